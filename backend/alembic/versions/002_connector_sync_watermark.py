@@ -0,0 +1,24 @@
+"""Connector incremental sync watermark
+
+Revision ID: 002_connector_sync_watermark
+Revises: 001_enterprise_upgrade
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '002_connector_sync_watermark'
+down_revision = '001_enterprise_upgrade'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('connectors', sa.Column('sync_watermark', postgresql.JSON(astext_type=sa.Text()), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('connectors', 'sync_watermark')
@@ -7,7 +7,8 @@ from fastapi import APIRouter, HTTPException, Query, Depends
 from sqlalchemy.orm import Session
 
 from app.core.violation_engine import (
-    get_dataset_stats, load_violations, run_scan
+    DEFAULT_CHUNK_SIZE, get_dataset_stats, get_violation_by_id,
+    run_incremental_scan, run_scan, run_streaming_scan, violation_index,
 )
 from app.core.scheduler import get_scheduler_status
 from app.models.violation import Violation
@@ -22,12 +23,27 @@ router = APIRouter(prefix="/api/compliance", tags=["Compliance"])
 
 @router.post("/scan", summary="Run a compliance scan on the IBM AML dataset")
 def trigger_scan(
+    chunk_size: Optional[int] = Query(
+        default=None, ge=1000,
+        description="Stream the dataset in chunks of this many rows (bounded memory)"
+    ),
+    incremental: bool = Query(
+        default=False,
+        description="Scan only rows appended since the last incremental scan and keep existing violations"
+    ),
+    workers: Optional[int] = Query(
+        default=None, ge=0,
+        description="Worker processes for a full scan (0 = one per CPU core; default from SCAN_WORKERS)"
+    ),
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
     """
     Runs all approved rules against the IBM AML transaction dataset.
-    Returns a summary of violations found.
+    Returns a summary of violations found. With `chunk_size` the scan streams
+    the file in fixed-size chunks and also reports peak memory. With
+    `incremental` only new rows are scanned and the summary covers the new
+    violations.
     """
     # Check transaction limit before scanning
     service = SubscriptionService(db)
@@ -42,8 +58,16 @@ def trigger_scan(
             detail=limit_check.get("reason", "Monthly transaction limit exceeded. Upgrade your plan.")
         )
     
+    scan_stats: dict = {}
     try:
-        violations = run_scan()
+        if incremental:
+            scan_stats = run_incremental_scan(chunk_size or DEFAULT_CHUNK_SIZE)
+            violations = scan_stats.pop("violations")
+        elif chunk_size:
+            scan_stats = run_streaming_scan(chunk_size)
+            violations = scan_stats.pop("violations")
+        else:
+            violations = run_scan(workers=workers)
     except FileNotFoundError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
@@ -64,6 +88,7 @@ def trigger_scan(
         "severity_breakdown": severity_counts,
         "violations_by_rule": rule_counts,
         "message": f"Scan complete. {len(violations)} violation(s) detected and saved.",
+        **scan_stats,
     }
 
 
@@ -75,17 +100,11 @@ def list_violations(
     limit: int = Query(default=100, ge=1, le=1000),
     offset: int = Query(default=0, ge=0),
 ):
-    violations = load_violations()
-
-    if status:
-        violations = [v for v in violations if v.status == status]
-    if severity:
-        violations = [v for v in violations if v.severity == severity]
-    if rule_id:
-        violations = [v for v in violations if v.rule_id == rule_id]
-
-    total = len(violations)
-    paginated = violations[offset: offset + limit]
+    filters = {"status": status, "severity": severity, "rule_id": rule_id}
+    # One index refresh serves both the count and the page
+    index = violation_index()
+    total = index.count(**filters)
+    paginated = index.query(limit=limit, offset=offset, **filters)
 
     return {
         "total": total,
@@ -97,8 +116,7 @@ def list_violations(
 
 @router.get("/violations/{violation_id}", summary="Get a single violation by ID")
 def get_violation(violation_id: str):
-    violations = load_violations()
-    match = next((v for v in violations if v.id == violation_id), None)
+    match = get_violation_by_id(violation_id)
     if not match:
         raise HTTPException(status_code=404, detail="Violation not found")
     return match
@@ -106,26 +124,24 @@ def get_violation(violation_id: str):
 
 @router.get("/summary", summary="High-level compliance summary statistics")
 def compliance_summary():
-    violations = load_violations()
+    index = violation_index()
     stats = get_dataset_stats()
 
     total_txns = stats.get("total_transactions", 0)
-    open_v = [v for v in violations if v.status == "open"]
-    resolved_v = [v for v in violations if v.status == "resolved"]
-    false_pos = [v for v in violations if v.status == "false_positive"]
+    status_counts = index.count_by("status")
+    open_count = status_counts.get("open", 0)
 
     severity_counts = {"critical": 0, "high": 0, "medium": 0, "low": 0}
-    for v in open_v:
-        severity_counts[v.severity] = severity_counts.get(v.severity, 0) + 1
+    severity_counts.update(index.count_by("severity", status="open"))
 
-    compliance_rate = round((1 - len(open_v) / max(total_txns, 1)) * 100, 2)
+    compliance_rate = round((1 - open_count / max(total_txns, 1)) * 100, 2)
 
     return {
         "total_transactions_scanned": total_txns,
-        "total_violations": len(violations),
-        "open_violations": len(open_v),
-        "resolved_violations": len(resolved_v),
-        "false_positives": len(false_pos),
+        "total_violations": len(index),
+        "open_violations": open_count,
+        "resolved_violations": status_counts.get("resolved", 0),
+        "false_positives": status_counts.get("false_positive", 0),
         "compliance_rate": compliance_rate,
         "severity_breakdown": severity_counts,
         "dataset_laundering_rate": stats.get("laundering_percentage", 0),
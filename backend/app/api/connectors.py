@@ -6,22 +6,17 @@ from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from typing import Dict, Any, Optional
 from uuid import UUID
-from cryptography.fernet import Fernet
-import os
-import base64
 
 from app.database import get_db
 from app.models.db_models import Connector, ConnectorType, ConnectorStatus
 from app.auth import get_current_active_user
 from app.models.db_models import User
 from app.connectors import create_connector
+from app.connectors.credentials import decrypt_config, encrypt_config
+from app.connectors.pool import pool_stats
 
 router = APIRouter(prefix="/api/connectors", tags=["Connectors"])
 
-# Encryption key for credentials
-ENCRYPTION_KEY = os.getenv("ENCRYPTION_KEY", Fernet.generate_key())
-cipher_suite = Fernet(ENCRYPTION_KEY if isinstance(ENCRYPTION_KEY, bytes) else ENCRYPTION_KEY.encode())
-
 
 class ConnectorCreate(BaseModel):
     connector_name: str
@@ -47,7 +42,7 @@ def add_connector(
 ):
     """Add new data connector"""
     # Encrypt sensitive credentials
-    encrypted_config = _encrypt_config(connector_data.connection_config)
+    encrypted_config = encrypt_config(connector_data.connection_config)
     
     connector = Connector(
         org_id=current_user.org_id,
@@ -110,7 +105,7 @@ def test_connector(
     
     try:
         # Decrypt config
-        decrypted_config = _decrypt_config(connector.connection_config)
+        decrypted_config = decrypt_config(connector.connection_config)
         
         # Create connector instance and test
         conn = create_connector(
@@ -140,6 +135,25 @@ def test_connector(
         }
 
 
+@router.get("/pools")
+def get_connection_pools(
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Metrics (open connections, checkouts, waits) of the pools serving the organization's connectors"""
+    connectors = db.query(Connector).filter(Connector.org_id == current_user.org_id).all()
+    
+    keys = set()
+    for c in connectors:
+        try:
+            conn = create_connector(c.connector_type.value, decrypt_config(c.connection_config), c.field_mapping)
+        except Exception:
+            continue
+        keys.add(conn.pool_key())
+    
+    return {"pools": pool_stats(keys)}
+
+
 @router.delete("/remove/{connector_id}")
 def remove_connector(
     connector_id: UUID,
@@ -179,36 +193,27 @@ def get_connector_status(
     return {
         "connector_id": str(connector.connector_id),
         "status": connector.status.value,
-        "last_sync": connector.last_sync.isoformat() if connector.last_sync else None
+        "last_sync": connector.last_sync.isoformat() if connector.last_sync else None,
+        "sync_watermark": connector.sync_watermark
     }
 
 
-def _encrypt_config(config: Dict[str, Any]) -> Dict[str, Any]:
-    """Encrypt sensitive configuration"""
-    encrypted = {}
-    sensitive_keys = ["password", "api_key", "secret", "token"]
-    
-    for key, value in config.items():
-        if any(sk in key.lower() for sk in sensitive_keys):
-            encrypted[key] = cipher_suite.encrypt(str(value).encode()).decode()
-        else:
-            encrypted[key] = value
+@router.post("/resync/{connector_id}")
+def reset_connector_sync(
+    connector_id: UUID,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Forget the sync watermark: the next scan reads the whole source"""
+    connector = db.query(Connector).filter(
+        Connector.connector_id == connector_id,
+        Connector.org_id == current_user.org_id
+    ).first()
     
-    return encrypted
-
-
-def _decrypt_config(config: Dict[str, Any]) -> Dict[str, Any]:
-    """Decrypt sensitive configuration"""
-    decrypted = {}
-    sensitive_keys = ["password", "api_key", "secret", "token"]
+    if not connector:
+        raise HTTPException(status_code=404, detail="Connector not found")
     
-    for key, value in config.items():
-        if any(sk in key.lower() for sk in sensitive_keys):
-            try:
-                decrypted[key] = cipher_suite.decrypt(value.encode()).decode()
-            except:
-                decrypted[key] = value
-        else:
-            decrypted[key] = value
+    connector.sync_watermark = None
+    db.commit()
     
-    return decrypted
+    return {"message": "Connector will be fully resynced on its next scan"}
@@ -14,7 +14,7 @@ from sqlalchemy.orm import Session
 
 from app.services.document_parser import extract_text, get_document_metadata
 from app.core.rule_engine import (
-    add_rules, approve_rule, delete_rule, get_rules, update_rule
+    add_rules, approve_rule, delete_rule, get_rules, get_rules_for_policy, update_rule
 )
 from app.core.rule_extractor import extract_rules_from_text
 from app.models.rule import PolicyRule
@@ -166,8 +166,7 @@ async def upload_policy(
 
 @router.get("/{policy_id}/rules", summary="List rules for a specific policy")
 def get_policy_rules(policy_id: str):
-    rules = [r for r in get_rules() if r.policy_id == policy_id]
-    return rules
+    return get_rules_for_policy(policy_id)
 
 
 @router.get("/rules/all", summary="List all rules across all policies")
@@ -3,7 +3,7 @@ API routes for human review of compliance violations.
 """
 from typing import Literal, Optional
 from fastapi import APIRouter, HTTPException, Query
-from app.core.violation_engine import load_violations, update_violation_status
+from app.core.violation_engine import update_violation_status, violation_index
 from app.models.review import ReviewAction
 
 router = APIRouter(prefix="/api/reviews", tags=["Reviews"])
@@ -21,15 +21,13 @@ def list_review_queue(
     severity: Optional[Literal["critical", "high", "medium", "low"]] = None,
     limit: int = Query(default=50, ge=1, le=200),
 ):
-    violations = load_violations()
+    index = violation_index()
     # Review queue shows only open + reviewed (not yet resolved or false_positive)
-    queue = [v for v in violations if v.status in ("open", "reviewed")]
-    if severity:
-        queue = [v for v in queue if v.severity == severity]
-    queue.sort(key=lambda v: {"critical": 0, "high": 1, "medium": 2, "low": 3}[v.severity])
+    pending = ("open", "reviewed")
+    queue = index.review_queue(pending, severity=severity, limit=limit)
     return {
-        "total_pending": len(queue),
-        "violations": [v.model_dump() for v in queue[:limit]],
+        "total_pending": index.count(status=pending, severity=severity),
+        "violations": [v.model_dump() for v in queue],
     }
 
 
@@ -54,21 +52,16 @@ def review_violation(violation_id: str, action: ReviewAction):
 
 @router.get("/stats", summary="Review queue statistics")
 def review_stats():
-    violations = load_violations()
-    open_v = [v for v in violations if v.status == "open"]
-    reviewed_v = [v for v in violations if v.status == "reviewed"]
-    resolved_v = [v for v in violations if v.status == "resolved"]
-    false_pos = [v for v in violations if v.status == "false_positive"]
-
-    critical_open = [v for v in open_v if v.severity == "critical"]
+    index = violation_index()
+    status_counts = index.count_by("status")
 
     return {
-        "open": len(open_v),
-        "reviewed": len(reviewed_v),
-        "resolved": len(resolved_v),
-        "false_positives": len(false_pos),
-        "critical_open": len(critical_open),
+        "open": status_counts.get("open", 0),
+        "reviewed": status_counts.get("reviewed", 0),
+        "resolved": status_counts.get("resolved", 0),
+        "false_positives": status_counts.get("false_positive", 0),
+        "critical_open": index.count(status="open", severity="critical"),
         "resolution_rate": round(
-            len(resolved_v) / max(len(violations), 1) * 100, 1
+            status_counts.get("resolved", 0) / max(len(index), 1) * 100, 1
         ),
     }
@@ -2,9 +2,11 @@
 Base connector class for all data source integrations
 """
 from abc import ABC, abstractmethod
-from typing import Dict, List, Any, Optional
+from typing import Dict, Iterator, List, Any, Optional
 import pandas as pd
 
+from .pool import ConnectionPool, config_key, pool_for
+
 
 class BaseConnector(ABC):
     """Abstract base class for all data connectors"""
@@ -34,6 +36,120 @@ class BaseConnector(ABC):
         """Fetch data from source"""
         pass
     
+    def iter_batches(
+        self,
+        batch_size: int,
+        columns: Optional[List[str]] = None,
+        limit: Optional[int] = None,
+        predicates: Optional[List[tuple]] = None
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Stream data from source as DataFrames of at most `batch_size` rows,
+        with field mapping applied. `columns` (mapped names) restricts the
+        columns read; `limit` caps the total number of rows.
+        
+        `predicates` are condition ASTs (see app.connectors.pushdown) of which
+        the scan needs only rows where any holds. Sources that can filter
+        apply them as a coarse filter; others, like this fallback, ignore them.
+        
+        Connectors override this to stream natively; this fallback slices the
+        result of fetch_data, so it holds the whole result in memory.
+        """
+        if batch_size <= 0:
+            raise ValueError("batch_size must be positive")
+        df = self.fetch_data(limit=limit)
+        if columns is not None:
+            df = df[[c for c in columns if c in df.columns]]
+        for start in range(0, len(df), batch_size):
+            yield df.iloc[start:start + batch_size]
+    
+    @property
+    def watermark_column(self) -> Optional[str]:
+        """Source column for incremental sync (see app.connectors.sync), if configured"""
+        return self.config.get("watermark_column")
+    
+    def max_watermark(self, column: str) -> Any:
+        """
+        Current maximum of source `column`, bounding an incremental sync.
+        None when the source cannot report it: the sync then keeps the
+        largest value it reads.
+        """
+        return None
+    
+    def available_columns(self) -> Optional[List[str]]:
+        """
+        Mapped names of the source's columns, or None when the source cannot
+        list them without reading data (a projection then names only columns
+        the scan needs).
+        """
+        return None
+    
+    def mapped_columns(self, names: List[str]) -> List[str]:
+        """Engine-facing names of source columns `names`, applying the field mapping"""
+        return [self.field_mapping.get(name, name) for name in names]
+    
+    def source_columns(self, columns: List[str]) -> List[str]:
+        """Source column names of mapped `columns`, reversing the field mapping"""
+        reverse = {target: source for source, target in self.field_mapping.items()}
+        return [reverse.get(c, c) for c in columns]
+    
+    def project(self, df: pd.DataFrame, columns: Optional[List[str]]) -> pd.DataFrame:
+        """Keep the source columns of mapped `columns` present in an unmapped frame"""
+        if columns is None:
+            return df
+        return df[[c for c in self.source_columns(columns) if c in df.columns]]
+    
+    # ── Pooled connections ───────────────────────────────────────────────────
+    # Database connectors implement _open_connection and check connections
+    # out of the process-wide pool for their config instead of opening one
+    # per instance (see app.connectors.pool).
+    
+    # Config keys a connection is opened from: pools are shared by every
+    # config with the same values, whatever it reads through the connection
+    POOL_CONFIG_KEYS = ("host", "port", "database", "user", "password", "connection_string")
+    
+    @staticmethod
+    def _open_connection(config: Dict[str, Any]) -> Any:
+        """Open a new connection for the POOL_CONFIG_KEYS of a config"""
+        raise NotImplementedError
+    
+    @staticmethod
+    def _ping_connection(connection: Any) -> None:
+        """Raise if a pooled connection is no longer usable"""
+    
+    @staticmethod
+    def _reset_connection(connection: Any) -> None:
+        """Return a connection to a clean state before it is pooled again"""
+    
+    def _pool_params(self) -> Dict[str, Any]:
+        return {k: self.config[k] for k in self.POOL_CONFIG_KEYS if k in self.config}
+    
+    def pool_key(self) -> str:
+        """Registry key of the pool this connector checks connections out of"""
+        return config_key(type(self).__name__, self._pool_params())
+    
+    def _pool(self) -> ConnectionPool:
+        # The pool outlives this instance: its callables must not reference it
+        cls, params = type(self), self._pool_params()
+        return pool_for(
+            cls.__name__,
+            params,
+            lambda: cls._open_connection(params),
+            cls._ping_connection,
+            cls._reset_connection
+        )
+    
+    def _acquire(self) -> None:
+        """Check a connection out of the pool (no-op if one is held)"""
+        if self.connection is None:
+            self.connection = self._pool().acquire()
+    
+    def _release(self) -> None:
+        """Hand the held connection back to the pool"""
+        if self.connection is not None:
+            connection, self.connection = self.connection, None
+            self._pool().release(connection)
+    
     def validate_schema(self, df: pd.DataFrame) -> Dict[str, Any]:
         """Validate data schema"""
         required_fields = ["transaction_id", "amount", "date"]
@@ -0,0 +1,46 @@
+"""
+Encryption of sensitive connector settings (passwords, API keys, tokens)
+"""
+import os
+from typing import Any, Dict
+
+from cryptography.fernet import Fernet
+
+# Encryption key for credentials
+ENCRYPTION_KEY = os.getenv("ENCRYPTION_KEY", Fernet.generate_key())
+cipher_suite = Fernet(ENCRYPTION_KEY if isinstance(ENCRYPTION_KEY, bytes) else ENCRYPTION_KEY.encode())
+
+SENSITIVE_KEYS = ["password", "api_key", "secret", "token"]
+
+
+def _is_sensitive(key: str) -> bool:
+    return any(sk in key.lower() for sk in SENSITIVE_KEYS)
+
+
+def encrypt_config(config: Dict[str, Any]) -> Dict[str, Any]:
+    """Encrypt sensitive configuration"""
+    encrypted = {}
+    
+    for key, value in config.items():
+        if _is_sensitive(key):
+            encrypted[key] = cipher_suite.encrypt(str(value).encode()).decode()
+        else:
+            encrypted[key] = value
+    
+    return encrypted
+
+
+def decrypt_config(config: Dict[str, Any]) -> Dict[str, Any]:
+    """Decrypt sensitive configuration"""
+    decrypted = {}
+    
+    for key, value in (config or {}).items():
+        if _is_sensitive(key):
+            try:
+                decrypted[key] = cipher_suite.decrypt(value.encode()).decode()
+            except Exception:
+                decrypted[key] = value
+        else:
+            decrypted[key] = value
+    
+    return decrypted
@@ -2,7 +2,7 @@
 CSV file connector implementation
 """
 import pandas as pd
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Iterator, List, Optional
 from .base import BaseConnector
 
 
@@ -46,3 +46,36 @@ class CSVConnector(BaseConnector):
         
         df = pd.read_csv(file_path, **kwargs)
         return self.map_fields(df)
+    
+    def iter_batches(
+        self,
+        batch_size: int,
+        columns: Optional[List[str]] = None,
+        limit: Optional[int] = None,
+        predicates: Optional[List[tuple]] = None
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Read the file in chunks of `batch_size` rows, parsing only `columns`.
+        `predicates` are not pushed down.
+        """
+        if batch_size <= 0:
+            raise ValueError("batch_size must be positive")
+        
+        kwargs = {}
+        if limit:
+            kwargs["nrows"] = limit
+        if columns is not None:
+            wanted = set(self.source_columns(columns))
+            kwargs["usecols"] = lambda c: c in wanted
+        
+        for chunk in pd.read_csv(self.config.get("file_path"), chunksize=batch_size, **kwargs):
+            yield self.map_fields(chunk)
+    
+    def max_watermark(self, column: str) -> Any:
+        """Current maximum of `column` in the file"""
+        values = pd.read_csv(self.config.get("file_path"), usecols=[column])[column].dropna()
+        if not len(values):
+            return None
+        if not pd.api.types.is_numeric_dtype(values):
+            values = values.astype(str)
+        return values.max()
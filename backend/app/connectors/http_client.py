@@ -0,0 +1,84 @@
+"""
+Shared HTTP clients for REST connectors.
+
+An httpx.AsyncClient is bound to the event loop it runs on, so REST
+connectors run all their requests on one background event loop thread.
+That loop owns a keep-alive AsyncClient per distinct (headers, timeout)
+setting, shared by every connector instance and scan, so connections and
+TLS sessions are reused between requests, pages and scans.
+
+Synchronous code, including code that already runs inside another event
+loop (a scan), submits coroutines to that loop with `run`.
+"""
+import asyncio
+import os
+import threading
+from typing import Any, Awaitable, Dict, Optional, Tuple
+
+import httpx
+
+# Connections open at most per shared client (all hosts)
+REST_MAX_CONNECTIONS = int(os.getenv("REST_MAX_CONNECTIONS", "20"))
+
+_lock = threading.Lock()
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_thread: Optional[threading.Thread] = None
+_clients: Dict[Tuple, httpx.AsyncClient] = {}
+
+
+def _ensure_loop() -> asyncio.AbstractEventLoop:
+    global _loop, _thread
+    with _lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            _thread = threading.Thread(target=_loop.run_forever, name="rest-connectors", daemon=True)
+            _thread.start()
+        return _loop
+
+
+def run(coroutine: Awaitable, timeout: Optional[float] = None) -> Any:
+    """Run `coroutine` on the connector loop and wait for its result"""
+    loop = _ensure_loop()
+    if threading.current_thread() is _thread:
+        raise RuntimeError("run() called from the connector loop itself")
+    future = asyncio.run_coroutine_threadsafe(coroutine, loop)
+    try:
+        return future.result(timeout)
+    except BaseException:
+        future.cancel()
+        raise
+
+
+def shared_client(headers: Dict[str, str], timeout: float) -> httpx.AsyncClient:
+    """The keep-alive client for these settings; call on the connector loop only"""
+    key = (tuple(sorted(headers.items())), timeout)
+    client = _clients.get(key)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            headers=headers,
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=REST_MAX_CONNECTIONS, max_keepalive_connections=REST_MAX_CONNECTIONS),
+        )
+        _clients[key] = client
+    return client
+
+
+async def _close_all() -> None:
+    clients = list(_clients.values())
+    _clients.clear()
+    for client in clients:
+        await client.aclose()
+
+
+def close_clients() -> None:
+    """Close the shared clients and stop the connector loop"""
+    global _loop, _thread
+    with _lock:
+        loop, thread = _loop, _thread
+        _loop = _thread = None
+    if loop is None:
+        return
+    asyncio.run_coroutine_threadsafe(_close_all(), loop).result()
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    loop.close()
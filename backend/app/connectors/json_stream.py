@@ -0,0 +1,138 @@
+"""
+Incremental decoding of JSON record responses.
+
+A JSONRecordStream is fed a response body chunk by chunk and returns the
+records completed by each chunk, so a large response becomes DataFrame
+batches without holding the whole body or its parsed form in memory.
+Three layouts are understood:
+
+- a top-level array of records: [{...}, {...}]
+- an object holding the array under `records_key`: {"data": [...], "next": ...};
+  its other members are kept in `meta` (e.g. a next-page cursor)
+- newline-delimited JSON (`ndjson=True`): one record per line
+
+A top-level object without `records_key` is a single record, as in the
+non-streaming REST reads.
+"""
+import codecs
+import json
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+_WHITESPACE = re.compile(r"\s*")
+
+
+class JSONRecordStream:
+    """Decode the records of a JSON response fed in chunks"""
+
+    def __init__(self, records_key: str = "data", ndjson: bool = False):
+        self.records_key = records_key
+        self.ndjson = ndjson
+        # Members of an enclosing object other than the records
+        self.meta: Dict[str, Any] = {}
+        self._text = codecs.getincrementaldecoder("utf-8")()
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        # start -> items / key -> colon -> value -> ... -> end
+        self._state = "start"
+        self._in_object = False
+        self._key: Optional[str] = None
+        self._has_records = False
+
+    def feed(self, chunk: bytes) -> List[Any]:
+        """Records completed by `chunk`"""
+        self._buffer += self._text.decode(chunk)
+        return self._drain(final=False)
+
+    def close(self) -> List[Any]:
+        """Records left at the end of the body; raises ValueError on truncated JSON"""
+        self._buffer += self._text.decode(b"", final=True)
+        records = self._drain(final=True)
+        if self.ndjson:
+            return records
+        if self._state != "end":
+            raise ValueError("Truncated JSON response")
+        if self._in_object and not self._has_records:
+            # An object without a records array is one record
+            records.append(self.meta)
+            self.meta = {}
+        return records
+
+    def _drain(self, final: bool) -> List[Any]:
+        if self.ndjson:
+            return self._drain_lines(final)
+        records: List[Any] = []
+        buffer, pos = self._buffer, 0
+        while True:
+            pos = _WHITESPACE.match(buffer, pos).end()
+            if pos >= len(buffer):
+                break
+            char = buffer[pos]
+            state = self._state
+            if state == "start":
+                if char == "[":
+                    self._state = "items"
+                elif char == "{":
+                    self._state, self._in_object = "key", True
+                else:
+                    raise ValueError("JSON response is not an array or object")
+                pos += 1
+            elif state == "items":
+                if char in ",]":
+                    pos += 1
+                    if char == "]":
+                        self._state = "key" if self._in_object else "end"
+                    continue
+                decoded = self._decode(buffer, pos, final)
+                if decoded is None:
+                    break
+                record, pos = decoded
+                records.append(record)
+            elif state == "key":
+                if char in ",}":
+                    pos += 1
+                    if char == "}":
+                        self._state = "end"
+                    continue
+                decoded = self._decode(buffer, pos, final)
+                if decoded is None:
+                    break
+                self._key, pos = decoded
+                self._state = "colon"
+            elif state == "colon":
+                if char != ":":
+                    raise ValueError("Malformed JSON object")
+                self._state = "value"
+                pos += 1
+            elif state == "value":
+                if self._key == self.records_key and char == "[":
+                    self._state, self._has_records = "items", True
+                    pos += 1
+                    continue
+                decoded = self._decode(buffer, pos, final)
+                if decoded is None:
+                    break
+                self.meta[self._key], pos = decoded
+                self._state = "key"
+            else:
+                raise ValueError("Unexpected data after the JSON response")
+        self._buffer = buffer[pos:]
+        return records
+
+    def _drain_lines(self, final: bool) -> List[Any]:
+        lines = self._buffer.split("\n")
+        self._buffer = "" if final else lines.pop()
+        return [json.loads(line) for line in lines if line.strip()]
+
+    def _decode(self, buffer: str, pos: int, final: bool) -> Optional[Tuple[Any, int]]:
+        # None: the value continues in the next chunk
+        try:
+            value, end = self._decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            if final:
+                raise ValueError("Truncated JSON response")
+            return None
+        if end == len(buffer) and not final and not isinstance(value, (dict, list, str)):
+            # A number (or literal) at the end of the buffer may still be cut short
+            return None
+        return value, end
@@ -3,48 +3,62 @@ MongoDB connector implementation
 """
 from pymongo import MongoClient
 import pandas as pd
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Iterator, List, Optional
 from .base import BaseConnector
+from .pushdown import mongo_filter
 
 
 class MongoDBConnector(BaseConnector):
     """MongoDB database connector"""
     
-    def connect(self) -> bool:
-        """Establish MongoDB connection"""
-        try:
-            connection_string = self.config.get("connection_string")
-            if not connection_string:
-                host = self.config.get("host", "localhost")
-                port = self.config.get("port", 27017)
-                user = self.config.get("user")
-                password = self.config.get("password")
-                
-                if user and password:
-                    connection_string = f"mongodb://{user}:{password}@{host}:{port}"
-                else:
-                    connection_string = f"mongodb://{host}:{port}"
+    @staticmethod
+    def _open_connection(config: Dict[str, Any]) -> Any:
+        connection_string = config.get("connection_string")
+        if not connection_string:
+            host = config.get("host", "localhost")
+            port = config.get("port", 27017)
+            user = config.get("user")
+            password = config.get("password")
             
-            self.connection = MongoClient(connection_string)
+            if user and password:
+                connection_string = f"mongodb://{user}:{password}@{host}:{port}"
+            else:
+                connection_string = f"mongodb://{host}:{port}"
+        
+        client = MongoClient(connection_string)
+        try:
             # Test connection
-            self.connection.server_info()
+            client.server_info()
+        except Exception:
+            client.close()
+            raise
+        return client
+    
+    @staticmethod
+    def _ping_connection(connection: Any) -> None:
+        connection.admin.command("ping")
+    
+    def connect(self) -> bool:
+        """Check a MongoDB client out of the shared pool"""
+        try:
+            self._acquire()
             return True
         except Exception as e:
             raise ConnectionError(f"Failed to connect to MongoDB: {str(e)}")
     
     def disconnect(self) -> bool:
-        """Close MongoDB connection"""
-        if self.connection:
-            self.connection.close()
-            self.connection = None
+        """Return the MongoDB client to the pool"""
+        self._release()
         return True
     
     def test_connection(self) -> Dict[str, Any]:
         """Test MongoDB connection"""
         try:
             self.connect()
-            info = self.connection.server_info()
-            self.disconnect()
+            try:
+                info = self.connection.server_info()
+            finally:
+                self.disconnect()
             
             return {
                 "status": "success",
@@ -75,7 +89,61 @@ class MongoDBConnector(BaseConnector):
             cursor = cursor.limit(limit)
         
         data = list(cursor)
-        df = pd.DataFrame(data)
+        return self._to_frame(data)
+    
+    def iter_batches(
+        self,
+        batch_size: int,
+        columns: Optional[List[str]] = None,
+        limit: Optional[int] = None,
+        predicates: Optional[List[tuple]] = None
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Stream the collection through a cursor fetching `batch_size` documents
+        per round trip, projected server-side to `columns` and filtered by
+        `predicates`.
+        """
+        if batch_size <= 0:
+            raise ValueError("batch_size must be positive")
+        if not self.connection:
+            self.connect()
+        
+        coll = self.connection[self.config.get("database")][self.config.get("collection", "transactions")]
+        projection = None
+        if columns is not None:
+            projection = {c: 1 for c in self.source_columns(columns)}
+            projection["_id"] = 0
+        
+        query_filter = {}
+        if predicates:
+            query_filter = mongo_filter(predicates, lambda c: self.source_columns([c])[0]) or {}
+        
+        cursor = coll.find(query_filter, projection, batch_size=batch_size)
+        if limit:
+            cursor = cursor.limit(limit)
+        try:
+            batch = []
+            for document in cursor:
+                batch.append(document)
+                if len(batch) == batch_size:
+                    yield self._to_frame(batch)
+                    batch = []
+            if batch:
+                yield self._to_frame(batch)
+        finally:
+            cursor.close()
+    
+    def max_watermark(self, column: str) -> Any:
+        """Current maximum of `column` in the collection"""
+        if not self.connection:
+            self.connect()
+        
+        coll = self.connection[self.config.get("database")][self.config.get("collection", "transactions")]
+        document = coll.find_one({column: {"$ne": None}}, {column: 1}, sort=[(column, -1)])
+        return document.get(column) if document else None
+    
+    def _to_frame(self, documents: List[dict]) -> pd.DataFrame:
+        df = pd.DataFrame(documents)
         
         # Remove MongoDB _id if present
         if "_id" in df.columns:
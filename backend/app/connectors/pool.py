@@ -0,0 +1,317 @@
+"""
+Connection pools shared by database connectors.
+
+Connectors of the same type and (decrypted) connection parameters share one
+process-wide ConnectionPool, looked up in a registry keyed by a hash of those
+parameters only: connectors reading different tables, mappings or pages of
+the same database share a pool. Scans and connection tests check a warm connection out of the pool
+instead of paying TCP, TLS and authentication setup every time, and hand it
+back on disconnect instead of closing it.
+
+Pools are bounded: at most `max_size` connections are open per pool and a
+checkout waits up to `timeout` seconds for one to come back. Connections
+idle for longer than `idle_timeout` seconds are closed, and one idle for
+longer than `check_after` seconds is health-checked before it is reused.
+`close_idle` (run on every lookup and periodically by the scheduler) applies
+that eviction to every pool and closes and forgets pools left without
+connections for `idle_timeout` seconds.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Connections open at most per pool
+CONNECTOR_POOL_SIZE = int(os.getenv("CONNECTOR_POOL_SIZE", "5"))
+# Seconds an idle connection is kept open
+CONNECTOR_POOL_IDLE_TIMEOUT = float(os.getenv("CONNECTOR_POOL_IDLE_TIMEOUT", "300"))
+# Seconds a connection may sit idle before it is health-checked on checkout
+CONNECTOR_POOL_CHECK_AFTER = float(os.getenv("CONNECTOR_POOL_CHECK_AFTER", "30"))
+# Seconds a checkout waits for a connection when the pool is exhausted
+CONNECTOR_POOL_TIMEOUT = float(os.getenv("CONNECTOR_POOL_TIMEOUT", "30"))
+
+
+def _close_quietly(connection: Any) -> None:
+    try:
+        connection.close()
+    except Exception:
+        pass
+
+
+class ConnectionPool:
+    """Bounded pool of connections opened by `open_connection`"""
+
+    def __init__(
+        self,
+        open_connection: Callable[[], Any],
+        ping: Optional[Callable[[Any], None]] = None,
+        reset: Optional[Callable[[Any], None]] = None,
+        max_size: Optional[int] = None,
+        idle_timeout: Optional[float] = None,
+        check_after: Optional[float] = None,
+        timeout: Optional[float] = None,
+        name: str = ""
+    ):
+        self.open_connection = open_connection
+        # Raises if a connection is no longer usable
+        self.ping = ping
+        # Returns a connection to a clean state before it is pooled again
+        self.reset = reset
+        self.max_size = max_size or CONNECTOR_POOL_SIZE
+        if self.max_size <= 0:
+            raise ValueError("max_size must be positive")
+        self.idle_timeout = CONNECTOR_POOL_IDLE_TIMEOUT if idle_timeout is None else idle_timeout
+        self.check_after = CONNECTOR_POOL_CHECK_AFTER if check_after is None else check_after
+        self.timeout = CONNECTOR_POOL_TIMEOUT if timeout is None else timeout
+        self.name = name
+
+        self._cond = threading.Condition()
+        # (connection, returned_at) oldest first; checkouts take the most recently used
+        self._idle: List[Tuple[Any, float]] = []
+        self._in_use = 0
+        self._closed = False
+        self.last_used = time.monotonic()
+
+        self.checkouts = 0
+        self.waits = 0
+        self.wait_seconds = 0.0
+        self.timeouts = 0
+        self.created = 0
+        self.evicted = 0
+        self.failed_checks = 0
+
+    # ── Checkout ─────────────────────────────────────────────────────────────
+
+    def acquire(self, timeout: Optional[float] = None) -> Any:
+        """Check out a connection, opening one if none is idle and the pool has room"""
+        timeout = self.timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        wait_started = None
+        with self._cond:
+            stale = self._take_expired()
+            while True:
+                if self._closed:
+                    raise ConnectionError(f"Connection pool {self.name} is closed")
+                if self._idle:
+                    connection, returned_at = self._idle.pop()
+                    break
+                if self._in_use < self.max_size:
+                    connection, returned_at = None, None
+                    break
+                if wait_started is None:
+                    wait_started = time.monotonic()
+                    self.waits += 1
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.timeouts += 1
+                    self.wait_seconds += time.monotonic() - wait_started
+                    raise ConnectionError(
+                        f"No connection available in pool {self.name} within {timeout}s "
+                        f"({self.max_size} in use)"
+                    )
+                self._cond.wait(remaining)
+            self._in_use += 1
+            self.checkouts += 1
+            self.last_used = time.monotonic()
+            if wait_started is not None:
+                self.wait_seconds += time.monotonic() - wait_started
+
+        # Closing, health checks and connecting are round trips: done outside the lock
+        for old in stale:
+            _close_quietly(old)
+        try:
+            if connection is not None and time.monotonic() - returned_at > self.check_after:
+                if not self._healthy(connection):
+                    _close_quietly(connection)
+                    connection = None
+            if connection is None:
+                connection = self.open_connection()
+                with self._cond:
+                    self.created += 1
+        except BaseException:
+            with self._cond:
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+        return connection
+
+    def release(self, connection: Any, discard: bool = False) -> None:
+        """Return a checked-out connection; `discard` closes it instead of pooling it"""
+        if not discard and self.reset is not None:
+            try:
+                self.reset(connection)
+            except Exception:
+                discard = True
+        with self._cond:
+            self._in_use -= 1
+            self.last_used = time.monotonic()
+            pooled = not (discard or self._closed)
+            if pooled:
+                self._idle.append((connection, time.monotonic()))
+            stale = self._take_expired()
+            self._cond.notify()
+        if not pooled:
+            _close_quietly(connection)
+        for old in stale:
+            _close_quietly(old)
+
+    @contextmanager
+    def connection(self) -> Iterator[Any]:
+        """Check out a connection for the block; it is discarded if the block raises"""
+        connection = self.acquire()
+        try:
+            yield connection
+        except BaseException:
+            self.release(connection, discard=True)
+            raise
+        self.release(connection)
+
+    def _healthy(self, connection: Any) -> bool:
+        if self.ping is None:
+            return True
+        try:
+            self.ping(connection)
+            return True
+        except Exception:
+            with self._cond:
+                self.failed_checks += 1
+            return False
+
+    # ── Eviction ─────────────────────────────────────────────────────────────
+
+    def _take_expired(self) -> List[Any]:
+        """Remove idle connections past idle_timeout (caller holds the lock)"""
+        cutoff = time.monotonic() - self.idle_timeout
+        expired = 0
+        while expired < len(self._idle) and self._idle[expired][1] < cutoff:
+            expired += 1
+        stale = [connection for connection, _ in self._idle[:expired]]
+        del self._idle[:expired]
+        self.evicted += expired
+        return stale
+
+    def evict_idle(self) -> int:
+        """Close idle connections past idle_timeout; returns how many were closed"""
+        with self._cond:
+            stale = self._take_expired()
+        for connection in stale:
+            _close_quietly(connection)
+        return len(stale)
+
+    def touch(self) -> bool:
+        """Count a lookup as a use; False if the pool is already closed"""
+        with self._cond:
+            if self._closed:
+                return False
+            self.last_used = time.monotonic()
+            return True
+
+    def _retire(self) -> bool:
+        """Close the pool if it holds no connections and was unused for idle_timeout"""
+        with self._cond:
+            if self._in_use or self._idle or time.monotonic() - self.last_used <= self.idle_timeout:
+                return False
+            self._closed = True
+            return True
+
+    def close(self) -> None:
+        """Close idle connections now and checked-out ones when they are released"""
+        with self._cond:
+            self._closed = True
+            stale = [connection for connection, _ in self._idle]
+            self._idle = []
+            self._cond.notify_all()
+        for connection in stale:
+            _close_quietly(connection)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "name": self.name,
+                "max_size": self.max_size,
+                "open": self._in_use + len(self._idle),
+                "in_use": self._in_use,
+                "idle": len(self._idle),
+                "checkouts": self.checkouts,
+                "waits": self.waits,
+                "wait_seconds": round(self.wait_seconds, 6),
+                "timeouts": self.timeouts,
+                "created": self.created,
+                "evicted": self.evicted,
+                "failed_health_checks": self.failed_checks,
+            }
+
+
+# ── Registry ─────────────────────────────────────────────────────────────────
+
+_pools: Dict[str, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def config_key(connector_type: str, config: Dict[str, Any]) -> str:
+    """Registry key of connection parameters: a hash, so credentials are not kept as keys"""
+    payload = json.dumps([connector_type, config], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def pool_for(
+    connector_type: str,
+    config: Dict[str, Any],
+    open_connection: Callable[[], Any],
+    ping: Optional[Callable[[Any], None]] = None,
+    reset: Optional[Callable[[Any], None]] = None
+) -> ConnectionPool:
+    """
+    The process-wide pool for the connection parameters `config`, created
+    with the given callables on first use. A lookup also runs `close_idle`.
+    """
+    key = config_key(connector_type, config)
+    with _pools_lock:
+        pool = _pools.get(key)
+        # Touching counts as a use, so close_idle cannot retire the pool before
+        # the checkout; a pool closed meanwhile is replaced
+        if pool is None or not pool.touch():
+            pool = ConnectionPool(open_connection, ping, reset, name=f"{connector_type}:{key[:12]}")
+            _pools[key] = pool
+    close_idle()
+    return pool
+
+
+def close_idle() -> int:
+    """
+    Close idle connections past their pool's idle_timeout, then close and
+    forget pools left empty for that long. Returns how many pools were closed.
+    """
+    with _pools_lock:
+        pools = list(_pools.items())
+    for _, pool in pools:
+        pool.evict_idle()
+    retired = 0
+    with _pools_lock:
+        for key, pool in pools:
+            if _pools.get(key) is pool and pool._retire():
+                del _pools[key]
+                retired += 1
+    return retired
+
+
+def pool_stats(keys: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+    """Metrics of every registered pool, or of those with a `config_key` in `keys`"""
+    with _pools_lock:
+        if keys is None:
+            pools = list(_pools.values())
+        else:
+            pools = [_pools[key] for key in set(keys) if key in _pools]
+    return [pool.stats() for pool in pools]
+
+
+def close_pools() -> None:
+    """Close and forget every registered pool"""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
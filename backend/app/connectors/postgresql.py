@@ -1,45 +1,66 @@
 """
 PostgreSQL connector implementation
 """
+import uuid
 import psycopg2
 import pandas as pd
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Iterator, List, Optional, Tuple
 from .base import BaseConnector
+from .pushdown import sql_where
 
 
 class PostgreSQLConnector(BaseConnector):
     """PostgreSQL database connector"""
     
+    @staticmethod
+    def _open_connection(config: Dict[str, Any]) -> Any:
+        return psycopg2.connect(
+            host=config.get("host", "localhost"),
+            port=config.get("port", 5432),
+            database=config.get("database"),
+            user=config.get("user"),
+            password=config.get("password")
+        )
+    
+    @staticmethod
+    def _ping_connection(connection: Any) -> None:
+        if connection.closed:
+            raise ConnectionError("Connection closed")
+        cursor = connection.cursor()
+        try:
+            cursor.execute("SELECT 1")
+        finally:
+            cursor.close()
+        connection.rollback()
+    
+    @staticmethod
+    def _reset_connection(connection: Any) -> None:
+        connection.rollback()
+    
     def connect(self) -> bool:
-        """Establish PostgreSQL connection"""
+        """Check a PostgreSQL connection out of the shared pool"""
         try:
-            self.connection = psycopg2.connect(
-                host=self.config.get("host", "localhost"),
-                port=self.config.get("port", 5432),
-                database=self.config.get("database"),
-                user=self.config.get("user"),
-                password=self.config.get("password")
-            )
+            self._acquire()
             return True
         except Exception as e:
             raise ConnectionError(f"Failed to connect to PostgreSQL: {str(e)}")
     
     def disconnect(self) -> bool:
-        """Close PostgreSQL connection"""
-        if self.connection:
-            self.connection.close()
-            self.connection = None
+        """Return the PostgreSQL connection to the pool"""
+        self._release()
         return True
     
     def test_connection(self) -> Dict[str, Any]:
         """Test PostgreSQL connection"""
         try:
             self.connect()
-            cursor = self.connection.cursor()
-            cursor.execute("SELECT version();")
-            version = cursor.fetchone()[0]
-            cursor.close()
-            self.disconnect()
+            try:
+                cursor = self.connection.cursor()
+                cursor.execute("SELECT version();")
+                version = cursor.fetchone()[0]
+                cursor.close()
+            finally:
+                self.disconnect()
             
             return {
                 "status": "success",
@@ -66,3 +87,84 @@ class PostgreSQLConnector(BaseConnector):
         
         df = pd.read_sql_query(query, self.connection)
         return self.map_fields(df)
+    
+    def iter_batches(
+        self,
+        batch_size: int,
+        columns: Optional[List[str]] = None,
+        limit: Optional[int] = None,
+        predicates: Optional[List[tuple]] = None
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Stream the table through a server-side (named) cursor: rows stay on
+        the server and are fetched `batch_size` at a time. `columns` and
+        `predicates` are pushed down as the SELECT list and WHERE clause.
+        """
+        if batch_size <= 0:
+            raise ValueError("batch_size must be positive")
+        if not self.connection:
+            self.connect()
+        
+        cursor = self.connection.cursor(name=f"nitilens_{uuid.uuid4().hex}")
+        cursor.itersize = batch_size
+        try:
+            cursor.execute(*self._select_query(columns, limit, predicates))
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                names = [d[0] for d in cursor.description]
+                yield self.map_fields(pd.DataFrame.from_records(rows, columns=names))
+        finally:
+            cursor.close()
+            # End the read transaction the named cursor lived in
+            self.connection.rollback()
+    
+    def available_columns(self) -> Optional[List[str]]:
+        """Mapped column names of the configured table, from an empty SELECT"""
+        if not self.connection:
+            self.connect()
+        
+        table = self.config.get("table", "transactions")
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute(f"SELECT * FROM {table} LIMIT 0", [])
+            return self.mapped_columns([d[0] for d in cursor.description])
+        finally:
+            cursor.close()
+    
+    def max_watermark(self, column: str) -> Any:
+        """Current maximum of `column` in the configured table"""
+        if not self.connection:
+            self.connect()
+        
+        table = self.config.get("table", "transactions")
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute(f"SELECT MAX({_quote(column)}) FROM {table}", [])
+            return cursor.fetchone()[0]
+        finally:
+            cursor.close()
+    
+    def _select_query(
+        self,
+        columns: Optional[List[str]],
+        limit: Optional[int],
+        predicates: Optional[List[tuple]] = None
+    ) -> Tuple[str, list]:
+        """SELECT of the configured table with %s placeholders, and its parameters"""
+        table = self.config.get("table", "transactions")
+        fields = ", ".join(_quote(c) for c in self.source_columns(columns)) if columns else "*"
+        query = f"SELECT {fields} FROM {table}"
+        params: list = []
+        if predicates:
+            where, params = sql_where(predicates, lambda c: _quote(self.source_columns([c])[0]), "postgresql")
+            query += f" WHERE {where}"
+        if limit:
+            query += f" LIMIT {int(limit)}"
+        return query, params
+
+
+def _quote(identifier: str) -> str:
+    # Queries always run with parameters, so a literal % is doubled
+    return '"' + identifier.replace('"', '""').replace("%", "%%") + '"'
@@ -0,0 +1,226 @@
+"""
+Pushdown planner: which columns and rows a scan needs from a database source.
+
+`plan_pushdown` turns the active rules of a scan into a PushdownPlan: the
+columns the rules read (a projection) and their predicates, which are ORed
+into a SQL WHERE condition (`sql_where`) or a MongoDB filter (`mongo_filter`).
+The source database then ships only the rows some rule may flag, and only the
+columns the rules need. The filter is coarse: every row it drops is one no
+rule flags, and the rows it ships are still confirmed by the pandas checkers.
+
+Predicates are pushed down only when every rule of the scan can be expressed
+(threshold / comparison / pattern rules whose conditions translate exactly);
+a single rule that needs every row, such as an aggregate rule, keeps the
+filter off. Rules of unknown type also disable the projection.
+"""
+import re
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from app.core.condition_compiler import Node, logic_to_node, node_columns
+from app.core.stateful_rules import AggregateThresholdRule
+
+# Columns every scan reads besides the rule columns (violation record ids)
+ID_COLUMNS = ["transaction_id"]
+
+_SQL_OPERATORS = {">": ">", "<": "<", ">=": ">=", "<=": "<=", "==": "=", "!=": "<>"}
+_MONGO_OPERATORS = {">": "$gt", "<": "$lt", ">=": "$gte", "<=": "$lte", "==": "$eq", "!=": "$ne"}
+# BSON types pandas coerces to numbers (to_numeric) when a rule compares a field with a number
+_MONGO_NUMERIC_LIKE = ["string", "bool", "binData"]
+
+
+class PushdownPlan:
+    """Columns and row predicates a scan needs from its source"""
+
+    def __init__(self, columns: Optional[List[str]] = None, predicates: Optional[List[Node]] = None):
+        # Engine-facing column names to read (None: all columns)
+        self.columns = columns
+        # A row is needed if any of these holds (None: every row is needed)
+        self.predicates = predicates
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "columns": list(self.columns) if self.columns is not None else None,
+            "predicates": len(self.predicates) if self.predicates is not None else None,
+        }
+
+
+def plan_pushdown(logics: Iterable[dict]) -> PushdownPlan:
+    """Plan the projection and row filter for rules with the given structured logic"""
+    columns: Set[str] = set(ID_COLUMNS)
+    predicates: List[Node] = []
+    project = filterable = True
+    for logic in logics:
+        logic = logic or {}
+        node = logic_to_node(logic)
+        if node is not None and all(isinstance(c, str) for c in node_columns(node)):
+            columns |= node_columns(node)
+            if _pushable(node):
+                predicates.append(node)
+            else:
+                filterable = False
+        elif logic.get("type") == "aggregate":
+            # Totals need every row of the grouped columns
+            columns |= set(AggregateThresholdRule.from_logic(logic).columns)
+            filterable = False
+        else:
+            project = filterable = False
+    return PushdownPlan(
+        sorted(columns) if project else None,
+        list(dict.fromkeys(predicates)) if filterable and predicates else None
+    )
+
+
+# ── Translatable conditions ──────────────────────────────────────────────────
+
+def literal_alternatives(pattern: Any) -> Optional[List[str]]:
+    """The literal texts of a pattern like "cash|bitcoin", or None if it uses other regex syntax"""
+    if not isinstance(pattern, str):
+        return None
+    parts = pattern.split("|")
+    if not all(part and re.escape(part) == part for part in parts):
+        return None
+    return parts
+
+
+def _is_value(value: Any) -> bool:
+    return isinstance(value, str) or (
+        isinstance(value, (int, float)) and not isinstance(value, bool) and value == value
+    )
+
+
+def _pushable(node: Node) -> bool:
+    kind = node[0]
+    if kind in ("and", "or"):
+        return all(_pushable(child) for child in node[1])
+    if kind == "cmp":
+        _, op, left, right = node
+        return (
+            op in _SQL_OPERATORS and left[0] == "col"
+            and (right[0] == "col" or (right[0] == "lit" and _is_value(right[1])))
+        )
+    if kind == "in":
+        return node[1][0] == "col" and bool(node[2]) and all(_is_value(v) for v in node[2])
+    if kind == "match":
+        return node[1][0] == "col" and literal_alternatives(node[2]) is not None
+    return False
+
+
+def _string_members(values) -> bool:
+    # String membership is case-insensitive, as in the pandas evaluation
+    return all(isinstance(v, str) for v in values)
+
+
+# ── SQL ──────────────────────────────────────────────────────────────────────
+
+def sql_where(
+    predicates: List[Node],
+    column: Callable[[str], str],
+    dialect: str = "postgresql"
+) -> Tuple[str, list]:
+    """
+    The OR of `predicates` as a SQL condition with %s placeholders, and its
+    parameters. `column` renders a (mapped) column name as a quoted source
+    column; `dialect` is "postgresql" or "mysql".
+    """
+    params: list = []
+    clauses = [_sql(node, column, dialect, params) for node in predicates]
+    return " OR ".join(f"({clause})" for clause in clauses), params
+
+
+def _sql_text(expression: str, dialect: str) -> str:
+    return f"LOWER(CAST({expression} AS {'TEXT' if dialect == 'postgresql' else 'CHAR'}))"
+
+
+def _sql(node: Node, column: Callable[[str], str], dialect: str, params: list) -> str:
+    kind = node[0]
+    if kind in ("and", "or"):
+        joiner = " AND " if kind == "and" else " OR "
+        return joiner.join(f"({_sql(child, column, dialect, params)})" for child in node[1])
+    if kind == "cmp":
+        _, op, left, right = node
+        lhs = column(left[1])
+        if right[0] == "col":
+            rhs = column(right[1])
+        else:
+            params.append(right[1])
+            rhs = "%s"
+        clause = f"{lhs} {_SQL_OPERATORS[op]} {rhs}"
+        if op == "!=":
+            # Missing values compare unequal in pandas, but NULL <> x is not true in SQL
+            nullable = [lhs] + ([rhs] if right[0] == "col" else [])
+            clause = " OR ".join([clause] + [f"{c} IS NULL" for c in nullable])
+        return clause
+    if kind == "in":
+        values = list(node[2])
+        target = column(node[1][1])
+        if _string_members(values):
+            target = _sql_text(target, dialect)
+            values = [v.lower() for v in values]
+        params.extend(values)
+        return f"{target} IN ({', '.join(['%s'] * len(values))})"
+    if kind == "match":
+        target = _sql_text(column(node[1][1]), dialect)
+        parts = literal_alternatives(node[2])
+        params.extend(f"%{part.lower()}%" for part in parts)
+        return " OR ".join(f"{target} LIKE %s" for _ in parts)
+    raise ValueError(f"Cannot push down condition: {node!r}")
+
+
+# ── MongoDB ──────────────────────────────────────────────────────────────────
+
+def mongo_filter(predicates: List[Node], field: Callable[[str], str]) -> Optional[Dict[str, Any]]:
+    """
+    The OR of `predicates` as a MongoDB filter. `field` maps a column name to
+    its source field. Returns None when a field name has MongoDB path syntax.
+
+    MongoDB comparisons and $regex only match values of the literal's type,
+    while the pandas checkers coerce: numeric strings and booleans compare as
+    numbers and patterns match `str()` of any value. So a numeric comparison
+    also ships documents holding the field as one of _MONGO_NUMERIC_LIKE, and
+    a pattern also ships documents where it is not a string (and numeric
+    membership ships booleans).
+    """
+    try:
+        clauses = [_mongo(node, field) for node in predicates]
+    except ValueError:
+        return None
+    return clauses[0] if len(clauses) == 1 else {"$or": clauses}
+
+
+def _mongo_field(name: str, field: Callable[[str], str]) -> str:
+    source = field(name)
+    if "." in source or source.startswith("$"):
+        raise ValueError(f"Field name not usable in a filter: {source}")
+    return source
+
+
+def _mongo(node: Node, field: Callable[[str], str]) -> Dict[str, Any]:
+    kind = node[0]
+    if kind in ("and", "or"):
+        return {f"${kind}": [_mongo(child, field) for child in node[1]]}
+    if kind == "cmp":
+        _, op, left, right = node
+        lhs = _mongo_field(left[1], field)
+        if right[0] == "col":
+            rhs = _mongo_field(right[1], field)
+            return {"$expr": {_MONGO_OPERATORS[op]: [f"${lhs}", f"${rhs}"]}}
+        clause = {lhs: {_MONGO_OPERATORS[op]: right[1]}}
+        if op != "!=" and not isinstance(right[1], str):
+            # ($ne already matches every value of another type)
+            return {"$or": [clause, {lhs: {"$type": _MONGO_NUMERIC_LIKE}}]}
+        return clause
+    if kind == "in":
+        target = _mongo_field(node[1][1], field)
+        values = list(node[2])
+        if _string_members(values):
+            alternatives = "|".join(re.escape(v) for v in values)
+            return {target: {"$regex": f"^(?:{alternatives})$", "$options": "i"}}
+        # pandas membership matches True / False against 1 / 0
+        return {"$or": [{target: {"$in": values}}, {target: {"$type": "bool"}}]}
+    if kind == "match":
+        target = _mongo_field(node[1][1], field)
+        return {"$or": [
+            {target: {"$regex": "|".join(literal_alternatives(node[2])), "$options": "i"}},
+            {target: {"$not": {"$type": "string"}}},
+        ]}
+    raise ValueError(f"Cannot push down condition: {node!r}")
@@ -1,40 +1,125 @@
 """
 REST API connector implementation
+
+Records are read page by page over a shared keep-alive httpx.AsyncClient
+(see http_client) and decoded as the response streams in (see json_stream).
+Config keys besides base_url, endpoint, headers and api_key:
+
+- pagination: how pages are followed
+  - "offset" (default): `limit_param` / `offset_param` query parameters;
+    up to `concurrency` pages are requested at once. A server capping its
+    page size below `page_size` is followed at its own size; an empty page,
+    or one shorter than the server has been serving, ends the data
+  - "cursor": the next cursor is read from the response member
+    `cursor_field` (a dotted path, default "next_cursor") and sent as
+    `cursor_param`
+  - "link": the next page is the rel="next" URL of the Link header
+  - "none": a single response
+  Cursor and link pages are sequential: the next page is requested while
+  the current one is processed.
+- page_size: records requested per page (default: DEFAULT_PAGE_SIZE)
+- records_key: member holding the records of an object response ("data")
+- max_retries / retry_backoff: 429 and 5xx responses and transport errors
+  are retried with exponential backoff, honouring Retry-After
+- timeout: seconds per request
+
+Each read records its request count and throughput in `stats`.
 """
+import asyncio
+import os
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+
 import httpx
 import pandas as pd
-from typing import Dict, Any, Optional
+
+from . import http_client
 from .base import BaseConnector
+from .json_stream import JSONRecordStream
+
+# Offset pages in flight per read, unless the connector config sets "concurrency"
+REST_CONCURRENCY = int(os.getenv("REST_CONCURRENCY", "4"))
+# Retries per request, unless the connector config sets "max_retries"
+REST_MAX_RETRIES = int(os.getenv("REST_MAX_RETRIES", "3"))
+
+PAGINATION_STYLES = ("offset", "cursor", "link", "none")
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# Records requested per page, without a page_size config
+DEFAULT_PAGE_SIZE = 1000
+
+
+class _Page:
+    """Records of one response, its other members and the Link rel="next" URL"""
+
+    def __init__(self):
+        self.records: List[Any] = []
+        self.meta: Dict[str, Any] = {}
+        self.next_url: Optional[str] = None
+
+
+async def _anext(pages: AsyncIterator) -> Optional[List[Any]]:
+    # None once exhausted: run_coroutine_threadsafe needs a coroutine, and
+    # StopAsyncIteration should not cross the thread boundary
+    try:
+        return await pages.__anext__()
+    except StopAsyncIteration:
+        return None
+
+
+async def _aclose(pages) -> None:
+    await pages.aclose()
+
+
+async def _settle(pending: deque) -> None:
+    # Let requests no longer needed finish, keeping their connections alive
+    await asyncio.gather(*(task for *_, task in pending), return_exceptions=True)
+    pending.clear()
+
+
+async def _cancel(tasks: List[asyncio.Future]) -> None:
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def _lookup(data: Dict[str, Any], path: str) -> Any:
+    for key in path.split("."):
+        if not isinstance(data, dict):
+            return None
+        data = data.get(key)
+    return data
 
 
 class RestAPIConnector(BaseConnector):
     """REST API connector"""
-    
+
+    def __init__(self, config: Dict[str, Any], field_mapping: Optional[Dict[str, str]] = None):
+        super().__init__(config, field_mapping)
+        self.stats: Dict[str, Any] = {}
+
     def connect(self) -> bool:
         """Validate API configuration"""
         required = ["base_url"]
         missing = [k for k in required if k not in self.config]
         if missing:
             raise ValueError(f"Missing required config: {missing}")
+        if self._pagination() not in PAGINATION_STYLES:
+            raise ValueError(f"Unknown pagination: {self._pagination()} (expected one of {PAGINATION_STYLES})")
         return True
-    
+
     def disconnect(self) -> bool:
-        """No persistent connection for REST API"""
+        """Connections stay open in the shared client"""
         return True
-    
+
     def test_connection(self) -> Dict[str, Any]:
         """Test REST API connection"""
         try:
-            base_url = self.config.get("base_url")
-            headers = self.config.get("headers", {})
-            
-            # Add API key if provided
-            api_key = self.config.get("api_key")
-            if api_key:
-                headers["Authorization"] = f"Bearer {api_key}"
-            
-            response = httpx.get(f"{base_url}/health", headers=headers, timeout=10)
-            
+            async def probe():
+                return await self._client().get(f"{self.config.get('base_url')}/health", timeout=10)
+
+            response = http_client.run(probe())
+
             return {
                 "status": "success" if response.status_code == 200 else "error",
                 "message": f"Status code: {response.status_code}",
@@ -45,35 +130,247 @@ class RestAPIConnector(BaseConnector):
                 "status": "error",
                 "message": str(e)
             }
-    
+
     def fetch_data(self, query: Optional[str] = None, limit: Optional[int] = None) -> pd.DataFrame:
         """Fetch data from REST API"""
-        base_url = self.config.get("base_url")
-        endpoint = self.config.get("endpoint", "/data")
-        headers = self.config.get("headers", {})
-        
+        params = {"query": query} if query else {}
+        page_size = int(self.config.get("page_size") or DEFAULT_PAGE_SIZE)
+        frames = list(self._batches(page_size, page_size, None, limit, params))
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames, ignore_index=True)
+
+    def iter_batches(
+        self,
+        batch_size: int,
+        columns: Optional[List[str]] = None,
+        limit: Optional[int] = None,
+        predicates: Optional[List[tuple]] = None
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Page through the endpoint as configured (see the module docstring),
+        yielding DataFrames of `batch_size` records as pages arrive.
+        `predicates` are not pushed down.
+        """
+        if batch_size <= 0:
+            raise ValueError("batch_size must be positive")
+        page_size = int(self.config.get("page_size") or DEFAULT_PAGE_SIZE)
+        return self._batches(batch_size, page_size, columns, limit, {})
+
+    def _batches(
+        self,
+        batch_size: int,
+        page_size: int,
+        columns: Optional[List[str]],
+        limit: Optional[int],
+        params: Dict[str, Any]
+    ) -> Iterator[pd.DataFrame]:
+        self.connect()
+        self.stats = {"requests": 0, "retries": 0, "rows": 0, "seconds": 0.0, "rows_per_second": 0.0}
+        started = time.perf_counter()
+        pages = self._pages(page_size, limit, params)
+        buffered: List[Any] = []
+        try:
+            while limit is None or self.stats["rows"] < limit:
+                records = http_client.run(_anext(pages))
+                if records is None:
+                    break
+                if limit is not None:
+                    records = records[:limit - self.stats["rows"]]
+                self.stats["rows"] += len(records)
+                buffered.extend(records)
+                while len(buffered) >= batch_size:
+                    yield self._frame(buffered[:batch_size], columns)
+                    del buffered[:batch_size]
+            if buffered:
+                yield self._frame(buffered, columns)
+        finally:
+            http_client.run(_aclose(pages))
+            seconds = time.perf_counter() - started
+            self.stats["seconds"] = round(seconds, 3)
+            self.stats["rows_per_second"] = round(self.stats["rows"] / seconds, 1) if seconds > 0 else 0.0
+
+    def _frame(self, records: List[Any], columns: Optional[List[str]]) -> pd.DataFrame:
+        return self.map_fields(self.project(pd.DataFrame(records), columns))
+
+    # ── Paging (runs on the http_client loop) ────────────────────────────────
+
+    def _pages(self, page_size: int, limit: Optional[int], params: Dict[str, Any]) -> AsyncIterator[List[Any]]:
+        """Record lists as they arrive, in source order"""
+        style = self._pagination()
+        if style == "offset":
+            return self._offset_pages(params, page_size, limit)
+        if style == "none":
+            return self._read(self._url(), params, _Page())
+        return self._linked_pages(style, params, page_size)
+
+    async def _linked_pages(self, style: str, params: Dict[str, Any], page_size: int) -> AsyncIterator[List[Any]]:
+        """Cursor or link pages: each names the next, which is requested while it is processed"""
+        cursor_param = self.config.get("cursor_param", "cursor")
+        cursor_field = self.config.get("cursor_field", "next_cursor")
+        cursor = None
+        task = asyncio.ensure_future(self._fetch_page(self._url(), {**params, self._limit_param(): page_size}))
+        try:
+            while task is not None:
+                page = await task
+                task = None
+                if page.records:
+                    if style == "cursor":
+                        next_cursor = _lookup(page.meta, cursor_field)
+                        if next_cursor not in (None, "", cursor):
+                            cursor = next_cursor
+                            next_params = {**params, self._limit_param(): page_size, cursor_param: cursor}
+                            task = asyncio.ensure_future(self._fetch_page(self._url(), next_params))
+                    elif page.next_url:
+                        task = asyncio.ensure_future(self._fetch_page(page.next_url, None))
+                yield page.records
+        finally:
+            if task is not None:
+                await _cancel([task])
+
+    async def _offset_pages(
+        self,
+        params: Dict[str, Any],
+        page_size: int,
+        limit: Optional[int]
+    ) -> AsyncIterator[List[Any]]:
+        """
+        Offset pages in order. A non-empty page shorter than requested is
+        either the last one or a server cap: unless it is shorter than pages
+        already served, paging continues right after it at its size (and
+        stops if the next page repeats it, as from a server ignoring offsets).
+        """
+        offset_param = self.config.get("offset_param", "offset")
+        concurrency = max(1, int(self.config.get("concurrency") or REST_CONCURRENCY))
+        pending = deque()
+        offset = 0
+        # Most records the server has returned for one page
+        served = 0
+        # Records of a short page paging continued after: the next page repeating
+        # them means the server ignores the offset
+        repeat_check = None
+        try:
+            while True:
+                while len(pending) < concurrency and (limit is None or offset < limit):
+                    size = page_size if limit is None else min(page_size, limit - offset)
+                    page_params = {**params, self._limit_param(): size, offset_param: offset}
+                    pending.append((offset, size, asyncio.ensure_future(self._fetch_page(self._url(), page_params))))
+                    offset += size
+                if not pending:
+                    break
+                start, size, task = pending.popleft()
+                page = await task
+                count = len(page.records)
+                if repeat_check is not None:
+                    repeated, repeat_check = page.records == repeat_check, None
+                    if repeated:
+                        await _settle(pending)
+                        break
+                if count:
+                    yield page.records
+                if count == size:
+                    served = max(served, count)
+                    continue
+                # Requests past this page asked for the wrong offsets, or for none at all
+                await _settle(pending)
+                # The data ends with an empty page, a page shorter than the server's
+                # page size, or a page longer than requested (paging ignored)
+                if count == 0 or count < served or count > size:
+                    break
+                served = page_size = count
+                offset = start + count
+                repeat_check = page.records
+        finally:
+            await _cancel([task for _, _, task in pending])
+
+    async def _fetch_page(self, url: str, params: Optional[Dict[str, Any]]) -> _Page:
+        page = _Page()
+        async for records in self._read(url, params, page):
+            page.records.extend(records)
+        return page
+
+    async def _read(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]],
+        page: _Page
+    ) -> AsyncIterator[List[Any]]:
+        """
+        Records of one response as its body streams in; `page` receives the
+        other members and the next link. A request is retried until records
+        have been yielded.
+        """
+        client = self._client()
+        max_retries = int(self.config.get("max_retries", REST_MAX_RETRIES))
+        attempt = 0
+        while True:
+            yielded = False
+            try:
+                async with client.stream("GET", url, params=params) as response:
+                    self.stats["requests"] = self.stats.get("requests", 0) + 1
+                    if response.status_code in RETRY_STATUSES and attempt < max_retries:
+                        delay = self._retry_delay(attempt, response.headers.get("Retry-After"))
+                        await response.aread()
+                    else:
+                        response.raise_for_status()
+                        stream = JSONRecordStream(
+                            self.config.get("records_key", "data"),
+                            ndjson="ndjson" in response.headers.get("content-type", "")
+                        )
+                        async for chunk in response.aiter_bytes():
+                            records = stream.feed(chunk)
+                            if records:
+                                yielded = True
+                                yield records
+                        records = stream.close()
+                        if records:
+                            yield records
+                        page.meta = stream.meta
+                        page.next_url = self._next_link(response)
+                        return
+            except httpx.TransportError:
+                if yielded or attempt >= max_retries:
+                    raise
+                delay = self._retry_delay(attempt)
+            attempt += 1
+            self.stats["retries"] = self.stats.get("retries", 0) + 1
+            await asyncio.sleep(delay)
+
+    def _retry_delay(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        if retry_after:
+            try:
+                return max(0.0, float(retry_after))
+            except ValueError:
+                pass  # an HTTP date: back off as usual
+        return float(self.config.get("retry_backoff", 0.5)) * 2 ** attempt
+
+    @staticmethod
+    def _next_link(response: httpx.Response) -> Optional[str]:
+        link = response.links.get("next")
+        if not link or not link.get("url"):
+            return None
+        return str(response.url.join(link["url"]))
+
+    # ── Config ───────────────────────────────────────────────────────────────
+
+    def _client(self) -> httpx.AsyncClient:
+        # On the http_client loop only
+        return http_client.shared_client(self._headers(), float(self.config.get("timeout", 30)))
+
+    def _pagination(self) -> str:
+        return self.config.get("pagination", "offset")
+
+    def _limit_param(self) -> str:
+        return self.config.get("limit_param", "limit")
+
+    def _url(self) -> str:
+        return f"{self.config.get('base_url')}{self.config.get('endpoint', '/data')}"
+
+    def _headers(self) -> Dict[str, str]:
+        headers = dict(self.config.get("headers", {}))
+
         # Add API key if provided
         api_key = self.config.get("api_key")
         if api_key:
             headers["Authorization"] = f"Bearer {api_key}"
-        
-        params = {}
-        if limit:
-            params["limit"] = limit
-        if query:
-            params["query"] = query
-        
-        response = httpx.get(f"{base_url}{endpoint}", headers=headers, params=params, timeout=30)
-        response.raise_for_status()
-        
-        data = response.json()
-        
-        # Handle different response formats
-        if isinstance(data, list):
-            df = pd.DataFrame(data)
-        elif isinstance(data, dict) and "data" in data:
-            df = pd.DataFrame(data["data"])
-        else:
-            df = pd.DataFrame([data])
-        
-        return self.map_fields(df)
+        return headers
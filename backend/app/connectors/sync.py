@@ -0,0 +1,157 @@
+"""
+Incremental connector sync: scan only the rows past a stored watermark.
+
+A connector configured with a `watermark_column` (a monotonic column such as
+updated_at, an id or a timestamp) is scanned incrementally. Each scan reads
+the rows of a SyncWindow, whose column values lie in (since, until]:
+
+- `since` is the watermark stored after the previous successful scan
+  (nothing on the first scan or a full resync),
+- `until` is the column's current maximum, read from the source when the
+  scan starts, so rows written while the scan runs are left for the next.
+
+The window is pushed down to the source as a predicate and applied again to
+every batch in pandas, for sources that cannot filter. After a successful
+scan `until` becomes the stored watermark. Sources that cannot report a
+maximum are read from `since` on, and the largest value seen is stored.
+
+Watermarks are stored as {"column", "value", "type"} with datetimes as naive
+UTC ISO strings, so they round-trip through a JSON column.
+"""
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from app.core.condition_compiler import Node
+
+
+def to_state(column: str, value: Any) -> Optional[Dict[str, Any]]:
+    """The stored form of a watermark value (None for a missing value)"""
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return None
+    if isinstance(value, (datetime, pd.Timestamp, np.datetime64)):
+        stamp = pd.Timestamp(value)
+        if stamp.tzinfo is not None:
+            stamp = stamp.tz_convert("UTC").tz_localize(None)
+        return {"column": column, "value": stamp.isoformat(), "type": "datetime"}
+    if isinstance(value, (int, np.integer)) and not isinstance(value, bool):
+        return {"column": column, "value": int(value), "type": "number"}
+    if isinstance(value, (float, Decimal, np.floating)):
+        number = float(value)
+        return {"column": column, "value": int(number) if number.is_integer() else number, "type": "number"}
+    return {"column": column, "value": str(value), "type": "string"}
+
+
+def from_state(state: Dict[str, Any]) -> Any:
+    """The typed watermark value of a stored state (a datetime, number or string)"""
+    if state.get("type") == "datetime":
+        return pd.Timestamp(state["value"]).to_pydatetime()
+    return state["value"]
+
+
+class SyncWindow:
+    """Rows whose `column` value is in (since, until] for one incremental scan"""
+
+    def __init__(
+        self,
+        column: str,
+        source_column: str,
+        since: Optional[Dict[str, Any]] = None,
+        until: Optional[Dict[str, Any]] = None
+    ):
+        # Column name in scanned frames (after field mapping) and in the source
+        self.column = column
+        self.source_column = source_column
+        self.since = since
+        self.until = until
+        self.rows = 0
+        self._seen: Optional[Dict[str, Any]] = None
+
+    @classmethod
+    def start(
+        cls,
+        column: str,
+        source_column: str,
+        stored: Optional[Dict[str, Any]],
+        high: Any,
+        full_resync: bool = False
+    ) -> "SyncWindow":
+        """The window after `stored` (ignored on a full resync or if it tracked another column)"""
+        since = None
+        if stored and not full_resync and stored.get("column") == source_column:
+            since = stored
+        return cls(column, source_column, since, to_state(source_column, high))
+
+    @staticmethod
+    def _compare_key(value: Any) -> Any:
+        return pd.Timestamp(value) if isinstance(value, datetime) else value
+
+    def predicate(self, lower: bool = True) -> Optional[Node]:
+        """The window as a condition AST; `lower=False` drops the lower bound"""
+        bounds = []
+        if lower and self.since is not None:
+            bounds.append(("cmp", ">", ("col", self.column), ("lit", from_state(self.since))))
+        if self.until is not None:
+            bounds.append(("cmp", "<=", ("col", self.column), ("lit", from_state(self.until))))
+        if not bounds:
+            return None
+        return bounds[0] if len(bounds) == 1 else ("and", tuple(bounds))
+
+    def _values(self, df: pd.DataFrame, kind: str) -> pd.Series:
+        values = df[self.column]
+        if kind == "datetime":
+            values = pd.to_datetime(values, errors="coerce", utc=True).dt.tz_localize(None)
+        elif kind == "number":
+            values = pd.to_numeric(values, errors="coerce")
+        return values
+
+    def mask(self, df: pd.DataFrame, lower: bool = True) -> np.ndarray:
+        """Rows of `df` inside the window"""
+        since = self.since if lower else None
+        if self.column not in df.columns or (since is None and self.until is None):
+            return np.ones(len(df), dtype=bool)
+        mask = df[self.column].notna().to_numpy()
+        for state, inside in ((since, "gt"), (self.until, "le")):
+            if state is None:
+                continue
+            values = self._values(df, state["type"])
+            bound = from_state(state)
+            if state["type"] == "datetime":
+                bound = pd.Timestamp(bound)
+            elif state["type"] == "string":
+                values = values.astype(str)
+            with np.errstate(invalid="ignore"):
+                hit = values > bound if inside == "gt" else values <= bound
+            mask &= hit.fillna(False).to_numpy(dtype=bool)
+        return mask
+
+    def observe(self, df: pd.DataFrame) -> None:
+        """Count the scanned rows and, without an upper bound, track the largest value seen"""
+        self.rows += len(df)
+        if self.until is not None or self.column not in df.columns or not len(df):
+            return
+        kind = (self.since or {}).get("type")
+        values = self._values(df, kind) if kind else df[self.column]
+        if kind is None and pd.api.types.is_object_dtype(values):
+            values = values.dropna().astype(str)
+        high = to_state(self.source_column, values.max())
+        if high is not None and (
+            self._seen is None
+            or self._compare_key(from_state(high)) > self._compare_key(from_state(self._seen))
+        ):
+            self._seen = high
+
+    def next_state(self) -> Optional[Dict[str, Any]]:
+        """The watermark to store after the scan succeeds"""
+        return self.until or self._seen or self.since
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "watermark_column": self.source_column,
+            "since": self.since["value"] if self.since else None,
+            "until": self.until["value"] if self.until else None,
+            "rows": self.rows,
+        }
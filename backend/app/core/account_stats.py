@@ -0,0 +1,248 @@
+"""
+Account statistics: per-account running transaction-frequency history.
+
+Accounts are dictionary-encoded to dense integer codes on first sight; every
+statistic lives in a numpy array indexed by that code:
+
+    periods   completed periods in the history (including idle ones)
+    mean, m2  Welford running mean / sum of squared deviations of the
+              transaction count per completed period
+    current_period, current_count
+              the open (latest) period of the account and its count so far
+    last_seen latest transaction time (epoch seconds)
+
+`update()` folds a batch of (account, time) events in O(batch) vectorized
+work: periods closed by the batch are merged into the running moments with
+Chan's parallel form of Welford's update, and each closed period is scored
+against the history that preceded it. Events older than an account's open
+period arrive too late to change its history and are ignored.
+"""
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+_GROW = 1024  # minimum capacity increment of the stat arrays
+
+
+def merge_moments(n_a, mean_a, m2_a, n_b, mean_b, m2_b) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Combine two sets of (count, mean, M2) moments element-wise (Chan et al.)."""
+    n = n_a + n_b
+    safe = np.where(n > 0, n, 1)
+    delta = mean_b - mean_a
+    mean = mean_a + delta * n_b / safe
+    m2 = m2_a + m2_b + delta * delta * n_a * n_b / safe
+    return n, mean, m2
+
+
+class AccountStats:
+    """Array-backed per-account frequency statistics keyed by dictionary-encoded account ids."""
+
+    def __init__(self, period: int = 30 * 86400):
+        if period <= 0:
+            raise ValueError("period must be a positive number of seconds")
+        self.period = period
+        self.codes: Dict[str, int] = {}
+        self.accounts: list = []
+        self.periods = np.zeros(0, dtype=np.int64)
+        self.mean = np.zeros(0, dtype=float)
+        self.m2 = np.zeros(0, dtype=float)
+        self.current_period = np.zeros(0, dtype=np.int64)
+        self.current_count = np.zeros(0, dtype=np.int64)
+        self.last_seen = np.zeros(0, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self.accounts)
+
+    # ── Encoding ─────────────────────────────────────────────────────────────
+
+    def encode(self, accounts: pd.Series, add: bool = True) -> np.ndarray:
+        """
+        Dense int64 code per account value. Unseen accounts get new codes when
+        `add` is set and -1 otherwise.
+        """
+        values = accounts.astype(str)
+        codes = values.map(self.codes)
+        missing = codes.isna().to_numpy()
+        if add and missing.any():
+            for account in pd.unique(values[missing]):
+                self.codes[account] = len(self.accounts)
+                self.accounts.append(account)
+            self._reserve(len(self.accounts))
+            codes = values.map(self.codes)
+            missing = codes.isna().to_numpy()
+        return np.where(missing, -1, codes.fillna(-1).to_numpy()).astype(np.int64)
+
+    def _reserve(self, size: int) -> None:
+        capacity = len(self.periods)
+        if size <= capacity:
+            return
+        extra = max(size - capacity, capacity // 2, _GROW)
+        self.periods = np.concatenate([self.periods, np.zeros(extra, dtype=np.int64)])
+        self.mean = np.concatenate([self.mean, np.zeros(extra, dtype=float)])
+        self.m2 = np.concatenate([self.m2, np.zeros(extra, dtype=float)])
+        self.current_period = np.concatenate([self.current_period, np.full(extra, -1, dtype=np.int64)])
+        self.current_count = np.concatenate([self.current_count, np.zeros(extra, dtype=np.int64)])
+        self.last_seen = np.concatenate([self.last_seen, np.zeros(extra, dtype=np.int64)])
+
+    # ── Updates ──────────────────────────────────────────────────────────────
+
+    def update(self, codes: np.ndarray, times: np.ndarray) -> pd.DataFrame:
+        """
+        Fold events (account code, epoch seconds) into the statistics.
+
+        Returns one row per period closed by this batch: code, period, count,
+        and the history (periods, mean, std) that preceded it.
+        """
+        periods = times // self.period
+        events = pd.DataFrame({"code": codes, "period": periods})
+        counts = events.value_counts(sort=False).sort_index()
+        g_code = counts.index.get_level_values("code").to_numpy(dtype=np.int64)
+        g_period = counts.index.get_level_values("period").to_numpy(dtype=np.int64)
+        g_count = counts.to_numpy(dtype=np.int64)
+
+        last_seen = pd.Series(times).groupby(codes).max()
+        seen_codes = last_seen.index.to_numpy(dtype=np.int64)
+        self.last_seen[seen_codes] = np.maximum(self.last_seen[seen_codes], last_seen.to_numpy())
+
+        open_period = self.current_period[g_code]
+        same = g_period == open_period
+        np.add.at(self.current_count, g_code[same], g_count[same])
+        newer = g_period > open_period
+        g_code, g_period, g_count = g_code[newer], g_period[newer], g_count[newer]
+        if not len(g_code):
+            return _closed_frame()
+
+        # Per account: the open period (if any) is closed by its first newer
+        # group, and every newer group but the last is closed by the next one.
+        first = np.ones(len(g_code), dtype=bool)
+        first[1:] = g_code[1:] != g_code[:-1]
+        last = np.ones(len(g_code), dtype=bool)
+        last[:-1] = first[1:]
+        starts = np.flatnonzero(first)
+        group_of = np.cumsum(first) - 1
+
+        account = g_code[starts]
+        had_open = self.current_period[account] >= 0
+        open_count = np.where(had_open, self.current_count[account], 0)
+        origin = np.where(had_open, self.current_period[account], g_period[starts])
+        base = (self.periods[account], self.mean[account], self.m2[account])
+
+        # Samples closed before each group: the open count, then earlier groups
+        prior_sum = np.cumsum(g_count) - g_count
+        prior_sum = prior_sum - prior_sum[starts][group_of] + open_count[group_of]
+        prior_sq = np.cumsum(g_count * g_count) - g_count * g_count
+        prior_sq = prior_sq - prior_sq[starts][group_of] + (open_count ** 2)[group_of]
+        prior_n = g_period - origin[group_of]
+        history = merge_moments(
+            base[0][group_of], base[1][group_of], base[2][group_of],
+            *_batch_moments(prior_n, prior_sum, prior_sq),
+        )
+
+        closed = [
+            # Open periods closed by this batch, scored against the stored history
+            pd.DataFrame({
+                "code": account[had_open],
+                "period": self.current_period[account][had_open],
+                "count": open_count[had_open],
+                "history": base[0][had_open],
+                "mean": base[1][had_open],
+                "std": _std(base[0][had_open], base[2][had_open]),
+            }),
+            # Newer periods that are not the last of their account
+            pd.DataFrame({
+                "code": g_code[~last],
+                "period": g_period[~last],
+                "count": g_count[~last],
+                "history": history[0][~last],
+                "mean": history[1][~last],
+                "std": _std(history[0][~last], history[2][~last]),
+            }),
+        ]
+
+        # The last group of each account becomes its open period
+        self.periods[account] = history[0][last]
+        self.mean[account] = history[1][last]
+        self.m2[account] = history[2][last]
+        self.current_period[account] = g_period[last]
+        self.current_count[account] = g_count[last]
+        return pd.concat(closed, ignore_index=True)
+
+    # ── Reads ────────────────────────────────────────────────────────────────
+
+    def std(self, codes: Optional[np.ndarray] = None) -> np.ndarray:
+        """Sample standard deviation of the per-period count (0 with < 2 periods)."""
+        if codes is None:
+            codes = np.arange(len(self))
+        return _std(self.periods[codes], self.m2[codes])
+
+    def frame(self) -> pd.DataFrame:
+        """All statistics as a DataFrame indexed by account id."""
+        n = len(self)
+        return pd.DataFrame(
+            {
+                "periods": self.periods[:n],
+                "mean": self.mean[:n],
+                "std": self.std(),
+                "current_period": self.current_period[:n],
+                "current_count": self.current_count[:n],
+                "last_seen": self.last_seen[:n],
+            },
+            index=pd.Index(self.accounts, name="account"),
+        )
+
+    @property
+    def nbytes(self) -> int:
+        arrays = (self.periods, self.mean, self.m2, self.current_period, self.current_count, self.last_seen)
+        return int(sum(a.nbytes for a in arrays))
+
+    # ── Persistence ──────────────────────────────────────────────────────────
+
+    def to_state(self) -> dict:
+        n = len(self)
+        return {
+            "period": self.period,
+            "accounts": list(self.accounts),
+            "periods": self.periods[:n].tolist(),
+            "mean": self.mean[:n].tolist(),
+            "m2": self.m2[:n].tolist(),
+            "current_period": self.current_period[:n].tolist(),
+            "current_count": self.current_count[:n].tolist(),
+            "last_seen": self.last_seen[:n].tolist(),
+        }
+
+    @classmethod
+    def from_state(cls, state: dict) -> "AccountStats":
+        stats = cls(int(state.get("period", 30 * 86400)))
+        stats.accounts = list(state.get("accounts", []))
+        stats.codes = {account: i for i, account in enumerate(stats.accounts)}
+        stats.periods = np.asarray(state.get("periods", []), dtype=np.int64)
+        stats.mean = np.asarray(state.get("mean", []), dtype=float)
+        stats.m2 = np.asarray(state.get("m2", []), dtype=float)
+        stats.current_period = np.asarray(state.get("current_period", []), dtype=np.int64)
+        stats.current_count = np.asarray(state.get("current_count", []), dtype=np.int64)
+        stats.last_seen = np.asarray(state.get("last_seen", []), dtype=np.int64)
+        return stats
+
+
+def _batch_moments(n: np.ndarray, total: np.ndarray, squares: np.ndarray):
+    """(count, mean, M2) of batches given their size, sum and sum of squares."""
+    safe = np.where(n > 0, n, 1)
+    mean = np.where(n > 0, total / safe, 0.0)
+    m2 = np.where(n > 0, squares - total * mean, 0.0)
+    return n, mean, np.maximum(m2, 0.0)
+
+
+def _std(n: np.ndarray, m2: np.ndarray) -> np.ndarray:
+    return np.sqrt(np.where(n > 1, m2 / np.where(n > 1, n - 1, 1), 0.0))
+
+
+def _closed_frame() -> pd.DataFrame:
+    return pd.DataFrame({
+        "code": pd.Series(dtype="int64"),
+        "period": pd.Series(dtype="int64"),
+        "count": pd.Series(dtype="int64"),
+        "history": pd.Series(dtype="int64"),
+        "mean": pd.Series(dtype="float64"),
+        "std": pd.Series(dtype="float64"),
+    })
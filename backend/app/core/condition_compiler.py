@@ -0,0 +1,316 @@
+"""
+Condition compiler: turns PolicyRule.condition strings into vectorized pandas/NumPy predicates.
+
+Supports the grammar emitted by the rule extractor, e.g.
+    Amount Paid > 10000
+    Amount Paid % 1000 == 0 AND Amount Paid > 5000
+    Payment Currency != Receiving Currency
+    Amount Paid > 50000 AND Payment Format IN ['Cheque', 'Wire']
+
+Conditions are parsed into a small tuple-based AST and compiled once; compiled
+predicates are cached by a hash of the normalized condition text.
+"""
+import ast
+import hashlib
+import re
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+import pandas as pd
+
+# AST nodes (plain tuples so identical sub-expressions compare and hash equal):
+#   ("col", name)              column reference
+#   ("lit", value)             number / string / bool literal
+#   ("mod", operand, divisor)  operand % divisor
+#   ("cmp", op, left, right)   comparison
+#   ("in", operand, values)    membership in a literal list
+#   ("match", operand, regex)  case-insensitive regex search (structured "pattern" rules)
+#   ("and", (nodes...))        conjunction
+#   ("or", (nodes...))         disjunction
+Node = Tuple
+
+_COMPARISON_OPS = (">=", "<=", "==", "!=", ">", "<")
+
+_TOKEN_RE = re.compile(
+    r"""
+    (?P<ws>\s+)
+  | (?P<list>\[[^\]]*\])
+  | (?P<string>'[^']*'|"[^"]*")
+  | (?P<number>-?\d+(?:\.\d+)?(?![\w.]))
+  | (?P<op>>=|<=|==|!=|>|<|%)
+  | (?P<word>[A-Za-z_][\w.]*|\d[\w.]*)
+    """,
+    re.VERBOSE,
+)
+
+_KEYWORDS = {"AND", "OR", "IN"}
+
+_cache: Dict[str, "CompiledCondition"] = {}
+
+
+def condition_key(condition: str) -> str:
+    """Stable hash of a condition string, insensitive to whitespace differences."""
+    normalized = " ".join(condition.split())
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+
+
+def _tokenize(condition: str) -> List[Tuple[str, object]]:
+    """Split a condition into (kind, value) tokens; adjacent words form one column name."""
+    tokens: List[Tuple[str, object]] = []
+    pos = 0
+    while pos < len(condition):
+        match = _TOKEN_RE.match(condition, pos)
+        if not match:
+            raise ValueError(f"Unsupported syntax at position {pos}: {condition[pos:]!r}")
+        pos = match.end()
+        kind = match.lastgroup
+        text = match.group()
+
+        if kind == "ws":
+            continue
+        if kind == "list":
+            try:
+                values = ast.literal_eval(text)
+            except (ValueError, SyntaxError):
+                raise ValueError(f"Invalid list literal: {text}")
+            tokens.append(("list", tuple(values)))
+        elif kind == "string":
+            tokens.append(("lit", text[1:-1]))
+        elif kind == "number":
+            tokens.append(("lit", float(text) if "." in text else int(text)))
+        elif kind == "op":
+            tokens.append(("op", text))
+        elif text in _KEYWORDS:
+            tokens.append(("kw", text))
+        elif text.lower() in ("true", "false"):
+            tokens.append(("lit", text.lower() == "true"))
+        elif tokens and tokens[-1][0] == "col":
+            # Column names may contain spaces ("Amount Paid")
+            tokens[-1] = ("col", f"{tokens[-1][1]} {text}")
+        else:
+            tokens.append(("col", text))
+    return tokens
+
+
+class _Parser:
+    """Recursive-descent parser: or_expr := and_expr (OR and_expr)*, and_expr := cmp (AND cmp)*."""
+
+    def __init__(self, tokens: List[Tuple[str, object]]):
+        self.tokens = tokens
+        self.pos = 0
+
+    def _peek(self) -> Tuple[str, object]:
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else ("end", None)
+
+    def _next(self) -> Tuple[str, object]:
+        token = self._peek()
+        self.pos += 1
+        return token
+
+    def parse(self) -> Node:
+        node = self._or_expr()
+        if self._peek()[0] != "end":
+            raise ValueError(f"Unexpected token: {self._peek()[1]!r}")
+        return node
+
+    def _or_expr(self) -> Node:
+        nodes = [self._and_expr()]
+        while self._peek() == ("kw", "OR"):
+            self._next()
+            nodes.append(self._and_expr())
+        return nodes[0] if len(nodes) == 1 else ("or", tuple(nodes))
+
+    def _and_expr(self) -> Node:
+        nodes = [self._comparison()]
+        while self._peek() == ("kw", "AND"):
+            self._next()
+            nodes.append(self._comparison())
+        return nodes[0] if len(nodes) == 1 else ("and", tuple(nodes))
+
+    def _comparison(self) -> Node:
+        left = self._operand()
+        kind, value = self._next()
+        if (kind, value) == ("kw", "IN"):
+            kind, values = self._next()
+            if kind != "list":
+                raise ValueError("IN must be followed by a [...] list")
+            return ("in", left, values)
+        if kind == "op" and value in _COMPARISON_OPS:
+            return ("cmp", value, left, self._operand())
+        raise ValueError(f"Expected a comparison operator, got {value!r}")
+
+    def _operand(self) -> Node:
+        kind, value = self._next()
+        if kind == "col":
+            node = ("col", value)
+        elif kind == "lit":
+            node = ("lit", value)
+        else:
+            raise ValueError(f"Expected a column or literal, got {value!r}")
+        if self._peek() == ("op", "%"):
+            self._next()
+            kind, divisor = self._next()
+            if kind != "lit" or not isinstance(divisor, (int, float)):
+                raise ValueError("% must be followed by a number")
+            node = ("mod", node, divisor)
+        return node
+
+
+def parse_condition(condition: str) -> Node:
+    """Parse a condition string into its AST."""
+    if not condition or not condition.strip():
+        raise ValueError("Empty condition")
+    return _Parser(_tokenize(condition)).parse()
+
+
+def node_columns(node: Node) -> Set[str]:
+    """Return every column referenced by an AST node."""
+    kind = node[0]
+    if kind == "col":
+        return {node[1]}
+    if kind == "lit":
+        return set()
+    if kind == "mod":
+        return node_columns(node[1])
+    if kind == "cmp":
+        return node_columns(node[2]) | node_columns(node[3])
+    if kind in ("in", "match"):
+        return node_columns(node[1])
+    return set().union(*(node_columns(child) for child in node[1]))
+
+
+def _operand_values(node: Node, df: pd.DataFrame, numeric: bool, cache: Optional[dict] = None):
+    """Evaluate an operand to a NumPy array (or a scalar for literals)."""
+    kind = node[0]
+    if kind == "lit":
+        return node[1]
+    key = (node, numeric)
+    if cache is not None and key in cache:
+        return cache[key]
+    if kind == "col":
+        if node[1] not in df.columns:
+            raise ValueError(f"Column not found: {node[1]}")
+        series = df[node[1]]
+        if numeric and not pd.api.types.is_numeric_dtype(series):
+            series = pd.to_numeric(series, errors="coerce")
+        values = series.to_numpy()
+    else:
+        # ("mod", operand, divisor)
+        values = np.mod(_operand_values(node[1], df, True, cache), node[2])
+    if cache is not None:
+        cache[key] = values
+    return values
+
+
+def _is_number(node: Node) -> bool:
+    return node[0] == "mod" or (node[0] == "lit" and isinstance(node[1], (int, float)) and not isinstance(node[1], bool))
+
+
+def _evaluate_leaf(node: Node, df: pd.DataFrame, cache: Optional[dict]) -> np.ndarray:
+    kind = node[0]
+    if kind == "in":
+        values = pd.Series(_operand_values(node[1], df, False, cache))
+        members = node[2]
+        if members and all(isinstance(m, str) for m in members):
+            # String membership is case-insensitive ('Wire' matches 'WIRE')
+            values = values.str.lower()
+            members = [m.lower() for m in members]
+        return values.isin(members).to_numpy(dtype=bool)
+    if kind == "match":
+        values = pd.Series(_operand_values(node[1], df, False, cache))
+        return values.astype(str).str.contains(node[2], case=False, na=False).to_numpy(dtype=bool)
+    if kind == "cmp":
+        _, op, left, right = node
+        numeric = _is_number(left) or _is_number(right)
+        lhs = _operand_values(left, df, numeric, cache)
+        rhs = _operand_values(right, df, numeric, cache)
+        with np.errstate(invalid="ignore"):
+            if op == ">":
+                result = lhs > rhs
+            elif op == "<":
+                result = lhs < rhs
+            elif op == ">=":
+                result = lhs >= rhs
+            elif op == "<=":
+                result = lhs <= rhs
+            elif op == "==":
+                result = lhs == rhs
+            else:
+                result = lhs != rhs
+        return np.broadcast_to(np.asarray(result, dtype=bool), (len(df),))
+    raise ValueError(f"Not a boolean expression: {node!r}")
+
+
+def evaluate_node(node: Node, df: pd.DataFrame, cache: Optional[dict] = None) -> np.ndarray:
+    """
+    Evaluate a boolean AST node against a DataFrame, returning a bool array of len(df).
+
+    Pass the same `cache` dict when evaluating several conditions over one frame:
+    identical sub-predicates and column conversions are then computed only once.
+    """
+    kind = node[0]
+    if kind in ("and", "or"):
+        combine = np.logical_and if kind == "and" else np.logical_or
+        mask = evaluate_node(node[1][0], df, cache)
+        for child in node[1][1:]:
+            mask = combine(mask, evaluate_node(child, df, cache))
+        return mask
+    if cache is None:
+        return _evaluate_leaf(node, df, None)
+    mask = cache.get(node)
+    if mask is None:
+        mask = _evaluate_leaf(node, df, cache)
+        cache[node] = mask
+    return mask
+
+
+def logic_to_node(logic: dict) -> Optional[Node]:
+    """
+    Translate a DB Rule.structured_logic dict (threshold / comparison / pattern)
+    into a condition AST. Returns None for logic types that have no predicate form.
+    """
+    logic_type = logic.get("type")
+    if logic_type == "threshold":
+        operator = logic.get("operator", ">")
+        if operator not in (">", "<", ">=", "<=", "=="):
+            return None
+        return ("cmp", operator, ("col", logic.get("field")), ("lit", logic.get("threshold")))
+    if logic_type == "comparison":
+        operator = logic.get("operator", ">")
+        if operator not in (">", "<", "=="):
+            return None
+        return ("cmp", operator, ("col", logic.get("field1")), ("col", logic.get("field2")))
+    if logic_type == "pattern":
+        return ("match", ("col", logic.get("field")), logic.get("pattern"))
+    return None
+
+
+class CompiledCondition:
+    """A parsed condition that evaluates to a boolean mask over a DataFrame."""
+
+    def __init__(self, condition: str):
+        self.condition = condition
+        self.key = condition_key(condition)
+        self.ast = parse_condition(condition)
+        self.columns = node_columns(self.ast)
+
+    def __call__(self, df: pd.DataFrame) -> np.ndarray:
+        return evaluate_node(self.ast, df)
+
+    def __repr__(self) -> str:
+        return f"CompiledCondition({self.condition!r})"
+
+
+def compile_condition(condition: str) -> CompiledCondition:
+    """Compile a condition string, reusing the cached predicate for identical conditions."""
+    key = condition_key(condition)
+    compiled = _cache.get(key)
+    if compiled is None:
+        compiled = CompiledCondition(condition)
+        _cache[key] = compiled
+    return compiled
+
+
+def clear_cache() -> None:
+    """Drop all cached compiled conditions."""
+    _cache.clear()
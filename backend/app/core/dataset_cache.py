@@ -0,0 +1,122 @@
+"""
+Dataset cache: a columnar copy of a CSV dataset stored next to it.
+
+The first load parses the CSV and writes an uncompressed Arrow IPC file
+(`<name>.csv.arrow`) whose schema metadata records the source path, size and
+mtime. Later loads memory-map that file and materialise only the requested
+columns, so repeated dashboard reads cost milliseconds instead of a full CSV
+parse. A changed CSV invalidates the cache automatically.
+
+pyarrow is optional: without it every load falls back to pandas.read_csv.
+"""
+import logging
+import os
+from pathlib import Path
+from typing import List, Optional
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as ipc
+except ImportError:
+    pa = None
+
+logger = logging.getLogger("nitilens.dataset_cache")
+
+CACHE_SUFFIX = ".arrow"
+
+# Account ids must parse identically on every read path (full, chunked,
+# incremental): as strings, so leading zeros survive into transaction ids
+ACCOUNT_DTYPES = {"Account": str, "Account.1": str}
+
+
+def cache_path(csv_path: Path) -> Path:
+    return csv_path.with_name(csv_path.name + CACHE_SUFFIX)
+
+
+def _source_key(csv_path: Path) -> dict:
+    """Identity of the CSV the cache was built from (path, size, mtime)."""
+    stat = csv_path.stat()
+    return {
+        b"source": str(csv_path.resolve()).encode("utf-8"),
+        b"size": str(stat.st_size).encode(),
+        b"mtime_ns": str(stat.st_mtime_ns).encode(),
+        # Caches written with other parse dtypes are stale
+        b"dtypes": repr(sorted(ACCOUNT_DTYPES)).encode(),
+    }
+
+
+def read_dataset(
+    csv_path: Path, columns: Optional[List[str]] = None, limit: Optional[int] = None
+) -> pd.DataFrame:
+    """
+    Load a CSV dataset with normalised (stripped) column names, through the
+    columnar cache when possible. `columns` projects a subset of columns and
+    `limit` returns only the first rows.
+    """
+    if pa is not None:
+        df = _read_cached(csv_path, columns, limit)
+        if df is not None:
+            return df
+        df = _read_csv(csv_path)
+        _write_cache(csv_path, df)
+    else:
+        df = _read_csv(csv_path)
+
+    if columns is not None:
+        df = df[list(columns)]
+    if limit is not None:
+        df = df.head(limit)
+    return df
+
+
+def _read_csv(csv_path: Path) -> pd.DataFrame:
+    df = pd.read_csv(csv_path, dtype=ACCOUNT_DTYPES)
+    df.columns = [c.strip() for c in df.columns]
+    return df
+
+
+def _read_cached(csv_path: Path, columns: Optional[List[str]], limit: Optional[int]) -> Optional[pd.DataFrame]:
+    """Return the projected frame from a valid cache file, or None on a miss."""
+    path = cache_path(csv_path)
+    if not path.exists():
+        return None
+    try:
+        with pa.memory_map(str(path), "r") as source:
+            reader = ipc.open_file(source)
+            metadata = reader.schema.metadata or {}
+            key = _source_key(csv_path)
+            if any(metadata.get(k) != v for k, v in key.items()):
+                return None
+            table = reader.read_all()
+            if columns is not None:
+                missing = [c for c in columns if c not in table.column_names]
+                if missing:
+                    raise KeyError(f"Columns not found: {missing}")
+                table = table.select(list(columns))
+            if limit is not None:
+                table = table.slice(0, limit)
+            # to_pandas copies only the selected (and sliced) buffers out of the map
+            return table.to_pandas()
+    except KeyError:
+        raise
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable dataset cache {path}: {e}")
+        return None
+
+
+def _write_cache(csv_path: Path, df: pd.DataFrame) -> None:
+    """Write `df` as the cache for `csv_path`; failures only cost the speed-up."""
+    path = cache_path(csv_path)
+    tmp = path.with_name(path.name + ".tmp")
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        table = table.replace_schema_metadata({**(table.schema.metadata or {}), **_source_key(csv_path)})
+        with pa.OSFile(str(tmp), "wb") as sink:
+            with ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp, path)
+    except Exception as e:
+        logger.warning(f"Could not write dataset cache {path}: {e}")
+        tmp.unlink(missing_ok=True)
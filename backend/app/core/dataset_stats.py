@@ -0,0 +1,187 @@
+"""
+Dataset statistics: mergeable summary statistics for the transaction dataset.
+
+`DatasetStats` holds only running aggregates: row count, laundering-label
+sum, amount count / sum / max, and exact per-value counters for the
+low-cardinality currency and payment-format columns (top-k is read off the
+counters). Two summaries of disjoint row sets merge into the summary of
+their union, so rows appended to the dataset are folded into the existing
+statistics instead of recomputing them from the whole file.
+
+`StatsMemo` remembers the statistics per dataset file together with the
+file fingerprint (size, mtime) and how far into the file they reach, so the
+owner can tell an unchanged file (reuse), an appended file (fold in only the
+new bytes) and a rewritten file (recompute) apart.
+"""
+import hashlib
+import math
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Optional
+
+import pandas as pd
+
+# Bytes at each edge of the covered range that must be unchanged for an append to be trusted
+EDGE_BYTES = 4096
+
+
+class DatasetStats:
+    """Running aggregates over the IBM AML transaction columns used by the dashboards."""
+
+    columns = ["Is Laundering", "Payment Currency", "Payment Format", "Amount Paid"]
+
+    def __init__(self):
+        self.rows = 0
+        self.laundering = 0
+        self.amount_count = 0
+        self.amount_sum = 0.0
+        self.amount_max: Optional[float] = None
+        self.currencies: Counter = Counter()
+        self.formats: Counter = Counter()
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "DatasetStats":
+        stats = cls()
+        stats.update(df)
+        return stats
+
+    def update(self, df: pd.DataFrame) -> "DatasetStats":
+        """Fold the rows of `df` into the statistics."""
+        if df.empty:
+            return self
+        amounts = pd.to_numeric(df["Amount Paid"], errors="coerce")
+        self.rows += len(df)
+        self.laundering += int(pd.to_numeric(df["Is Laundering"], errors="coerce").sum())
+        self.amount_count += int(amounts.count())
+        self.amount_sum += float(amounts.sum())
+        if amounts.count():
+            self._max(float(amounts.max()))
+        # sort=False keeps first-seen order, so ties rank like value_counts() on the whole file
+        self.currencies.update(df["Payment Currency"].value_counts(sort=False).to_dict())
+        self.formats.update(df["Payment Format"].value_counts(sort=False).to_dict())
+        return self
+
+    def _max(self, value: Optional[float]) -> None:
+        if value is not None and (self.amount_max is None or value > self.amount_max):
+            self.amount_max = value
+
+    def merge(self, other: "DatasetStats") -> "DatasetStats":
+        """Fold another summary (of rows not covered by this one) into this one."""
+        self.rows += other.rows
+        self.laundering += other.laundering
+        self.amount_count += other.amount_count
+        self.amount_sum += other.amount_sum
+        self._max(other.amount_max)
+        self.currencies.update(other.currencies)
+        self.formats.update(other.formats)
+        return self
+
+    def copy(self) -> "DatasetStats":
+        return DatasetStats().merge(self)
+
+    def summary(self, top_k: int = 5) -> dict:
+        """The statistics in the shape served by the dataset and summary endpoints."""
+        mean = self.amount_sum / self.amount_count if self.amount_count else math.nan
+        return {
+            "total_transactions": self.rows,
+            "confirmed_laundering": self.laundering,
+            "laundering_percentage": round(self.laundering / self.rows * 100, 2) if self.rows > 0 else 0,
+            "avg_amount_paid": round(mean, 2),
+            "max_amount_paid": round(self.amount_max, 2) if self.amount_max is not None else math.nan,
+            "top_currencies": dict(self.currencies.most_common(top_k)),
+            "payment_formats": dict(self.formats.most_common()),
+        }
+
+
+def fingerprint(path: Path) -> tuple:
+    """Identity of the file contents as far as the cache is concerned: (size, mtime_ns)."""
+    stat = path.stat()
+    return stat.st_size, stat.st_mtime_ns
+
+
+def edge_digest(path: Path, offset: int) -> str:
+    """
+    Digest of the first and last EDGE_BYTES of the bytes before `offset`:
+    unchanged by appends past `offset`, changed by most rewrites.
+    """
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        digest.update(f.read(min(EDGE_BYTES, offset)))
+        start = max(0, offset - EDGE_BYTES)
+        f.seek(start)
+        digest.update(f.read(offset - start))
+    return digest.hexdigest()
+
+
+class _Entry:
+    __slots__ = ("fingerprint", "header", "offset", "digest", "stats")
+
+    def __init__(self, fingerprint, header, offset, digest, stats):
+        self.fingerprint = fingerprint
+        self.header = header
+        self.offset = offset
+        self.digest = digest
+        self.stats = stats
+
+
+class StatsMemo:
+    """
+    Process-wide statistics per dataset path. An entry records the file
+    fingerprint it was computed for, the header line, and `offset`: the
+    (newline-aligned) end of the bytes its statistics cover.
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, _Entry] = {}
+        self._lock = threading.Lock()
+
+    def get(self, path: Path) -> Optional[DatasetStats]:
+        """Statistics for `path` if the file is unchanged since they were stored."""
+        with self._lock:
+            entry = self._entries.get(str(path))
+        if entry is not None and entry.fingerprint == fingerprint(path):
+            return entry.stats
+        return None
+
+    def covered(self, path: Path, header: bytes, end: int) -> Optional[int]:
+        """
+        If the file only grew since the stored statistics (same header, same
+        bytes at the edges of the covered range, covered offset < `end`), the
+        offset they reach; otherwise None.
+        """
+        with self._lock:
+            entry = self._entries.get(str(path))
+        if entry is None or entry.header != header or entry.offset is None or entry.offset >= end:
+            return None
+        if edge_digest(path, entry.offset) != entry.digest:
+            return None
+        return entry.offset
+
+    def put(self, path: Path, file_fingerprint: tuple, header: bytes, offset: Optional[int], stats: DatasetStats) -> None:
+        """Store statistics covering the bytes up to `offset` (None: not extendable)."""
+        digest = edge_digest(path, offset) if offset is not None else None
+        with self._lock:
+            self._entries[str(path)] = _Entry(file_fingerprint, header, offset, digest, stats)
+
+    def extend(
+        self, path: Path, start: int, end: int, file_fingerprint: tuple, header: bytes, delta: DatasetStats
+    ) -> Optional[DatasetStats]:
+        """
+        Fold `delta`, the statistics of the rows in bytes [start, end), into the
+        stored statistics if they reach exactly `start`. Returns the merged
+        statistics, or None if the stored ones do not line up with `start`.
+        """
+        with self._lock:
+            entry = self._entries.get(str(path))
+        if entry is None or entry.offset != start or entry.header != header:
+            return None
+        if start != end and edge_digest(path, start) != entry.digest:
+            return None
+        stats = entry.stats.copy().merge(delta)
+        self.put(path, file_fingerprint, header, end, stats)
+        return stats
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
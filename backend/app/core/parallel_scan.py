@@ -0,0 +1,150 @@
+"""
+Parallel scan: the rule matrix evaluated by a pool of worker processes.
+
+The frame is partitioned by a hash of the account column, so every row of an
+account lands in the same shard and grouping rules (windowed counts,
+per-account aggregates, velocity statistics) see exactly the rows they see
+in a serial scan. Shards reach the workers as Arrow IPC files in a temporary
+directory (/dev/shm when available) that the workers memory-map, instead of
+DataFrames pickled through the pool's pipes; only the predicates go out and
+only the packed hit bits come back. The parent scatters each shard's bits to
+the original row positions, so the result is the same RuleMatrix a serial
+`evaluate_rule_matrix` call returns.
+
+Predicates must be picklable: condition ASTs, or bound methods of stateful
+rule instances (a fresh rule's `evaluate`, or the `mask` of a pre-filled one).
+With one worker, without pyarrow, without the shard column, or for frames too
+small to be worth it, evaluation stays serial.
+"""
+import logging
+import os
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from app.core.rule_matrix import Predicate, RuleMatrix, evaluate_rule_matrix
+from app.core.stateful_rules import hash_columns
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as ipc
+except ImportError:
+    pa = None
+
+logger = logging.getLogger("nitilens.parallel_scan")
+
+# Worker processes used for rule evaluation: 1 keeps scans in-process, 0 means one per CPU core
+SCAN_WORKERS = int(os.getenv("SCAN_WORKERS", "1"))
+
+# Below this many rows per worker, shipping shards costs more than it saves
+MIN_ROWS_PER_WORKER = 25_000
+
+_SHM_DIR = "/dev/shm"
+
+_pools: Dict[int, ProcessPoolExecutor] = {}
+_pools_lock = threading.Lock()
+
+
+def resolve_workers(workers: Optional[int] = None) -> int:
+    """`workers`, or SCAN_WORKERS when None; 0 means one per CPU core."""
+    n = SCAN_WORKERS if workers is None else workers
+    if n <= 0:
+        return os.cpu_count() or 1
+    return n
+
+
+def worker_pool(workers: int) -> ProcessPoolExecutor:
+    """A process-wide pool with `workers` processes, created on first use and reused."""
+    with _pools_lock:
+        pool = _pools.get(workers)
+        if pool is None:
+            pool = ProcessPoolExecutor(max_workers=workers)
+            _pools[workers] = pool
+        return pool
+
+
+def _discard_pool(workers: int) -> None:
+    with _pools_lock:
+        pool = _pools.pop(workers, None)
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def shard_assignments(df: pd.DataFrame, shard_column: str, shards: int) -> np.ndarray:
+    """Shard number (0 .. shards - 1) of every row, from a stable hash of `shard_column`."""
+    return (hash_columns(df, [shard_column]) % np.uint64(shards)).astype(np.int64)
+
+
+def evaluate_rule_matrix_parallel(
+    rule_ids: Sequence[str],
+    predicates: Sequence[Predicate],
+    df: pd.DataFrame,
+    workers: Optional[int] = None,
+    shard_column: Optional[str] = "Account",
+    cache: Optional[dict] = None,
+) -> RuleMatrix:
+    """
+    `evaluate_rule_matrix` over `df` split into per-account shards evaluated by
+    `workers` processes (default SCAN_WORKERS). Every grouping rule among
+    `predicates` must group by `shard_column` (possibly among other columns).
+    `cache` is only used when evaluation stays serial.
+    """
+    workers = min(resolve_workers(workers), len(df) // MIN_ROWS_PER_WORKER)
+    if workers <= 1 or pa is None or not rule_ids or shard_column not in df.columns:
+        return evaluate_rule_matrix(rule_ids, predicates, df, cache)
+    try:
+        return _evaluate_sharded(list(rule_ids), list(predicates), df, workers, shard_column)
+    except BrokenProcessPool as e:
+        _discard_pool(workers)
+        logger.warning("Worker pool broke during rule evaluation (%s); evaluating serially", e)
+    except Exception as e:
+        logger.warning("Parallel rule evaluation failed (%s); evaluating serially", e)
+    return evaluate_rule_matrix(rule_ids, predicates, df, cache)
+
+
+def _evaluate_sharded(
+    rule_ids: list, predicates: list, df: pd.DataFrame, workers: int, shard_column: str
+) -> RuleMatrix:
+    shard_of = shard_assignments(df, shard_column, workers)
+    order = np.argsort(shard_of, kind="stable")
+    bounds = np.searchsorted(shard_of[order], np.arange(workers + 1))
+    table = pa.Table.from_pandas(df, preserve_index=False)
+
+    bits = np.zeros((len(df), (len(rule_ids) + 7) // 8), dtype=np.uint8)
+    errors: Dict[str, str] = {}
+    pool = worker_pool(workers)
+    shm = _SHM_DIR if os.path.isdir(_SHM_DIR) else None
+    with tempfile.TemporaryDirectory(prefix="nitilens-scan-", dir=shm) as tmp:
+        pending = []
+        for shard in range(workers):
+            rows = order[bounds[shard]:bounds[shard + 1]]
+            if not len(rows):
+                continue
+            path = os.path.join(tmp, f"shard-{shard}.arrow")
+            _write_shard(table.take(pa.array(rows)), path)
+            pending.append((rows, pool.submit(_evaluate_shard, path, rule_ids, predicates)))
+        for rows, future in pending:
+            shard_bits, shard_errors = future.result()
+            bits[rows] = shard_bits
+            for rule_id, message in shard_errors.items():
+                errors.setdefault(rule_id, message)
+    return RuleMatrix(rule_ids, bits, len(df), errors)
+
+
+def _write_shard(table, path: str) -> None:
+    with pa.OSFile(path, "wb") as sink:
+        with ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+
+def _evaluate_shard(path: str, rule_ids: list, predicates: list):
+    """Worker: memory-map one shard, evaluate the rule matrix, return (bits, errors)."""
+    with pa.memory_map(path) as source:
+        df = ipc.open_file(source).read_pandas()
+    matrix = evaluate_rule_matrix(rule_ids, predicates, df)
+    return matrix.bits, matrix.errors
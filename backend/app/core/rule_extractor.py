@@ -26,6 +26,14 @@ _AML_RULE_TEMPLATES = [
         "severity": "medium",
         "category": "Structuring",
     },
+    {
+        "keywords": ["aggregate threshold", "totaling $10,000", "single business day", "same-day", "same day"],
+        "id_prefix": "ext-aml-agg",
+        "description": "Same-day transactions by one account totalling $10,000 or more are a single CTR event",
+        "condition": "sum(Amount Paid, Account, 1d) >= 10000",
+        "severity": "high",
+        "category": "Large Transaction Reporting",
+    },
     {
         "keywords": ["rapid transfer", "5 transfer", "24 hour", "24-hour", "layering"],
         "id_prefix": "ext-aml-rapid",
@@ -34,6 +42,14 @@ _AML_RULE_TEMPLATES = [
         "severity": "high",
         "category": "Suspicious Activity",
     },
+    {
+        "keywords": ["standard deviation", "3σ", "3 sigma", "historical average", "velocity"],
+        "id_prefix": "ext-aml-velocity",
+        "description": "Account transaction frequency more than 3 standard deviations above its monthly average",
+        "condition": "zscore(Account, 30d) > 3",
+        "severity": "medium",
+        "category": "Suspicious Activity",
+    },
     {
         "keywords": ["currency conversion", "cross-currency", "foreign exchange", "mixing"],
         "id_prefix": "ext-aml-fx",
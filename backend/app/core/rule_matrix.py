@@ -0,0 +1,103 @@
+"""
+Rule matrix: single-pass evaluation of many rules over one DataFrame.
+
+Every rule predicate is evaluated against a shared sub-predicate cache, so a
+leaf such as `Amount Paid > 10000` or a numeric column conversion is computed
+once no matter how many rules use it. The per-rule masks are packed into an
+N x ceil(R/8) uint8 bit matrix (numpy.packbits), and hits are read back as
+(row, rule) positions without building a filtered DataFrame per rule.
+"""
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from app.core.condition_compiler import Node, evaluate_node
+
+# A rule predicate is either a condition AST or a callable returning a bool mask
+# (used for stateful rules such as grouping/windowed counts).
+Predicate = Union[Node, Callable[[pd.DataFrame], np.ndarray], None]
+
+
+class RuleMatrix:
+    """Packed (row, rule) hit matrix for one evaluation pass."""
+
+    def __init__(self, rule_ids: List[str], bits: np.ndarray, n_rows: int, errors: Dict[str, str]):
+        self.rule_ids = rule_ids
+        self.bits = bits
+        self.n_rows = n_rows
+        self.errors = errors
+
+    def rule_mask(self, rule_index: int) -> np.ndarray:
+        """Boolean mask of the rows hit by one rule."""
+        column = self.bits[:, rule_index >> 3]
+        return (column & np.uint8(1 << (rule_index & 7))) != 0
+
+    def rows_for(self, rule_index: int) -> np.ndarray:
+        """Positional row indices hit by one rule, in row order."""
+        return np.flatnonzero(self.rule_mask(rule_index))
+
+    def hit_rows(self) -> np.ndarray:
+        """Positional indices of the rows hit by at least one rule."""
+        return np.flatnonzero(self.bits.any(axis=1))
+
+    def hits(self) -> Tuple[np.ndarray, np.ndarray]:
+        """All (row, rule) hits as two parallel arrays, ordered by row."""
+        rows, rules = [], []
+        for byte in range(self.bits.shape[1]):
+            width = min(8, len(self.rule_ids) - byte * 8)
+            block = np.unpackbits(self.bits[:, byte:byte + 1], axis=1, count=width, bitorder="little")
+            r, c = np.nonzero(block)
+            rows.append(r)
+            rules.append(c + byte * 8)
+        if not rows:
+            return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+        rows_arr = np.concatenate(rows)
+        rules_arr = np.concatenate(rules)
+        order = np.argsort(rows_arr, kind="stable")
+        return rows_arr[order], rules_arr[order]
+
+    def counts(self) -> Dict[str, int]:
+        """Number of rows hit per rule id."""
+        return {rule_id: int(self.rule_mask(i).sum()) for i, rule_id in enumerate(self.rule_ids)}
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.bits.nbytes)
+
+
+def evaluate_rule_matrix(
+    rule_ids: Sequence[str],
+    predicates: Sequence[Predicate],
+    df: pd.DataFrame,
+    cache: Optional[dict] = None,
+) -> RuleMatrix:
+    """
+    Evaluate all rule predicates over `df` in one pass and pack the hits.
+
+    A predicate that is None, or that raises (e.g. a referenced column is missing),
+    hits no rows; the error message is recorded in `RuleMatrix.errors`.
+    """
+    n_rows = len(df)
+    n_rules = len(rule_ids)
+    bits = np.zeros((n_rows, (n_rules + 7) // 8), dtype=np.uint8)
+    errors: Dict[str, str] = {}
+    shared = {} if cache is None else cache
+
+    for start in range(0, n_rules, 8):
+        block = np.zeros((n_rows, 8), dtype=bool)
+        for offset, rule_index in enumerate(range(start, min(start + 8, n_rules))):
+            predicate = predicates[rule_index]
+            if predicate is None:
+                continue
+            try:
+                if callable(predicate):
+                    mask = predicate(df)
+                else:
+                    mask = evaluate_node(predicate, df, shared)
+                block[:, offset] = np.asarray(mask, dtype=bool)
+            except Exception as e:
+                errors[rule_ids[rule_index]] = str(e)
+        bits[:, start >> 3] = np.packbits(block, axis=1, bitorder="little")[:, 0]
+
+    return RuleMatrix(list(rule_ids), bits, n_rows, errors)
@@ -0,0 +1,147 @@
+"""
+Rule repository: the parsed rules file kept in memory and indexed.
+
+The rules file is parsed and validated into PolicyRule objects once and held
+together with an index by id, the rules of each policy_id and the approved
+rules, so lookups are O(1) and listing rules costs no JSON parsing or model
+validation. The repository remembers the file's (size, mtime) and reloads
+only when they change, which picks up edits by other processes.
+
+Writes go to a temporary file in the same directory that is then renamed
+over the rules file, so readers never see a partially written file. Rules
+are replaced, never mutated in place: objects handed out earlier keep the
+values they had when they were read.
+"""
+import json
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from app.models.rule import PolicyRule
+
+
+class RuleRepository:
+    """In-memory, file-validated view of one rules file."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock = threading.RLock()
+        self._fingerprint = None
+        self._loaded = False
+        self._index([])
+
+    def _index(self, rules: List[PolicyRule]) -> None:
+        self._rules = rules
+        self._by_id: Dict[str, PolicyRule] = {r.id: r for r in rules}
+        self._by_policy: Dict[Optional[str], List[PolicyRule]] = {}
+        for rule in rules:
+            self._by_policy.setdefault(rule.policy_id, []).append(rule)
+        self._approved = [r for r in rules if r.approved]
+
+    def _stat(self) -> Optional[tuple]:
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_size, stat.st_mtime_ns
+
+    # ── Reads ────────────────────────────────────────────────────────────────
+
+    def refresh(self) -> "RuleRepository":
+        """Reload the rules if the file changed since they were read."""
+        with self._lock:
+            fingerprint = self._stat()
+            if not self._loaded or fingerprint != self._fingerprint:
+                try:
+                    data = json.loads(self.path.read_text(encoding="utf-8"))
+                    rules = [PolicyRule(**r) for r in data]
+                except Exception:
+                    rules = []
+                self._index(rules)
+                self._fingerprint = fingerprint
+                self._loaded = True
+        return self
+
+    def all(self, approved_only: bool = False) -> List[PolicyRule]:
+        with self._lock:
+            self.refresh()
+            return list(self._approved if approved_only else self._rules)
+
+    def get(self, rule_id: str) -> Optional[PolicyRule]:
+        with self._lock:
+            return self.refresh()._by_id.get(rule_id)
+
+    def for_policy(self, policy_id: str) -> List[PolicyRule]:
+        with self._lock:
+            return list(self.refresh()._by_policy.get(policy_id, []))
+
+    # ── Writes ───────────────────────────────────────────────────────────────
+
+    def save(self, rules: Iterable[PolicyRule]) -> None:
+        """Replace the stored rules with `rules`."""
+        with self._lock:
+            self._write(list(rules))
+
+    def add(self, new_rules: Iterable[PolicyRule]) -> List[PolicyRule]:
+        """Append the rules whose ids are not stored yet; returns those added."""
+        with self._lock:
+            self.refresh()
+            added: List[PolicyRule] = []
+            ids = set(self._by_id)
+            for rule in new_rules:
+                if rule.id not in ids:
+                    ids.add(rule.id)
+                    added.append(rule)
+            self._write(self._rules + added)
+            return added
+
+    def update(self, rule_id: str, updates: dict) -> Optional[PolicyRule]:
+        """Set the known fields in `updates` on a rule; returns the new rule, or None if missing."""
+        with self._lock:
+            rule = self.refresh()._by_id.get(rule_id)
+            if rule is None:
+                return None
+            updated = rule.model_copy(update={k: v for k, v in updates.items() if hasattr(rule, k)})
+            self._write([updated if r is rule else r for r in self._rules])
+            return updated
+
+    def delete(self, rule_id: str) -> bool:
+        with self._lock:
+            if rule_id not in self.refresh()._by_id:
+                return False
+            self._write([r for r in self._rules if r.id != rule_id])
+            return True
+
+    def _write(self, rules: List[PolicyRule]) -> None:
+        """Write `rules` atomically (temp file + rename) and index them."""
+        payload = json.dumps([r.model_dump() for r in rules], indent=2)
+        fd, tmp = tempfile.mkstemp(prefix=self.path.name + ".", suffix=".tmp", dir=self.path.parent)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+        self._index(rules)
+        self._fingerprint = self._stat()
+        self._loaded = True
+
+
+_repositories: Dict[str, RuleRepository] = {}
+_repositories_lock = threading.Lock()
+
+
+def repository_for(path: Path) -> RuleRepository:
+    """The process-wide repository for the rules file at `path`."""
+    key = str(path)
+    with _repositories_lock:
+        repository = _repositories.get(key)
+        if repository is None:
+            repository = RuleRepository(path)
+            _repositories[key] = repository
+    return repository
@@ -1,6 +1,8 @@
 """
 Scheduler: periodic compliance scan using APScheduler.
-The scheduler runs a scan every 24 hours and can be triggered manually.
+The scheduler runs an incremental scan every 24 hours (only rows appended since
+the previous run are evaluated) and can be triggered manually. It also closes
+idle connector connection pools every minute.
 """
 import logging
 from datetime import datetime, timezone
@@ -8,7 +10,7 @@ from datetime import datetime, timezone
 logger = logging.getLogger("nitilens.scheduler")
 
 _scheduler = None
-_last_run: dict = {"timestamp": None, "violations_found": 0}
+_last_run: dict = {"timestamp": None, "violations_found": 0, "rows_scanned": 0}
 
 
 def start_scheduler():
@@ -24,6 +26,13 @@ def start_scheduler():
             id="daily_aml_scan",
             replace_existing=True,
         )
+        _scheduler.add_job(
+            _close_idle_pools,
+            trigger="interval",
+            minutes=1,
+            id="close_idle_pools",
+            replace_existing=True,
+        )
         _scheduler.start()
         logger.info("APScheduler started — daily AML scan scheduled.")
     except ImportError:
@@ -44,17 +53,31 @@ def _run_scheduled_scan():
     """Callback executed by the scheduler."""
     global _last_run
     try:
-        from app.core.violation_engine import run_scan
-        violations = run_scan()
+        from app.core.violation_engine import run_incremental_scan
+        result = run_incremental_scan()
+        violations = result["violations"]
         _last_run = {
             "timestamp": datetime.now(timezone.utc).isoformat(),
             "violations_found": len(violations),
+            "rows_scanned": result["rows_scanned"],
         }
-        logger.info(f"Scheduled scan complete — {len(violations)} violations found.")
+        logger.info(
+            f"Scheduled scan complete — {result['rows_scanned']} new rows, "
+            f"{len(violations)} new violations found."
+        )
     except Exception as e:
         logger.error(f"Scheduled scan failed: {e}")
 
 
+def _close_idle_pools():
+    """Callback closing idle connector connections and pools."""
+    try:
+        from app.connectors.pool import close_idle
+        close_idle()
+    except Exception as e:
+        logger.error(f"Closing idle connection pools failed: {e}")
+
+
 def get_scheduler_status() -> dict:
     """Return scheduler status and last run info."""
     return {
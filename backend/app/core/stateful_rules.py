@@ -0,0 +1,569 @@
+"""
+Stateful rules: AML rules whose verdict for a row depends on other rows
+(grouping / per-account aggregates), written so they work on a whole frame
+and on a file streamed in fixed-size chunks.
+
+Each rule keeps a compact state (hashed keys and counters, never raw rows):
+    observe(chunk)  accumulate state from a chunk (only `columns` are needed)
+    mask(chunk)     flag rows of a chunk using the accumulated state
+    evaluate(df)    observe + mask for a frame held fully in memory
+
+`to_state()` / `load_state()` round-trip that state through plain JSON types so
+incremental scans can carry it from one run to the next.
+"""
+import re
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.core.account_stats import AccountStats
+
+
+def hash_columns(df: pd.DataFrame, columns) -> np.ndarray:
+    """Stable uint64 hash per row over the given columns."""
+    return pd.util.hash_pandas_object(df[list(columns)], index=False).to_numpy()
+
+
+class StatefulRule:
+    """Base class for rules that need cross-row (and cross-chunk) state."""
+
+    columns: list = []
+
+    def observe(self, chunk: pd.DataFrame) -> None:
+        raise NotImplementedError
+
+    def mask(self, chunk: pd.DataFrame) -> np.ndarray:
+        raise NotImplementedError
+
+    def evaluate(self, df: pd.DataFrame) -> np.ndarray:
+        self.observe(df)
+        return self.mask(df)
+
+    @property
+    def state_bytes(self) -> int:
+        """Approximate memory held by the cross-chunk state."""
+        return 0
+
+    def to_state(self) -> dict:
+        """JSON-serialisable snapshot of the accumulated state."""
+        raise NotImplementedError
+
+    def load_state(self, state: dict) -> None:
+        """Restore state produced by `to_state`."""
+        raise NotImplementedError
+
+
+# count(<field>, <n><unit>) > <k>   e.g. "count(To Account, 24h) > 5"
+_WINDOW_CONDITION_RE = re.compile(
+    r"^\s*count\(\s*[^,()]+?\s*,\s*(?P<n>\d+)\s*(?P<unit>[smhd])\s*\)\s*(?P<op>>=|>)\s*(?P<k>\d+)\s*$",
+    re.IGNORECASE,
+)
+# sum(<value field>, <group field>, <n><unit>) >= <amount>   e.g. "sum(Amount Paid, Account, 1d) >= 10000"
+_AGGREGATE_CONDITION_RE = re.compile(
+    r"^\s*sum\(\s*(?P<value>[^,()]+?)\s*,\s*(?P<group>[^,()]+?)\s*,\s*(?P<n>\d+)\s*(?P<unit>[smhd])\s*\)"
+    r"\s*(?P<op>>=|>)\s*(?P<k>\d+(?:\.\d+)?)\s*$",
+    re.IGNORECASE,
+)
+# zscore(<group field>, <n><unit>) > <sigmas>   e.g. "zscore(Account, 30d) > 3"
+_ZSCORE_CONDITION_RE = re.compile(
+    r"^\s*zscore\(\s*(?P<group>[^,()]+?)\s*,\s*(?P<n>\d+)\s*(?P<unit>[smhd])\s*\)"
+    r"\s*>\s*(?P<k>\d+(?:\.\d+)?)\s*$",
+    re.IGNORECASE,
+)
+_UNIT_SECONDS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def parse_duration(text: str) -> int:
+    """'24h' / '1d' / '30m' / '90s' -> seconds."""
+    match = re.fullmatch(r"\s*(\d+)\s*([smhd])\s*", str(text), re.IGNORECASE)
+    if not match:
+        raise ValueError(f"Invalid duration: {text!r}")
+    return int(match.group(1)) * _UNIT_SECONDS[match.group(2).lower()]
+
+
+def parse_window_condition(condition: Optional[str]) -> Optional[Tuple[int, int]]:
+    """
+    Parse a windowed-count condition into (window_seconds, threshold), where a
+    transfer qualifies when its window holds more than `threshold` transfers.
+    Returns None for any other condition.
+    """
+    match = _WINDOW_CONDITION_RE.match(condition or "")
+    if not match:
+        return None
+    window = parse_duration(match.group("n") + match.group("unit"))
+    threshold = int(match.group("k"))
+    if match.group("op") == ">=":
+        threshold -= 1
+    return window, threshold
+
+
+def parse_aggregate_condition(condition: Optional[str]) -> Optional[Tuple[str, str, int, str, float]]:
+    """
+    Parse an aggregate condition into (value column, group column, bucket
+    seconds, operator, threshold). Returns None for any other condition.
+    """
+    match = _AGGREGATE_CONDITION_RE.match(condition or "")
+    if not match:
+        return None
+    return (
+        match.group("value"),
+        match.group("group"),
+        parse_duration(match.group("n") + match.group("unit")),
+        match.group("op"),
+        float(match.group("k")),
+    )
+
+
+def parse_zscore_condition(condition: Optional[str]) -> Optional[Tuple[str, int, float]]:
+    """
+    Parse a frequency z-score condition into (group column, period seconds,
+    sigmas). Returns None for any other condition.
+    """
+    match = _ZSCORE_CONDITION_RE.match(condition or "")
+    if not match:
+        return None
+    return (
+        match.group("group"),
+        parse_duration(match.group("n") + match.group("unit")),
+        float(match.group("k")),
+    )
+
+
+def _epoch_seconds(values: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+    """(epoch seconds, valid mask) for a column of timestamps; unparseable values are invalid."""
+    stamps = pd.to_datetime(values, errors="coerce")
+    valid = stamps.notna().to_numpy()
+    return stamps.to_numpy().astype("datetime64[s]").astype(np.int64), valid
+
+
+def _combine_keys(*arrays: np.ndarray) -> np.ndarray:
+    """One stable uint64 hash per position over several parallel arrays."""
+    frame = pd.DataFrame({str(i): a for i, a in enumerate(arrays)})
+    return pd.util.hash_pandas_object(frame, index=False).to_numpy()
+
+
+def window_flags(groups: np.ndarray, times: np.ndarray, window: int, threshold: int) -> np.ndarray:
+    """
+    Flag every event that lies in some window [t, t + window) holding more than
+    `threshold` events of the same group.
+
+    Events are sorted by (group, time) once; a searchsorted over a composite
+    int64 key (dense group id * span + time offset, with span > time range +
+    window) finds where each window ends without crossing into the next group.
+    Qualifying windows are marked with a difference array, so the whole pass is
+    O(n log n).
+    """
+    n = len(times)
+    if n == 0:
+        return np.zeros(0, dtype=bool)
+    order = np.lexsort((times, groups))
+    sorted_groups = groups[order]
+    offsets = times[order] - times.min()
+    new_group = np.empty(n, dtype=bool)
+    new_group[0] = True
+    np.not_equal(sorted_groups[1:], sorted_groups[:-1], out=new_group[1:])
+    group_ids = np.cumsum(new_group, dtype=np.int64) - 1
+
+    span = int(offsets.max()) + window + 1
+    composite = group_ids * span + offsets
+    window_end = np.searchsorted(composite, composite + window, side="left")
+    starts = np.flatnonzero(window_end - np.arange(n) > threshold)
+
+    coverage = np.zeros(n + 1, dtype=np.int64)
+    np.add.at(coverage, starts, 1)
+    np.add.at(coverage, window_end[starts], -1)
+    flags = np.empty(n, dtype=bool)
+    flags[order] = np.cumsum(coverage[:n]) > 0
+    return flags
+
+
+class WindowCountRule(StatefulRule):
+    """
+    aml-002: flag transfers that belong to a burst of more than `threshold`
+    transfers between the same (Account, Account.1) pair within `window`
+    seconds (default: more than 5 in 24 hours).
+
+    State is bounded by the window, not the file: `observe` keeps (pair hash,
+    epoch seconds) only for the trailing transfers, and settles a transfer
+    once every window holding it is complete (the newest timestamp seen is a
+    window past it). Its flag is then kept as a (pair, timestamp) row key if
+    flagged, and it is dropped after one more window, when it can no longer
+    start a window of an unsettled transfer. Input must be in time order up
+    to one window, as a time-sorted file (or any order within a chunk) is;
+    `mask` settles the transfers still buffered. Rows with an unparseable
+    timestamp are never flagged. `to_state` keeps only the trailing window,
+    which is all a later incremental run needs.
+    """
+
+    columns = ["Account", "Account.1", "Timestamp"]
+    key_columns = ["Account", "Account.1"]
+
+    def __init__(self, window: int = 24 * 3600, threshold: int = 5):
+        if window <= 0:
+            raise ValueError("window must be a positive number of seconds")
+        self.window = window
+        self.threshold = threshold
+        # Trailing transfers and whether each one's flag is already settled
+        self._groups = np.zeros(0, dtype=np.uint64)
+        self._times = np.zeros(0, dtype=np.int64)
+        self._settled = np.zeros(0, dtype=bool)
+        # Row keys of settled flagged transfers
+        self._parts: List[np.ndarray] = []
+        self._flagged: Optional[np.ndarray] = None
+
+    @classmethod
+    def from_condition(cls, condition: Optional[str] = None) -> "WindowCountRule":
+        """Build from a `count(..., 24h) > 5` condition; other conditions use the defaults."""
+        parsed = parse_window_condition(condition)
+        return cls(*parsed) if parsed else cls()
+
+    def _keys(self, chunk: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(pair hashes, epoch seconds, valid-timestamp mask) for a chunk."""
+        groups = hash_columns(chunk, self.key_columns)
+        times, valid = _epoch_seconds(chunk["Timestamp"])
+        return groups, times, valid
+
+    def observe(self, chunk: pd.DataFrame) -> None:
+        if chunk.empty:
+            return
+        groups, times, valid = self._keys(chunk)
+        self._groups = np.concatenate([self._groups, groups[valid]])
+        self._times = np.concatenate([self._times, times[valid]])
+        self._settled = np.concatenate([self._settled, np.zeros(int(valid.sum()), dtype=bool)])
+        self._flagged = None
+        if not len(self._times):
+            return
+
+        latest = int(self._times.max())
+        settle = ~self._settled & (self._times < latest - self.window)
+        if settle.any():
+            flags = window_flags(self._groups, self._times, self.window, self.threshold) & settle
+            if flags.any():
+                self._parts.append(_combine_keys(self._groups[flags], self._times[flags]))
+            self._settled |= settle
+        keep = self._times >= latest - 2 * self.window
+        self._groups, self._times, self._settled = self._groups[keep], self._times[keep], self._settled[keep]
+
+    def _resolve(self) -> np.ndarray:
+        if self._flagged is None:
+            parts = list(self._parts)
+            if len(self._times):
+                flags = window_flags(self._groups, self._times, self.window, self.threshold) & ~self._settled
+                parts.append(_combine_keys(self._groups[flags], self._times[flags]))
+            if len(self._parts) > 1:
+                self._parts = [np.unique(np.concatenate(self._parts))]
+            self._flagged = np.unique(np.concatenate(parts)) if parts else np.zeros(0, dtype=np.uint64)
+        return self._flagged
+
+    def mask(self, chunk: pd.DataFrame) -> np.ndarray:
+        if chunk.empty:
+            return np.zeros(0, dtype=bool)
+        flagged = self._resolve()
+        groups, times, valid = self._keys(chunk)
+        return np.isin(_combine_keys(groups, times), flagged) & valid
+
+    @property
+    def state_bytes(self) -> int:
+        arrays = [self._groups, self._times, self._settled] + self._parts
+        if self._flagged is not None:
+            arrays.append(self._flagged)
+        return int(sum(a.nbytes for a in arrays))
+
+    def to_state(self) -> dict:
+        times = self._times
+        recent = times >= times.max() - self.window if len(times) else np.zeros(0, dtype=bool)
+        return {
+            "window": self.window,
+            "threshold": self.threshold,
+            "groups": self._groups[recent].tolist(),
+            "times": times[recent].tolist(),
+        }
+
+    def load_state(self, state: dict) -> None:
+        self._groups = np.asarray(state.get("groups", []), dtype=np.uint64)
+        self._times = np.asarray(state.get("times", []), dtype=np.int64)
+        # Transfers of an earlier run only provide context: their rows are not masked again
+        self._settled = np.ones(len(self._times), dtype=bool)
+        self._parts = []
+        self._flagged = None
+
+
+class AggregateThresholdRule(StatefulRule):
+    """
+    aml-007 (policy section 3.2): transactions by one account within a single
+    day (time bucket) that together reach `threshold` are one reportable
+    event. Flags every contributing row of each qualifying (account, day)
+    with at least `min_count` transactions.
+
+    State is a hash table keyed by hash(account, bucket) holding the bucket,
+    running total and transaction count: one row per account-day, never per
+    transaction. Per-chunk partial sums come from a vectorized groupby and are
+    folded into the table in batches.
+    """
+
+    # Fold pending per-chunk partial sums into the table past this many rows
+    CONSOLIDATE_ROWS = 1_000_000
+
+    def __init__(
+        self,
+        value_column: str = "Amount Paid",
+        group_column: str = "Account",
+        bucket: int = 86400,
+        operator: str = ">=",
+        threshold: float = 10_000,
+        min_count: int = 2,
+        timestamp_column: str = "Timestamp",
+    ):
+        if operator not in (">", ">="):
+            raise ValueError(f"Unsupported aggregate operator: {operator}")
+        if bucket <= 0:
+            raise ValueError("bucket must be a positive number of seconds")
+        self.value_column = value_column
+        self.group_column = group_column
+        self.timestamp_column = timestamp_column
+        self.columns = [group_column, value_column, timestamp_column]
+        self.bucket = bucket
+        self.operator = operator
+        self.threshold = threshold
+        self.min_count = min_count
+        self._table = self._empty_table()
+        self._parts: List[pd.DataFrame] = []
+        self._pending = 0
+        self._flagged: Optional[np.ndarray] = None
+
+    @classmethod
+    def from_condition(cls, condition: Optional[str] = None) -> "AggregateThresholdRule":
+        """Build from a `sum(Amount Paid, Account, 1d) >= 10000` condition; otherwise the defaults."""
+        parsed = parse_aggregate_condition(condition)
+        if not parsed:
+            return cls()
+        value_column, group_column, bucket, operator, threshold = parsed
+        return cls(value_column, group_column, bucket, operator, threshold)
+
+    @classmethod
+    def from_logic(cls, logic: dict) -> "AggregateThresholdRule":
+        """Build from a DB Rule.structured_logic dict of type "aggregate"."""
+        return cls(
+            value_column=logic.get("field", "amount"),
+            group_column=logic.get("group_by", "account_id"),
+            bucket=parse_duration(logic.get("period", "1d")),
+            operator=logic.get("operator", ">="),
+            threshold=float(logic.get("threshold", 10_000)),
+            min_count=int(logic.get("min_count", 2)),
+            timestamp_column=logic.get("timestamp_field", "timestamp"),
+        )
+
+    @staticmethod
+    def _empty_table() -> pd.DataFrame:
+        return pd.DataFrame(
+            {"bucket": pd.Series(dtype="int64"), "total": pd.Series(dtype="float64"), "count": pd.Series(dtype="int64")},
+            index=pd.Index([], dtype="uint64"),
+        )
+
+    def _keys(self, chunk: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """(account-day keys, buckets, values, valid mask) for a chunk."""
+        times, valid = _epoch_seconds(chunk[self.timestamp_column])
+        values = pd.to_numeric(chunk[self.value_column], errors="coerce").to_numpy(dtype=float)
+        valid &= ~np.isnan(values) & chunk[self.group_column].notna().to_numpy()
+        buckets = times // self.bucket
+        keys = _combine_keys(hash_columns(chunk, [self.group_column]), buckets)
+        return keys, buckets, values, valid
+
+    @staticmethod
+    def _fold(frame: pd.DataFrame) -> pd.DataFrame:
+        return frame.groupby(level=0, sort=False).agg({"bucket": "first", "total": "sum", "count": "sum"})
+
+    def observe(self, chunk: pd.DataFrame) -> None:
+        if chunk.empty:
+            return
+        keys, buckets, values, valid = self._keys(chunk)
+        part = self._fold(pd.DataFrame(
+            {"bucket": buckets[valid], "total": values[valid], "count": np.ones(int(valid.sum()), dtype=np.int64)},
+            index=pd.Index(keys[valid], dtype="uint64"),
+        ))
+        self._parts.append(part)
+        self._pending += len(part)
+        self._flagged = None
+        if self._pending > len(self._table) + self.CONSOLIDATE_ROWS:
+            self._consolidate()
+
+    def _consolidate(self) -> None:
+        if self._parts:
+            self._table = self._fold(pd.concat([self._table] + self._parts))
+            self._parts = []
+            self._pending = 0
+
+    def _resolve(self) -> np.ndarray:
+        if self._flagged is None:
+            self._consolidate()
+            totals = self._table["total"].to_numpy()
+            reached = totals >= self.threshold if self.operator == ">=" else totals > self.threshold
+            reached &= self._table["count"].to_numpy() >= self.min_count
+            self._flagged = np.sort(self._table.index.to_numpy()[reached])
+        return self._flagged
+
+    def mask(self, chunk: pd.DataFrame) -> np.ndarray:
+        if chunk.empty:
+            return np.zeros(0, dtype=bool)
+        flagged = self._resolve()
+        keys, _, _, valid = self._keys(chunk)
+        return np.isin(keys, flagged) & valid
+
+    def totals(self) -> pd.DataFrame:
+        """Per account-day (bucket, total, count) table accumulated so far."""
+        self._consolidate()
+        return self._table
+
+    def row_totals(self, chunk: pd.DataFrame) -> np.ndarray:
+        """The accumulated account-day total for each row of `chunk` (NaN if unknown)."""
+        keys, _, _, valid = self._keys(chunk)
+        totals = self.totals()["total"].reindex(pd.Index(keys, dtype="uint64")).to_numpy()
+        return np.where(valid, totals, np.nan)
+
+    @property
+    def state_bytes(self) -> int:
+        frames = [self._table] + self._parts
+        return int(sum(f.memory_usage(index=True, deep=False).sum() for f in frames))
+
+    def to_state(self) -> dict:
+        self._consolidate()
+        table = self._table
+        if len(table):
+            # Only the latest buckets can still grow in a later incremental run
+            table = table[table["bucket"] >= table["bucket"].max() - 1]
+        return {
+            "keys": table.index.tolist(),
+            "buckets": table["bucket"].tolist(),
+            "totals": table["total"].tolist(),
+            "counts": table["count"].tolist(),
+        }
+
+    def load_state(self, state: dict) -> None:
+        self._table = pd.DataFrame(
+            {
+                "bucket": np.asarray(state.get("buckets", []), dtype=np.int64),
+                "total": np.asarray(state.get("totals", []), dtype=float),
+                "count": np.asarray(state.get("counts", []), dtype=np.int64),
+            },
+            index=pd.Index(np.asarray(state.get("keys", []), dtype=np.uint64)),
+        )
+        self._parts = []
+        self._pending = 0
+        self._flagged = None
+
+
+class VelocityAnomalyRule(StatefulRule):
+    """
+    aml-008 (policy section 4.3): flag transactions of an account whose
+    transaction count in a period (default 30 days) lies more than `sigmas`
+    standard deviations above the account's historical average per period.
+
+    The history is an `AccountStats` store (Welford moments per dictionary-
+    encoded account), so each chunk costs O(rows in the chunk) and the state
+    carries over between incremental scans instead of being recomputed. A
+    period is judged against the periods before it, and only once the
+    account has `min_periods` of history; `min_std` keeps an account with a
+    perfectly regular history from being flagged for one extra transaction.
+    Closed periods are judged when they close; the open period is judged on
+    its count so far.
+    """
+
+    def __init__(
+        self,
+        group_column: str = "Account",
+        period: int = 30 * 86400,
+        sigmas: float = 3.0,
+        min_periods: int = 3,
+        min_std: float = 1.0,
+        timestamp_column: str = "Timestamp",
+    ):
+        if sigmas <= 0:
+            raise ValueError("sigmas must be positive")
+        self.group_column = group_column
+        self.timestamp_column = timestamp_column
+        self.columns = [group_column, timestamp_column]
+        self.sigmas = sigmas
+        self.min_periods = min_periods
+        self.min_std = min_std
+        self.stats = AccountStats(period)
+        self._flagged: List[np.ndarray] = []  # (code, period) keys of anomalous closed periods
+
+    @classmethod
+    def from_condition(cls, condition: Optional[str] = None) -> "VelocityAnomalyRule":
+        """Build from a `zscore(Account, 30d) > 3` condition; other conditions use the defaults."""
+        parsed = parse_zscore_condition(condition)
+        if not parsed:
+            return cls()
+        group_column, period, sigmas = parsed
+        return cls(group_column, period, sigmas)
+
+    def is_anomalous(self, count, history, mean, std) -> np.ndarray:
+        """True where a period `count` deviates more than `sigmas` above its history."""
+        limit = mean + self.sigmas * np.maximum(std, self.min_std)
+        return (np.asarray(history) >= self.min_periods) & (np.asarray(count) > limit)
+
+    @staticmethod
+    def _period_keys(codes: np.ndarray, periods: np.ndarray) -> np.ndarray:
+        return (codes.astype(np.int64) << 32) | periods.astype(np.int64)
+
+    def _events(self, chunk: pd.DataFrame, add: bool) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(account codes, epoch seconds, valid mask) for a chunk."""
+        times, valid = _epoch_seconds(chunk[self.timestamp_column])
+        accounts = chunk[self.group_column]
+        valid &= accounts.notna().to_numpy()
+        codes = np.full(len(chunk), -1, dtype=np.int64)
+        codes[valid] = self.stats.encode(accounts[valid], add=add)
+        return codes, times, valid & (codes >= 0)
+
+    def observe(self, chunk: pd.DataFrame) -> None:
+        if chunk.empty:
+            return
+        codes, times, valid = self._events(chunk, add=True)
+        closed = self.stats.update(codes[valid], times[valid])
+        hits = self.is_anomalous(closed["count"], closed["history"], closed["mean"], closed["std"])
+        if hits.any():
+            keys = self._period_keys(closed["code"].to_numpy()[hits], closed["period"].to_numpy()[hits])
+            self._flagged.append(keys)
+
+    def mask(self, chunk: pd.DataFrame) -> np.ndarray:
+        if chunk.empty:
+            return np.zeros(0, dtype=bool)
+        if len(self._flagged) > 1:
+            self._flagged = [np.unique(np.concatenate(self._flagged))]
+        if not len(self.stats):
+            return np.zeros(len(chunk), dtype=bool)
+        codes, times, valid = self._events(chunk, add=False)
+        stats = self.stats
+        codes = np.where(valid, codes, 0)
+        periods = times // stats.period
+        in_open = periods == stats.current_period[codes]
+        open_hit = in_open & self.is_anomalous(
+            stats.current_count[codes], stats.periods[codes], stats.mean[codes], stats.std(codes)
+        )
+        closed_hit = np.isin(self._period_keys(codes, periods), self._flagged[0]) if self._flagged else False
+        return valid & (open_hit | closed_hit)
+
+    @property
+    def state_bytes(self) -> int:
+        return self.stats.nbytes + int(sum(a.nbytes for a in self._flagged))
+
+    def to_state(self) -> dict:
+        # Closed periods can no longer receive rows, so their verdicts are not kept
+        return {"stats": self.stats.to_state()}
+
+    def load_state(self, state: dict) -> None:
+        if "stats" in state:
+            self.stats = AccountStats.from_state(state["stats"])
+        self._flagged = []
+
+
+def rule_from_condition(condition: Optional[str]) -> Optional[StatefulRule]:
+    """A fresh stateful rule for a windowed-count, aggregate or z-score condition, else None."""
+    if parse_window_condition(condition):
+        return WindowCountRule.from_condition(condition)
+    if parse_aggregate_condition(condition):
+        return AggregateThresholdRule.from_condition(condition)
+    if parse_zscore_condition(condition):
+        return VelocityAnomalyRule.from_condition(condition)
+    return None
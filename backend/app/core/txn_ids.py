@@ -0,0 +1,127 @@
+"""
+Transaction ids: deterministic per-row transaction hashes and violation dedup keys.
+
+A transaction is identified by (Timestamp, Account, Account.1, Amount Paid).
+`txn_hashes` computes a stable uint64 hash of those columns for a whole frame
+in one vectorized pass; the transaction id stored on a violation is that hash
+rendered as 16 hex digits ("TXN-<hex>"), so it can be parsed back into the
+integer.
+
+`SeenKeys` deduplicates violations on (transaction hash, rule) pairs kept as
+sorted uint64 arrays per rule, so a scan never builds a Python string key per
+flagged row.
+"""
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+KEY_COLUMNS = ["Timestamp", "Account", "Account.1", "Amount Paid"]
+# Numeric key columns are hashed as float64, so int- and float-parsed chunks agree
+_NUMERIC_KEYS = {"Amount Paid"}
+
+TXN_PREFIX = "TXN-"
+
+
+def txn_hashes(df: pd.DataFrame) -> np.ndarray:
+    """Stable uint64 transaction hash for every row of `df` (missing key columns hash as empty)."""
+    keys = {}
+    for column in KEY_COLUMNS:
+        if column not in df.columns:
+            keys[column] = np.full(len(df), "", dtype=object)
+        elif column in _NUMERIC_KEYS:
+            keys[column] = pd.to_numeric(df[column], errors="coerce").to_numpy(dtype="float64")
+        elif pd.api.types.infer_dtype(df[column], skipna=False) == "string":
+            keys[column] = df[column].to_numpy()
+        else:
+            keys[column] = df[column].astype(str).to_numpy()
+    return pd.util.hash_pandas_object(pd.DataFrame(keys), index=False).to_numpy()
+
+
+def txn_id_strings(hashes: np.ndarray) -> List[str]:
+    """Render transaction hashes as "TXN-<16 hex digits>" ids."""
+    return [f"{TXN_PREFIX}{h:016X}" for h in hashes.tolist()]
+
+
+def parse_txn_id(txn_id: str) -> Optional[int]:
+    """The transaction hash behind a "TXN-<16 hex digits>" id, or None for ids in another format."""
+    digits = txn_id[len(TXN_PREFIX):]
+    if not txn_id.startswith(TXN_PREFIX) or len(digits) != 16:
+        return None
+    try:
+        return int(digits, 16)
+    except ValueError:
+        return None
+
+
+def _contains(sorted_keys: np.ndarray, values: np.ndarray) -> np.ndarray:
+    positions = np.searchsorted(sorted_keys, values)
+    found = positions < len(sorted_keys)
+    found[found] = sorted_keys[positions[found]] == values[found]
+    return found
+
+
+class SeenKeys:
+    """
+    (transaction hash, rule id) pairs already turned into violations. Each
+    rule keeps a few sorted uint64 arrays that are merged once they pile up.
+    """
+
+    MAX_PARTS = 8
+
+    def __init__(self):
+        self._keys: Dict[str, List[np.ndarray]] = {}
+
+    def add_new(self, rule_id: str, hashes: np.ndarray) -> np.ndarray:
+        """
+        Mask of the entries of `hashes` not seen before for `rule_id` (the first
+        of any repeats within `hashes`), which are then recorded as seen.
+        """
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        fresh = np.zeros(len(hashes), dtype=bool)
+        if not len(hashes):
+            return fresh
+        unique, first = np.unique(hashes, return_index=True)
+        keep = np.ones(len(unique), dtype=bool)
+        parts = self._keys.setdefault(rule_id, [])
+        for part in parts:
+            keep &= ~_contains(part, unique)
+        fresh[first[keep]] = True
+        if keep.any():
+            parts.append(unique[keep])
+            if len(parts) > self.MAX_PARTS:
+                self._keys[rule_id] = [np.sort(np.concatenate(parts))]
+        return fresh
+
+    def add(self, rule_id: str, hashes: Iterable[int]) -> None:
+        self.add_new(rule_id, np.fromiter(hashes, dtype=np.uint64))
+
+    def __len__(self) -> int:
+        return int(sum(len(part) for parts in self._keys.values() for part in parts))
+
+    def to_state(self) -> Dict[str, list]:
+        """Per rule id, the seen transaction hashes as plain ints."""
+        return {
+            rule_id: np.sort(np.concatenate(parts)).tolist() if parts else []
+            for rule_id, parts in self._keys.items()
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict[str, list]) -> "SeenKeys":
+        seen = cls()
+        for rule_id, hashes in state.items():
+            seen._keys[rule_id] = [np.asarray(hashes, dtype=np.uint64)]
+        return seen
+
+    @classmethod
+    def from_violations(cls, violations) -> "SeenKeys":
+        """Keys of stored violations whose transaction ids are in the "TXN-<hex>" format."""
+        by_rule: Dict[str, list] = {}
+        for v in violations:
+            value = parse_txn_id(v.transaction_id)
+            if value is not None:
+                by_rule.setdefault(v.rule_id, []).append(value)
+        seen = cls()
+        for rule_id, hashes in by_rule.items():
+            seen.add(rule_id, hashes)
+        return seen
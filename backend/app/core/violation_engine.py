@@ -2,105 +2,435 @@
 Violation Engine: applies AML compliance rules to IBM AML transaction data.
 Reads the CSV, runs each approved rule using pandas, and returns Violation objects.
 """
+import io
 import json
+import os
+import sys
+import time
 import uuid
+import numpy as np
 import pandas as pd
+import psutil
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import List, Tuple
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from app.models.rule import PolicyRule
 from app.models.violation import Violation
 from app.core.rule_engine import get_rules
+from app.core.condition_compiler import compile_condition
+from app.core.dataset_cache import ACCOUNT_DTYPES, read_dataset
+from app.core.dataset_stats import DatasetStats, StatsMemo, fingerprint
+from app.core.parallel_scan import evaluate_rule_matrix_parallel
+from app.core.rule_matrix import Predicate, RuleMatrix, evaluate_rule_matrix
+from app.core.stateful_rules import (
+    AggregateThresholdRule, StatefulRule, VelocityAnomalyRule, WindowCountRule, rule_from_condition,
+)
+from app.core.txn_ids import SeenKeys, txn_hashes, txn_id_strings
+from app.core.violation_index import ViolationIndex, index_for
+from app.core.violation_store import ViolationStore, open_store
 
 _BASE = Path(__file__).parent.parent.parent.parent  # project root inside backend/
 DATA_FILE = _BASE.parent / "data" / "datasets" / "ibm_aml" / "sample_transactions.csv"
 VIOLATIONS_FILE = Path(__file__).parent.parent / "storage" / "violations.json"
+SCAN_STATE_FILE = Path(__file__).parent.parent / "storage" / "scan_state.json"
+
+# Violation storage backend: "sqlite" (indexed violations.db next to
+# VIOLATIONS_FILE) or "json" (the VIOLATIONS_FILE array itself).
+VIOLATION_STORE = os.getenv("VIOLATION_STORE", "sqlite")
 
 
-def load_transactions() -> pd.DataFrame:
-    """Load IBM AML transactions CSV into a DataFrame."""
+def load_transactions(columns: Optional[List[str]] = None, limit: Optional[int] = None) -> pd.DataFrame:
+    """
+    Load IBM AML transactions CSV into a DataFrame (column names stripped).
+    Reads go through the columnar dataset cache; `columns` projects a subset
+    of columns and `limit` keeps only the first rows.
+    """
     if not DATA_FILE.exists():
         raise FileNotFoundError(f"IBM AML dataset not found at: {DATA_FILE}")
-    df = pd.read_csv(DATA_FILE)
-    # Normalise column names (strip whitespace)
-    df.columns = [c.strip() for c in df.columns]
-    return df
-
-
-def run_scan() -> List[Violation]:
+    return read_dataset(DATA_FILE, columns=columns, limit=limit)
+
+
+# Built-in stateless AML rules: id -> (condition, short description)
+_BUILTIN_RULES = {
+    "aml-001": ("Amount Paid > 10000", "Amount Paid > $10,000"),
+    "aml-003": ("Amount Paid % 1000 == 0 AND Amount Paid > 5000", "Round-number amount > $5,000 (structuring)"),
+    "aml-004": ("Payment Currency != Receiving Currency", "Payment currency ≠ receiving currency"),
+    "aml-005": ("Is Laundering == 1", "Confirmed laundering label"),
+    "aml-006": (
+        "Amount Paid > 50000 AND Payment Format IN ['Cheque', 'Wire']",
+        "Wire/Cheque > $50,000 — EDD required",
+    ),
+}
+
+
+# Rules that need cross-row state: id -> factory(condition) for a fresh StatefulRule.
+# Any other rule whose condition is a windowed count ("count(To Account, 24h) > 5")
+# an aggregate ("sum(Amount Paid, Account, 1d) >= 10000") or a frequency z-score
+# ("zscore(Account, 30d) > 3") is stateful as well.
+_STATEFUL_RULES = {
+    "aml-002": WindowCountRule.from_condition,
+    "aml-007": AggregateThresholdRule.from_condition,
+    "aml-008": VelocityAnomalyRule.from_condition,
+}
+
+_STATEFUL_DESCRIPTIONS = {
+    "aml-002": "Rapid transfers to same beneficiary",
+    "aml-007": "Same-day transactions by one account totalling $10,000 or more",
+    "aml-008": "Account transaction frequency far above its historical average",
+}
+
+DEFAULT_CHUNK_SIZE = 100_000
+
+
+def run_scan(
+    single_pass: bool = True, chunk_size: Optional[int] = None, workers: Optional[int] = None
+) -> List[Violation]:
     """
     Run all approved rules against the IBM AML transaction dataset.
     Returns a flat list of violations found.
+
+    With `single_pass` (the default) all rules are evaluated together into a
+    packed rule-hit matrix that shares sub-predicates between rules; otherwise
+    each rule builds its own mask and filtered frame. Passing `chunk_size`
+    streams the file in bounded memory instead (see `run_streaming_scan`).
+    `workers` evaluates the matrix in that many processes over shards of the
+    dataset split by Account (default: the SCAN_WORKERS setting).
     """
+    if chunk_size:
+        return run_streaming_scan(chunk_size)["violations"]
+
     df = load_transactions()
     rules = get_rules(approved_only=True)
     now = datetime.now(timezone.utc).isoformat()
 
     all_violations: List[Violation] = []
-    seen_ids: set = set()  # avoid exact duplicates for the same (txn_id, rule_id)
-
-    for rule in rules:
-        flagged_rows, _ = _apply_rule(rule.id, df)
-        for _, row in flagged_rows.iterrows():
-            txn_id = _make_txn_id(row)
-            dedup_key = f"{txn_id}-{rule.id}"
-            if dedup_key in seen_ids:
-                continue
-            seen_ids.add(dedup_key)
-
-            violation = Violation(
-                id=f"viol-{uuid.uuid4().hex[:8]}",
-                transaction_id=txn_id,
-                rule_id=rule.id,
-                rule_name=rule.description,
-                severity=rule.severity,
-                explanation=_build_explanation(rule.id, row),
-                evidence=_build_evidence(row),
-                status="open",
-                detected_at=now,
-            )
-            all_violations.append(violation)
+    seen = SeenKeys()  # avoid exact duplicates for the same (transaction, rule)
+
+    if single_pass:
+        matrix = evaluate_rule_matrix_parallel(
+            [r.id for r in rules], [_rule_predicate(r) for r in rules], df, workers, shard_column="Account"
+        )
+        _materialize_matrix(rules, matrix, df, now, seen, all_violations)
+    else:
+        for rule in rules:
+            flagged_rows, _ = _apply_rule(rule.id, df, rule.condition)
+            all_violations.extend(_materialize_violations(rule, flagged_rows, now, seen))
 
     # Persist to storage
     _save_violations(all_violations)
+    _reset_scan_state()
     return all_violations
 
 
-def _apply_rule(rule_id: str, df: pd.DataFrame) -> Tuple[pd.DataFrame, str]:
-    """Apply a specific rule and return matching rows."""
+def run_streaming_scan(chunk_size: int = DEFAULT_CHUNK_SIZE) -> Dict[str, Any]:
+    """
+    Run all approved rules over the dataset in fixed-size chunks, so memory
+    does not grow with file size.
+
+    Stateless rules are evaluated chunk by chunk. Stateful rules (aml-002,
+    aml-007, aml-008) first accumulate compact keyed state in a pre-pass that
+    reads only the columns they need, then flag rows during the main pass.
+    Returns the violations plus scan statistics, including peak memory.
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be a positive integer")
+    if not DATA_FILE.exists():
+        raise FileNotFoundError(f"IBM AML dataset not found at: {DATA_FILE}")
+
+    started = time.perf_counter()
+    rules = get_rules(approved_only=True)
+    now = datetime.now(timezone.utc).isoformat()
+
+    states = _new_states(rules)
+    if states:
+        columns = {c for state in states.values() for c in state.columns}
+        for chunk in _read_chunks(chunk_size, usecols=columns):
+            for state in states.values():
+                state.observe(chunk)
+
+    rule_ids = [r.id for r in rules]
+    predicates = [_rule_predicate(r, states) for r in rules]
+
+    all_violations: List[Violation] = []
+    seen = SeenKeys()
+    rows_scanned = 0
+    chunks = 0
+    for chunk in _read_chunks(chunk_size):
+        matrix = evaluate_rule_matrix(rule_ids, predicates, chunk)
+        _materialize_matrix(rules, matrix, chunk, now, seen, all_violations)
+        rows_scanned += len(chunk)
+        chunks += 1
+
+    _save_violations(all_violations)
+    _reset_scan_state()
+    return {
+        "violations": all_violations,
+        "rows_scanned": rows_scanned,
+        "chunks": chunks,
+        "chunk_size": chunk_size,
+        "state_bytes": sum(state.state_bytes for state in states.values()),
+        "peak_memory_mb": peak_memory_mb(),
+        "duration_seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+def _read_chunks(chunk_size: int, usecols: Optional[set] = None) -> Iterator[pd.DataFrame]:
+    """Yield the dataset in chunks of `chunk_size` rows with normalised column names."""
+    kwargs = {}
+    if usecols is not None:
+        kwargs["usecols"] = lambda c: c.strip() in usecols
+    for chunk in pd.read_csv(DATA_FILE, chunksize=chunk_size, dtype=ACCOUNT_DTYPES, **kwargs):
+        chunk.columns = [c.strip() for c in chunk.columns]
+        yield chunk
+
+
+def run_incremental_scan(chunk_size: int = DEFAULT_CHUNK_SIZE) -> Dict[str, Any]:
+    """
+    Scan only the rows appended to the dataset since the previous incremental scan.
+
+    A watermark (byte offset of the last complete line scanned, plus the header
+    it belongs to), the (transaction, rule) dedup keys and the state of stateful
+    rules are persisted in SCAN_STATE_FILE. New violations are appended to the
+    stored ones, so review status on existing violations is kept.
+
+    The whole file is rescanned (still deduplicated against stored violations)
+    when there is no state yet, the header changed, the file shrank, or the set
+    of approved rules changed. Rows scanned earlier are not re-evaluated, so a
+    stateful rule flags only the new rows that complete a pattern.
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be a positive integer")
+    if not DATA_FILE.exists():
+        raise FileNotFoundError(f"IBM AML dataset not found at: {DATA_FILE}")
+
+    started = time.perf_counter()
+    rules = get_rules(approved_only=True)
+    rule_ids = [r.id for r in rules]
+    now = datetime.now(timezone.utc).isoformat()
+
+    file_fingerprint = fingerprint(DATA_FILE)
+    with open(DATA_FILE, "rb") as f:
+        header = f.readline()
+        end = _last_line_end(f, file_fingerprint[0])
+
+    state = _load_scan_state()
+    full_rescan = (
+        state.get("version") != _SCAN_STATE_VERSION
+        or state.get("data_file") != str(DATA_FILE)
+        or state.get("header") != header.decode("utf-8", "replace")
+        or state.get("rule_ids") != rule_ids
+        or not len(header) <= state.get("offset", -1) <= end
+    )
+    if full_rescan:
+        start = len(header)
+        seen = SeenKeys.from_violations(load_violations())
+        rule_states: dict = {}
+    else:
+        start = state["offset"]
+        seen = SeenKeys.from_state(state.get("seen", {}))
+        rule_states = state.get("rule_states", {})
+
+    states = _new_states(rules)
+    for rule_id, s in states.items():
+        if rule_id in rule_states:
+            s.load_state(rule_states[rule_id])
+
+    columns = list(pd.read_csv(DATA_FILE, nrows=0).columns)
+    if states:
+        state_columns = {c for s in states.values() for c in s.columns}
+        for chunk in _read_range(start, end, columns, chunk_size, usecols=state_columns):
+            for s in states.values():
+                s.observe(chunk)
+
+    predicates = [_rule_predicate(r, states) for r in rules]
+    new_violations: List[Violation] = []
+    rows_scanned = 0
+    appended_stats = DatasetStats()
+    for chunk in _read_range(start, end, columns, chunk_size):
+        matrix = evaluate_rule_matrix(rule_ids, predicates, chunk)
+        _materialize_matrix(rules, matrix, chunk, now, seen, new_violations)
+        appended_stats.update(chunk)
+        rows_scanned += len(chunk)
+    # The new rows are already in memory: fold them into the memoized dataset stats
+    _stats_memo.extend(DATA_FILE, start, end, file_fingerprint, header, appended_stats)
+
+    # Violations first: if the state write is lost the next run rescans the
+    # same rows, and the stored dedup keys keep it from adding them twice.
+    if new_violations:
+        _append_violations(new_violations)
+    _save_scan_state({
+        "version": _SCAN_STATE_VERSION,
+        "data_file": str(DATA_FILE),
+        "header": header.decode("utf-8", "replace"),
+        "offset": end,
+        "rule_ids": rule_ids,
+        "seen": seen.to_state(),
+        "rule_states": {rule_id: s.to_state() for rule_id, s in states.items()},
+        "updated_at": now,
+    })
+    return {
+        "violations": new_violations,
+        "rows_scanned": rows_scanned,
+        "start_offset": start,
+        "end_offset": end,
+        "full_rescan": full_rescan,
+        "total_violations": violation_store().count(),
+        "duration_seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+def _last_line_end(f, size: int) -> int:
+    """
+    Offset just past the last newline in the first `size` bytes of `f`, so a
+    row that is still being appended is left for the next scan.
+    """
+    pos = size
+    while pos > 0:
+        step = min(64 * 1024, pos)
+        f.seek(pos - step)
+        newline = f.read(step).rfind(b"\n")
+        if newline != -1:
+            return pos - step + newline + 1
+        pos -= step
+    return 0
+
+
+class _RangeReader(io.RawIOBase):
+    """Read-only view of bytes [start, end) of an open binary file."""
+
+    def __init__(self, f, start: int, end: int):
+        self._f = f
+        self._remaining = end - start
+        f.seek(start)
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        if self._remaining <= 0:
+            return 0
+        data = self._f.read(min(len(buffer), self._remaining))
+        buffer[:len(data)] = data
+        self._remaining -= len(data)
+        return len(data)
+
+
+def _read_range(
+    start: int, end: int, columns: List[str], chunk_size: int, usecols: Optional[set] = None
+) -> Iterator[pd.DataFrame]:
+    """Yield the rows stored in bytes [start, end) of the dataset, in chunks."""
+    if end <= start:
+        return
+    kwargs = {}
+    if usecols is not None:
+        kwargs["usecols"] = lambda c: c.strip() in usecols
+    with open(DATA_FILE, "rb") as f:
+        reader = io.BufferedReader(_RangeReader(f, start, end))
+        for chunk in pd.read_csv(
+            reader, names=columns, header=None, chunksize=chunk_size, dtype=ACCOUNT_DTYPES, **kwargs
+        ):
+            chunk.columns = [c.strip() for c in chunk.columns]
+            yield chunk
+
+
+# Bumped when the layout of the scan state (or the transaction id scheme) changes
+_SCAN_STATE_VERSION = 2
+
+
+def _load_scan_state() -> dict:
     try:
-        if rule_id == "aml-001":
-            mask = df["Amount Paid"] > 10_000
-            return df[mask], "Amount Paid > $10,000"
-
-        elif rule_id == "aml-002":
-            # Rapid transfers: group by From Account + To Account.1, count within window
-            # Simplified: flag accounts with top 5% frequency to same beneficiary
-            counts = df.groupby(["Account", "Account.1"]).size().reset_index(name="tx_count")
-            high = counts[counts["tx_count"] >= 2]  # at least 2 in sample = flag
-            flagged = df.merge(high[["Account", "Account.1"]], on=["Account", "Account.1"])
-            return flagged.drop_duplicates(), "Rapid transfers to same beneficiary"
-
-        elif rule_id == "aml-003":
-            mask = (df["Amount Paid"] % 1000 == 0) & (df["Amount Paid"] > 5_000)
-            return df[mask], "Round-number amount > $5,000 (structuring)"
-
-        elif rule_id == "aml-004":
-            mask = df["Payment Currency"] != df["Receiving Currency"]
-            return df[mask], "Payment currency ≠ receiving currency"
-
-        elif rule_id == "aml-005":
-            mask = df["Is Laundering"] == 1
-            return df[mask], "Confirmed laundering label"
-
-        elif rule_id == "aml-006":
-            mask = (df["Amount Paid"] > 50_000) & (
-                df["Payment Format"].str.lower().isin(["cheque", "wire"])
-            )
-            return df[mask], "Wire/Cheque > $50,000 — EDD required"
+        return json.loads(SCAN_STATE_FILE.read_text(encoding="utf-8"))
+    except Exception:
+        return {}
+
+
+def _save_scan_state(state: dict) -> None:
+    """Write the incremental scan state atomically (temp file + rename)."""
+    tmp = SCAN_STATE_FILE.with_suffix(".tmp")
+    tmp.write_text(json.dumps(state), encoding="utf-8")
+    os.replace(tmp, SCAN_STATE_FILE)
+
+
+def _reset_scan_state() -> None:
+    """Forget the incremental watermark; the next incremental scan starts over."""
+    SCAN_STATE_FILE.unlink(missing_ok=True)
+
+
+def peak_memory_mb() -> float:
+    """Peak resident set size of this process in MB."""
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is reported in KiB on Linux and in bytes on macOS
+        if sys.platform == "darwin":
+            peak /= 1024
+        return round(peak / 1024, 1)
+    # Windows: psutil exposes the peak working set
+    info = psutil.Process().memory_info()
+    return round(getattr(info, "peak_wset", info.rss) / (1024 * 1024), 1)
+
+
+def _new_state(rule_id: str, condition: Optional[str]) -> Optional[StatefulRule]:
+    """Fresh cross-row state for a stateful rule, or None for a row-level rule."""
+    if rule_id in _STATEFUL_RULES:
+        return _STATEFUL_RULES[rule_id](condition)
+    return rule_from_condition(condition)
+
+
+def _new_states(rules: List[PolicyRule]) -> Dict[str, StatefulRule]:
+    states = {}
+    for rule in rules:
+        state = _new_state(rule.id, rule.condition)
+        if state is not None:
+            states[rule.id] = state
+    return states
+
+
+def _rule_predicate(rule: PolicyRule, states: Optional[Dict[str, StatefulRule]] = None) -> Predicate:
+    """
+    Return the rule-matrix predicate for a rule, or None if it cannot be evaluated.
+    Stateful rules use the pre-filled state from `states` when streaming.
+    """
+    if states is not None and rule.id in states:
+        return states[rule.id].mask
+    state = _new_state(rule.id, rule.condition)
+    if state is not None:
+        return state.evaluate
+    if rule.id in _BUILTIN_RULES:
+        return compile_condition(_BUILTIN_RULES[rule.id][0]).ast
+    try:
+        return compile_condition(rule.condition).ast
+    except ValueError:
+        return None
+
+
+def _apply_rule(rule_id: str, df: pd.DataFrame, condition: Optional[str] = None) -> Tuple[pd.DataFrame, str]:
+    """
+    Apply a specific rule and return matching rows.
+    Built-in AML rules are matched by id; any other rule is evaluated by
+    compiling its `condition` string into a vectorized predicate.
+    """
+    try:
+        state = _new_state(rule_id, condition)
+        if state is not None:
+            # Windowed counts (rapid transfers) and per-account daily aggregates
+            return df[state.evaluate(df)], _STATEFUL_DESCRIPTIONS.get(rule_id, condition)
+
+        elif rule_id in _BUILTIN_RULES:
+            builtin_condition, description = _BUILTIN_RULES[rule_id]
+            return df[compile_condition(builtin_condition)(df)], description
+
+        elif condition:
+            # Rules extracted from policy documents: compile the condition string
+            mask = compile_condition(condition)(df)
+            return df[mask], condition
 
         else:
-            # For extracted rules from PDFs, attempt basic numeric comparisons
             return pd.DataFrame(), "Unknown rule"
     except Exception as e:
         return pd.DataFrame(), str(e)
@@ -108,118 +438,295 @@ def _apply_rule(rule_id: str, df: pd.DataFrame) -> Tuple[pd.DataFrame, str]:
 
 def _make_txn_id(row: pd.Series) -> str:
     """Create a deterministic transaction identifier from row data."""
-    parts = [
-        str(row.get("Timestamp", "")),
-        str(row.get("Account", "")),
-        str(row.get("Account.1", "")),
-        str(row.get("Amount Paid", "")),
-    ]
-    return "TXN-" + uuid.uuid5(uuid.NAMESPACE_DNS, "|".join(parts)).hex[:12].upper()
+    return _make_txn_ids(row.to_frame().T)[0]
+
+
+_EXPLANATION_TEMPLATES = {
+    "aml-001": (
+        "Transaction of ${amount:,.2f} from account {from_acct} exceeds the $10,000 CTR "
+        "reporting threshold. A Currency Transaction Report must be filed within 15 business days."
+    ),
+    "aml-002": (
+        "Account {from_acct} has made multiple rapid transfers to account {to_acct}, "
+        "indicating a potential layering pattern in the AML placement cycle."
+    ),
+    "aml-003": (
+        "Transaction of ${amount:,.2f} is a round number above $5,000, which may indicate "
+        "deliberate structuring (smurfing) to stay below reporting thresholds."
+    ),
+    "aml-004": (
+        "Payment made in {currency} but funds received in {recv_currency}. "
+        "Cross-currency conversion between accounts {from_acct} and {to_acct} requires "
+        "enhanced scrutiny for currency-based layering."
+    ),
+    "aml-005": (
+        "Transaction of ${amount:,.2f} ({fmt}) from {from_acct} to {to_acct} is confirmed "
+        "as illicit in the ground-truth dataset. This is a confirmed money laundering transaction."
+    ),
+    "aml-006": (
+        "{fmt} transaction of ${amount:,.2f} from {from_acct} exceeds $50,000 threshold. "
+        "Enhanced Due Diligence (EDD) documentation required before processing."
+    ),
+    "aml-007": (
+        "Transaction of ${amount:,.2f} ({fmt}) is one of several same-day transactions by account "
+        "{from_acct} that together total $10,000 or more. Aggregated transactions must be treated "
+        "as a single Currency Transaction Report event."
+    ),
+    "aml-008": (
+        "Account {from_acct} is transacting more than 3 standard deviations above its historical "
+        "monthly average frequency. A sudden change in account velocity may indicate the account "
+        "is being used to move illicit funds."
+    ),
+}
+
+# Evidence fields: (evidence key, source column, default, converter)
+_EVIDENCE_FIELDS = [
+    ("timestamp", "Timestamp", "", str),
+    ("from_bank", "From Bank", "", str),
+    ("from_account", "Account", "", str),
+    ("to_bank", "To Bank", "", str),
+    ("to_account", "Account.1", "", str),
+    ("amount_paid", "Amount Paid", 0, float),
+    ("payment_currency", "Payment Currency", "", str),
+    ("amount_received", "Amount Received", 0, float),
+    ("receiving_currency", "Receiving Currency", "", str),
+    ("payment_format", "Payment Format", "", str),
+    ("is_laundering", "Is Laundering", 0, int),
+]
 
 
 def _build_explanation(rule_id: str, row: pd.Series) -> str:
-    amount = row.get("Amount Paid", 0)
-    from_acct = row.get("Account", "N/A")
-    to_acct = row.get("Account.1", "N/A")
-    currency = row.get("Payment Currency", "N/A")
-    recv_currency = row.get("Receiving Currency", "N/A")
-    fmt = row.get("Payment Format", "N/A")
-
-    explanations = {
-        "aml-001": (
-            f"Transaction of ${amount:,.2f} from account {from_acct} exceeds the $10,000 CTR "
-            f"reporting threshold. A Currency Transaction Report must be filed within 15 business days."
-        ),
-        "aml-002": (
-            f"Account {from_acct} has made multiple rapid transfers to account {to_acct}, "
-            f"indicating a potential layering pattern in the AML placement cycle."
-        ),
-        "aml-003": (
-            f"Transaction of ${amount:,.2f} is a round number above $5,000, which may indicate "
-            f"deliberate structuring (smurfing) to stay below reporting thresholds."
-        ),
-        "aml-004": (
-            f"Payment made in {currency} but funds received in {recv_currency}. "
-            f"Cross-currency conversion between accounts {from_acct} and {to_acct} requires "
-            f"enhanced scrutiny for currency-based layering."
-        ),
-        "aml-005": (
-            f"Transaction of ${amount:,.2f} ({fmt}) from {from_acct} to {to_acct} is confirmed "
-            f"as illicit in the ground-truth dataset. This is a confirmed money laundering transaction."
-        ),
-        "aml-006": (
-            f"{fmt} transaction of ${amount:,.2f} from {from_acct} exceeds $50,000 threshold. "
-            f"Enhanced Due Diligence (EDD) documentation required before processing."
-        ),
-    }
-    return explanations.get(rule_id, f"Transaction flagged by rule {rule_id}.")
+    template = _EXPLANATION_TEMPLATES.get(rule_id)
+    if template is None:
+        return f"Transaction flagged by rule {rule_id}."
+    return template.format(
+        amount=row.get("Amount Paid", 0),
+        from_acct=row.get("Account", "N/A"),
+        to_acct=row.get("Account.1", "N/A"),
+        currency=row.get("Payment Currency", "N/A"),
+        recv_currency=row.get("Receiving Currency", "N/A"),
+        fmt=row.get("Payment Format", "N/A"),
+    )
 
 
 def _build_evidence(row: pd.Series) -> dict:
     """Build evidence dict from transaction row."""
     return {
-        "timestamp": str(row.get("Timestamp", "")),
-        "from_bank": str(row.get("From Bank", "")),
-        "from_account": str(row.get("Account", "")),
-        "to_bank": str(row.get("To Bank", "")),
-        "to_account": str(row.get("Account.1", "")),
-        "amount_paid": float(row.get("Amount Paid", 0)),
-        "payment_currency": str(row.get("Payment Currency", "")),
-        "amount_received": float(row.get("Amount Received", 0)),
-        "receiving_currency": str(row.get("Receiving Currency", "")),
-        "payment_format": str(row.get("Payment Format", "")),
-        "is_laundering": int(row.get("Is Laundering", 0)),
+        key: convert(row.get(column, default))
+        for key, column, default, convert in _EVIDENCE_FIELDS
     }
 
 
+# ── Columnar materialization ─────────────────────────────────────────────────
+# The helpers below do the same work as the per-row functions above, but for a
+# whole flagged frame at once: each column is converted to a Python list once
+# and the results are zipped, so no per-row pd.Series is ever built.
+
+def _column_values(df: pd.DataFrame, column: str, default) -> list:
+    """Return a column as a plain list, or `default` repeated if it is missing."""
+    if column in df.columns:
+        return df[column].tolist()
+    return [default] * len(df)
+
+
+def _make_txn_ids(df: pd.DataFrame) -> List[str]:
+    """Columnar equivalent of `_make_txn_id` for every row of `df`."""
+    return txn_id_strings(txn_hashes(df))
+
+
+def _build_explanations(rule_id: str, df: pd.DataFrame) -> List[str]:
+    """Columnar equivalent of `_build_explanation`; formats only the rule's template."""
+    template = _EXPLANATION_TEMPLATES.get(rule_id)
+    if template is None:
+        return [f"Transaction flagged by rule {rule_id}."] * len(df)
+    columns = zip(
+        _column_values(df, "Amount Paid", 0),
+        _column_values(df, "Account", "N/A"),
+        _column_values(df, "Account.1", "N/A"),
+        _column_values(df, "Payment Currency", "N/A"),
+        _column_values(df, "Receiving Currency", "N/A"),
+        _column_values(df, "Payment Format", "N/A"),
+    )
+    return [
+        template.format(
+            amount=amount, from_acct=from_acct, to_acct=to_acct,
+            currency=currency, recv_currency=recv_currency, fmt=fmt,
+        )
+        for amount, from_acct, to_acct, currency, recv_currency, fmt in columns
+    ]
+
+
+def _build_evidence_records(df: pd.DataFrame) -> List[dict]:
+    """Columnar equivalent of `_build_evidence` for every row of `df`."""
+    keys = [key for key, _, _, _ in _EVIDENCE_FIELDS]
+    columns = [
+        [convert(v) for v in _column_values(df, column, default)]
+        for _, column, default, convert in _EVIDENCE_FIELDS
+    ]
+    return [dict(zip(keys, values)) for values in zip(*columns)]
+
+
+def _materialize_violations(
+    rule: PolicyRule,
+    flagged: pd.DataFrame,
+    detected_at: str,
+    seen: SeenKeys,
+    hashes: Optional[np.ndarray] = None,
+) -> List[Violation]:
+    """
+    Turn a rule's flagged rows into Violation objects in one columnar pass.
+    `seen` holds the (transaction, rule) dedup keys and is updated in place;
+    `hashes` are the rows' transaction hashes if already computed.
+    """
+    if flagged.empty:
+        return []
+
+    if hashes is None:
+        hashes = txn_hashes(flagged)
+    fresh = seen.add_new(rule.id, hashes)
+    if not fresh.all():
+        flagged, hashes = flagged[fresh], hashes[fresh]
+
+    txn_ids = txn_id_strings(hashes)
+    explanations = _build_explanations(rule.id, flagged)
+    evidence = _build_evidence_records(flagged)
+
+    violations: List[Violation] = []
+    for txn_id, explanation, record in zip(txn_ids, explanations, evidence):
+        # Every field is built from validated inputs, so skip per-row validation.
+        violations.append(Violation.model_construct(
+            id=f"viol-{uuid.uuid4().hex[:8]}",
+            transaction_id=txn_id,
+            rule_id=rule.id,
+            rule_name=rule.description,
+            severity=rule.severity,
+            explanation=explanation,
+            evidence=record,
+            status="open",
+            reviewer_comment=None,
+            detected_at=detected_at,
+            reviewed_at=None,
+        ))
+    return violations
+
+
+def _materialize_matrix(
+    rules: List[PolicyRule],
+    matrix: RuleMatrix,
+    df: pd.DataFrame,
+    detected_at: str,
+    seen: SeenKeys,
+    out: List[Violation],
+) -> None:
+    """
+    Append the violations of every rule in a rule matrix over `df` to `out`.
+    Transaction hashes are computed once, for the rows any rule hit.
+    """
+    hashes = np.zeros(len(df), dtype=np.uint64)
+    hit_rows = matrix.hit_rows()
+    if len(hit_rows):
+        hashes[hit_rows] = txn_hashes(df.iloc[hit_rows])
+    for i, rule in enumerate(rules):
+        rows = matrix.rows_for(i)
+        out.extend(_materialize_violations(rule, df.iloc[rows], detected_at, seen, hashes[rows]))
+
+
+def violation_store() -> ViolationStore:
+    """The configured violation storage backend."""
+    return open_store(VIOLATION_STORE, VIOLATIONS_FILE)
+
+
+def violation_index() -> ViolationIndex:
+    """Up-to-date in-process index over the violation store (for list/summary reads)."""
+    return index_for(violation_store())
+
+
 def load_violations() -> List[Violation]:
     """Load all violations from storage."""
     try:
-        data = json.loads(VIOLATIONS_FILE.read_text(encoding="utf-8"))
-        return [Violation(**v) for v in data]
+        return violation_store().load_all()
     except Exception:
         return []
 
 
+def query_violations(limit: Optional[int] = None, offset: int = 0, **filters) -> List[Violation]:
+    """
+    Violations matching filters on status, severity or rule_id (a value or a
+    collection of values), in insertion order, answered from the index.
+    """
+    return violation_index().query(limit=limit, offset=offset, **filters)
+
+
+def count_violations(**filters) -> int:
+    return violation_index().count(**filters)
+
+
+def get_violation_by_id(violation_id: str) -> Optional[Violation]:
+    return violation_store().get(violation_id)
+
+
 def _save_violations(violations: List[Violation]) -> None:
-    """Persist violations list to storage."""
-    VIOLATIONS_FILE.write_text(
-        json.dumps([v.model_dump() for v in violations], indent=2),
-        encoding="utf-8"
-    )
+    """Persist violations list to storage, replacing what is stored."""
+    violation_store().replace_all(violations)
+
+
+def _append_violations(violations: List[Violation]) -> None:
+    """Bulk-insert new violations, leaving stored ones untouched."""
+    index_for(violation_store(), refresh=False).insert_many(violations)
 
 
 def update_violation_status(violation_id: str, status: str, comment: str = None) -> bool:
     """Update a single violation's status and comment."""
-    violations = load_violations()
-    for v in violations:
-        if v.id == violation_id:
-            v.status = status
-            if comment:
-                v.reviewer_comment = comment
-            v.reviewed_at = datetime.now(timezone.utc).isoformat()
-            _save_violations(violations)
-            return True
-    return False
+    return index_for(violation_store(), refresh=False).update_status(
+        violation_id, status, comment, datetime.now(timezone.utc).isoformat()
+    )
+
+
+_stats_memo = StatsMemo()
+
+
+def dataset_stats() -> DatasetStats:
+    """
+    Summary statistics for DATA_FILE, memoized by file fingerprint.
+
+    An unchanged file is answered from memory. If rows were only appended
+    since the statistics were computed, just the new bytes are read and
+    merged in; any other change recomputes them from the dataset.
+    """
+    if not DATA_FILE.exists():
+        raise FileNotFoundError(f"IBM AML dataset not found at: {DATA_FILE}")
+    stats = _stats_memo.get(DATA_FILE)
+    if stats is not None:
+        return stats
+
+    file_fingerprint = fingerprint(DATA_FILE)
+    with open(DATA_FILE, "rb") as f:
+        header = f.readline()
+        end = _last_line_end(f, file_fingerprint[0])
+
+    start = _stats_memo.covered(DATA_FILE, header, end)
+    if start is not None:
+        delta = DatasetStats()
+        columns = list(pd.read_csv(DATA_FILE, nrows=0).columns)
+        for chunk in _read_range(start, end, columns, DEFAULT_CHUNK_SIZE, usecols=set(DatasetStats.columns)):
+            delta.update(chunk)
+        stats = _stats_memo.extend(DATA_FILE, start, end, file_fingerprint, header, delta)
+        if stats is not None:
+            return stats
+
+    stats = DatasetStats.from_frame(load_transactions(columns=DatasetStats.columns))
+    # Only a file that ends on a newline and did not change while being read
+    # can later be extended from `end`
+    extendable = end == file_fingerprint[0] and fingerprint(DATA_FILE) == file_fingerprint
+    _stats_memo.put(DATA_FILE, file_fingerprint, header, end if extendable else None, stats)
+    return stats
 
 
 def get_dataset_stats() -> dict:
     """Return summary statistics for the IBM AML dataset."""
     try:
-        df = load_transactions()
-        total = len(df)
-        laundering_count = int(df["Is Laundering"].sum())
-        laundering_pct = round(laundering_count / total * 100, 2) if total > 0 else 0
-        currencies = df["Payment Currency"].value_counts().head(5).to_dict()
-        formats = df["Payment Format"].value_counts().to_dict()
         return {
-            "total_transactions": total,
-            "confirmed_laundering": laundering_count,
-            "laundering_percentage": laundering_pct,
-            "avg_amount_paid": round(float(df["Amount Paid"].mean()), 2),
-            "max_amount_paid": round(float(df["Amount Paid"].max()), 2),
-            "top_currencies": currencies,
-            "payment_formats": formats,
+            **dataset_stats().summary(),
             "source": "IBM AML Dataset (Synthetic, CDLA-Sharing-1.0)",
             "kaggle_url": "https://www.kaggle.com/datasets/ealtman2019/ibm-transactions-for-anti-money-laundering-aml",
         }
@@ -230,7 +737,7 @@ def get_dataset_stats() -> dict:
 def get_dataset_preview(limit: int = 20) -> list:
     """Return the first `limit` rows of the dataset as a list of dicts."""
     try:
-        df = load_transactions()
-        return df.head(limit).where(df.head(limit).notna(), None).to_dict("records")
+        df = load_transactions(limit=limit)
+        return df.where(df.notna(), None).to_dict("records")
     except Exception as e:
         return [{"error": str(e)}]
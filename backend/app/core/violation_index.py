@@ -0,0 +1,205 @@
+"""
+Violation index: process-local secondary indexes over the violation store.
+
+Holds every stored violation by id together with id sets keyed by status,
+severity and rule_id and counters per (status, severity), so list endpoints
+filter and paginate in O(result) and summary counts are O(1) instead of
+loading and scanning every violation per request.
+
+The index remembers the store `version()` it was built from. Reads first
+compare it with the store and rebuild lazily when another writer (a scan,
+another worker process) changed the data. Status updates and inserts made
+through the index are written to the store and then applied in place, when
+the version pair the store write returns shows no other writer in between.
+"""
+import heapq
+import threading
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Set
+
+from app.core.violation_store import ViolationStore
+from app.models.violation import Violation
+
+INDEXED_FIELDS = ("status", "severity", "rule_id")
+
+SEVERITY_ORDER = ("critical", "high", "medium", "low")
+
+
+def _values(value) -> tuple:
+    """A filter value as a tuple of accepted values."""
+    return tuple(value) if isinstance(value, (list, tuple, set)) else (value,)
+
+
+class ViolationIndex:
+    """Id sets per indexed field value plus (status, severity) counters."""
+
+    def __init__(self, store: ViolationStore):
+        self.store = store
+        self.version = None
+        self._built = False
+        self._lock = threading.RLock()
+        self._reset()
+
+    def _reset(self) -> None:
+        self.by_id: Dict[str, Violation] = {}
+        self.position: Dict[str, int] = {}
+        self.ids: Dict[str, Dict[str, Set[str]]] = {field: {} for field in INDEXED_FIELDS}
+        self.counts: Counter = Counter()  # (status, severity) -> count
+
+    # ── Maintenance ──────────────────────────────────────────────────────────
+
+    def refresh(self) -> "ViolationIndex":
+        """Rebuild from the store if it changed since the index was built."""
+        with self._lock:
+            version = self.store.version()
+            if not self._built or version != self.version:
+                self._reset()
+                self._add(self.store.load_all())
+                self.version = version
+                self._built = True
+        return self
+
+    def _add(self, violations: Iterable[Violation]) -> None:
+        for v in violations:
+            if v.id in self.by_id:
+                # Replaced in place: the id keeps its position, as in the store
+                self._discard(self.by_id[v.id])
+            else:
+                self.position[v.id] = len(self.position)
+            self.by_id[v.id] = v
+            for field in INDEXED_FIELDS:
+                self.ids[field].setdefault(getattr(v, field), set()).add(v.id)
+            self.counts[(v.status, v.severity)] += 1
+
+    def _discard(self, v: Violation) -> None:
+        for field in INDEXED_FIELDS:
+            self.ids[field].get(getattr(v, field), set()).discard(v.id)
+        self.counts[(v.status, v.severity)] -= 1
+
+    def _synced(self, versions: tuple) -> bool:
+        """
+        Given the (before, after) versions of a store write, True if the index
+        was up to date when it began, and then records `after` as its version.
+        """
+        before, after = versions
+        if not self._built or before != self.version:
+            self._built = False
+            return False
+        self.version = after
+        return True
+
+    def insert_many(self, violations: List[Violation]) -> None:
+        """Write-through bulk insert: store first, then the index in place."""
+        with self._lock:
+            if self._synced(self.store.insert_many(violations)):
+                self._add(violations)
+
+    def update_status(self, violation_id: str, status: str, comment: Optional[str], reviewed_at: str) -> bool:
+        """Write-through status update: one store row, then the status set and counters."""
+        with self._lock:
+            versions = self.store.update_status(violation_id, status, comment, reviewed_at)
+            if versions is None:
+                return False
+            v = self.by_id.get(violation_id)
+            if not self._synced(versions) or v is None:
+                self._built = False
+                return True
+            self.ids["status"][v.status].discard(v.id)
+            self.counts[(v.status, v.severity)] -= 1
+            v.status = status
+            if comment:
+                v.reviewer_comment = comment
+            v.reviewed_at = reviewed_at
+            self.ids["status"].setdefault(status, set()).add(v.id)
+            self.counts[(status, v.severity)] += 1
+            return True
+
+    # ── Reads ────────────────────────────────────────────────────────────────
+
+    def _matching_ids(self, filters: dict) -> Optional[Set[str]]:
+        """Ids matching all filters, or None when nothing is filtered."""
+        sets = []
+        for field, value in filters.items():
+            if value is None:
+                continue
+            if field not in self.ids:
+                raise ValueError(f"Unsupported violation filter: {field}")
+            sets.append(set().union(*(self.ids[field].get(x, set()) for x in _values(value))))
+        if not sets:
+            return None
+        sets.sort(key=len)
+        return sets[0].intersection(*sets[1:])
+
+    def query(self, limit: Optional[int] = None, offset: int = 0, **filters) -> List[Violation]:
+        """
+        Violations matching `filters` in insertion order. A filter value may be a
+        single value or a collection of accepted values.
+        """
+        with self._lock:
+            ids = self._matching_ids(filters)
+            if ids is None:
+                ordered = list(self.by_id)
+            elif limit is None:
+                ordered = sorted(ids, key=self.position.__getitem__)
+            else:
+                # A page only needs its first offset + limit ids in order
+                ordered = heapq.nsmallest(offset + limit, ids, key=self.position.__getitem__)
+            end = None if limit is None else offset + limit
+            return [self.by_id[i] for i in ordered[offset:end]]
+
+    def count(self, **filters) -> int:
+        with self._lock:
+            active = {k: set(_values(v)) for k, v in filters.items() if v is not None}
+            if set(active) <= {"status", "severity"}:
+                # Answer from the (status, severity) counters without touching id sets
+                return sum(
+                    n for (status, severity), n in self.counts.items()
+                    if status in active.get("status", (status,))
+                    and severity in active.get("severity", (severity,))
+                )
+            return len(self._matching_ids(active))
+
+    def count_by(self, field: str, **filters) -> Dict[str, int]:
+        """Counts per value of `status` or `severity`, optionally filtered by the other."""
+        if field not in ("status", "severity"):
+            raise ValueError(f"count_by supports status or severity, not {field}")
+        with self._lock:
+            totals: Counter = Counter()
+            for (status, severity), n in self.counts.items():
+                row = {"status": status, "severity": severity}
+                if all(value is None or row[k] == value for k, value in filters.items()):
+                    totals[row[field]] += n
+            return {k: n for k, n in totals.items() if n}
+
+    def review_queue(self, statuses, severity: Optional[str] = None, limit: Optional[int] = None) -> List[Violation]:
+        """Violations in `statuses`, most severe first, insertion order within a severity."""
+        with self._lock:
+            queue: List[Violation] = []
+            for level in SEVERITY_ORDER:
+                if severity is not None and level != severity:
+                    continue
+                remaining = None if limit is None else limit - len(queue)
+                queue.extend(self.query(limit=remaining, status=statuses, severity=level))
+                if limit is not None and len(queue) >= limit:
+                    return queue
+            return queue
+
+    def __len__(self) -> int:
+        return len(self.by_id)
+
+
+_indexes: Dict[int, ViolationIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def index_for(store: ViolationStore, refresh: bool = True) -> ViolationIndex:
+    """
+    The process-wide index for `store`. With `refresh` it is first brought up
+    to date with the store; writers pass False so a write never forces a build.
+    """
+    with _indexes_lock:
+        index = _indexes.get(id(store))
+        if index is None or index.store is not store:
+            index = ViolationIndex(store)
+            _indexes[id(store)] = index
+    return index.refresh() if refresh else index
@@ -0,0 +1,306 @@
+"""
+Violation store: persistence backends for file-engine violations.
+
+    JsonViolationStore    the original single JSON file, rewritten on every change
+    SqliteViolationStore  embedded SQLite database with indexes on status,
+                          severity, rule_id and transaction_id
+
+Both expose the same operations: full load/replace, bulk insert, point lookup
+and status update, filtered, paginated reads, and a `version()` token that
+changes whenever stored data changes (used to invalidate in-process caches). The SQLite backend updates a
+single row in place, so a review action no longer parses and rewrites every
+stored violation and concurrent reviewers cannot overwrite each other.
+"""
+import json
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from app.models.violation import Violation
+
+_FIELDS = [
+    "id", "transaction_id", "rule_id", "rule_name", "severity", "explanation",
+    "evidence", "status", "reviewer_comment", "detected_at", "reviewed_at",
+]
+_FILTERS = ("status", "severity", "rule_id", "transaction_id")
+
+
+class ViolationStore:
+    """Interface shared by the violation storage backends."""
+
+    def load_all(self) -> List[Violation]:
+        raise NotImplementedError
+
+    def replace_all(self, violations: List[Violation]) -> None:
+        raise NotImplementedError
+
+    def insert_many(self, violations: List[Violation]) -> tuple:
+        """
+        Add violations; one with a stored id replaces that row in place. Returns
+        the (before, after) `version()` pair read in the same write, so a cache
+        can tell whether anyone else wrote in between.
+        """
+        raise NotImplementedError
+
+    def get(self, violation_id: str) -> Optional[Violation]:
+        raise NotImplementedError
+
+    def update_status(
+        self, violation_id: str, status: str, comment: Optional[str], reviewed_at: str
+    ) -> Optional[tuple]:
+        """The (before, after) version pair as for `insert_many`, or None if no such violation."""
+        raise NotImplementedError
+
+    def query(self, limit: Optional[int] = None, offset: int = 0, **filters) -> List[Violation]:
+        """Violations matching equality `filters` (status, severity, rule_id, transaction_id), in insertion order."""
+        raise NotImplementedError
+
+    def count(self, **filters) -> int:
+        raise NotImplementedError
+
+    def version(self):
+        """Opaque token that changes on every write (from any process)."""
+        raise NotImplementedError
+
+
+def _check_filters(filters: dict) -> Dict[str, object]:
+    unknown = set(filters) - set(_FILTERS)
+    if unknown:
+        raise ValueError(f"Unsupported violation filter(s): {sorted(unknown)}")
+    return {k: v for k, v in filters.items() if v is not None}
+
+
+class JsonViolationStore(ViolationStore):
+    """Violations kept as one JSON array (the original storage format)."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def load_all(self) -> List[Violation]:
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            return [Violation(**v) for v in data]
+        except Exception:
+            return []
+
+    def replace_all(self, violations: List[Violation]) -> None:
+        self.path.write_text(
+            json.dumps([v.model_dump() for v in violations], indent=2),
+            encoding="utf-8"
+        )
+
+    def insert_many(self, violations: List[Violation]) -> tuple:
+        with self._lock:
+            before = self.version()
+            merged = {v.id: v for v in self.load_all()}
+            merged.update((v.id, v) for v in violations)
+            self.replace_all(list(merged.values()))
+            return before, self.version()
+
+    def get(self, violation_id: str) -> Optional[Violation]:
+        return next((v for v in self.load_all() if v.id == violation_id), None)
+
+    def update_status(self, violation_id, status, comment, reviewed_at) -> Optional[tuple]:
+        with self._lock:
+            before = self.version()
+            violations = self.load_all()
+            for v in violations:
+                if v.id == violation_id:
+                    v.status = status
+                    if comment:
+                        v.reviewer_comment = comment
+                    v.reviewed_at = reviewed_at
+                    self.replace_all(violations)
+                    return before, self.version()
+        return None
+
+    def query(self, limit: Optional[int] = None, offset: int = 0, **filters) -> List[Violation]:
+        filters = _check_filters(filters)
+        matches = [
+            v for v in self.load_all()
+            if all(getattr(v, k) == value for k, value in filters.items())
+        ]
+        return matches[offset:] if limit is None else matches[offset:offset + limit]
+
+    def count(self, **filters) -> int:
+        return len(self.query(**filters))
+
+    def version(self):
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+
+class SqliteViolationStore(ViolationStore):
+    """
+    Violations in an embedded SQLite database (WAL mode). Rows keep insertion
+    order through the implicit rowid; `evidence` is stored as JSON text.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS violations (
+                    id TEXT PRIMARY KEY,
+                    transaction_id TEXT NOT NULL,
+                    rule_id TEXT NOT NULL,
+                    rule_name TEXT NOT NULL,
+                    severity TEXT NOT NULL,
+                    explanation TEXT NOT NULL,
+                    evidence TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'open',
+                    reviewer_comment TEXT,
+                    detected_at TEXT NOT NULL,
+                    reviewed_at TEXT
+                );
+                CREATE INDEX IF NOT EXISTS idx_violations_status ON violations (status);
+                CREATE INDEX IF NOT EXISTS idx_violations_severity ON violations (severity);
+                CREATE INDEX IF NOT EXISTS idx_violations_rule_id ON violations (rule_id);
+                CREATE INDEX IF NOT EXISTS idx_violations_transaction_id ON violations (transaction_id);
+                CREATE TABLE IF NOT EXISTS store_meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL);
+                INSERT OR IGNORE INTO store_meta (key, value) VALUES ('version', 0);
+            """)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # One short-lived connection per operation (one transaction): safe across
+        # request threads, and SQLite serialises writers itself.
+        conn = sqlite3.connect(str(self.path), timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _to_row(v: Violation) -> tuple:
+        return tuple(
+            json.dumps(getattr(v, f)) if f == "evidence" else getattr(v, f)
+            for f in _FIELDS
+        )
+
+    @staticmethod
+    def _from_row(row: sqlite3.Row) -> Violation:
+        data = dict(row)
+        data["evidence"] = json.loads(data["evidence"])
+        # Rows were validated on the way in; skip re-validation on every read.
+        return Violation.model_construct(**data)
+
+    @staticmethod
+    def _bump_version(conn: sqlite3.Connection) -> tuple:
+        # Called after the transaction's first write, so it holds the write lock
+        # and no other writer can have moved the version since it began.
+        conn.execute("UPDATE store_meta SET value = value + 1 WHERE key = 'version'")
+        after = conn.execute("SELECT value FROM store_meta WHERE key = 'version'").fetchone()[0]
+        return after - 1, after
+
+    def _insert(self, conn: sqlite3.Connection, violations: Iterable[Violation]) -> None:
+        # Upsert rather than INSERT OR REPLACE: a replaced row keeps its rowid,
+        # i.e. its place in insertion order.
+        conn.executemany(
+            f"INSERT INTO violations ({', '.join(_FIELDS)}) "
+            f"VALUES ({', '.join('?' * len(_FIELDS))}) "
+            f"ON CONFLICT(id) DO UPDATE SET "
+            + ", ".join(f"{f} = excluded.{f}" for f in _FIELDS[1:]),
+            (self._to_row(v) for v in violations),
+        )
+
+    def load_all(self) -> List[Violation]:
+        return self.query()
+
+    def replace_all(self, violations: List[Violation]) -> None:
+        with self._connect() as conn:
+            conn.execute("DELETE FROM violations")
+            self._insert(conn, violations)
+            self._bump_version(conn)
+
+    def insert_many(self, violations: List[Violation]) -> tuple:
+        with self._connect() as conn:
+            self._insert(conn, violations)
+            return self._bump_version(conn)
+
+    def get(self, violation_id: str) -> Optional[Violation]:
+        with self._connect() as conn:
+            row = conn.execute(
+                f"SELECT {', '.join(_FIELDS)} FROM violations WHERE id = ?", (violation_id,)
+            ).fetchone()
+        return self._from_row(row) if row else None
+
+    def update_status(self, violation_id, status, comment, reviewed_at) -> Optional[tuple]:
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE violations SET status = ?, reviewed_at = ?, "
+                "reviewer_comment = COALESCE(?, reviewer_comment) WHERE id = ?",
+                (status, reviewed_at, comment or None, violation_id),
+            )
+            if cursor.rowcount == 0:
+                return None
+            return self._bump_version(conn)
+
+    @staticmethod
+    def _where(filters: dict) -> tuple:
+        filters = _check_filters(filters)
+        if not filters:
+            return "", []
+        return " WHERE " + " AND ".join(f"{k} = ?" for k in filters), list(filters.values())
+
+    def query(self, limit: Optional[int] = None, offset: int = 0, **filters) -> List[Violation]:
+        where, params = self._where(filters)
+        sql = f"SELECT {', '.join(_FIELDS)} FROM violations{where} ORDER BY rowid"
+        if limit is not None or offset:
+            sql += " LIMIT ? OFFSET ?"
+            params += [-1 if limit is None else limit, offset]
+        with self._connect() as conn:
+            return [self._from_row(row) for row in conn.execute(sql, params)]
+
+    def count(self, **filters) -> int:
+        where, params = self._where(filters)
+        with self._connect() as conn:
+            return conn.execute(f"SELECT COUNT(*) FROM violations{where}", params).fetchone()[0]
+
+    def version(self) -> int:
+        with self._connect() as conn:
+            return conn.execute("SELECT value FROM store_meta WHERE key = 'version'").fetchone()[0]
+
+
+BACKENDS = {
+    "json": JsonViolationStore,
+    "sqlite": SqliteViolationStore,
+}
+
+_stores: Dict[tuple, ViolationStore] = {}
+_stores_lock = threading.Lock()
+
+
+def open_store(backend: str, json_path: Path) -> ViolationStore:
+    """
+    Return the (cached) store for `backend`. The SQLite database lives next to
+    the JSON file (violations.db); on first use it imports any violations still
+    held in the JSON file.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown violation store backend: {backend!r} (expected one of {sorted(BACKENDS)})")
+    key = (backend, str(json_path))
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is not None and backend == "sqlite" and not store.path.exists():
+            store = None  # database file was removed; recreate it
+        if store is None:
+            if backend == "sqlite":
+                db_path = json_path.with_suffix(".db")
+                is_new = not db_path.exists()
+                store = SqliteViolationStore(db_path)
+                if is_new and json_path.exists():
+                    store.insert_many(JsonViolationStore(json_path).load_all())
+            else:
+                store = JsonViolationStore(json_path)
+            _stores[key] = store
+    return store
@@ -32,6 +32,8 @@ from app.api.dashboard import router as dashboard_router
 from app.api.subscription import router as subscription_router
 from app.api.agent import router as agent_router
 from app.core.scheduler import start_scheduler, stop_scheduler
+from app.connectors.http_client import close_clients
+from app.connectors.pool import close_pools
 from app.middleware.performance_middleware import PerformanceMonitoringMiddleware
 
 app = FastAPI(
@@ -94,6 +96,8 @@ async def on_startup():
 async def on_shutdown():
     """Cleanup on shutdown"""
     stop_scheduler()
+    close_pools()
+    close_clients()
     print("👋 NitiLens Enterprise Platform stopped")
 
 
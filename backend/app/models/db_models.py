@@ -211,6 +211,8 @@ class Connector(Base):
     
     status = Column(SQLEnum(ConnectorStatus), default=ConnectorStatus.INACTIVE)
     last_sync = Column(DateTime)
+    # Incremental sync watermark: {"column", "value", "type"} (see app.connectors.sync)
+    sync_watermark = Column(JSON)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
@@ -4,16 +4,27 @@ Real-time alert system with WebSocket, Email, and Slack support
 import os
 import json
 import asyncio
-from typing import Dict, Any, List
+import html
+import time
+from typing import Dict, Any, List, Optional
 from datetime import datetime
+from uuid import uuid4
 from sendgrid import SendGridAPIClient
 from sendgrid.helpers.mail import Mail
 import httpx
 import redis
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 
 from app.models.db_models import Alert, Violation, AlertChannel, AlertStatus
 
+# Violations listed individually in a digest email or Slack message (the rest are counted)
+DIGEST_MAX_ITEMS = 50
+
+# Scan-time alert coalescing: seconds a buffer stays open, and alerts per digest
+ALERT_DIGEST_WINDOW = float(os.getenv("ALERT_DIGEST_WINDOW", "60"))
+ALERT_DIGEST_MAX = int(os.getenv("ALERT_DIGEST_MAX", "500"))
+
 
 class AlertService:
     """Manages real-time alerts across multiple channels"""
@@ -74,6 +85,125 @@ class AlertService:
             alert.error_message = str(e)[:500]
             db.commit()
     
+    async def send_email_digest(
+        self,
+        db: Session,
+        violations: List[Violation],
+        recipient: str,
+        subject: Optional[str] = None
+    ):
+        """
+        Send one email covering all `violations` and record one Alert per
+        violation with a single bulk insert and commit.
+        """
+        if not violations:
+            return
+        
+        status, sent_at, error_message = AlertStatus.SENT, None, None
+        try:
+            if not self.sendgrid_key:
+                raise ValueError("SendGrid API key not configured")
+            
+            if len(violations) == 1:
+                # A lone alert reads like a regular one
+                default_subject = f"[{violations[0].severity.upper()}] Compliance Violation Detected"
+                content = self._format_email_content(violations[0])
+            else:
+                default_subject = f"{len(violations)} Compliance Violations Detected"
+                content = self._format_digest_content(violations)
+            message = Mail(
+                from_email=self.email_from,
+                to_emails=recipient,
+                subject=subject or default_subject,
+                html_content=content
+            )
+            
+            sg = SendGridAPIClient(self.sendgrid_key)
+            await asyncio.to_thread(sg.send, message)
+            sent_at = datetime.utcnow()
+            
+        except Exception as e:
+            status, error_message = AlertStatus.FAILED, str(e)[:500]
+        
+        await asyncio.to_thread(
+            self._record_alerts, db, violations, AlertChannel.EMAIL, recipient, status, sent_at, error_message
+        )
+    
+    async def send_slack_digest(self, db: Session, violations: List[Violation]):
+        """
+        Post one Slack message summarising all `violations` and record one
+        Alert per violation with a single bulk insert and commit.
+        """
+        if not violations:
+            return
+        
+        status, sent_at, error_message = AlertStatus.SENT, None, None
+        try:
+            if not self.slack_webhook:
+                raise ValueError("Slack webhook not configured")
+            
+            payload = (
+                self._format_slack_alert(violations[0]) if len(violations) == 1
+                else self._format_slack_digest(violations)
+            )
+            async with httpx.AsyncClient() as client:
+                response = await client.post(self.slack_webhook, json=payload, timeout=10)
+                response.raise_for_status()
+            sent_at = datetime.utcnow()
+            
+        except Exception as e:
+            status, error_message = AlertStatus.FAILED, str(e)[:500]
+        
+        await asyncio.to_thread(
+            self._record_alerts, db, violations, AlertChannel.SLACK, "slack_channel", status, sent_at, error_message
+        )
+    
+    async def send_websocket_batch(self, violations: List[Violation]):
+        """Broadcast `violations` as one batched WebSocket frame per organisation"""
+        by_org: Dict[Any, List[Violation]] = {}
+        for violation in violations:
+            by_org.setdefault(violation.org_id, []).append(violation)
+        
+        for org_id, org_violations in by_org.items():
+            if len(org_violations) == 1:
+                message = {"type": "violation_alert", **self._websocket_payload(org_violations[0])}
+            else:
+                message = {
+                    "type": "violation_alert_batch",
+                    "count": len(org_violations),
+                    "alerts": [self._websocket_payload(violation) for violation in org_violations]
+                }
+            try:
+                self.redis_client.publish(f"alerts:{org_id}", json.dumps(message))
+            except Exception as e:
+                print(f"WebSocket alert failed: {e}")
+    
+    def _record_alerts(
+        self,
+        db: Session,
+        violations: List[Violation],
+        channel: AlertChannel,
+        recipient: str,
+        status: AlertStatus,
+        sent_at: Optional[datetime],
+        error_message: Optional[str]
+    ):
+        """Insert one Alert row per violation with one executemany and commit (blocking: run it on a thread)"""
+        db.execute(insert(Alert), [
+            {
+                "alert_id": uuid4(),
+                "violation_id": violation.violation_id,
+                "org_id": violation.org_id,
+                "channel": channel,
+                "recipient": recipient,
+                "status": status,
+                "sent_at": sent_at,
+                "error_message": error_message
+            }
+            for violation in violations
+        ])
+        db.commit()
+    
     async def _send_slack_alert(self, db: Session, violation: Violation):
         """Send Slack alert via webhook"""
         alert = Alert(
@@ -90,37 +220,8 @@ class AlertService:
             if not self.slack_webhook:
                 raise ValueError("Slack webhook not configured")
             
-            payload = {
-                "text": f"🚨 *{violation.severity.upper()} Compliance Violation*",
-                "blocks": [
-                    {
-                        "type": "header",
-                        "text": {
-                            "type": "plain_text",
-                            "text": f"🚨 {violation.severity.upper()} Violation Detected"
-                        }
-                    },
-                    {
-                        "type": "section",
-                        "fields": [
-                            {"type": "mrkdwn", "text": f"*Violation ID:*\n{violation.violation_id}"},
-                            {"type": "mrkdwn", "text": f"*Severity:*\n{violation.severity}"},
-                            {"type": "mrkdwn", "text": f"*Department:*\n{violation.department or 'N/A'}"},
-                            {"type": "mrkdwn", "text": f"*Detected:*\n{violation.detected_at.strftime('%Y-%m-%d %H:%M')}"}
-                        ]
-                    },
-                    {
-                        "type": "section",
-                        "text": {
-                            "type": "mrkdwn",
-                            "text": f"*Explanation:*\n{violation.explanation}"
-                        }
-                    }
-                ]
-            }
-            
             async with httpx.AsyncClient() as client:
-                response = await client.post(self.slack_webhook, json=payload, timeout=10)
+                response = await client.post(self.slack_webhook, json=self._format_slack_alert(violation), timeout=10)
                 response.raise_for_status()
             
             alert.status = AlertStatus.SENT
@@ -132,17 +233,41 @@ class AlertService:
             alert.error_message = str(e)[:500]
             db.commit()
     
+    def _format_slack_alert(self, violation: Violation) -> Dict[str, Any]:
+        """Slack message for a single violation"""
+        return {
+            "text": f"🚨 *{violation.severity.upper()} Compliance Violation*",
+            "blocks": [
+                {
+                    "type": "header",
+                    "text": {
+                        "type": "plain_text",
+                        "text": f"🚨 {violation.severity.upper()} Violation Detected"
+                    }
+                },
+                {
+                    "type": "section",
+                    "fields": [
+                        {"type": "mrkdwn", "text": f"*Violation ID:*\n{violation.violation_id}"},
+                        {"type": "mrkdwn", "text": f"*Severity:*\n{violation.severity}"},
+                        {"type": "mrkdwn", "text": f"*Department:*\n{violation.department or 'N/A'}"},
+                        {"type": "mrkdwn", "text": f"*Detected:*\n{violation.detected_at.strftime('%Y-%m-%d %H:%M')}"}
+                    ]
+                },
+                {
+                    "type": "section",
+                    "text": {
+                        "type": "mrkdwn",
+                        "text": f"*Explanation:*\n{violation.explanation}"
+                    }
+                }
+            ]
+        }
+    
     async def _send_websocket_alert(self, violation: Violation):
         """Broadcast alert via WebSocket"""
         try:
-            alert_data = {
-                "type": "violation_alert",
-                "violation_id": str(violation.violation_id),
-                "severity": violation.severity,
-                "department": violation.department,
-                "explanation": violation.explanation,
-                "detected_at": violation.detected_at.isoformat()
-            }
+            alert_data = {"type": "violation_alert", **self._websocket_payload(violation)}
             
             # Publish to Redis for WebSocket servers
             self.redis_client.publish(
@@ -153,6 +278,15 @@ class AlertService:
         except Exception as e:
             print(f"WebSocket alert failed: {e}")
     
+    def _websocket_payload(self, violation: Violation) -> Dict[str, Any]:
+        return {
+            "violation_id": str(violation.violation_id),
+            "severity": violation.severity,
+            "department": violation.department,
+            "explanation": violation.explanation,
+            "detected_at": violation.detected_at.isoformat()
+        }
+    
     def _format_email_content(self, violation: Violation) -> str:
         """Format email HTML content"""
         severity_colors = {
@@ -163,21 +297,25 @@ class AlertService:
         }
         
         color = severity_colors.get(violation.severity, "#6b7280")
+        # Explanations quote transaction field values: escape everything interpolated
+        severity = html.escape(str(violation.severity).upper())
+        department = html.escape(str(violation.department or 'N/A'))
+        explanation = html.escape(str(violation.explanation))
         
         return f"""
         <html>
             <body style="font-family: Arial, sans-serif; padding: 20px;">
                 <div style="border-left: 4px solid {color}; padding-left: 20px;">
                     <h2 style="color: {color};">Compliance Violation Detected</h2>
-                    <p><strong>Severity:</strong> {violation.severity.upper()}</p>
-                    <p><strong>Department:</strong> {violation.department or 'N/A'}</p>
+                    <p><strong>Severity:</strong> {severity}</p>
+                    <p><strong>Department:</strong> {department}</p>
                     <p><strong>Detected:</strong> {violation.detected_at.strftime('%Y-%m-%d %H:%M:%S')}</p>
                     <hr>
                     <h3>Explanation:</h3>
-                    <p>{violation.explanation}</p>
+                    <p>{explanation}</p>
                     <hr>
                     <p style="color: #6b7280; font-size: 12px;">
-                        Violation ID: {violation.violation_id}<br>
+                        Violation ID: {html.escape(str(violation.violation_id))}<br>
                         This is an automated alert from NitiLens Compliance Platform
                     </p>
                 </div>
@@ -185,6 +323,142 @@ class AlertService:
         </html>
         """
 
+    
+    def _format_digest_content(self, violations: List[Violation]) -> str:
+        """Format digest email HTML content: one row per violation, up to DIGEST_MAX_ITEMS"""
+        rows = "".join(
+            f"""
+                    <tr>
+                        <td>{html.escape(str(violation.severity).upper())}</td>
+                        <td>{html.escape(str(violation.department or 'N/A'))}</td>
+                        <td>{html.escape(str(violation.explanation))}</td>
+                        <td style="color: #6b7280; font-size: 12px;">{html.escape(str(violation.violation_id))}</td>
+                    </tr>"""
+            for violation in violations[:DIGEST_MAX_ITEMS]
+        )
+        more = len(violations) - DIGEST_MAX_ITEMS
+        more_note = f"<p>... and {more} more.</p>" if more > 0 else ""
+        
+        return f"""
+        <html>
+            <body style="font-family: Arial, sans-serif; padding: 20px;">
+                <h2>{len(violations)} Compliance Violation(s)</h2>
+                <table cellpadding="6" style="border-collapse: collapse;">
+                    <tr><th>Severity</th><th>Department</th><th>Explanation</th><th>Violation ID</th></tr>{rows}
+                </table>
+                {more_note}
+                <hr>
+                <p style="color: #6b7280; font-size: 12px;">
+                    This is an automated alert from NitiLens Compliance Platform
+                </p>
+            </body>
+        </html>
+        """
+
+    
+    def _format_slack_digest(self, violations: List[Violation]) -> Dict[str, Any]:
+        """Slack message for a digest: counts by severity, then up to DIGEST_MAX_ITEMS lines"""
+        by_severity: Dict[str, int] = {}
+        for violation in violations:
+            by_severity[violation.severity] = by_severity.get(violation.severity, 0) + 1
+        counts = ", ".join(f"{count} {severity}" for severity, count in by_severity.items())
+        lines = "\n".join(
+            f"• *{violation.severity.upper()}* {violation.explanation}"
+            for violation in violations[:DIGEST_MAX_ITEMS]
+        )
+        more = len(violations) - DIGEST_MAX_ITEMS
+        if more > 0:
+            lines += f"\n... and {more} more"
+        
+        return {
+            "text": f"🚨 *{len(violations)} Compliance Violations* ({counts})",
+            "blocks": [
+                {
+                    "type": "header",
+                    "text": {"type": "plain_text", "text": f"🚨 {len(violations)} Violations Detected"}
+                },
+                {
+                    "type": "section",
+                    "text": {"type": "mrkdwn", "text": f"*By severity:* {counts}"}
+                },
+                {
+                    "type": "section",
+                    # Slack caps section text at 3000 characters
+                    "text": {"type": "mrkdwn", "text": lines[:3000]}
+                }
+            ]
+        }
+
+
+class AlertBuffer:
+    """
+    Coalesces the alerts raised during a scan. Alerts are buffered per
+    (org, channel, recipient) and a buffer is flushed as one digest email,
+    one Slack message or one batched WebSocket frame when it holds
+    `max_items` alerts, when `window` seconds have passed since its first
+    alert, or on `flush()`. A buffer holding a single alert goes through
+    the same digest path (off the event loop), formatted as a regular alert.
+    """
+    
+    def __init__(self, service: AlertService, window: Optional[float] = None, max_items: Optional[int] = None):
+        self.service = service
+        self.window = ALERT_DIGEST_WINDOW if window is None else window
+        self.max_items = ALERT_DIGEST_MAX if max_items is None else max_items
+        self._db: Optional[Session] = None
+        self._buffers: Dict[tuple, List[Violation]] = {}
+        self._opened: Dict[tuple, float] = {}
+        self.alerts = 0
+        self.messages = 0
+    
+    def _targets(self, channels: List[str], recipients: Dict[str, str]):
+        """(channel, recipient) pairs `send_alert` would deliver to"""
+        for channel in channels:
+            if channel == "email" and recipients.get("email"):
+                yield channel, recipients["email"]
+            elif channel == "slack" and self.service.slack_webhook:
+                yield channel, "slack_channel"
+            elif channel == "websocket":
+                yield channel, None
+    
+    async def add(self, db: Session, violation: Violation, channels: List[str], recipients: Dict[str, str]):
+        """Buffer an alert; flushes the buffers that are full or past their window"""
+        self._db = db
+        now = time.monotonic()
+        for channel, recipient in self._targets(channels, recipients):
+            key = (violation.org_id, channel, recipient)
+            self._buffers.setdefault(key, []).append(violation)
+            self._opened.setdefault(key, now)
+            self.alerts += 1
+        
+        due = [
+            key for key, buffered in self._buffers.items()
+            if len(buffered) >= self.max_items or now - self._opened[key] >= self.window
+        ]
+        for key in due:
+            await self._flush_key(key)
+    
+    async def flush(self):
+        """Send everything still buffered"""
+        for key in list(self._buffers):
+            await self._flush_key(key)
+    
+    async def _flush_key(self, key: tuple):
+        violations = self._buffers.pop(key, [])
+        self._opened.pop(key, None)
+        if not violations:
+            return
+        _, channel, recipient = key
+        self.messages += 1
+        if channel == "email":
+            await self.service.send_email_digest(self._db, violations, recipient)
+        elif channel == "slack":
+            await self.service.send_slack_digest(self._db, violations)
+        else:
+            await self.service.send_websocket_batch(violations)
+    
+    def stats(self) -> Dict[str, int]:
+        return {"alerts": self.alerts, "messages": self.messages}
+
 
 # Global instance
 alert_service = AlertService()
@@ -1,23 +1,77 @@
 """
 Enhanced multi-policy compliance scanning engine
 """
-from typing import List, Dict, Any, Optional
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Iterator, Optional
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy import and_, insert, inspect
 import pandas as pd
+import numpy as np
 from datetime import datetime
-from uuid import UUID
+from uuid import UUID, uuid4
 
 from app.models.db_models import Policy, Rule, Violation, PolicyStatus, RuleStatus, ViolationStatus
-from app.services.alert_service import alert_service
-from app.connectors import create_connector
+from app.services.alert_service import AlertBuffer, alert_service
+from app.connectors import BaseConnector, create_connector
+from app.connectors.credentials import decrypt_config
+from app.connectors.pushdown import ID_COLUMNS, PushdownPlan, plan_pushdown
+from app.connectors.sync import SyncWindow
+from app.core.condition_compiler import logic_to_node
+from app.core.parallel_scan import evaluate_rule_matrix_parallel
+from app.core.stateful_rules import AggregateThresholdRule, StatefulRule
+from app.core.violation_engine import peak_memory_mb
+
+DEFAULT_DATA_FILE = "data/datasets/ibm_aml/sample_transactions.csv"
+
+# Violations inserted per executemany (and per commit)
+VIOLATION_BATCH_SIZE = int(os.getenv("VIOLATION_BATCH_SIZE", "5000"))
+
+# Threads evaluating policies concurrently during a scan (0: one per CPU core)
+POLICY_SCAN_THREADS = int(os.getenv("POLICY_SCAN_THREADS", "0"))
+
+# Rows per batch streamed from a connector when a scan sets no chunk size
+CONNECTOR_BATCH_SIZE = int(os.getenv("CONNECTOR_BATCH_SIZE", "50000"))
+
+_VIOLATION_COLUMNS = [column.key for column in Violation.__table__.columns]
+
+
+class _Snapshot:
+    """Plain copy of an ORM instance's column attributes, safe to read on any thread"""
+    
+    def __init__(self, instance):
+        for attr in inspect(instance).mapper.column_attrs:
+            setattr(self, attr.key, getattr(instance, attr.key))
 
 
 class ComplianceEngine:
     """Multi-policy compliance scanning engine"""
     
-    def __init__(self, db: Session):
+    def __init__(
+        self,
+        db: Session,
+        single_pass: bool = True,
+        workers: Optional[int] = None,
+        policy_threads: Optional[int] = None
+    ):
         self.db = db
+        # Evaluate all rules of a policy in one pass over a shared rule-hit matrix
+        self.single_pass = single_pass
+        # Worker processes for the rule matrix (None: SCAN_WORKERS setting)
+        self.workers = workers
+        # Threads evaluating policies concurrently (None: POLICY_SCAN_THREADS setting)
+        self.policy_threads = POLICY_SCAN_THREADS if policy_threads is None else policy_threads
+        # Scan-time alerts, flushed as digests
+        self.alerts = AlertBuffer(alert_service)
+        # Bulk violation inserts, for the persisted rows/s reported by scans
+        self.persisted_rows = 0
+        self.persist_seconds = 0.0
+        # Rule evaluations and policy writes that failed during the current scan
+        self.scan_errors: List[str] = []
+        # Degraded source reads (pushdown fallbacks) of the current scan
+        self.scan_warnings: List[str] = []
     
     async def scan_all_policies(
         self,
@@ -25,9 +79,35 @@ class ComplianceEngine:
         connector_id: Optional[UUID] = None,
         department: Optional[str] = None,
         framework: Optional[str] = None,
-        limit: Optional[int] = None
+        limit: Optional[int] = None,
+        chunk_size: Optional[int] = None,
+        full_resync: bool = False
     ) -> Dict[str, Any]:
-        """Scan data against all active policies"""
+        """
+        Scan data against all active policies.
+        With `chunk_size` the data is scanned in chunks of that many rows, so
+        memory stays bounded by the chunk size instead of the dataset size.
+        Connector data is always streamed in batches (CONNECTOR_BATCH_SIZE
+        rows unless `chunk_size` is given). A connector with a watermark
+        column is synced incrementally: only rows past the watermark stored
+        by its last successful scan are read, unless `full_resync` is set.
+        
+        Policies are evaluated concurrently on a pool of `policy_threads`
+        threads, off the event loop. Evaluation never touches the session:
+        each evaluated policy is queued to a single writer that persists its
+        violations, remediation cases and alerts through `self.db`. Source
+        reads, the aggregate pre-pass and the writer's database calls also
+        run on worker threads, so a long scan does not block the event loop;
+        the session is only ever used by one thread at a time.
+        
+        A failed rule evaluation or policy write does not stop the scan, but
+        it is reported under "errors" and the connector's watermark and
+        last_sync are left unchanged, so the next scan reads those rows again.
+        A pushed-down source query that fails is retried as a wider read,
+        reported under "warnings".
+        """
+        self.scan_errors = []
+        self.scan_warnings = []
         # Get active policies with filters
         query = self.db.query(Policy).filter(
             and_(
@@ -49,13 +129,50 @@ class ComplianceEngine:
                 "message": "No active policies found"
             }
         
-        # Fetch data from connector
-        data = await self._fetch_data(org_id, connector_id, limit)
+        policy_rules = self._active_rules(policies)
+        
+        # Fetch data from connector. Database sources ship only the columns
+        # and rows the rules may need; the checkers confirm the hits.
+        connector = self._load_connector(org_id, connector_id) if connector_id else None
+        plan = prepass_plan = sync = None
+        if connector is not None:
+            plan = plan_pushdown(
+                rule.structured_logic for rules in policy_rules.values() for rule in rules
+            )
+            if limit:
+                # A limit counts the leading rows of the source, not of the filtered rows
+                plan.predicates = None
+            prepass_plan = plan
+            sync = await asyncio.to_thread(self._start_sync, connector, full_resync)
+            if sync is not None:
+                # Without an upper bound the whole window is read, to find the new watermark
+                plan = self._windowed(plan, sync, sync.predicate(), sync.until is not None)
+                # Aggregate totals also count the rows before the window
+                prepass_plan = self._windowed(prepass_plan, sync, sync.predicate(lower=False), False)
+        if connector_id and not chunk_size:
+            chunk_size = CONNECTOR_BATCH_SIZE
+        if chunk_size:
+            chunks = self._iter_data(org_id, connector_id, limit, chunk_size, plan, sync)
+        else:
+            chunks = iter([await self._fetch_data(org_id, connector_id, limit)])
+        
+        # Aggregate rules need totals over all the data before any row can be
+        # flagged: accumulate them first (a separate pre-pass when chunked)
+        states = self._aggregate_states(policy_rules)
+        if states:
+            if chunk_size:
+                prepass = self._iter_data(
+                    org_id, connector_id, limit, chunk_size, prepass_plan, sync, lower=False
+                )
+            else:
+                data = next(chunks)
+                prepass, chunks = [data], iter([data])
+            await asyncio.to_thread(self._observe_states, prepass, states)
         
         # Scan each policy
         results = {
             "total_policies": len(policies),
-            "total_records": len(data),
+            "total_records": 0,
             "policies_scanned": [],
             "total_violations": 0,
             "violations_by_severity": {
@@ -66,27 +183,174 @@ class ComplianceEngine:
             }
         }
         
-        for policy in policies:
-            policy_result = await self._scan_policy(policy, data, org_id)
-            results["policies_scanned"].append(policy_result)
+        policy_results: Dict[str, Dict[str, Any]] = {}
+        
+        policy_by_id = {policy.policy_id: policy for policy in policies}
+        
+        # Worker threads only see plain snapshots of the ORM rows: commits by
+        # the writer expire the originals, and reloading them would use the
+        # session from another thread
+        snapshots = {
+            policy.policy_id: (
+                _Snapshot(policy),
+                [_Snapshot(rule) for rule in policy_rules.get(policy.policy_id, [])]
+            )
+            for policy in policies
+        }
+        
+        threads = min(self.policy_threads or (os.cpu_count() or 1), len(policies))
+        queue: asyncio.Queue = asyncio.Queue(maxsize=2 * threads)
+        writer = asyncio.create_task(self._write_queue(queue, policy_rules, org_id, results, policy_results))
+        loop = asyncio.get_running_loop()
+        try:
+            with ThreadPoolExecutor(max_workers=threads, thread_name_prefix="policy-scan") as pool:
+                while (data := await asyncio.to_thread(next, chunks, None)) is not None:
+                    results["total_records"] += len(data)
+                    
+                    # Sub-predicates shared by rules of different policies are evaluated once per chunk
+                    predicate_cache: dict = {}
+                    
+                    evaluations = [
+                        loop.run_in_executor(
+                            pool, self._evaluate_policy,
+                            *snapshots[policy.policy_id], data, org_id, predicate_cache, states
+                        )
+                        for policy in policies
+                    ]
+                    for evaluation in asyncio.as_completed(evaluations):
+                        policy_snapshot, rule_violations = await evaluation
+                        await queue.put((policy_by_id[policy_snapshot.policy_id], rule_violations))
+        finally:
+            await queue.put(None)
+            await writer
+        
+        await self.alerts.flush()
+        
+        results["policies_scanned"] = [
+            policy_results[str(policy.policy_id)]
+            for policy in policies
+            if str(policy.policy_id) in policy_results
+        ]
+        results["persistence"] = self.persistence_stats()
+        results["alerts"] = self.alerts.stats()
+        if plan is not None:
+            results["pushdown"] = plan.describe()
+        if self.scan_errors:
+            results["errors"] = list(self.scan_errors)
+        if self.scan_warnings:
+            results["warnings"] = list(dict.fromkeys(self.scan_warnings))
+        if connector is not None:
+            results["sync"] = await asyncio.to_thread(
+                self._finish_sync, connector, sync, not limit and not self.scan_errors
+            )
+            results["sync"]["full_resync"] = full_resync
+        if chunk_size:
+            results["chunk_size"] = chunk_size
+            results["peak_memory_mb"] = peak_memory_mb()
+        
+        return results
+    
+    @staticmethod
+    def _observe_states(batches, states: Dict[str, StatefulRule]) -> None:
+        """Accumulate aggregate rule totals over `batches` (runs on a worker thread)"""
+        for data in batches:
+            for state in states.values():
+                if set(state.columns) <= set(data.columns):
+                    state.observe(data)
+    
+    async def _write_queue(
+        self,
+        queue: asyncio.Queue,
+        policy_rules: Dict[UUID, List[Rule]],
+        org_id: UUID,
+        results: Dict[str, Any],
+        policy_results: Dict[str, Dict[str, Any]]
+    ) -> None:
+        """
+        The scan's single writer: persists evaluated policies from `queue`
+        in arrival order until it receives None, and merges their results.
+        """
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            policy, rule_violations = item
+            rules = policy_rules.get(policy.policy_id, [])
+            try:
+                policy_result = await self._write_policy(policy, list(zip(rules, rule_violations)), org_id)
+            except Exception as e:
+                # Keep draining the queue: the evaluation side waits on it
+                print(f"Policy write error: {e}")
+                self.scan_errors.append(f"Policy {policy.policy_id} write failed: {e}")
+                continue
             results["total_violations"] += policy_result["violations_found"]
             
             # Aggregate severity counts
             for severity, count in policy_result["violations_by_severity"].items():
                 results["violations_by_severity"][severity] += count
-        
-        return results
+            
+            # Merge per-policy results across chunks
+            merged = policy_results.setdefault(policy_result["policy_id"], policy_result)
+            if merged is not policy_result:
+                merged["violations_found"] += policy_result["violations_found"]
+                for severity, count in policy_result["violations_by_severity"].items():
+                    merged["violations_by_severity"][severity] += count
     
-    async def _scan_policy(self, policy: Policy, data: pd.DataFrame, org_id: UUID) -> Dict[str, Any]:
-        """Scan data against a single policy"""
-        # Get active rules for policy
-        rules = self.db.query(Rule).filter(
-            and_(
-                Rule.policy_id == policy.policy_id,
-                Rule.status == RuleStatus.ACTIVE
+    async def _scan_policy(
+        self,
+        policy: Policy,
+        data: pd.DataFrame,
+        org_id: UUID,
+        predicate_cache: Optional[dict] = None,
+        states: Optional[Dict[str, StatefulRule]] = None
+    ) -> Dict[str, Any]:
+        """
+        Scan data against a single policy.
+        `states` holds pre-filled state for aggregate rules, keyed by rule id.
+        """
+        rules = self._active_rules([policy]).get(policy.policy_id, [])
+        _, rule_violations = self._evaluate_policy(policy, rules, data, org_id, predicate_cache, states)
+        return await self._write_policy(policy, list(zip(rules, rule_violations)), org_id)
+    
+    def _evaluate_policy(
+        self,
+        policy: Policy,
+        rules: List[Rule],
+        data: pd.DataFrame,
+        org_id: UUID,
+        predicate_cache: Optional[dict] = None,
+        states: Optional[Dict[str, StatefulRule]] = None
+    ) -> tuple:
+        """
+        Evaluate the rules of a policy without touching the session, so it
+        can run on a worker thread. Returns (policy, violations per rule).
+        """
+        states = states or {}
+        matrix = None
+        if self.single_pass:
+            matrix = evaluate_rule_matrix_parallel(
+                [str(rule.rule_id) for rule in rules],
+                [self._rule_predicate(rule, data, states) for rule in rules],
+                data,
+                self.workers,
+                shard_column=self._shard_column(states),
+                cache=predicate_cache
             )
-        ).all()
         
+        rule_violations = []
+        for i, rule in enumerate(rules):
+            rows = matrix.rows_for(i) if matrix is not None else None
+            state = states.get(str(rule.rule_id))
+            rule_violations.append(self._evaluate_rule(rule, data, policy, org_id, rows, state))
+        return policy, rule_violations
+    
+    async def _write_policy(
+        self,
+        policy: Policy,
+        rule_violations: List[tuple],
+        org_id: UUID
+    ) -> Dict[str, Any]:
+        """Persist the (rule, violations) pairs of an evaluated policy and summarise them"""
         violations_found = 0
         violations_by_severity = {
             "critical": 0,
@@ -95,12 +359,11 @@ class ComplianceEngine:
             "low": 0
         }
         
-        # Execute each rule
-        for rule in rules:
-            rule_violations = await self._execute_rule(rule, data, policy, org_id)
-            violations_found += len(rule_violations)
+        for rule, violations in rule_violations:
+            violations = await self._write_violations(violations)
+            violations_found += len(violations)
             
-            for violation in rule_violations:
+            for violation in violations:
                 violations_by_severity[violation.severity] += 1
         
         return {
@@ -109,7 +372,7 @@ class ComplianceEngine:
             "version": policy.version,
             "department": policy.department,
             "framework": policy.regulatory_framework,
-            "rules_executed": len(rules),
+            "rules_executed": len(rule_violations),
             "violations_found": violations_found,
             "violations_by_severity": violations_by_severity
         }
@@ -119,26 +382,54 @@ class ComplianceEngine:
         rule: Rule,
         data: pd.DataFrame,
         policy: Policy,
-        org_id: UUID
+        org_id: UUID,
+        rows: Optional[np.ndarray] = None,
+        state: Optional[StatefulRule] = None
     ) -> List[Violation]:
-        """Execute a single rule against data"""
-        violations = []
-        
+        """
+        Execute a single rule against data and persist its violations.
+        `rows` are the positional hits precomputed by the rule matrix, if any;
+        `state` is the pre-filled state of an aggregate rule.
+        """
+        violations = self._evaluate_rule(rule, data, policy, org_id, rows, state)
+        return await self._write_violations(violations)
+    
+    def _evaluate_rule(
+        self,
+        rule: Rule,
+        data: pd.DataFrame,
+        policy: Policy,
+        org_id: UUID,
+        rows: Optional[np.ndarray] = None,
+        state: Optional[StatefulRule] = None
+    ) -> List[Violation]:
+        """Build (unsaved) violations of a single rule; does not use the session"""
         try:
             # Parse structured logic
             logic = rule.structured_logic or {}
             
             # Execute rule based on logic type
             if logic.get("type") == "threshold":
-                violations = self._check_threshold(rule, data, policy, org_id, logic)
+                return self._check_threshold(rule, data, policy, org_id, logic, rows)
             elif logic.get("type") == "pattern":
-                violations = self._check_pattern(rule, data, policy, org_id, logic)
+                return self._check_pattern(rule, data, policy, org_id, logic, rows)
             elif logic.get("type") == "comparison":
-                violations = self._check_comparison(rule, data, policy, org_id, logic)
+                return self._check_comparison(rule, data, policy, org_id, logic, rows)
+            elif logic.get("type") == "aggregate":
+                return self._check_aggregate(rule, data, policy, org_id, logic, rows, state)
             else:
                 # Default: check rule text against data
-                violations = self._check_generic(rule, data, policy, org_id)
-            
+                return self._check_generic(rule, data, policy, org_id)
+        
+        except Exception as e:
+            print(f"Rule execution error: {e}")
+            # list.append is atomic, so worker threads can record failures directly
+            self.scan_errors.append(f"Rule {rule.rule_id} evaluation failed: {e}")
+            return []
+    
+    async def _write_violations(self, violations: List[Violation]) -> List[Violation]:
+        """Score and persist violations, create their remediation cases and raise alerts"""
+        try:
             # Import anomaly detector and remediation engine
             from app.services.anomaly_detector import AnomalyDetector
             from app.services.remediation_engine import RemediationEngine
@@ -146,44 +437,81 @@ class ComplianceEngine:
             detector = AnomalyDetector(self.db)
             remediation = RemediationEngine(self.db)
             
-            # Save violations and create remediation cases
+            # Calculate combined risk scores
             for violation in violations:
-                # Calculate combined risk score
-                anomaly_score = violation.anomaly_score if hasattr(violation, 'anomaly_score') else 0.0
+                violation.anomaly_score = violation.anomaly_score or 0.0
                 violation.final_risk_score = detector.calculate_combined_risk_score(
                     violation.severity,
-                    anomaly_score
+                    violation.anomaly_score
                 )
-                
-                self.db.add(violation)
-                self.db.flush()
-                
-                # Create remediation case automatically
-                await remediation.create_remediation_case(violation)
-                
-                # Send real-time alerts for high/critical violations
+            
+            # Save violations in bulk (off the event loop), then create their remediation cases
+            await asyncio.to_thread(self._persist_violations, violations)
+            await remediation.create_remediation_cases_bulk(violations)
+            
+            for violation in violations:
+                # Alert on high/critical violations (coalesced into digests per recipient)
                 if violation.severity in ["high", "critical"]:
-                    await alert_service.send_alert(
+                    await self.alerts.add(
                         self.db,
                         violation,
                         channels=["websocket", "email"],
                         recipients={"email": "compliance@example.com"}
                     )
             
-            self.db.commit()
+            await asyncio.to_thread(self.db.commit)
             
         except Exception as e:
-            print(f"Rule execution error: {e}")
+            print(f"Violation write error: {e}")
+            self.db.rollback()
+            raise
         
         return violations
     
+    def _persist_violations(self, violations: List[Violation]) -> None:
+        """
+        Insert violations as plain row mappings, one executemany per batch of
+        VIOLATION_BATCH_SIZE rows with a commit after each batch. Ids and
+        detection times are assigned here, on the objects as well as the rows,
+        so remediation cases and alerts can reference the stored rows without
+        a flush or refresh per violation.
+        """
+        if not violations:
+            return
+        started = time.perf_counter()
+        detected_at = datetime.utcnow()
+        for start in range(0, len(violations), VIOLATION_BATCH_SIZE):
+            rows = []
+            for violation in violations[start:start + VIOLATION_BATCH_SIZE]:
+                violation.violation_id = violation.violation_id or uuid4()
+                violation.detected_at = violation.detected_at or detected_at
+                # Unset columns are left out so their defaults apply
+                rows.append({
+                    column: value
+                    for column in _VIOLATION_COLUMNS
+                    if (value := getattr(violation, column)) is not None
+                })
+            self.db.execute(insert(Violation), rows)
+            self.db.commit()
+        self.persisted_rows += len(violations)
+        self.persist_seconds += time.perf_counter() - started
+    
+    def persistence_stats(self) -> Dict[str, Any]:
+        """Violations persisted by this engine so far and the insert rate"""
+        return {
+            "rows": self.persisted_rows,
+            "seconds": round(self.persist_seconds, 3),
+            "rows_per_second": round(self.persisted_rows / self.persist_seconds) if self.persist_seconds else None
+        }
+    
     def _check_threshold(
         self,
         rule: Rule,
         data: pd.DataFrame,
         policy: Policy,
         org_id: UUID,
-        logic: Dict
+        logic: Dict,
+        rows: Optional[np.ndarray] = None
     ) -> List[Violation]:
         """Check threshold-based rules"""
         violations = []
@@ -194,21 +522,24 @@ class ComplianceEngine:
         if field not in data.columns:
             return violations
         
-        # Apply threshold check
-        if operator == ">":
-            mask = data[field] > threshold
-        elif operator == "<":
-            mask = data[field] < threshold
-        elif operator == ">=":
-            mask = data[field] >= threshold
-        elif operator == "<=":
-            mask = data[field] <= threshold
-        elif operator == "==":
-            mask = data[field] == threshold
+        if rows is not None:
+            violating_records = data.iloc[rows]
         else:
-            return violations
-        
-        violating_records = data[mask]
+            # Apply threshold check
+            if operator == ">":
+                mask = data[field] > threshold
+            elif operator == "<":
+                mask = data[field] < threshold
+            elif operator == ">=":
+                mask = data[field] >= threshold
+            elif operator == "<=":
+                mask = data[field] <= threshold
+            elif operator == "==":
+                mask = data[field] == threshold
+            else:
+                return violations
+            
+            violating_records = data[mask]
         
         for _, record in violating_records.iterrows():
             violation = Violation(
@@ -234,7 +565,8 @@ class ComplianceEngine:
         data: pd.DataFrame,
         policy: Policy,
         org_id: UUID,
-        logic: Dict
+        logic: Dict,
+        rows: Optional[np.ndarray] = None
     ) -> List[Violation]:
         """Check pattern-based rules"""
         violations = []
@@ -244,9 +576,12 @@ class ComplianceEngine:
         if field not in data.columns:
             return violations
         
-        # Check pattern match
-        mask = data[field].astype(str).str.contains(pattern, case=False, na=False)
-        violating_records = data[mask]
+        if rows is not None:
+            violating_records = data.iloc[rows]
+        else:
+            # Check pattern match
+            mask = data[field].astype(str).str.contains(pattern, case=False, na=False)
+            violating_records = data[mask]
         
         for _, record in violating_records.iterrows():
             violation = Violation(
@@ -272,7 +607,8 @@ class ComplianceEngine:
         data: pd.DataFrame,
         policy: Policy,
         org_id: UUID,
-        logic: Dict
+        logic: Dict,
+        rows: Optional[np.ndarray] = None
     ) -> List[Violation]:
         """Check comparison-based rules"""
         violations = []
@@ -283,17 +619,20 @@ class ComplianceEngine:
         if field1 not in data.columns or field2 not in data.columns:
             return violations
         
-        # Apply comparison
-        if operator == ">":
-            mask = data[field1] > data[field2]
-        elif operator == "<":
-            mask = data[field1] < data[field2]
-        elif operator == "==":
-            mask = data[field1] == data[field2]
+        if rows is not None:
+            violating_records = data.iloc[rows]
         else:
-            return violations
-        
-        violating_records = data[mask]
+            # Apply comparison
+            if operator == ">":
+                mask = data[field1] > data[field2]
+            elif operator == "<":
+                mask = data[field1] < data[field2]
+            elif operator == "==":
+                mask = data[field1] == data[field2]
+            else:
+                return violations
+            
+            violating_records = data[mask]
         
         for _, record in violating_records.iterrows():
             violation = Violation(
@@ -313,6 +652,55 @@ class ComplianceEngine:
         
         return violations
     
+    def _check_aggregate(
+        self,
+        rule: Rule,
+        data: pd.DataFrame,
+        policy: Policy,
+        org_id: UUID,
+        logic: Dict,
+        rows: Optional[np.ndarray] = None,
+        state: Optional[AggregateThresholdRule] = None
+    ) -> List[Violation]:
+        """Check aggregate rules (e.g. same-day per-account totals >= $10,000)"""
+        violations = []
+        if state is None:
+            # Unchunked scan without a pre-pass: the frame holds all the data
+            state = AggregateThresholdRule.from_logic(logic)
+            if not set(state.columns) <= set(data.columns):
+                return violations
+            state.observe(data)
+        elif not set(state.columns) <= set(data.columns):
+            return violations
+        
+        if rows is None:
+            rows = np.flatnonzero(state.mask(data))
+        violating_records = data.iloc[rows]
+        totals = state.row_totals(violating_records)
+        field = state.value_column
+        group = state.group_column
+        
+        for (_, record), total in zip(violating_records.iterrows(), totals):
+            violation = Violation(
+                rule_id=rule.rule_id,
+                policy_id=policy.policy_id,
+                org_id=org_id,
+                department=policy.department,
+                severity=rule.severity,
+                record_id=str(record.get("transaction_id", "")),
+                field_name=field,
+                field_value=str(record[field]),
+                explanation=(
+                    f"{group} {record[group]} transactions in the same period total {total:,.2f}, "
+                    f"which is {state.operator} aggregate threshold {state.threshold:,.2f}"
+                ),
+                evidence=record.to_dict(),
+                status=ViolationStatus.PENDING
+            )
+            violations.append(violation)
+        
+        return violations
+    
     def _check_generic(
         self,
         rule: Rule,
@@ -324,6 +712,44 @@ class ComplianceEngine:
         # Simplified generic check - can be enhanced with NLP
         return []
     
+    def _active_rules(self, policies: List[Policy]) -> Dict[UUID, List[Rule]]:
+        """Active rules of the given policies (one query), keyed by policy id"""
+        rules = self.db.query(Rule).filter(
+            and_(
+                Rule.policy_id.in_([policy.policy_id for policy in policies]),
+                Rule.status == RuleStatus.ACTIVE
+            )
+        ).all()
+        by_policy: Dict[UUID, List[Rule]] = {}
+        for rule in rules:
+            by_policy.setdefault(rule.policy_id, []).append(rule)
+        return by_policy
+    
+    def _aggregate_states(self, policy_rules: Dict[UUID, List[Rule]]) -> Dict[str, StatefulRule]:
+        """Fresh state for every aggregate rule among `policy_rules`, keyed by rule id"""
+        return {
+            str(rule.rule_id): AggregateThresholdRule.from_logic(rule.structured_logic)
+            for rules in policy_rules.values()
+            for rule in rules
+            if (rule.structured_logic or {}).get("type") == "aggregate"
+        }
+    
+    @staticmethod
+    def _shard_column(states: Dict[str, StatefulRule]) -> Optional[str]:
+        """Column to shard parallel evaluation by: the one all aggregate rules group on, if any"""
+        group_columns = {state.group_column for state in states.values()}
+        if len(group_columns) > 1:
+            return None  # no single column keeps every group in one shard
+        return group_columns.pop() if group_columns else "account_id"
+    
+    @staticmethod
+    def _rule_predicate(rule: Rule, data: pd.DataFrame, states: Dict[str, StatefulRule]):
+        """Rule-matrix predicate: a condition AST, or the mask of a pre-filled aggregate state"""
+        state = states.get(str(rule.rule_id))
+        if state is not None:
+            return state.mask if set(state.columns) <= set(data.columns) else None
+        return logic_to_node(rule.structured_logic or {})
+    
     async def _fetch_data(
         self,
         org_id: UUID,
@@ -332,20 +758,182 @@ class ComplianceEngine:
     ) -> pd.DataFrame:
         """Fetch data from connector or default source"""
         if connector_id:
-            from app.models.db_models import Connector
-            connector = self.db.query(Connector).filter(
-                Connector.connector_id == connector_id,
-                Connector.org_id == org_id
-            ).first()
+            connector = self._load_connector(org_id, connector_id)
             
             if connector:
-                from app.connectors import create_connector
-                conn = create_connector(
-                    connector.connector_type.value,
-                    connector.connection_config,
-                    connector.field_mapping
-                )
-                return conn.fetch_data(limit=limit)
+                conn = self._connector(connector)
+                try:
+                    return await asyncio.to_thread(conn.fetch_data, limit=limit)
+                finally:
+                    conn.disconnect()
         
         # Default: load sample data
-        return pd.read_csv("data/datasets/ibm_aml/sample_transactions.csv", nrows=limit)
+        return await asyncio.to_thread(pd.read_csv, DEFAULT_DATA_FILE, nrows=limit)
+    
+    def _load_connector(self, org_id: UUID, connector_id: UUID):
+        """The organization's Connector row, or None"""
+        from app.models.db_models import Connector
+        return self.db.query(Connector).filter(
+            Connector.connector_id == connector_id,
+            Connector.org_id == org_id
+        ).first()
+    
+    @staticmethod
+    def _connector(connector) -> BaseConnector:
+        """Connector instance for a stored Connector row; its database connections are pooled"""
+        return create_connector(
+            connector.connector_type.value,
+            decrypt_config(connector.connection_config),
+            connector.field_mapping
+        )
+    
+    def _iter_data(
+        self,
+        org_id: UUID,
+        connector_id: Optional[UUID],
+        limit: Optional[int],
+        chunk_size: int,
+        plan: Optional[PushdownPlan] = None,
+        sync: Optional[SyncWindow] = None,
+        lower: bool = True
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Data in chunks of at most `chunk_size` rows, streamed from the
+        source with the projection and filter of `plan` pushed down. With a
+        `sync` window only its rows are yielded (`lower=False`: also those
+        before it), and the main pass (`lower`) records them in the window.
+        
+        The connector is resolved here, on the calling thread; the returned
+        iterator does not use the session, so it can be advanced on worker
+        threads.
+        """
+        if connector_id:
+            connector = self._load_connector(org_id, connector_id)
+            
+            if connector:
+                return self._connector_batches(
+                    self._connector(connector), chunk_size, limit, plan, sync, lower
+                )
+        
+        # Default: stream sample data from disk
+        return iter(pd.read_csv(DEFAULT_DATA_FILE, nrows=limit, chunksize=chunk_size))
+    
+    def _connector_batches(
+        self,
+        conn: BaseConnector,
+        chunk_size: int,
+        limit: Optional[int],
+        plan: Optional[PushdownPlan],
+        sync: Optional[SyncWindow],
+        lower: bool
+    ) -> Iterator[pd.DataFrame]:
+        try:
+            for batch in self._read_batches(conn, chunk_size, limit, plan):
+                if sync is not None:
+                    # Sources that cannot filter ship rows outside the window
+                    batch = batch[sync.mask(batch, lower)]
+                    if lower:
+                        sync.observe(batch)
+                if len(batch):
+                    yield batch
+        finally:
+            conn.disconnect()
+    
+    def _start_sync(self, connector, full_resync: bool = False) -> Optional[SyncWindow]:
+        """
+        The incremental sync window of a connector with a watermark column
+        (None without one): from its stored watermark to the column's
+        current maximum in the source.
+        """
+        conn = self._connector(connector)
+        source_column = conn.watermark_column
+        if not source_column:
+            return None
+        try:
+            high = conn.max_watermark(source_column)
+        finally:
+            conn.disconnect()
+        column = (connector.field_mapping or {}).get(source_column, source_column)
+        return SyncWindow.start(column, source_column, connector.sync_watermark, high, full_resync)
+    
+    @staticmethod
+    def _windowed(
+        plan: PushdownPlan,
+        sync: SyncWindow,
+        window: Optional[tuple],
+        keep_predicates: bool
+    ) -> PushdownPlan:
+        """`plan` reading the watermark column and restricted to `window`"""
+        columns = plan.columns
+        if columns is not None and sync.column not in columns:
+            columns = sorted(columns + [sync.column])
+        predicates = plan.predicates if keep_predicates else None
+        if window is not None:
+            predicates = [("and", (window, ("or", tuple(predicates))))] if predicates else [window]
+        return PushdownPlan(columns, predicates)
+    
+    def _finish_sync(self, connector, sync: Optional[SyncWindow], complete: bool) -> Dict[str, Any]:
+        """
+        Record a successful connector scan: `last_sync` and the new
+        watermark are committed together. A partial (limited) or failed
+        scan (`complete=False`) records neither.
+        """
+        if complete:
+            if sync is not None:
+                connector.sync_watermark = sync.next_state()
+            connector.last_sync = datetime.utcnow()
+            self.db.commit()
+        summary = sync.describe() if sync is not None else {}
+        summary["last_sync"] = connector.last_sync.isoformat() if connector.last_sync else None
+        return summary
+    
+    def _read_batches(
+        self,
+        conn: BaseConnector,
+        chunk_size: int,
+        limit: Optional[int],
+        plan: Optional[PushdownPlan]
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Batches of `conn` with `plan` pushed down. The projection keeps the
+        ID columns only where the source lists them. If the pushed-down query
+        fails before the first batch (e.g. a rule names a column the source
+        lacks), it is retried with the row filter but no projection, and
+        only then without pushdown; each fallback is a scan warning.
+        """
+        if plan is None or not conn.config.get("pushdown", True):
+            yield from conn.iter_batches(chunk_size, limit=limit)
+            return
+        
+        columns = plan.columns
+        if columns is not None and any(c in columns for c in ID_COLUMNS):
+            try:
+                available = conn.available_columns()
+            except Exception:
+                available = None
+            if available is not None:
+                columns = [c for c in columns if c not in ID_COLUMNS or c in available]
+        
+        attempts = [(columns, plan.predicates)]
+        if columns is not None and plan.predicates:
+            attempts.append((None, plan.predicates))
+        if columns is not None or plan.predicates:
+            attempts.append((None, None))
+        for attempt, (attempt_columns, predicates) in enumerate(attempts):
+            batches = conn.iter_batches(chunk_size, attempt_columns, limit, predicates)
+            try:
+                first = next(batches, None)
+                break
+            except Exception as e:
+                if attempt == len(attempts) - 1:
+                    raise
+                fallback = (
+                    "with the row filter and all columns" if attempts[attempt + 1][1]
+                    else "all columns and rows"
+                )
+                warning = f"Pushdown query failed, reading {fallback}: {e}"
+                print(warning)
+                self.scan_warnings.append(warning)
+        if first is not None:
+            yield first
+            yield from batches
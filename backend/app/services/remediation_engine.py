@@ -2,11 +2,13 @@
 Automated Remediation Engine
 Full lifecycle management from violation detection to resolution tracking
 """
+import asyncio
 from typing import Dict, Any, Optional, List
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
+from sqlalchemy import and_, or_, func, insert
 from datetime import datetime, timedelta
 from uuid import UUID
+import heapq
 import uuid
 
 from app.models.db_models import (
@@ -15,6 +17,66 @@ from app.models.db_models import (
 )
 from app.services.alert_service import alert_service
 
+# Roles a case of each priority is assigned to (least loaded user first)
+ASSIGNEE_ROLES = {
+    RemediationPriority.CRITICAL: [UserRole.SUPER_ADMIN, UserRole.COMPLIANCE_ADMIN],
+    RemediationPriority.HIGH: [UserRole.COMPLIANCE_ADMIN, UserRole.REVIEWER],
+    RemediationPriority.MEDIUM: [UserRole.REVIEWER],
+    RemediationPriority.LOW: [UserRole.REVIEWER, UserRole.VIEWER]
+}
+
+# Statuses that count towards a user's load
+ACTIVE_STATUSES = [
+    RemediationStatus.OPEN,
+    RemediationStatus.IN_PROGRESS,
+    RemediationStatus.ESCALATED
+]
+
+
+class AssigneeLoads:
+    """
+    Active-case counts of one organisation's users, with a min-heap of
+    (load, position, user) per candidate role set. Heap entries are refreshed
+    lazily: an entry whose load went stale is pushed back with the current one.
+    """
+    
+    def __init__(self, users: List[User], loads: Dict[UUID, int]):
+        self.users = users
+        self.loads = {user.user_id: loads.get(user.user_id, 0) for user in users}
+        self._heaps: Dict[tuple, list] = {}
+    
+    def _heap(self, roles: List[UserRole]) -> list:
+        key = tuple(roles)
+        heap = self._heaps.get(key)
+        if heap is None:
+            heap = [
+                (self.loads[user.user_id], position, user)
+                for position, user in enumerate(self.users)
+                if user.role in roles
+            ]
+            heapq.heapify(heap)
+            self._heaps[key] = heap
+        return heap
+    
+    def _take(self, roles: List[UserRole]) -> Optional[User]:
+        """The least loaded user with one of `roles`, charged with one more case"""
+        heap = self._heap(roles)
+        while heap:
+            load, position, user = heap[0]
+            current = self.loads[user.user_id]
+            if load != current:
+                heapq.heapreplace(heap, (current, position, user))
+                continue
+            self.loads[user.user_id] = current + 1
+            heapq.heapreplace(heap, (current + 1, position, user))
+            return user
+        return None
+    
+    def assign(self, priority: RemediationPriority) -> Optional[User]:
+        """Assignee for a new case, with the same fallback as `_auto_assign`"""
+        roles = ASSIGNEE_ROLES.get(priority, [UserRole.REVIEWER])
+        return self._take(roles) or self._take([UserRole.COMPLIANCE_ADMIN])
+
 
 class RemediationEngine:
     """Manages automated remediation workflow"""
@@ -69,9 +131,96 @@ class RemediationEngine:
         
         return case
     
-    def _generate_recommendation(self, rule: Rule, violation: Violation) -> str:
+    async def create_remediation_cases_bulk(self, violations: List[Violation]) -> List[Dict[str, Any]]:
+        """
+        Create the remediation cases of many violations at once.
+        Rules and assignee loads are read with one query each, cases are
+        assigned from in-memory heaps of active-case counts and inserted with
+        one executemany and one commit, and each assignee gets a single
+        notification covering all of their new cases.
+        Returns the inserted case rows, in violation order.
+        """
+        if not violations:
+            return []
+        
+        # The queries and the insert block: run them off the event loop
+        rows, assigned = await asyncio.to_thread(self._insert_cases, violations)
+        
+        # One notification per assignee
+        for assignee, assignee_violations in assigned.values():
+            await alert_service.send_email_digest(
+                self.db,
+                assignee_violations,
+                assignee.email,
+                subject=f"{len(assignee_violations)} new remediation case(s) assigned to you"
+            )
+        
+        return rows
+    
+    def _insert_cases(self, violations: List[Violation]) -> tuple:
+        """Insert the cases of `violations`; returns (case rows, violations per assignee)"""
+        rule_ids = {violation.rule_id for violation in violations}
+        rules = {
+            rule.rule_id: rule
+            for rule in self.db.query(Rule).filter(Rule.rule_id.in_(rule_ids)).all()
+        }
+        loads = self._assignee_loads({violation.org_id for violation in violations})
+        
+        rows = []
+        assigned: Dict[UUID, tuple] = {}
+        for violation in violations:
+            priority = self._severity_to_priority(violation.severity)
+            org_loads = loads.get(violation.org_id)
+            assignee = org_loads.assign(priority) if org_loads else None
+            rows.append({
+                "case_id": uuid.uuid4(),
+                "violation_id": violation.violation_id,
+                "rule_id": violation.rule_id,
+                "org_id": violation.org_id,
+                "assigned_to": assignee.user_id if assignee else None,
+                "status": RemediationStatus.OPEN,
+                "priority": priority,
+                "recommended_action": self._generate_recommendation(rules.get(violation.rule_id), violation),
+                "due_date": self._calculate_due_date(priority)
+            })
+            if assignee:
+                assigned.setdefault(assignee.user_id, (assignee, []))[1].append(violation)
+        
+        self.db.execute(insert(RemediationCase), rows)
+        self.db.commit()
+        return rows, assigned
+    
+    def _assignee_loads(self, org_ids) -> Dict[UUID, AssigneeLoads]:
+        """Active users of the organisations with their active-case counts (one GROUP BY)"""
+        users = self.db.query(User).filter(
+            and_(
+                User.org_id.in_(org_ids),
+                User.is_active == True
+            )
+        ).all()
+        if not users:
+            return {}
+        
+        counts = dict(
+            self.db.query(RemediationCase.assigned_to, func.count(RemediationCase.case_id))
+            .filter(
+                and_(
+                    RemediationCase.assigned_to.in_([user.user_id for user in users]),
+                    RemediationCase.status.in_(ACTIVE_STATUSES)
+                )
+            )
+            .group_by(RemediationCase.assigned_to)
+            .all()
+        )
+        
+        by_org: Dict[UUID, List[User]] = {}
+        for user in users:
+            by_org.setdefault(user.org_id, []).append(user)
+        return {org_id: AssigneeLoads(org_users, counts) for org_id, org_users in by_org.items()}
+    
+    def _generate_recommendation(self, rule: Optional[Rule], violation: Violation) -> str:
         """Generate recommended action based on rule type and violation"""
-        logic = rule.structured_logic or {}
+        logic = (rule.structured_logic if rule is not None else None) or {}
         rule_type = logic.get("type", "generic")
         
         recommendations = {
@@ -150,14 +299,7 @@ class RemediationEngine:
     
     def _auto_assign(self, org_id: UUID, priority: RemediationPriority) -> Optional[User]:
         """Auto-assign case based on priority and user role"""
-        role_mapping = {
-            RemediationPriority.CRITICAL: [UserRole.SUPER_ADMIN, UserRole.COMPLIANCE_ADMIN],
-            RemediationPriority.HIGH: [UserRole.COMPLIANCE_ADMIN, UserRole.REVIEWER],
-            RemediationPriority.MEDIUM: [UserRole.REVIEWER],
-            RemediationPriority.LOW: [UserRole.REVIEWER, UserRole.VIEWER]
-        }
-        
-        target_roles = role_mapping.get(priority, [UserRole.REVIEWER])
+        target_roles = ASSIGNEE_ROLES.get(priority, [UserRole.REVIEWER])
         
         # Find user with least active cases
         users = self.db.query(User).filter(
@@ -187,11 +329,7 @@ class RemediationEngine:
             active_cases = self.db.query(RemediationCase).filter(
                 and_(
                     RemediationCase.assigned_to == user.user_id,
-                    RemediationCase.status.in_([
-                        RemediationStatus.OPEN,
-                        RemediationStatus.IN_PROGRESS,
-                        RemediationStatus.ESCALATED
-                    ])
+                    RemediationCase.status.in_(ACTIVE_STATUSES)
                 )
             ).count()
             user_case_counts.append((user, active_cases))
@@ -27,8 +27,18 @@ celery_app.conf.update(
 
 
 @celery_app.task(name="scan_compliance")
-def scan_compliance_task(org_id: str, connector_id: str = None, limit: int = None):
-    """Background task for compliance scanning"""
+def scan_compliance_task(
+    org_id: str,
+    connector_id: str = None,
+    limit: int = None,
+    chunk_size: int = None,
+    full_resync: bool = False
+):
+    """
+    Background task for compliance scanning (chunked when chunk_size is set).
+    Connectors with a watermark column are synced incrementally unless
+    full_resync is set.
+    """
     from app.database import SessionLocal
     from app.services.compliance_engine import ComplianceEngine
     import asyncio
@@ -39,7 +49,9 @@ def scan_compliance_task(org_id: str, connector_id: str = None, limit: int = Non
         result = asyncio.run(engine.scan_all_policies(
             org_id=org_id,
             connector_id=connector_id,
-            limit=limit
+            limit=limit,
+            chunk_size=chunk_size,
+            full_resync=full_resync
         ))
         return result
     finally:
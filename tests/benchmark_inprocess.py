@@ -0,0 +1,381 @@
+"""
+In-Process Scan Engine Benchmark
+Measures the scan engines directly, without the API server, a database or
+Redis: `violation_engine.run_scan` end to end, every approved rule of the
+file engine on its own, and the `ComplianceEngine` checkers and
+`_execute_rule` per rule type. Datasets are synthetic IBM AML transactions
+generated at each requested size.
+
+Every measurement reports seconds, rows/s, violations/s and the peak RSS
+sampled while it ran (with its growth over the RSS at its start). Results are
+written as JSON so runs of different releases can be compared.
+
+`_execute_rule` runs against an in-memory session that only counts what would
+be written, and alert messages are counted instead of sent, so its numbers
+are the engine's own work (risk scoring, remediation cases, alert
+coalescing) without database or delivery latency. The ComplianceEngine section is skipped, with
+the reason recorded, when its DB models cannot be imported.
+
+Run with:
+    cd backend && python ../tests/benchmark_inprocess.py --sizes 10000,1000000,10000000 --output results.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from functools import lru_cache
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List
+
+# Ensure backend is importable
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import pandas as pd
+import psutil
+
+from benchmark_parallel_scan import synthetic_transactions
+
+DEFAULT_SIZES = [10_000, 1_000_000, 10_000_000]
+
+# Rows generated (and written to CSV) at a time, so large datasets do not need two full copies
+_GENERATE_CHUNK = 1_000_000
+
+
+# ── Measurement ──────────────────────────────────────────────────────────────
+
+class RssSampler:
+    """Samples this process's RSS on a background thread and keeps the peak (MB)."""
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self._process = psutil.Process()
+        self._stop = threading.Event()
+        self.start_mb = self.peak_mb = self._rss_mb()
+
+    def _rss_mb(self) -> float:
+        return self._process.memory_info().rss / (1024 * 1024)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.peak_mb = max(self.peak_mb, self._rss_mb())
+
+    def __enter__(self) -> "RssSampler":
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak_mb = max(self.peak_mb, self._rss_mb())
+
+
+def measure(fn: Callable, rows: int, count: Callable = len) -> dict:
+    """Run `fn` once; timing, throughput and memory, plus `count` of its result as violations."""
+    with RssSampler() as rss:
+        started = time.perf_counter()
+        result = fn()
+        seconds = time.perf_counter() - started
+    violations = count(result)
+    return {
+        "seconds": round(seconds, 4),
+        "rows_per_second": round(rows / seconds) if seconds > 0 else None,
+        "violations": violations,
+        "violations_per_second": round(violations / seconds) if seconds > 0 else None,
+        "peak_rss_mb": round(rss.peak_mb, 1),
+        "rss_growth_mb": round(rss.peak_mb - rss.start_mb, 1),
+    }
+
+
+def write_dataset(rows: int, path: Path) -> pd.DataFrame:
+    """Generate `rows` synthetic transactions, write them to `path` as CSV and return them."""
+    chunks = []
+    for i, start in enumerate(range(0, rows, _GENERATE_CHUNK)):
+        chunk = synthetic_transactions(min(_GENERATE_CHUNK, rows - start), seed=42 + i)
+        chunk.to_csv(path, mode="w" if i == 0 else "a", header=i == 0, index=False)
+        chunks.append(chunk)
+    return pd.concat(chunks, ignore_index=True) if len(chunks) > 1 else chunks[0]
+
+
+@contextmanager
+def engine_paths(engine, data_file: Path, storage: Path):
+    """Point the file engine at `data_file`, with its storage in `storage`."""
+    names = ("DATA_FILE", "VIOLATIONS_FILE", "SCAN_STATE_FILE")
+    saved = {name: getattr(engine, name) for name in names}
+    engine.DATA_FILE = data_file
+    engine.VIOLATIONS_FILE = storage / "violations.json"
+    engine.SCAN_STATE_FILE = storage / "scan_state.json"
+    try:
+        yield engine
+    finally:
+        for name, value in saved.items():
+            setattr(engine, name, value)
+
+
+# ── File engine (violation_engine) ───────────────────────────────────────────
+
+def _rule_kind(rule) -> str:
+    from app.core import violation_engine as engine
+    state = engine._new_state(rule.id, rule.condition)
+    return type(state).__name__ if state is not None else "condition"
+
+
+def bench_violation_engine(df: pd.DataFrame, data_file: Path, storage: Path) -> dict:
+    from app.core import violation_engine as engine
+    from app.core.rule_engine import get_rules
+    from app.core.txn_ids import SeenKeys
+
+    rows = len(df)
+    now = datetime.now(timezone.utc).isoformat()
+    per_rule = []
+    for rule in get_rules(approved_only=True):
+        flagged = {}
+
+        def evaluate():
+            flagged["rows"], _ = engine._apply_rule(rule.id, df, rule.condition)
+            return flagged["rows"]
+
+        evaluation = measure(evaluate, rows)
+        materialization = measure(
+            lambda: engine._materialize_violations(rule, flagged["rows"], now, SeenKeys()), rows
+        )
+        seconds = evaluation["seconds"] + materialization["seconds"]
+        per_rule.append({
+            "rule_id": rule.id,
+            "category": rule.category,
+            "kind": _rule_kind(rule),
+            "hits": evaluation["violations"],
+            "evaluate": evaluation,
+            "materialize": materialization,
+            "rows_per_second": round(rows / seconds) if seconds > 0 else None,
+            "violations_per_second": round(materialization["violations"] / seconds) if seconds > 0 else None,
+        })
+        print(f"    {rule.id:<10} {per_rule[-1]['kind']:<22} {seconds:8.3f}s  "
+              f"{materialization['violations']:>9,} violations")
+
+    with engine_paths(engine, data_file, storage):
+        # The first scan also builds the columnar dataset cache; the second reads through it
+        cold = measure(engine.run_scan, rows)
+        warm = measure(engine.run_scan, rows)
+    print(f"    run_scan   cold {cold['seconds']:.3f}s  warm {warm['seconds']:.3f}s  "
+          f"{warm['violations']:,} violations")
+    return {"run_scan": {"cold": cold, "warm": warm}, "rules": per_rule}
+
+
+# ── Compliance engine (services) ─────────────────────────────────────────────
+
+class _NullQuery:
+    def __init__(self, first=None):
+        self._first = first
+
+    def filter(self, *args, **kwargs):
+        return self
+
+    filter_by = order_by = join = limit = filter
+
+    def first(self):
+        return self._first
+
+    def all(self):
+        return [self._first] if self._first is not None else []
+
+    def count(self):
+        return len(self.all())
+
+
+class NullSession:
+    """Stands in for a SQLAlchemy session: counts writes, answers Rule lookups with `rule`."""
+
+    def __init__(self, rule=None):
+        self.rule = rule
+        self.added = 0
+        self.commits = 0
+
+    def query(self, model):
+        from app.models.db_models import Rule
+        return _NullQuery(self.rule if model is Rule else None)
+
+    def add(self, obj):
+        self.added += 1
+
+    def execute(self, statement, params=None):
+        self.added += len(params) if isinstance(params, list) else 1
+
+    def flush(self):
+        pass
+
+    def commit(self):
+        self.commits += 1
+
+    def refresh(self, obj):
+        pass
+
+
+class NullAlerts:
+    """Counts alert messages instead of delivering them (no SendGrid, Slack or Redis)."""
+
+    slack_webhook = None
+
+    def __init__(self):
+        self.sent = 0
+
+    async def send_alert(self, db, violation, channels, recipients):
+        self.sent += 1
+
+    async def send_email_digest(self, db, violations, recipient, subject=None):
+        self.sent += 1
+
+    async def send_slack_digest(self, db, violations):
+        self.sent += 1
+
+    async def send_websocket_batch(self, violations):
+        self.sent += 1
+
+
+# Structured logic of one rule per checker, over the IBM AML columns
+COMPLIANCE_RULES = {
+    "threshold": {"type": "threshold", "field": "Amount Paid", "operator": ">", "threshold": 10_000},
+    "pattern": {"type": "pattern", "field": "Payment Format", "pattern": "Cash"},
+    "comparison": {
+        "type": "comparison", "field1": "Payment Currency", "field2": "Receiving Currency", "operator": "==",
+    },
+    "aggregate": {
+        "type": "aggregate", "field": "Amount Paid", "group_by": "Account", "period": "1d",
+        "operator": ">=", "threshold": 10_000, "min_count": 2, "timestamp_field": "Timestamp",
+    },
+}
+
+
+@lru_cache(maxsize=None)
+def _compliance_modules():
+    """(db_models, compliance_engine) modules, or the import error as a string."""
+    try:
+        from app.models import db_models
+        from app.services import compliance_engine
+    except Exception as e:  # the services need the DB models (and their drivers) importable
+        return f"{type(e).__name__}: {e}"
+    return db_models, compliance_engine
+
+
+def bench_compliance_engine(df: pd.DataFrame) -> dict:
+    modules = _compliance_modules()
+    if isinstance(modules, str):
+        print(f"    skipped: {modules}")
+        return {"skipped": modules}
+    db_models, module = modules
+    Policy, Rule, ComplianceEngine = db_models.Policy, db_models.Rule, module.ComplianceEngine
+
+    rows = len(df)
+    org_id = uuid.uuid4()
+    policy = Policy(policy_id=org_id, org_id=org_id, policy_name="Benchmark", version="1", department="AML")
+    alerts = NullAlerts()
+    saved_alerts, module.alert_service = module.alert_service, alerts
+
+    checkers = {
+        "threshold": "_check_threshold",
+        "pattern": "_check_pattern",
+        "comparison": "_check_comparison",
+        "aggregate": "_check_aggregate",
+    }
+    results = []
+    try:
+        for rule_type, logic in COMPLIANCE_RULES.items():
+            rule = Rule(
+                rule_id=uuid.uuid4(), policy_id=policy.policy_id,
+                rule_text=rule_type, severity="high", structured_logic=logic,
+            )
+            session = NullSession(rule)
+            engine = ComplianceEngine(session)
+            checker = getattr(engine, checkers[rule_type])
+            check = measure(lambda: checker(rule, df, policy, org_id, logic), rows)
+            alerts.sent = 0
+
+            async def execute_rule():
+                violations = await engine._execute_rule(rule, df, policy, org_id)
+                await engine.alerts.flush()
+                return violations
+
+            execute = measure(lambda: asyncio.run(execute_rule()), rows)
+            results.append({
+                "rule_type": rule_type,
+                "check": check,
+                "execute_rule": execute,
+                "session_writes": session.added,
+                "session_commits": session.commits,
+                "alerts": alerts.sent,
+                "persistence": engine.persistence_stats(),
+            })
+            print(f"    {rule_type:<10} check {check['seconds']:8.3f}s  "
+                  f"_execute_rule {execute['seconds']:8.3f}s  {execute['violations']:>9,} violations")
+    finally:
+        module.alert_service = saved_alerts
+    return {"rules": results}
+
+
+# ── Driver ───────────────────────────────────────────────────────────────────
+
+def run_benchmark(sizes: List[int], workdir: Path, compliance: bool = True) -> dict:
+    results: Dict[str, object] = {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "cpu_count": os.cpu_count(),
+        "datasets": [],
+    }
+    for rows in sizes:
+        print(f"\n{rows:,} rows")
+        data_file = workdir / f"transactions_{rows}.csv"
+        started = time.perf_counter()
+        df = write_dataset(rows, data_file)
+        print(f"  generated in {time.perf_counter() - started:.1f}s")
+
+        print("  violation_engine:")
+        storage = workdir / f"storage_{rows}"
+        storage.mkdir(exist_ok=True)
+        dataset = {"rows": rows, "csv_mb": round(data_file.stat().st_size / (1024 * 1024), 1)}
+        dataset["violation_engine"] = bench_violation_engine(df, data_file, storage)
+        if compliance:
+            print("  compliance_engine:")
+            dataset["compliance_engine"] = bench_compliance_engine(df)
+        results["datasets"].append(dataset)
+        del df
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the scan engines in-process")
+    parser.add_argument(
+        "--sizes", type=str, default=",".join(str(s) for s in DEFAULT_SIZES),
+        help="Comma-separated dataset sizes in rows",
+    )
+    parser.add_argument("--workdir", type=str, default=None, help="Where to write datasets (default: a temp dir)")
+    parser.add_argument("--skip-compliance", action="store_true", help="Only benchmark the file engine")
+    parser.add_argument("--output", type=str, default=None, help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    if args.workdir:
+        workdir = Path(args.workdir)
+        workdir.mkdir(parents=True, exist_ok=True)
+        results = run_benchmark(sizes, workdir, not args.skip_compliance)
+    else:
+        with tempfile.TemporaryDirectory(prefix="nitilens-bench-") as tmp:
+            results = run_benchmark(sizes, Path(tmp), not args.skip_compliance)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\n✓ Results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
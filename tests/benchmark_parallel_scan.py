@@ -0,0 +1,105 @@
+"""
+Parallel Rule Evaluation Benchmark
+Measures rule-matrix evaluation time over synthetic IBM AML transactions with
+1 to N worker processes and reports the speedup over a single process.
+
+Run with:
+    cd backend && python ../tests/benchmark_parallel_scan.py --rows 2000000 --max-workers 8
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+# Ensure backend is importable
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+import numpy as np
+import pandas as pd
+
+
+def synthetic_transactions(rows: int, accounts: int = 50_000, seed: int = 42) -> pd.DataFrame:
+    """IBM AML-shaped transactions with random accounts, amounts and timestamps over 30 days."""
+    rng = np.random.default_rng(seed)
+    currencies = np.array(["US Dollar", "Euro", "UK Pound", "Yuan", "Rupee", "Yen"])
+    formats = np.array(["Cheque", "Wire", "ACH", "Credit Card", "Cash", "Reinvestment"])
+    seconds = np.sort(rng.integers(0, 30 * 86400, size=rows))
+    timestamps = pd.to_datetime("2023-01-01") + pd.to_timedelta(seconds, unit="s")
+    amount = np.round(rng.lognormal(7, 1.6, size=rows), 2)
+    return pd.DataFrame({
+        "Timestamp": timestamps.strftime("%Y/%m/%d %H:%M"),
+        "From Bank": rng.integers(1, 500, size=rows),
+        "Account": np.char.add("ACC", rng.integers(0, accounts, size=rows).astype(str)),
+        "To Bank": rng.integers(1, 500, size=rows),
+        "Account.1": np.char.add("ACC", rng.integers(0, accounts, size=rows).astype(str)),
+        "Amount Received": amount,
+        "Receiving Currency": rng.choice(currencies, size=rows, p=[0.6, 0.15, 0.1, 0.05, 0.05, 0.05]),
+        "Amount Paid": amount,
+        "Payment Currency": rng.choice(currencies, size=rows, p=[0.6, 0.15, 0.1, 0.05, 0.05, 0.05]),
+        "Payment Format": rng.choice(formats, size=rows),
+        "Is Laundering": (rng.random(rows) < 0.001).astype(np.int64),
+    })
+
+
+def _rule_set():
+    """Fresh predicates for every approved rule (stateful predicates must not be reused)."""
+    from app.core.rule_engine import get_rules
+    from app.core.violation_engine import _rule_predicate
+    rules = get_rules(approved_only=True)
+    return [r.id for r in rules], [_rule_predicate(r) for r in rules]
+
+
+def run_benchmark(rows: int, worker_counts, repeat: int = 3) -> dict:
+    from app.core.parallel_scan import evaluate_rule_matrix_parallel, worker_pool
+
+    df = synthetic_transactions(rows)
+    results = []
+    baseline = None
+    for workers in worker_counts:
+        if workers > 1:
+            worker_pool(workers)  # start the pool outside the timed runs
+        timings = []
+        for _ in range(repeat):
+            rule_ids, predicates = _rule_set()
+            started = time.perf_counter()
+            matrix = evaluate_rule_matrix_parallel(rule_ids, predicates, df, workers=workers)
+            timings.append(time.perf_counter() - started)
+        best = min(timings)
+        baseline = baseline or best
+        results.append({
+            "workers": workers,
+            "seconds": round(best, 3),
+            "rows_per_second": round(rows / best),
+            "speedup": round(baseline / best, 2),
+            "hits": int(sum(matrix.counts().values())),
+        })
+        print(f"  {workers:>3} workers  {best:8.3f}s  {rows / best:>12,.0f} rows/s  x{baseline / best:.2f}")
+    return {"rows": rows, "cpu_count": os.cpu_count(), "results": results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark parallel rule evaluation")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Synthetic transactions to generate")
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1, help="Largest worker count")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per worker count (best is reported)")
+    parser.add_argument("--output", type=str, default=None, help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    worker_counts = [1]
+    while worker_counts[-1] * 2 <= args.max_workers:
+        worker_counts.append(worker_counts[-1] * 2)
+    if worker_counts[-1] != args.max_workers:
+        worker_counts.append(args.max_workers)
+
+    print(f"Rule evaluation over {args.rows:,} rows ({os.cpu_count()} CPUs):")
+    results = run_benchmark(args.rows, worker_counts, args.repeat)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\n✓ Results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -117,6 +117,7 @@ class ScanBenchmark:
             violations_detected = scan_result.get("violations_detected", 0)
             
             throughput = transactions_scanned / total_time if total_time > 0 else 0
+            violation_throughput = violations_detected / total_time if total_time > 0 else 0
             
             memory_delta = final_memory["rss_mb"] - initial_memory["rss_mb"]
             
@@ -128,6 +129,7 @@ class ScanBenchmark:
                 "performance": {
                     "total_time_seconds": round(total_time, 2),
                     "throughput_per_second": round(throughput, 2),
+                    "violations_per_second": round(violation_throughput, 2),
                     "time_per_transaction_ms": round((total_time / transactions_scanned) * 1000, 3) if transactions_scanned > 0 else 0
                 },
                 "memory": {
@@ -174,6 +176,7 @@ class ScanBenchmark:
         print(f"\nPerformance:")
         print(f"  Total Time: {perf['total_time_seconds']} seconds")
         print(f"  Throughput: {perf['throughput_per_second']:,.0f} transactions/second")
+        print(f"  Violation Throughput: {perf['violations_per_second']:,.0f} violations/second")
         print(f"  Time per Transaction: {perf['time_per_transaction_ms']} ms")
         
         mem = self.results['memory']
@@ -0,0 +1,129 @@
+"""
+Local stub REST API for REST connector tests and benchmarks.
+
+Serves `total` synthetic records over HTTP/1.1 keep-alive on 127.0.0.1, in
+every pagination style the connector follows:
+
+    /data    limit/offset (or size/offset) paging, {"data": [...]}
+    /cursor  cursor paging, {"data": [...], "meta": {"next_cursor": ...}}
+    /link    page/per_page paging with a Link rel="next" header
+    /stream  every record in one response (?format=ndjson for NDJSON)
+    /health  {"status": "ok"}
+
+`max_page` caps the records of one /data page, whatever the client asks for.
+`latency` delays every response; the first `fail_first` requests get a
+503 with Retry-After: 0. Requests (path and query), client connections and
+the most requests served at once are recorded.
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+
+class StubAPI:
+    def __init__(
+        self,
+        total: int = 100,
+        latency: float = 0.0,
+        fail_first: int = 0,
+        ignore_paging: bool = False,
+        max_page: int = 0
+    ):
+        self.total = total
+        self.latency = latency
+        self.fail_first = fail_first
+        self.ignore_paging = ignore_paging
+        self.max_page = max_page
+        self.requests = []
+        self.connections = set()
+        self.max_in_flight = 0
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self._server = None
+
+    def record(self, i: int) -> dict:
+        return {"id": i, "account": f"acct-{i % 97}", "amount": i * 1.5}
+
+    def records(self, start: int, stop: int) -> list:
+        return [self.record(i) for i in range(max(start, 0), min(stop, self.total))]
+
+    def __enter__(self) -> "StubAPI":
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), _handler(self))
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        self.base_url = f"http://127.0.0.1:{self._server.server_address[1]}"
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def respond(self, path: str, params: dict):
+        """(status, headers, body) for a request"""
+        with self._lock:
+            self.requests.append((path, params))
+            failing = len(self.requests) <= self.fail_first
+        if self.latency:
+            time.sleep(self.latency)
+        if failing:
+            return 503, {"Retry-After": "0"}, b"unavailable"
+        if path == "/health":
+            return 200, {}, b'{"status": "ok"}'
+        if path == "/stream":
+            if params.get("format") == "ndjson":
+                body = "".join(json.dumps(r) + "\n" for r in self.records(0, self.total))
+                return 200, {"Content-Type": "application/x-ndjson"}, body.encode()
+            return 200, {}, json.dumps(self.records(0, self.total)).encode()
+        if path == "/data":
+            offset = int(params.get("offset", 0))
+            size = int(params.get("limit") or params.get("size") or self.total)
+            if self.ignore_paging:
+                offset, size = 0, self.total
+            if self.max_page:
+                size = min(size, self.max_page)
+            return 200, {}, json.dumps({"data": self.records(offset, offset + size)}).encode()
+        if path == "/cursor":
+            offset = int(params.get("cursor", "c0")[1:])
+            size = int(params.get("limit", 10))
+            stop = offset + size
+            meta = {"next_cursor": f"c{stop}" if stop < self.total else None}
+            return 200, {}, json.dumps({"data": self.records(offset, stop), "meta": meta}).encode()
+        if path == "/link":
+            page = int(params.get("page", 1))
+            size = int(params.get("per_page", params.get("limit", 10)))
+            headers = {}
+            if page * size < self.total:
+                headers["Link"] = f'</link?page={page + 1}&per_page={size}>; rel="next"'
+            return 200, headers, json.dumps(self.records((page - 1) * size, page * size)).encode()
+        return 404, {}, b"not found"
+
+
+def _handler(api: StubAPI):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            with api._lock:
+                api.connections.add(self.client_address)
+                api._in_flight += 1
+                api.max_in_flight = max(api.max_in_flight, api._in_flight)
+            url = urlsplit(self.path)
+            try:
+                status, headers, body = api.respond(url.path, dict(parse_qsl(url.query)))
+            finally:
+                with api._lock:
+                    api._in_flight -= 1
+            self.send_response(status)
+            headers.setdefault("Content-Type", "application/json")
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
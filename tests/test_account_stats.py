@@ -0,0 +1,108 @@
+"""
+Tests for the per-account statistics store.
+Validates the running Welford moments against a direct computation over every period.
+
+Run with:
+    cd backend && python -m pytest ../tests/test_account_stats.py -v
+"""
+import sys
+from pathlib import Path
+
+# Ensure backend is importable
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+import numpy as np
+import pandas as pd
+import pytest
+
+PERIOD = 86400
+
+
+def _events(n=2000, seed=11):
+    rng = np.random.default_rng(seed)
+    accounts = pd.Series(rng.choice([f"ACC{i}" for i in range(25)], size=n))
+    times = np.sort(rng.integers(0, 40 * PERIOD, size=n))
+    return accounts, times
+
+
+def _expected(accounts, times):
+    """Per account: closed periods (idle ones count as 0), their mean and std, open period and count."""
+    periods = pd.Series(times // PERIOD)
+    rows = {}
+    for account, group in periods.groupby(accounts):
+        counts = group.value_counts()
+        first, last = group.min(), group.max()
+        history = [counts.get(p, 0) for p in range(first, last)]
+        rows[account] = {
+            "periods": len(history),
+            "mean": float(np.mean(history)) if history else 0.0,
+            "std": float(np.std(history, ddof=1)) if len(history) > 1 else 0.0,
+            "current_period": last,
+            "current_count": counts[last],
+            "last_seen": times[group.index].max(),
+        }
+    return pd.DataFrame.from_dict(rows, orient="index")
+
+
+class TestAccountStats:
+    @pytest.mark.parametrize("batch", [2000, 333, 1])
+    def test_batches_match_direct_computation(self, batch):
+        from app.core.account_stats import AccountStats
+
+        accounts, times = _events(n=2000 if batch > 1 else 300)
+        stats = AccountStats(PERIOD)
+        for i in range(0, len(times), batch):
+            codes = stats.encode(accounts.iloc[i:i + batch])
+            stats.update(codes, times[i:i + batch])
+
+        frame = stats.frame().sort_index()
+        expected = _expected(accounts, times).sort_index()
+        assert frame.index.tolist() == expected.index.tolist()
+        for column in ["periods", "current_period", "current_count", "last_seen"]:
+            assert frame[column].tolist() == expected[column].tolist()
+        assert np.allclose(frame["mean"], expected["mean"])
+        assert np.allclose(frame["std"], expected["std"])
+
+    def test_encoding_is_stable(self):
+        from app.core.account_stats import AccountStats
+
+        stats = AccountStats(PERIOD)
+        assert stats.encode(pd.Series(["B", "A", "B"])).tolist() == [0, 1, 0]
+        assert stats.encode(pd.Series(["A", "C"])).tolist() == [1, 2]
+        assert stats.encode(pd.Series(["D", "C"]), add=False).tolist() == [-1, 2]
+        assert len(stats) == 3
+
+    def test_closed_periods_are_scored_against_prior_history(self):
+        from app.core.account_stats import AccountStats
+
+        stats = AccountStats(PERIOD)
+        codes = stats.encode(pd.Series(["A"] * 7))
+        # Day 0: 2, day 1: idle, day 2: 4, day 3: 1 (still open)
+        times = np.array([0, 10, 2 * PERIOD, 2 * PERIOD + 1, 2 * PERIOD + 2, 2 * PERIOD + 3, 3 * PERIOD])
+        closed = stats.update(codes, times)
+        assert closed[["period", "count", "history"]].values.tolist() == [[0, 2, 0], [2, 4, 2]]
+        assert closed["mean"].tolist() == [0.0, 1.0]
+        assert (stats.periods[0], stats.mean[0], stats.current_count[0]) == (3, 2.0, 1)
+
+    def test_late_events_are_ignored(self):
+        from app.core.account_stats import AccountStats
+
+        stats = AccountStats(PERIOD)
+        stats.update(stats.encode(pd.Series(["A", "A"])), np.array([0, 5 * PERIOD]))
+        before = stats.frame()
+        stats.update(stats.encode(pd.Series(["A"])), np.array([2 * PERIOD]))
+        pd.testing.assert_frame_equal(stats.frame(), before)
+
+    def test_state_round_trip(self):
+        import json
+        from app.core.account_stats import AccountStats
+
+        accounts, times = _events()
+        stats = AccountStats(PERIOD)
+        stats.update(stats.encode(accounts), times)
+        restored = AccountStats.from_state(json.loads(json.dumps(stats.to_state())))
+        pd.testing.assert_frame_equal(restored.frame(), stats.frame())
+
+        more = pd.Series(["ACC1", "NEW"])
+        restored.update(restored.encode(more), np.array([50 * PERIOD, 50 * PERIOD]))
+        assert restored.frame().loc["NEW", "current_count"] == 1
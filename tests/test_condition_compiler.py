@@ -0,0 +1,138 @@
+"""
+Tests for the rule condition compiler.
+Validates parsing of the extractor's condition grammar and vectorized evaluation.
+
+Run with:
+    cd backend && python -m pytest ../tests/test_condition_compiler.py -v
+"""
+import sys
+from pathlib import Path
+
+# Ensure backend is importable
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+import numpy as np
+import pandas as pd
+import pytest
+
+SAMPLE_CSV = Path(__file__).resolve().parent.parent / "data" / "datasets" / "ibm_aml" / "sample_transactions.csv"
+
+
+@pytest.fixture
+def transactions():
+    return pd.read_csv(SAMPLE_CSV)
+
+
+class TestParsing:
+    def test_multi_word_columns(self):
+        from app.core.condition_compiler import parse_condition
+        assert parse_condition("Amount Paid > 10000") == ("cmp", ">", ("col", "Amount Paid"), ("lit", 10000))
+
+    def test_modulo_and_conjunction(self):
+        from app.core.condition_compiler import parse_condition
+        node = parse_condition("Amount Paid % 1000 == 0 AND Amount Paid > 5000")
+        assert node[0] == "and"
+        assert node[1][0] == ("cmp", "==", ("mod", ("col", "Amount Paid"), 1000), ("lit", 0))
+
+    def test_in_list(self):
+        from app.core.condition_compiler import parse_condition
+        node = parse_condition("Payment Format IN ['Cheque', 'Wire']")
+        assert node == ("in", ("col", "Payment Format"), ("Cheque", "Wire"))
+
+    def test_column_to_column(self):
+        from app.core.condition_compiler import parse_condition
+        node = parse_condition("Payment Currency != Receiving Currency")
+        assert node == ("cmp", "!=", ("col", "Payment Currency"), ("col", "Receiving Currency"))
+
+    @pytest.mark.parametrize("condition", ["count(To Account, 24h) > 5", "", "Amount Paid >", "Amount Paid IN 5"])
+    def test_unsupported_raises(self, condition):
+        from app.core.condition_compiler import parse_condition
+        with pytest.raises(ValueError):
+            parse_condition(condition)
+
+
+class TestEvaluation:
+    def test_matches_handwritten_masks(self, transactions):
+        """Compiled conditions flag exactly the rows the equivalent pandas expressions flag."""
+        from app.core.condition_compiler import compile_condition
+
+        df = transactions
+        expected = {
+            "Amount Paid > 10000": df["Amount Paid"] > 10_000,
+            "Amount Paid % 1000 == 0 AND Amount Paid > 5000": (df["Amount Paid"] % 1000 == 0) & (df["Amount Paid"] > 5_000),
+            "Payment Currency != Receiving Currency": df["Payment Currency"] != df["Receiving Currency"],
+            "Is Laundering == 1": df["Is Laundering"] == 1,
+            "Amount Paid > 50000 AND Payment Format IN ['Cheque', 'Wire']": (
+                (df["Amount Paid"] > 50_000) & df["Payment Format"].str.lower().isin(["cheque", "wire"])
+            ),
+        }
+        for condition, mask in expected.items():
+            compiled = compile_condition(condition)(df)
+            assert isinstance(compiled, np.ndarray) and compiled.dtype == bool
+            assert (compiled == mask.to_numpy()).all(), condition
+
+    def test_string_membership_is_case_insensitive(self):
+        from app.core.condition_compiler import compile_condition
+        df = pd.DataFrame({"Payment Format": ["WIRE", "wire", "ACH", None]})
+        mask = compile_condition("Payment Format IN ['Wire']")(df)
+        assert mask.tolist() == [True, True, False, False]
+
+    def test_missing_column_raises(self, transactions):
+        from app.core.condition_compiler import compile_condition
+        with pytest.raises(ValueError, match="Column not found"):
+            compile_condition("days_since_erasure_request <= 30")(transactions)
+
+    def test_or(self, transactions):
+        from app.core.condition_compiler import compile_condition
+        mask = compile_condition("Is Laundering == 1 OR Amount Paid > 1000000")(transactions)
+        assert mask.sum() == (transactions["Is Laundering"] == 1).sum()
+
+    def test_shared_cache_reuses_leaves(self, transactions):
+        from app.core.condition_compiler import evaluate_node, parse_condition
+        cache: dict = {}
+        evaluate_node(parse_condition("Amount Paid > 10000"), transactions, cache)
+        leaf = parse_condition("Amount Paid > 10000")
+        first = cache[leaf]
+        evaluate_node(parse_condition("Amount Paid > 10000 AND Is Laundering == 1"), transactions, cache)
+        assert cache[leaf] is first
+
+    def test_cache_keyed_by_normalized_condition(self):
+        from app.core.condition_compiler import compile_condition
+        assert compile_condition("Amount Paid > 10000") is compile_condition("Amount Paid  >  10000")
+
+
+class TestStructuredLogic:
+    def test_threshold(self):
+        from app.core.condition_compiler import logic_to_node
+        node = logic_to_node({"type": "threshold", "field": "amount", "operator": ">=", "threshold": 5})
+        assert node == ("cmp", ">=", ("col", "amount"), ("lit", 5))
+
+    def test_pattern(self):
+        from app.core.condition_compiler import evaluate_node, logic_to_node
+        df = pd.DataFrame({"country": ["Iran", "usa", "IRAN-X"]})
+        node = logic_to_node({"type": "pattern", "field": "country", "pattern": "iran"})
+        assert evaluate_node(node, df).tolist() == [True, False, True]
+
+    def test_generic_has_no_predicate(self):
+        from app.core.condition_compiler import logic_to_node
+        assert logic_to_node({}) is None
+        assert logic_to_node({"type": "threshold", "operator": "~"}) is None
+
+
+class TestExtractedRules:
+    def test_extracted_rule_is_evaluated(self, transactions):
+        """Rules from the extractor no longer fall through to the 'Unknown rule' branch."""
+        from app.core.rule_extractor import extract_rules_from_text
+        from app.core.violation_engine import _apply_rule
+
+        rules = extract_rules_from_text("Transactions over $10,000 require a CTR.", "pol-test", "test.pdf")
+        ctr = next(r for r in rules if r.id.startswith("ext-aml-ctr"))
+        flagged, description = _apply_rule(ctr.id, transactions, ctr.condition)
+        assert description == ctr.condition
+        assert len(flagged) == int((transactions["Amount Paid"] > 10_000).sum())
+
+    def test_unsupported_condition_returns_empty(self, transactions):
+        from app.core.violation_engine import _apply_rule
+        flagged, message = _apply_rule("ext-aml-x", transactions, "sum(Amount Paid, 1d) > 5")
+        assert flagged.empty
+        assert "Unsupported" in message
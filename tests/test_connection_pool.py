@@ -0,0 +1,282 @@
+"""
+Tests for pooled connector connections.
+Validates reuse, bounded checkouts, idle eviction, health checks, the
+config-keyed registry and connector connect/disconnect through the pool.
+
+Run with:
+    cd backend && python -m pytest ../tests/test_connection_pool.py -v
+"""
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Ensure backend is importable
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+import pytest
+
+
+class FakeConnection:
+    def __init__(self, number):
+        self.number = number
+        self.closed = False
+        self.healthy = True
+        self.resets = 0
+
+    def close(self):
+        self.closed = True
+
+
+class Opener:
+    def __init__(self):
+        self.opened = []
+
+    def __call__(self):
+        connection = FakeConnection(len(self.opened))
+        self.opened.append(connection)
+        return connection
+
+
+def _ping(connection):
+    if not connection.healthy:
+        raise ConnectionError("gone")
+
+
+def _pool(**kwargs):
+    from app.connectors.pool import ConnectionPool
+    opener = Opener()
+    kwargs.setdefault("max_size", 2)
+    return ConnectionPool(opener, ping=_ping, **kwargs), opener
+
+
+@pytest.fixture(autouse=True)
+def empty_registry():
+    from app.connectors.pool import close_pools
+    close_pools()
+    yield
+    close_pools()
+
+
+class TestConnectionPool:
+    def test_reuses_released_connection(self):
+        pool, opener = _pool()
+        first = pool.acquire()
+        pool.release(first)
+        assert pool.acquire() is first
+        stats = pool.stats()
+        assert stats["checkouts"] == 2 and stats["created"] == 1
+        assert stats["open"] == 1 and stats["in_use"] == 1
+
+    def test_bounded_checkout_times_out(self):
+        pool, opener = _pool(max_size=1)
+        pool.acquire()
+        with pytest.raises(ConnectionError):
+            pool.acquire(timeout=0.05)
+        stats = pool.stats()
+        assert stats["waits"] == 1 and stats["timeouts"] == 1 and stats["open"] == 1
+
+    def test_waiter_gets_released_connection(self):
+        pool, opener = _pool(max_size=1)
+        held = pool.acquire()
+        got = []
+        waiter = threading.Thread(target=lambda: got.append(pool.acquire(timeout=5)))
+        waiter.start()
+        time.sleep(0.05)
+        pool.release(held)
+        waiter.join(5)
+        assert got == [held] and len(opener.opened) == 1
+        assert pool.stats()["waits"] == 1
+
+    def test_concurrent_checkouts_never_exceed_max_size(self):
+        pool, opener = _pool(max_size=3)
+        peak = []
+        lock = threading.Lock()
+        active = [0]
+
+        def work():
+            for _ in range(20):
+                with pool.connection():
+                    with lock:
+                        active[0] += 1
+                        peak.append(active[0])
+                    time.sleep(0.001)
+                    with lock:
+                        active[0] -= 1
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert max(peak) <= 3 and len(opener.opened) <= 3
+        assert pool.stats()["checkouts"] == 160 and pool.stats()["in_use"] == 0
+
+    def test_idle_connections_are_evicted(self):
+        pool, opener = _pool(idle_timeout=0.02)
+        connection = pool.acquire()
+        pool.release(connection)
+        time.sleep(0.05)
+        assert pool.evict_idle() == 1
+        assert connection.closed and pool.stats()["open"] == 0
+        assert pool.acquire() is not connection
+
+    def test_unhealthy_idle_connection_is_replaced(self):
+        pool, opener = _pool(check_after=0)
+        connection = pool.acquire()
+        pool.release(connection)
+        connection.healthy = False
+        replacement = pool.acquire()
+        assert replacement is not connection and connection.closed
+        assert pool.stats()["failed_health_checks"] == 1
+
+    def test_failed_reset_or_error_discards_connection(self):
+        def reset(connection):
+            raise RuntimeError("broken transaction")
+
+        pool, opener = _pool(reset=reset)
+        connection = pool.acquire()
+        pool.release(connection)
+        assert connection.closed and pool.stats()["idle"] == 0
+
+        pool, opener = _pool()
+        with pytest.raises(ValueError):
+            with pool.connection() as connection:
+                raise ValueError("query failed")
+        assert connection.closed and pool.stats()["open"] == 0
+
+    def test_failed_open_frees_the_slot(self):
+        from app.connectors.pool import ConnectionPool
+
+        def refuse():
+            raise ConnectionError("refused")
+
+        pool = ConnectionPool(refuse, max_size=1)
+        for _ in range(2):
+            with pytest.raises(ConnectionError):
+                pool.acquire(timeout=0.05)
+        assert pool.stats()["in_use"] == 0 and pool.stats()["timeouts"] == 0
+
+    def test_close_closes_idle_and_returned_connections(self):
+        pool, opener = _pool()
+        idle, held = pool.acquire(), pool.acquire()
+        pool.release(idle)
+        pool.close()
+        assert idle.closed and not held.closed
+        pool.release(held)
+        assert held.closed
+        with pytest.raises(ConnectionError):
+            pool.acquire()
+
+
+class TestRegistry:
+    def test_pools_keyed_by_config(self):
+        from app.connectors.pool import pool_for, pool_stats
+        opener = Opener()
+        a = pool_for("PostgreSQLConnector", {"host": "db", "password": "x"}, opener)
+        assert pool_for("PostgreSQLConnector", {"password": "x", "host": "db"}, opener) is a
+        assert pool_for("PostgreSQLConnector", {"host": "db", "password": "y"}, opener) is not a
+        assert pool_for("MySQLConnector", {"host": "db", "password": "x"}, opener) is not a
+        assert len(pool_stats()) == 3
+        assert all("x" not in s["name"] for s in pool_stats())
+
+    def test_closed_pool_is_replaced_on_lookup(self):
+        from app.connectors.pool import pool_for
+        opener = Opener()
+        pool = pool_for("PostgreSQLConnector", {"host": "a"}, opener)
+        pool.idle_timeout = 0
+        # Retired by close_idle between the lookup and a later one
+        assert pool._retire() and not pool.touch()
+        replacement = pool_for("PostgreSQLConnector", {"host": "a"}, opener)
+        assert replacement is not pool
+        replacement.release(replacement.acquire())
+
+    def test_stats_of_selected_pools(self):
+        from app.connectors import create_connector
+        from app.connectors.pool import pool_for, pool_stats
+        ours = create_connector("postgresql", {"host": "a", "table": "txns"})
+        theirs = create_connector("postgresql", {"host": "b"})
+        for conn in (ours, theirs):
+            pool_for("PostgreSQLConnector", conn._pool_params(), Opener())
+        assert [s["name"] for s in pool_stats([ours.pool_key()])] == [f"PostgreSQLConnector:{ours.pool_key()[:12]}"]
+        assert len(pool_stats()) == 2 and pool_stats([]) == []
+
+    def test_close_idle_retires_unused_pools(self):
+        from app.connectors.pool import close_idle, pool_for, pool_stats
+        opener = Opener()
+        idle = pool_for("PostgreSQLConnector", {"host": "a"}, opener)
+        busy = pool_for("PostgreSQLConnector", {"host": "b"}, opener)
+        for pool in (idle, busy):
+            pool.idle_timeout = 0.02
+        idle.release(idle.acquire())
+        held = busy.acquire()
+        time.sleep(0.05)
+
+        assert close_idle() == 1
+        assert opener.opened[0].closed and not held.closed
+        assert [s["name"] for s in pool_stats()] == [busy.name]
+        with pytest.raises(ConnectionError):
+            idle.acquire()
+        busy.release(held)
+
+
+class TestPooledConnectors:
+    def test_connectors_share_warm_connections(self, monkeypatch):
+        from app.connectors import create_connector
+        from app.connectors.postgresql import PostgreSQLConnector
+        from app.connectors.pool import pool_stats
+        opener = Opener()
+        monkeypatch.setattr(PostgreSQLConnector, "_open_connection", staticmethod(lambda config: opener()))
+        monkeypatch.setattr(PostgreSQLConnector, "_reset_connection", staticmethod(lambda c: None))
+
+        config = {"host": "db", "database": "aml", "password": "secret"}
+        for _ in range(3):
+            conn = create_connector("postgresql", dict(config))
+            conn.connect()
+            conn.disconnect()
+            assert conn.connection is None
+
+        other = create_connector("postgresql", {**config, "database": "other"})
+        other.connect()
+        assert len(opener.opened) == 2
+        assert not any(c.closed for c in opener.opened)
+        assert sorted((s["checkouts"], s["created"]) for s in pool_stats()) == [(1, 1), (3, 1)]
+
+    def test_pool_keyed_by_connection_parameters_only(self, monkeypatch):
+        from app.connectors import create_connector
+        from app.connectors.postgresql import PostgreSQLConnector
+        from app.connectors.pool import pool_stats
+        opened = []
+        monkeypatch.setattr(PostgreSQLConnector, "_open_connection",
+                            staticmethod(lambda config: opened.append(config) or FakeConnection(0)))
+        monkeypatch.setattr(PostgreSQLConnector, "_reset_connection", staticmethod(lambda c: None))
+
+        config = {"host": "db", "database": "aml", "password": "secret"}
+        for extra in ({"table": "transactions"}, {"table": "accounts", "watermark_column": "ts"},
+                      {"query": "SELECT 1", "pushdown": False}):
+            conn = create_connector("postgresql", {**config, **extra}, {"Amount": "amount"})
+            conn.connect()
+            conn.disconnect()
+        assert len(pool_stats()) == 1 and pool_stats()[0]["created"] == 1
+        assert opened == [config]
+
+    def test_failed_test_connection_returns_connection(self, monkeypatch):
+        from app.connectors import create_connector
+        from app.connectors.mysql import MySQLConnector
+        from app.connectors.pool import pool_stats
+
+        class BrokenCursor:
+            def execute(self, query):
+                raise RuntimeError("lost connection")
+
+        class BrokenConnection(FakeConnection):
+            def cursor(self):
+                return BrokenCursor()
+
+            def rollback(self):
+                raise RuntimeError("lost connection")
+
+        monkeypatch.setattr(MySQLConnector, "_open_connection", staticmethod(lambda config: BrokenConnection(0)))
+        result = create_connector("mysql", {"host": "db"}).test_connection()
+        assert result["status"] == "error"
+        assert pool_stats()[0]["in_use"] == 0 and pool_stats()[0]["open"] == 0
@@ -0,0 +1,198 @@
+"""
+Tests for incremental connector sync windows.
+Validates watermark storage, window bounds in pandas and SQL, and the
+watermark kept for sources that cannot report a maximum.
+
+Run with:
+    cd backend && python -m pytest ../tests/test_connector_sync.py -v
+"""
+import json
+import sqlite3
+import sys
+from datetime import datetime, timezone
+from decimal import Decimal
+from pathlib import Path
+
+# Ensure backend is importable
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+import numpy as np
+import pandas as pd
+import pytest
+
+SAMPLE_CSV = Path(__file__).resolve().parent.parent / "data" / "datasets" / "ibm_aml" / "sample_transactions.csv"
+
+
+class TestWatermarkState:
+    def test_round_trip(self):
+        from app.connectors.sync import from_state, to_state
+        cases = [
+            (datetime(2024, 5, 1, 12, 30), "datetime", datetime(2024, 5, 1, 12, 30)),
+            (pd.Timestamp("2024-05-01 14:30", tz="Europe/Berlin"), "datetime", datetime(2024, 5, 1, 12, 30)),
+            (np.int64(42), "number", 42),
+            (Decimal("17.0"), "number", 17),
+            (2.5, "number", 2.5),
+            ("2023-01-03 02:00:00", "string", "2023-01-03 02:00:00"),
+        ]
+        for value, kind, expected in cases:
+            state = json.loads(json.dumps(to_state("updated_at", value)))
+            assert state["type"] == kind and state["column"] == "updated_at"
+            assert from_state(state) == expected
+
+    def test_missing_value(self):
+        from app.connectors.sync import to_state
+        assert to_state("id", None) is None and to_state("id", float("nan")) is None
+        assert to_state("ts", pd.NaT) is None
+
+
+class TestSyncWindow:
+    def test_start_uses_stored_watermark_of_same_column(self):
+        from app.connectors.sync import SyncWindow, to_state
+        stored = to_state("id", 10)
+        assert SyncWindow.start("id", "id", stored, 20).since == stored
+        assert SyncWindow.start("id", "id", stored, 20, full_resync=True).since is None
+        assert SyncWindow.start("seq", "seq", stored, 20).since is None
+
+    def test_mask_and_predicate_bounds(self):
+        from app.connectors.sync import SyncWindow, to_state
+        window = SyncWindow("ts", "updated_at", to_state("updated_at", datetime(2024, 1, 2)),
+                            to_state("updated_at", datetime(2024, 1, 4)))
+        df = pd.DataFrame({"ts": ["2024-01-01", "2024-01-02", "2024-01-03", "2024-01-04", "2024-01-05", None]})
+        assert window.mask(df).tolist() == [False, False, True, True, False, False]
+        assert window.mask(df, lower=False).tolist() == [True, True, True, True, False, False]
+        assert window.predicate() == ("and", (
+            ("cmp", ">", ("col", "ts"), ("lit", datetime(2024, 1, 2))),
+            ("cmp", "<=", ("col", "ts"), ("lit", datetime(2024, 1, 4))),
+        ))
+        assert window.predicate(lower=False) == ("cmp", "<=", ("col", "ts"), ("lit", datetime(2024, 1, 4)))
+
+    def test_unbounded_window_keeps_every_row(self):
+        from app.connectors.sync import SyncWindow
+        window = SyncWindow("id", "id")
+        df = pd.DataFrame({"id": [1, None, 3]})
+        assert window.mask(df).all() and window.predicate() is None
+
+    def test_sql_window_selects_new_rows(self):
+        from app.connectors.pushdown import sql_where
+        from app.connectors.sync import SyncWindow, to_state
+        db = sqlite3.connect(":memory:")
+        db.execute("CREATE TABLE t (id INTEGER)")
+        db.executemany("INSERT INTO t VALUES (?)", [(i,) for i in range(1, 11)])
+        window = SyncWindow.start("id", "id", to_state("id", 4), 8)
+        where, params = sql_where([window.predicate()], lambda c: f'"{c}"')
+        rows = [r for (r,) in db.execute(f"SELECT id FROM t WHERE {where.replace('%s', '?')}", params)]
+        assert rows == [5, 6, 7, 8]
+
+    def test_watermark_without_source_maximum(self):
+        from app.connectors.sync import SyncWindow, to_state
+        window = SyncWindow("id", "id", to_state("id", 4))
+        window.observe(pd.DataFrame({"id": [7, 5]}))
+        window.observe(pd.DataFrame({"id": [6]}))
+        window.observe(pd.DataFrame({"id": []}))
+        assert window.next_state() == {"column": "id", "value": 7, "type": "number"}
+        assert window.rows == 3
+
+    def test_nothing_new_keeps_watermark(self):
+        from app.connectors.sync import SyncWindow, to_state
+        stored = to_state("id", 4)
+        assert SyncWindow("id", "id", stored).next_state() == stored
+        bounded = SyncWindow.start("id", "id", stored, 9)
+        assert bounded.next_state() == to_state("id", 9)
+
+    def test_describe(self):
+        from app.connectors.sync import SyncWindow, to_state
+        window = SyncWindow.start("id", "source_id", to_state("source_id", 4), 9)
+        assert window.describe() == {"watermark_column": "source_id", "since": 4, "until": 9, "rows": 0}
+
+
+class TestMaxWatermark:
+    def test_csv(self):
+        from app.connectors import create_connector
+        conn = create_connector("csv", {"file_path": str(SAMPLE_CSV), "watermark_column": "Timestamp"})
+        assert conn.watermark_column == "Timestamp"
+        assert conn.max_watermark("Timestamp") == pd.read_csv(SAMPLE_CSV)["Timestamp"].max()
+        assert conn.max_watermark("Amount Paid") == pd.read_csv(SAMPLE_CSV)["Amount Paid"].max()
+
+    def test_sql_query(self):
+        from app.connectors import create_connector
+
+        class Cursor:
+            def execute(self, query, params=None):
+                self.query = query
+
+            def fetchone(self):
+                return (datetime(2024, 1, 1, tzinfo=timezone.utc),)
+
+            def close(self):
+                pass
+
+        cursor = Cursor()
+        conn = create_connector("postgresql", {"table": "erp.ledger"})
+        conn.connection = type("Connection", (), {"cursor": lambda self: cursor})()
+        assert conn.max_watermark("updated_at") == datetime(2024, 1, 1, tzinfo=timezone.utc)
+        assert cursor.query == 'SELECT MAX("updated_at") FROM erp.ledger'
+
+    def test_rest_source_has_no_maximum(self):
+        from app.connectors import create_connector
+        conn = create_connector("rest_api", {"base_url": "http://api.test"})
+        assert conn.watermark_column is None and conn.max_watermark("id") is None
+
+
+def _compliance_modules():
+    """(db_models, compliance_engine) modules, or skip with the import error"""
+    try:
+        from app.models import db_models
+        from app.services import compliance_engine
+    except Exception as e:  # noqa: BLE001 - missing optional deps or model errors
+        pytest.skip(f"compliance engine unavailable: {type(e).__name__}: {e}")
+    return db_models, compliance_engine
+
+
+class TestFailedScanKeepsWatermark:
+    def test_write_failure(self, tmp_path):
+        import asyncio
+        from sqlalchemy import create_engine
+        from sqlalchemy.orm import Session
+        from sqlalchemy.pool import StaticPool
+        models, module = _compliance_modules()
+        from app.database import Base
+
+        engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        Base.metadata.create_all(engine)
+        db = Session(engine)
+        org = models.Organization(org_name="org")
+        db.add(org)
+        db.flush()
+        policy = models.Policy(org_id=org.org_id, policy_name="AML", department="AML")
+        db.add(policy)
+        db.flush()
+        db.add(models.Rule(
+            policy_id=policy.policy_id, org_id=org.org_id, rule_text="large", severity="high",
+            structured_logic={"type": "threshold", "field": "Amount Paid", "operator": ">", "threshold": 5000},
+        ))
+        path = tmp_path / "txns.csv"
+        path.write_bytes(SAMPLE_CSV.read_bytes())
+        connector = models.Connector(
+            org_id=org.org_id, connector_name="csv", connector_type=models.ConnectorType.CSV,
+            connection_config={"file_path": str(path), "watermark_column": "Timestamp"},
+        )
+        db.add(connector)
+        db.commit()
+
+        scanner = module.ComplianceEngine(db)
+
+        def fail(violations):
+            raise RuntimeError("disk full")
+
+        scanner._persist_violations = fail
+        results = asyncio.run(scanner.scan_all_policies(org.org_id, connector_id=connector.connector_id))
+        db.refresh(connector)
+        assert results["errors"] and "disk full" in results["errors"][0]
+        assert connector.sync_watermark is None and connector.last_sync is None
+        assert results["sync"]["last_sync"] is None
+
+        # Once writes succeed, the same rows are scanned and the watermark advances
+        retry = asyncio.run(module.ComplianceEngine(db).scan_all_policies(org.org_id, connector_id=connector.connector_id))
+        db.refresh(connector)
+        assert "errors" not in retry and retry["total_records"] == 50
+        assert connector.sync_watermark["column"] == "Timestamp"
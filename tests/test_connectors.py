@@ -0,0 +1,181 @@
+"""
+Tests for streaming connector reads (iter_batches).
+Validates batch sizes, limits, column projection and field mapping per
+connector, with the database clients replaced by in-memory fakes.
+
+Run with:
+    cd backend && python -m pytest ../tests/test_connectors.py -v
+"""
+import sys
+from pathlib import Path
+
+# Ensure backend is importable
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+import pandas as pd
+import pytest
+
+SAMPLE_CSV = Path(__file__).resolve().parent.parent / "data" / "datasets" / "ibm_aml" / "sample_transactions.csv"
+
+ROWS = [(i, f"acct-{i}", float(i * 10)) for i in range(7)]
+NAMES = ["id", "account", "amount"]
+
+
+class FakeCursor:
+    """DB-API cursor over ROWS that records the SQL it ran"""
+
+    def __init__(self, connection, name=None):
+        self.connection = connection
+        self.name = name
+        self.itersize = None
+        self.description = None
+        self.closed = False
+        self._rows = []
+
+    def execute(self, query, params=None):
+        self.connection.queries.append(query)
+        self.connection.params.append(params)
+        self.description = [(n,) for n in NAMES]
+        self._rows = list(ROWS)
+
+    def fetchmany(self, size):
+        self.connection.fetch_sizes.append(size)
+        batch, self._rows = self._rows[:size], self._rows[size:]
+        return batch
+
+    def close(self):
+        self.closed = True
+
+
+class FakeConnection:
+    def __init__(self):
+        self.queries = []
+        self.params = []
+        self.fetch_sizes = []
+        self.cursors = []
+        self.rolled_back = False
+
+    def cursor(self, *args, **kwargs):
+        cursor = FakeCursor(self, name=kwargs.get("name"))
+        cursor.cursor_class = args[0] if args else None
+        self.cursors.append(cursor)
+        return cursor
+
+    def rollback(self):
+        self.rolled_back = True
+
+    def close(self):
+        pass
+
+
+class TestBaseFallback:
+    def test_slices_fetch_data(self):
+        from app.connectors.base import BaseConnector
+
+        class Static(BaseConnector):
+            connect = disconnect = test_connection = lambda self: True
+
+            def fetch_data(self, query=None, limit=None):
+                return pd.DataFrame({"a": range(5), "b": range(5)}).head(limit)
+
+        batches = list(Static({}).iter_batches(2, columns=["b"], limit=4))
+        assert [len(b) for b in batches] == [2, 2]
+        assert list(batches[0].columns) == ["b"]
+
+    def test_rejects_non_positive_batch_size(self):
+        from app.connectors import create_connector
+        conn = create_connector("csv", {"file_path": str(SAMPLE_CSV)})
+        with pytest.raises(ValueError):
+            list(conn.iter_batches(0))
+
+
+class TestCSVConnector:
+    def test_batches_match_full_read(self):
+        from app.connectors import create_connector
+        conn = create_connector("csv", {"file_path": str(SAMPLE_CSV)})
+        batches = list(conn.iter_batches(16))
+        assert [len(b) for b in batches] == [16, 16, 16, 2]
+        pd.testing.assert_frame_equal(pd.concat(batches, ignore_index=True), conn.fetch_data())
+
+    def test_limit_projection_and_mapping(self):
+        from app.connectors import create_connector
+        conn = create_connector("csv", {"file_path": str(SAMPLE_CSV)}, {"Amount Paid": "amount"})
+        batches = list(conn.iter_batches(8, columns=["amount", "Account", "missing"], limit=10))
+        assert [len(b) for b in batches] == [8, 2]
+        assert sorted(batches[0].columns) == ["Account", "amount"]
+
+
+class TestSQLConnectors:
+    def test_postgres_uses_named_cursor(self):
+        from app.connectors import create_connector
+        conn = create_connector("postgresql", {"table": "txns"}, {"amount": "Amount Paid"})
+        conn.connection = FakeConnection()
+
+        batches = list(conn.iter_batches(3, columns=["Amount Paid", "id"], limit=100))
+        assert [len(b) for b in batches] == [3, 3, 1]
+        assert list(batches[0].columns) == ["id", "account", "Amount Paid"]
+
+        cursor = conn.connection.cursors[0]
+        assert cursor.name and cursor.itersize == 3 and cursor.closed
+        assert conn.connection.queries == ['SELECT "amount", "id" FROM txns LIMIT 100']
+        assert conn.connection.rolled_back
+
+    def test_mysql_uses_unbuffered_cursor(self):
+        import pymysql.cursors
+        from app.connectors import create_connector
+        conn = create_connector("mysql", {"table": "txns"})
+        conn.connection = FakeConnection()
+
+        batches = list(conn.iter_batches(4))
+        assert [len(b) for b in batches] == [4, 3]
+        cursor = conn.connection.cursors[0]
+        assert cursor.cursor_class is pymysql.cursors.SSCursor and cursor.closed
+        assert conn.connection.queries == ["SELECT * FROM txns"]
+        assert conn.connection.fetch_sizes == [4, 4, 4]
+
+    def test_cursor_closed_when_consumer_stops_early(self):
+        from app.connectors import create_connector
+        conn = create_connector("postgresql", {})
+        conn.connection = FakeConnection()
+        batches = conn.iter_batches(2)
+        next(batches)
+        batches.close()
+        assert conn.connection.cursors[0].closed and conn.connection.rolled_back
+
+
+class TestMongoDBConnector:
+    def test_cursor_batches_and_projection(self):
+        from app.connectors import create_connector
+        calls = {}
+
+        class FakeMongoCursor:
+            def __init__(self, docs):
+                self.docs = docs
+                self.closed = False
+
+            def limit(self, n):
+                calls["limit"] = n
+                self.docs = self.docs[:n]
+                return self
+
+            def __iter__(self):
+                return iter(self.docs)
+
+            def close(self):
+                self.closed = True
+
+        class FakeCollection:
+            def find(self, query_filter, projection=None, batch_size=0):
+                calls.update(filter=query_filter, projection=projection, batch_size=batch_size)
+                calls["cursor"] = FakeMongoCursor([{"amount": i, "account": "a"} for i in range(5)])
+                return calls["cursor"]
+
+        conn = create_connector("mongodb", {"database": "db", "collection": "txns"}, {"amount": "Amount Paid"})
+        conn.connection = {"db": {"txns": FakeCollection()}}
+
+        batches = list(conn.iter_batches(2, columns=["Amount Paid"], limit=3))
+        assert [len(b) for b in batches] == [2, 1]
+        assert "Amount Paid" in batches[0].columns
+        assert calls["projection"] == {"amount": 1, "_id": 0}
+        assert calls["batch_size"] == 2 and calls["limit"] == 3
+        assert calls["cursor"].closed
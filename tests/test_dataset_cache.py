@@ -0,0 +1,129 @@
+"""
+Tests for the columnar dataset cache.
+Validates that cached loads match a plain CSV parse and that a changed CSV invalidates the cache.
+
+Run with:
+    cd backend && python -m pytest ../tests/test_dataset_cache.py -v
+"""
+import os
+import shutil
+import sys
+from pathlib import Path
+
+# Ensure backend is importable
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+import pandas as pd
+import pytest
+
+SAMPLE_CSV = Path(__file__).resolve().parent.parent / "data" / "datasets" / "ibm_aml" / "sample_transactions.csv"
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    path = tmp_path / "transactions.csv"
+    shutil.copy(SAMPLE_CSV, path)
+    return path
+
+
+@pytest.fixture
+def expected():
+    from app.core.dataset_cache import ACCOUNT_DTYPES
+    df = pd.read_csv(SAMPLE_CSV, dtype=ACCOUNT_DTYPES)
+    df.columns = [c.strip() for c in df.columns]
+    return df
+
+
+class TestDatasetCache:
+    def test_first_load_writes_cache(self, csv_path, expected):
+        pytest.importorskip("pyarrow")
+        from app.core.dataset_cache import cache_path, read_dataset
+
+        pd.testing.assert_frame_equal(read_dataset(csv_path), expected)
+        assert cache_path(csv_path).exists()
+
+    def test_cached_load_matches_csv(self, csv_path, expected):
+        pytest.importorskip("pyarrow")
+        from app.core.dataset_cache import _read_cached, read_dataset
+
+        read_dataset(csv_path)
+        cached = _read_cached(csv_path, None, None)
+        assert cached is not None
+        pd.testing.assert_frame_equal(cached, expected)
+
+    def test_projection_and_limit(self, csv_path, expected):
+        from app.core.dataset_cache import read_dataset
+
+        read_dataset(csv_path)
+        df = read_dataset(csv_path, columns=["Amount Paid", "Is Laundering"], limit=5)
+        pd.testing.assert_frame_equal(df, expected[["Amount Paid", "Is Laundering"]].head(5))
+
+    def test_missing_column_raises(self, csv_path):
+        from app.core.dataset_cache import read_dataset
+
+        read_dataset(csv_path)
+        with pytest.raises(KeyError):
+            read_dataset(csv_path, columns=["No Such Column"])
+
+    def test_changed_csv_invalidates_cache(self, csv_path):
+        pytest.importorskip("pyarrow")
+        from app.core.dataset_cache import _read_cached, read_dataset
+
+        read_dataset(csv_path)
+        lines = csv_path.read_text().splitlines(keepends=True)
+        csv_path.write_text("".join(lines[:11]))
+        os.utime(csv_path, ns=(0, 0))
+
+        assert _read_cached(csv_path, None, None) is None
+        assert len(read_dataset(csv_path)) == 10
+        assert len(_read_cached(csv_path, None, None)) == 10
+
+    def test_corrupt_cache_is_ignored(self, csv_path, expected):
+        pytest.importorskip("pyarrow")
+        from app.core.dataset_cache import cache_path, read_dataset
+
+        cache_path(csv_path).write_bytes(b"not an arrow file")
+        pd.testing.assert_frame_equal(read_dataset(csv_path), expected)
+
+    def test_without_pyarrow(self, csv_path, expected, monkeypatch):
+        from app.core import dataset_cache
+
+        monkeypatch.setattr(dataset_cache, "pa", None)
+        pd.testing.assert_frame_equal(dataset_cache.read_dataset(csv_path, limit=3), expected.head(3))
+        assert not dataset_cache.cache_path(csv_path).exists()
+
+
+class TestEngineLoads:
+    @pytest.fixture
+    def engine(self, csv_path, monkeypatch):
+        from app.core import violation_engine
+
+        monkeypatch.setattr(violation_engine, "DATA_FILE", csv_path)
+        return violation_engine
+
+    def test_stats_and_preview(self, engine, expected):
+        stats = engine.get_dataset_stats()
+        assert stats["total_transactions"] == len(expected)
+        assert stats["confirmed_laundering"] == int(expected["Is Laundering"].sum())
+        assert engine.get_dataset_stats() == stats
+
+        preview = engine.get_dataset_preview(3)
+        assert len(preview) == 3
+        assert preview[0]["Account"] == expected["Account"].iloc[0]
+
+    def test_numeric_accounts_hash_alike_on_every_path(self, csv_path, engine):
+        """Leading zeros survive the full, cached and chunked reads, so TXN ids agree"""
+        from app.core.dataset_cache import read_dataset
+        from app.core.txn_ids import txn_hashes
+
+        df = pd.read_csv(SAMPLE_CSV, dtype=str)
+        df["Account"] = [f"{i:06d}" for i in range(len(df))]
+        df["Account.1"] = [f"00{i}" for i in range(len(df))]
+        df.to_csv(csv_path, index=False)
+
+        full = read_dataset(csv_path)
+        assert full["Account"].iloc[1] == "000001"
+        cached = read_dataset(csv_path)
+        chunked = pd.concat(engine._read_chunks(7), ignore_index=True)
+        assert (txn_hashes(full) == txn_hashes(chunked)).all()
+        assert (txn_hashes(cached) == txn_hashes(chunked)).all()
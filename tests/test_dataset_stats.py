@@ -0,0 +1,133 @@
+"""
+Tests for the memoized, mergeable dataset statistics.
+Validates merged statistics against a full recompute and the append-only update path.
+
+Run with:
+    cd backend && python -m pytest ../tests/test_dataset_stats.py -v
+"""
+import os
+import shutil
+import sys
+from pathlib import Path
+
+# Ensure backend is importable
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+import pandas as pd
+import pytest
+
+SAMPLE_CSV = Path(__file__).resolve().parent.parent / "data" / "datasets" / "ibm_aml" / "sample_transactions.csv"
+
+
+def _reference(df: pd.DataFrame) -> dict:
+    """The statistics as get_dataset_stats() computed them before they were memoized."""
+    total = len(df)
+    laundering = int(df["Is Laundering"].sum())
+    return {
+        "total_transactions": total,
+        "confirmed_laundering": laundering,
+        "laundering_percentage": round(laundering / total * 100, 2) if total > 0 else 0,
+        "avg_amount_paid": round(float(df["Amount Paid"].mean()), 2),
+        "max_amount_paid": round(float(df["Amount Paid"].max()), 2),
+        "top_currencies": df["Payment Currency"].value_counts().head(5).to_dict(),
+        "payment_formats": df["Payment Format"].value_counts().to_dict(),
+    }
+
+
+@pytest.fixture
+def transactions():
+    return pd.read_csv(SAMPLE_CSV)
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    """Violation engine on a private copy of the sample CSV with an empty stats memo."""
+    from app.core import violation_engine
+    from app.core.dataset_stats import StatsMemo
+
+    csv_path = tmp_path / "transactions.csv"
+    shutil.copy(SAMPLE_CSV, csv_path)
+    monkeypatch.setattr(violation_engine, "DATA_FILE", csv_path)
+    monkeypatch.setattr(violation_engine, "VIOLATIONS_FILE", tmp_path / "violations.json")
+    monkeypatch.setattr(violation_engine, "SCAN_STATE_FILE", tmp_path / "scan_state.json")
+    monkeypatch.setattr(violation_engine, "_stats_memo", StatsMemo())
+    return violation_engine
+
+
+def _append(csv_path: Path, rows: pd.DataFrame) -> None:
+    with open(csv_path, "a", encoding="utf-8", newline="") as f:
+        rows.to_csv(f, header=False, index=False)
+
+
+def _forbid_full_load(engine, monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("statistics were recomputed from the whole dataset")
+    monkeypatch.setattr(engine, "load_transactions", fail)
+
+
+class TestDatasetStats:
+    def test_matches_full_computation(self, transactions):
+        from app.core.dataset_stats import DatasetStats
+        assert DatasetStats.from_frame(transactions).summary() == _reference(transactions)
+
+    def test_merged_chunks_match_whole_frame(self, transactions):
+        from app.core.dataset_stats import DatasetStats
+
+        merged = DatasetStats()
+        for i in range(0, len(transactions), 7):
+            merged.merge(DatasetStats.from_frame(transactions.iloc[i:i + 7]))
+        whole = DatasetStats.from_frame(transactions)
+        assert merged.summary() == whole.summary()
+        assert (merged.rows, merged.amount_count) == (whole.rows, whole.amount_count)
+        assert merged.amount_sum == pytest.approx(whole.amount_sum)
+
+    def test_empty(self):
+        from app.core.dataset_stats import DatasetStats
+        summary = DatasetStats().summary()
+        assert summary["total_transactions"] == 0 and summary["top_currencies"] == {}
+
+
+class TestEngineStats:
+    def test_unchanged_file_is_memoized(self, engine, transactions, monkeypatch):
+        first = engine.get_dataset_stats()
+        assert {k: first[k] for k in _reference(transactions)} == _reference(transactions)
+        _forbid_full_load(engine, monkeypatch)
+        assert engine.get_dataset_stats() == first
+
+    def test_appended_rows_are_merged(self, engine, transactions, monkeypatch):
+        engine.get_dataset_stats()
+        extra = transactions.head(12).copy()
+        extra["Amount Paid"] = extra["Amount Paid"] * 100
+        _append(engine.DATA_FILE, extra)
+
+        _forbid_full_load(engine, monkeypatch)
+        stats = engine.get_dataset_stats()
+        combined = pd.concat([transactions, extra], ignore_index=True)
+        assert {k: stats[k] for k in _reference(combined)} == _reference(combined)
+
+    def test_rewritten_file_is_recomputed(self, engine, transactions):
+        engine.get_dataset_stats()
+        smaller = transactions.head(20)
+        smaller.to_csv(engine.DATA_FILE, index=False)
+        assert engine.get_dataset_stats()["total_transactions"] == 20
+
+        # Same length, different content before the covered end
+        changed = transactions.copy()
+        changed.loc[0, "Is Laundering"] = 1 - changed.loc[0, "Is Laundering"]
+        transactions.to_csv(engine.DATA_FILE, index=False)
+        assert engine.get_dataset_stats()["confirmed_laundering"] == int(transactions["Is Laundering"].sum())
+        changed.to_csv(engine.DATA_FILE, index=False)
+        os.utime(engine.DATA_FILE, ns=(0, 0))  # rewrites may land within one mtime tick
+        assert engine.get_dataset_stats()["confirmed_laundering"] == int(changed["Is Laundering"].sum())
+
+    def test_incremental_scan_extends_stats(self, engine, transactions, monkeypatch):
+        engine.run_incremental_scan()
+        engine.get_dataset_stats()
+        _append(engine.DATA_FILE, transactions.tail(5))
+        engine.run_incremental_scan()
+
+        _forbid_full_load(engine, monkeypatch)
+        monkeypatch.setattr(engine, "_read_range", _forbid_full_load)  # no re-read of the new rows either
+        stats = engine.get_dataset_stats()
+        combined = pd.concat([transactions, transactions.tail(5)], ignore_index=True)
+        assert {k: stats[k] for k in _reference(combined)} == _reference(combined)
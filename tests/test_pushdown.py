@@ -0,0 +1,328 @@
+"""
+Tests for rule pushdown into database connectors.
+Validates the planned projection and filter, their SQL and MongoDB forms, and
+that the SQL filter keeps every row the pandas checkers flag.
+
+Run with:
+    cd backend && python -m pytest ../tests/test_pushdown.py -v
+"""
+import sqlite3
+import sys
+from pathlib import Path
+
+# Ensure backend is importable
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+import numpy as np
+import pandas as pd
+import pytest
+
+SAMPLE_CSV = Path(__file__).resolve().parent.parent / "data" / "datasets" / "ibm_aml" / "sample_transactions.csv"
+
+THRESHOLD = {"type": "threshold", "field": "Amount Paid", "operator": ">", "threshold": 5000}
+PATTERN = {"type": "pattern", "field": "Payment Format", "pattern": "Cash|wire"}
+COMPARISON = {"type": "comparison", "field1": "Amount Received", "field2": "Amount Paid", "operator": ">"}
+AGGREGATE = {"type": "aggregate", "field": "Amount Paid", "group_by": "Account", "period": "1d",
+             "operator": ">=", "threshold": 10000, "timestamp_field": "Timestamp"}
+
+
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+_BSON_TYPES = {"string": str, "bool": bool, "binData": bytes}
+
+
+def _bson_type(value) -> str:
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "bool"
+    if isinstance(value, (int, float)):
+        return "number"
+    return next(name for name, kind in _BSON_TYPES.items() if isinstance(value, kind))
+
+
+def _mongo_matches(document: dict, query: dict) -> bool:
+    """MongoDB query semantics for the operators pushdown emits (comparisons are type-strict)"""
+    for key, condition in query.items():
+        if key in ("$or", "$and"):
+            results = [_mongo_matches(document, clause) for clause in condition]
+            if not (any(results) if key == "$or" else all(results)):
+                return False
+        elif not _field_matches(key in document, document.get(key), condition):
+            return False
+    return True
+
+
+def _field_matches(present: bool, value, condition: dict) -> bool:
+    import operator
+    import re
+    comparisons = {"$gt": operator.gt, "$gte": operator.ge, "$lt": operator.lt, "$lte": operator.le}
+    for op, operand in condition.items():
+        if op == "$options":
+            continue
+        if op in comparisons:
+            same_type = present and _bson_type(value) == _bson_type(operand)
+            matched = same_type and comparisons[op](value, operand)
+        elif op == "$eq":
+            matched = present and _bson_type(value) == _bson_type(operand) and value == operand
+        elif op == "$ne":
+            matched = not (present and _bson_type(value) == _bson_type(operand) and value == operand)
+        elif op == "$in":
+            matched = present and any(_bson_type(value) == _bson_type(v) and value == v for v in operand)
+        elif op == "$regex":
+            flags = re.IGNORECASE if "i" in condition.get("$options", "") else 0
+            matched = isinstance(value, str) and re.search(operand, value, flags) is not None
+        elif op == "$type":
+            matched = present and _bson_type(value) in ([operand] if isinstance(operand, str) else operand)
+        elif op == "$not":
+            matched = not _field_matches(present, value, operand)
+        else:
+            raise NotImplementedError(op)
+        if not matched:
+            return False
+    return True
+
+
+class TestPlanner:
+    def test_projection_and_predicates(self):
+        from app.connectors.pushdown import plan_pushdown
+        plan = plan_pushdown([THRESHOLD, PATTERN, COMPARISON, THRESHOLD])
+        assert plan.columns == sorted(
+            ["transaction_id", "Amount Paid", "Payment Format", "Amount Received"]
+        )
+        assert len(plan.predicates) == 3
+        assert plan.describe() == {"columns": plan.columns, "predicates": 3}
+
+    def test_aggregate_rule_keeps_every_row(self):
+        from app.connectors.pushdown import plan_pushdown
+        plan = plan_pushdown([THRESHOLD, AGGREGATE])
+        assert plan.predicates is None
+        assert {"Account", "Timestamp", "Amount Paid"} <= set(plan.columns)
+
+    def test_regex_pattern_keeps_every_row(self):
+        from app.connectors.pushdown import plan_pushdown
+        plan = plan_pushdown([THRESHOLD, {"type": "pattern", "field": "Payment Format", "pattern": "^Ca.h$"}])
+        assert plan.predicates is None and "Payment Format" in plan.columns
+
+    def test_unknown_rule_reads_everything(self):
+        from app.connectors.pushdown import plan_pushdown
+        for logic in ({"type": "custom"}, None, {"type": "threshold", "operator": ">", "threshold": 1}):
+            plan = plan_pushdown([THRESHOLD, logic])
+            assert plan.columns is None and plan.predicates is None
+
+    def test_no_rules(self):
+        from app.connectors.pushdown import plan_pushdown
+        plan = plan_pushdown([])
+        assert plan.columns == ["transaction_id"] and plan.predicates is None
+
+
+class TestSQL:
+    def test_postgres_where(self):
+        from app.connectors.pushdown import plan_pushdown, sql_where
+        plan = plan_pushdown([THRESHOLD, PATTERN, COMPARISON])
+        where, params = sql_where(plan.predicates, _quote, "postgresql")
+        assert where == (
+            '("Amount Paid" > %s) OR '
+            '(LOWER(CAST("Payment Format" AS TEXT)) LIKE %s OR LOWER(CAST("Payment Format" AS TEXT)) LIKE %s) OR '
+            '("Amount Received" > "Amount Paid")'
+        )
+        assert params == [5000, "%cash%", "%wire%"]
+
+    def test_not_equal_and_membership(self):
+        from app.core.condition_compiler import parse_condition
+        from app.connectors.pushdown import sql_where
+        node = parse_condition("Payment Currency != Receiving Currency AND Payment Format IN ['Wire', 'ACH']")
+        where, params = sql_where([node], lambda c: f"`{c}`", "mysql")
+        assert where == (
+            "((`Payment Currency` <> `Receiving Currency` OR `Payment Currency` IS NULL "
+            "OR `Receiving Currency` IS NULL) AND "
+            "(LOWER(CAST(`Payment Format` AS CHAR)) IN (%s, %s)))"
+        )
+        assert params == ["wire", "ach"]
+
+    def test_filter_keeps_every_flagged_row(self):
+        """The pushed-down WHERE, run by SQLite, keeps a superset of the pandas hits"""
+        from app.core.condition_compiler import evaluate_node, parse_condition
+        from app.connectors.pushdown import plan_pushdown, sql_where
+
+        df = pd.read_csv(SAMPLE_CSV)
+        df.loc[3, "Payment Currency"] = None
+        db = sqlite3.connect(":memory:")
+        df.rename_axis("row").to_sql("txns", db)
+
+        logics = [
+            THRESHOLD, PATTERN, COMPARISON,
+            {"type": "threshold", "field": "Amount Paid", "operator": "<=", "threshold": 100},
+            {"type": "pattern", "field": "Receiving Currency", "pattern": "EURO"},
+        ]
+        conditions = [parse_condition("Payment Currency != Receiving Currency")]
+        plan = plan_pushdown(logics)
+        predicates = plan.predicates + conditions
+        where, params = sql_where(predicates, _quote, "postgresql")
+        fetched = {
+            row for (row,) in db.execute(f"SELECT row FROM txns WHERE {where.replace('%s', '?')}", params)
+        }
+
+        flagged = np.zeros(len(df), dtype=bool)
+        for node in predicates:
+            flagged |= evaluate_node(node, df)
+        assert set(np.flatnonzero(flagged)) <= fetched
+        assert len(fetched) < len(df)
+
+
+class TestMongo:
+    def test_filter(self):
+        from app.core.condition_compiler import parse_condition
+        from app.connectors.pushdown import mongo_filter, plan_pushdown
+        plan = plan_pushdown([THRESHOLD, PATTERN, COMPARISON])
+        assert mongo_filter(plan.predicates, lambda c: c) == {"$or": [
+            {"$or": [{"Amount Paid": {"$gt": 5000}}, {"Amount Paid": {"$type": ["string", "bool", "binData"]}}]},
+            {"$or": [
+                {"Payment Format": {"$regex": "Cash|wire", "$options": "i"}},
+                {"Payment Format": {"$not": {"$type": "string"}}},
+            ]},
+            {"$expr": {"$gt": ["$Amount Received", "$Amount Paid"]}},
+        ]}
+        node = parse_condition("Payment Format IN ['Wire', 'ACH']")
+        assert mongo_filter([node], lambda c: c) == {
+            "Payment Format": {"$regex": "^(?:Wire|ACH)$", "$options": "i"}
+        }
+
+    def test_filter_keeps_mixed_type_documents(self):
+        """Documents the pandas checkers flag after type coercion pass the pushed filter"""
+        from app.core.condition_compiler import evaluate_node, logic_to_node, parse_condition
+        from app.connectors.pushdown import mongo_filter
+
+        documents = [
+            {"Amount Paid": 15000, "Payment Format": "Wire", "Code": 1},
+            {"Amount Paid": "15000", "Payment Format": "ACH", "Code": "1"},
+            {"Amount Paid": " 12000 ", "Payment Format": 7, "Code": True},
+            {"Amount Paid": True, "Payment Format": None, "Code": 2},
+            {"Amount Paid": 100, "Payment Format": "cheque", "Code": 3.0},
+            {"Payment Format": "Cash"},
+        ]
+        nodes = [
+            logic_to_node({"type": "threshold", "field": "Amount Paid", "operator": ">", "threshold": 10000}),
+            logic_to_node({"type": "threshold", "field": "Amount Paid", "operator": "==", "threshold": 1}),
+            logic_to_node({"type": "pattern", "field": "Payment Format", "pattern": "cash|7|none"}),
+            parse_condition("Code IN [1, 3]"),
+        ]
+        df = pd.DataFrame(documents)
+        for node in nodes:
+            query = mongo_filter([node], lambda c: c)
+            shipped = [_mongo_matches(doc, query) for doc in documents]
+            flagged = evaluate_node(node, df)
+            assert all(shipped[i] for i in np.flatnonzero(flagged)), (node, query)
+        # Numbers outside the condition are still filtered out server-side
+        assert not _mongo_matches(documents[4], mongo_filter(nodes[:1], lambda c: c))
+
+    def test_path_like_field_disables_filter(self):
+        from app.connectors.pushdown import mongo_filter, plan_pushdown
+        plan = plan_pushdown([{"type": "threshold", "field": "Account.1", "operator": ">", "threshold": 1}])
+        assert mongo_filter(plan.predicates, lambda c: c) is None
+
+
+class TestConnectorQueries:
+    def test_postgres_select_with_mapping(self):
+        from app.connectors import create_connector
+        from app.connectors.pushdown import plan_pushdown
+        conn = create_connector("postgresql", {"table": "txns"}, {"amount_paid": "Amount Paid", "id": "transaction_id"})
+        plan = plan_pushdown([THRESHOLD])
+        query, params = conn._select_query(plan.columns, None, plan.predicates)
+        assert query == 'SELECT "amount_paid", "id" FROM txns WHERE ("amount_paid" > %s)'
+        assert params == [5000]
+
+    def test_percent_in_identifier_is_escaped(self):
+        from app.connectors import create_connector
+        conn = create_connector("mysql", {"table": "txns"})
+        query, params = conn._select_query(["Fee %"], 10)
+        assert query == "SELECT `Fee %%` FROM txns LIMIT 10" and params == []
+
+
+def _compliance_engine():
+    """A ComplianceEngine without a session, or skip with the import error"""
+    try:
+        from app.services.compliance_engine import ComplianceEngine
+    except Exception as e:  # noqa: BLE001 - missing optional deps or model errors
+        pytest.skip(f"compliance engine unavailable: {type(e).__name__}: {e}")
+    return ComplianceEngine(None)
+
+
+def _sqlite_connector(db, list_columns=True):
+    """A connector reading table txns of SQLite `db` with pushdown, recording each query"""
+    from app.connectors.base import BaseConnector
+    from app.connectors.pushdown import sql_where
+
+    class SQLiteConnector(BaseConnector):
+        queries = []
+
+        def connect(self):
+            return True
+
+        def disconnect(self):
+            return True
+
+        def test_connection(self):
+            return {"status": "success"}
+
+        def fetch_data(self, query=None, limit=None):
+            return self.map_fields(pd.read_sql_query("SELECT * FROM txns", db))
+
+        def available_columns(self):
+            if not list_columns:
+                return None
+            return self.mapped_columns([row[1] for row in db.execute("PRAGMA table_info(txns)")])
+
+        def iter_batches(self, batch_size, columns=None, limit=None, predicates=None):
+            # Backticks: SQLite reads an unknown "double-quoted" name as a string
+            fields = ", ".join(f"`{c}`" for c in self.source_columns(columns)) if columns else "*"
+            query, params = f"SELECT {fields} FROM txns", []
+            if predicates:
+                where, params = sql_where(predicates, lambda c: f"`{c}`")
+                query += " WHERE " + where.replace("%s", "?")
+            self.queries.append(query)
+            yield self.map_fields(pd.read_sql_query(query, db, params=params))
+
+    return SQLiteConnector({})
+
+
+class TestScanReads:
+    def _db(self):
+        db = sqlite3.connect(":memory:")
+        pd.read_csv(SAMPLE_CSV).to_sql("txns", db, index=False)
+        return db
+
+    def test_missing_id_column_is_not_projected(self):
+        from app.connectors.pushdown import plan_pushdown
+        engine = _compliance_engine()
+        conn = _sqlite_connector(self._db())
+        plan = plan_pushdown([THRESHOLD])
+
+        df = pd.concat(engine._read_batches(conn, 100, None, plan))
+        assert list(df.columns) == ["Amount Paid"]
+        assert (df["Amount Paid"] > 5000).all() and len(df) < 50
+        assert len(conn.queries) == 1 and engine.scan_warnings == []
+
+    def test_failed_projection_keeps_the_row_filter(self):
+        from app.connectors.pushdown import plan_pushdown
+        engine = _compliance_engine()
+        conn = _sqlite_connector(self._db(), list_columns=False)
+        plan = plan_pushdown([THRESHOLD])
+
+        df = pd.concat(engine._read_batches(conn, 100, None, plan))
+        assert (df["Amount Paid"] > 5000).all() and len(df) < 50
+        assert conn.queries[-1].startswith("SELECT * FROM txns WHERE")
+        assert len(engine.scan_warnings) == 1 and "row filter" in engine.scan_warnings[0]
+
+    def test_failed_filter_reads_everything(self):
+        from app.connectors.pushdown import plan_pushdown
+        engine = _compliance_engine()
+        conn = _sqlite_connector(self._db())
+        plan = plan_pushdown([{"type": "threshold", "field": "Fee", "operator": ">", "threshold": 1}])
+
+        df = pd.concat(engine._read_batches(conn, 100, None, plan))
+        assert len(df) == 50 and conn.queries[-1] == "SELECT * FROM txns"
+        assert len(conn.queries) == 3 and len(engine.scan_warnings) == 2
+        assert "all columns and rows" in engine.scan_warnings[-1]
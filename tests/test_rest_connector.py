@@ -0,0 +1,189 @@
+"""
+Tests for the REST API connector against a local stub server.
+Validates streaming JSON decoding, offset / cursor / link pagination,
+bounded concurrent page requests, retries, keep-alive reuse and the
+throughput stats of a read.
+
+Run with:
+    cd backend && python -m pytest ../tests/test_rest_connector.py -v
+"""
+import json
+import sys
+from pathlib import Path
+
+# Ensure backend is importable
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import pytest
+
+from rest_stub_server import StubAPI
+
+
+def _feed(stream, body: bytes, chunk: int = 1):
+    records = []
+    for start in range(0, len(body), chunk):
+        records.extend(stream.feed(body[start:start + chunk]))
+    return records + stream.close()
+
+
+def _connector(api, **config):
+    from app.connectors import create_connector
+    return create_connector("rest_api", {"base_url": api.base_url, "retry_backoff": 0, **config})
+
+
+class TestJSONRecordStream:
+    def test_array_fed_byte_by_byte(self):
+        from app.connectors.json_stream import JSONRecordStream
+        records = [{"id": i, "amount": i * 10.25, "name": "zürich ✓"} for i in range(5)]
+        body = json.dumps(records, ensure_ascii=False).encode()
+        assert _feed(JSONRecordStream(), body) == records
+
+    def test_object_keeps_other_members(self):
+        from app.connectors.json_stream import JSONRecordStream
+        body = json.dumps({"total": 2, "data": [{"id": 1}, {"id": 2}], "meta": {"next_cursor": "c2"}}).encode()
+        stream = JSONRecordStream()
+        assert _feed(stream, body, chunk=3) == [{"id": 1}, {"id": 2}]
+        assert stream.meta == {"total": 2, "meta": {"next_cursor": "c2"}}
+
+    def test_records_arrive_before_the_body_ends(self):
+        from app.connectors.json_stream import JSONRecordStream
+        stream = JSONRecordStream()
+        assert stream.feed(b'[{"id": 1}, {"id"') == [{"id": 1}]
+        assert stream.feed(b': 2}, 12') == [{"id": 2}]
+        assert stream.feed(b"3]") == [123]
+        assert stream.close() == []
+
+    def test_ndjson_and_single_object(self):
+        from app.connectors.json_stream import JSONRecordStream
+        assert _feed(JSONRecordStream(ndjson=True), b'{"id": 1}\n{"id": 2}\n', chunk=4) == [{"id": 1}, {"id": 2}]
+        assert _feed(JSONRecordStream(), b'{"id": 7, "ok": true}') == [{"id": 7, "ok": True}]
+
+    def test_truncated_body(self):
+        from app.connectors.json_stream import JSONRecordStream
+        stream = JSONRecordStream()
+        stream.feed(b'[{"id": 1}, {"id": 2')
+        with pytest.raises(ValueError):
+            stream.close()
+
+
+class TestPagination:
+    def test_offset_pages(self):
+        with StubAPI(total=7) as api:
+            conn = _connector(api, page_size=3)
+            batches = list(conn.iter_batches(3, columns=["amount"]))
+        assert [len(b) for b in batches] == [3, 3, 1]
+        assert list(batches[0].columns) == ["amount"]
+        assert batches[2]["amount"].tolist() == [9.0]
+        offsets = sorted(int(params["offset"]) for _, params in api.requests)
+        assert offsets[:3] == [0, 3, 6]
+
+    def test_limit_caps_last_page(self):
+        with StubAPI(total=100) as api:
+            conn = _connector(api, limit_param="size", page_size=4)
+            batches = list(conn.iter_batches(4, limit=6))
+        assert [len(b) for b in batches] == [4, 2]
+        assert sorted(params["size"] for _, params in api.requests) == ["2", "4"]
+
+    def test_server_ignoring_page_size(self):
+        with StubAPI(total=10, ignore_paging=True) as api:
+            conn = _connector(api, concurrency=1, page_size=4)
+            batches = list(conn.iter_batches(4))
+            assert [len(b) for b in batches] == [4, 4, 2]
+            assert len(api.requests) == 1
+            # A page shorter than requested is followed up once; the repeat ends the data
+            assert _connector(api, concurrency=1).fetch_data()["id"].tolist() == list(range(10))
+        assert len(api.requests) == 3
+
+    def test_server_capping_page_size(self):
+        with StubAPI(total=250, max_page=100) as api:
+            conn = _connector(api, concurrency=3)
+            batches = list(conn.iter_batches(1000))
+        assert [len(b) for b in batches] == [250]
+        assert batches[0]["id"].tolist() == list(range(250))
+        assert {("100", "100"), ("200", "100")} <= {(params["offset"], params["limit"]) for _, params in api.requests}
+
+    def test_short_first_page_ends_with_an_empty_page(self):
+        with StubAPI(total=7) as api:
+            conn = _connector(api, concurrency=1)
+            df = conn.fetch_data()
+        assert df["id"].tolist() == list(range(7))
+        assert [params["offset"] for _, params in api.requests] == ["0", "7"]
+
+    def test_default_page_size_is_not_the_batch_size(self):
+        from app.connectors.rest_api import DEFAULT_PAGE_SIZE
+        with StubAPI(total=10) as api:
+            list(_connector(api, concurrency=1).iter_batches(50_000))
+        assert api.requests[0][1]["limit"] == str(DEFAULT_PAGE_SIZE)
+
+    def test_cursor_pages(self):
+        with StubAPI(total=25) as api:
+            conn = _connector(api, endpoint="/cursor", pagination="cursor",
+                              page_size=10, cursor_field="meta.next_cursor")
+            batches = list(conn.iter_batches(8))
+        assert [len(b) for b in batches] == [8, 8, 8, 1]
+        assert batches[3]["id"].tolist() == [24]
+        assert [params.get("cursor") for _, params in api.requests] == [None, "c10", "c20"]
+
+    def test_link_pages(self):
+        with StubAPI(total=25) as api:
+            conn = _connector(api, endpoint="/link", pagination="link", limit_param="per_page", page_size=10)
+            df = conn.fetch_data()
+        assert df["id"].tolist() == list(range(25))
+        assert [params.get("page") for _, params in api.requests] == [None, "2", "3"]
+
+    def test_single_streamed_response(self):
+        with StubAPI(total=2500) as api:
+            conn = _connector(api, endpoint="/stream", pagination="none")
+            batches = list(conn.iter_batches(1000))
+            ndjson = _connector(api, endpoint="/stream?format=ndjson", pagination="none")
+            limited = list(ndjson.iter_batches(1000, limit=1500))
+        assert [len(b) for b in batches] == [1000, 1000, 500]
+        assert [len(b) for b in limited] == [1000, 500]
+        assert limited[1]["id"].iloc[-1] == 1499
+
+    def test_unknown_pagination(self):
+        from app.connectors import create_connector
+        conn = create_connector("rest_api", {"base_url": "http://api.test", "pagination": "pages"})
+        with pytest.raises(ValueError):
+            list(conn.iter_batches(10))
+
+
+class TestTransport:
+    def test_concurrent_offset_pages_are_bounded(self):
+        with StubAPI(total=200, latency=0.05) as api:
+            conn = _connector(api, page_size=10, concurrency=4)
+            df = conn.fetch_data()
+        assert df["id"].tolist() == list(range(200))
+        assert 1 < api.max_in_flight <= 4
+
+    def test_keep_alive_client_is_shared(self):
+        with StubAPI(total=50) as api:
+            for _ in range(3):
+                list(_connector(api, page_size=10, concurrency=2).iter_batches(10))
+            assert _connector(api).test_connection()["status"] == "success"
+        assert len(api.requests) >= 16
+        assert len(api.connections) <= 2
+
+    def test_retries_with_backoff(self):
+        with StubAPI(total=5, fail_first=2) as api:
+            conn = _connector(api, concurrency=1)
+            df = conn.fetch_data()
+        assert df["id"].tolist() == list(range(5))
+        # Three attempts at the first (short) page, then the empty page after it
+        assert conn.stats["retries"] == 2 and conn.stats["requests"] == 4
+
+    def test_gives_up_after_max_retries(self):
+        import httpx
+        with StubAPI(total=5, fail_first=10) as api:
+            conn = _connector(api, concurrency=1, max_retries=1)
+            with pytest.raises(httpx.HTTPStatusError):
+                conn.fetch_data()
+        assert len(api.requests) == 2
+
+    def test_throughput_stats(self):
+        with StubAPI(total=30) as api:
+            conn = _connector(api)
+            list(conn.iter_batches(10))
+        assert conn.stats["rows"] == 30
+        assert conn.stats["rows_per_second"] > 0
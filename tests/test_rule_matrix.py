@@ -0,0 +1,95 @@
+"""
+Tests for single-pass multi-rule evaluation with a packed rule-hit matrix.
+
+Run with:
+    cd backend && python -m pytest ../tests/test_rule_matrix.py -v
+"""
+import sys
+from pathlib import Path
+
+# Ensure backend is importable
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+import numpy as np
+import pandas as pd
+import pytest
+
+SAMPLE_CSV = Path(__file__).resolve().parent.parent / "data" / "datasets" / "ibm_aml" / "sample_transactions.csv"
+
+
+@pytest.fixture
+def transactions():
+    return pd.read_csv(SAMPLE_CSV)
+
+
+def _conditions(n: int):
+    """n distinct threshold conditions on the same column."""
+    return [f"Amount Paid > {1000 * i}" for i in range(n)]
+
+
+class TestRuleMatrix:
+    def test_matches_individual_masks(self, transactions):
+        from app.core.condition_compiler import compile_condition
+        from app.core.rule_matrix import evaluate_rule_matrix
+
+        conditions = _conditions(19)  # spans three packed bytes
+        matrix = evaluate_rule_matrix(
+            [f"r{i}" for i in range(len(conditions))],
+            [compile_condition(c).ast for c in conditions],
+            transactions,
+        )
+        assert matrix.bits.shape == (len(transactions), 3)
+        assert matrix.bits.dtype == np.uint8
+        for i, condition in enumerate(conditions):
+            expected = np.flatnonzero(compile_condition(condition)(transactions))
+            assert np.array_equal(matrix.rows_for(i), expected), condition
+
+    def test_hits_are_row_rule_pairs(self, transactions):
+        from app.core.condition_compiler import compile_condition
+        from app.core.rule_matrix import evaluate_rule_matrix
+
+        conditions = _conditions(10)
+        matrix = evaluate_rule_matrix(
+            [f"r{i}" for i in range(10)], [compile_condition(c).ast for c in conditions], transactions
+        )
+        rows, rules = matrix.hits()
+        expected = {
+            (row, i)
+            for i, c in enumerate(conditions)
+            for row in np.flatnonzero(compile_condition(c)(transactions))
+        }
+        assert set(zip(rows.tolist(), rules.tolist())) == expected
+        assert np.all(np.diff(rows) >= 0)
+        assert sum(matrix.counts().values()) == len(expected)
+
+    def test_callable_and_failing_predicates(self, transactions):
+        from app.core.condition_compiler import parse_condition
+        from app.core.rule_matrix import evaluate_rule_matrix
+
+        matrix = evaluate_rule_matrix(
+            ["callable", "missing", "none"],
+            [lambda df: df["Is Laundering"] == 1, parse_condition("no_such_column > 1"), None],
+            transactions,
+        )
+        assert len(matrix.rows_for(0)) == int((transactions["Is Laundering"] == 1).sum())
+        assert len(matrix.rows_for(1)) == 0 and "missing" in matrix.errors
+        assert len(matrix.rows_for(2)) == 0
+
+    def test_empty_rule_set(self, transactions):
+        from app.core.rule_matrix import evaluate_rule_matrix
+        matrix = evaluate_rule_matrix([], [], transactions)
+        rows, rules = matrix.hits()
+        assert len(rows) == 0 and len(rules) == 0
+
+
+class TestSinglePassScan:
+    def test_same_violations_as_per_rule_scan(self, tmp_path, monkeypatch):
+        from app.core import violation_engine
+
+        monkeypatch.setattr(violation_engine, "DATA_FILE", SAMPLE_CSV)
+        monkeypatch.setattr(violation_engine, "VIOLATIONS_FILE", tmp_path / "violations.json")
+
+        single = violation_engine.run_scan(single_pass=True)
+        per_rule = violation_engine.run_scan(single_pass=False)
+        key = lambda v: (v.transaction_id, v.rule_id, v.explanation, tuple(v.evidence.items()))
+        assert [key(v) for v in single] == [key(v) for v in per_rule]
@@ -0,0 +1,149 @@
+"""
+Tests for the cached, file-validated rule repository.
+Validates indexed lookups, reloads on file changes and atomic writes.
+
+Run with:
+    cd backend && python -m pytest ../tests/test_rule_repository.py -v
+"""
+import json
+import os
+import sys
+from pathlib import Path
+
+# Ensure backend is importable
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+import pytest
+
+
+def _rule(rule_id, policy_id=None, approved=False, **extra):
+    return {
+        "id": rule_id,
+        "description": f"Rule {rule_id}",
+        "condition": "Amount Paid > 10000",
+        "severity": "high",
+        "source_reference": "Section 1",
+        "category": "Test",
+        "approved": approved,
+        "policy_id": policy_id,
+        **extra,
+    }
+
+
+def _touch_later(path: Path) -> None:
+    """Move the mtime forward so a same-size rewrite is still seen as a change."""
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+@pytest.fixture
+def rules_file(tmp_path):
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps([
+        _rule("r1", "p1", approved=True),
+        _rule("r2", "p1"),
+        _rule("r3", "p2", approved=True),
+    ]))
+    return path
+
+
+@pytest.fixture
+def repo(rules_file):
+    from app.core.rule_repository import RuleRepository
+    return RuleRepository(rules_file)
+
+
+class TestReads:
+    def test_indexes(self, repo):
+        assert [r.id for r in repo.all()] == ["r1", "r2", "r3"]
+        assert [r.id for r in repo.all(approved_only=True)] == ["r1", "r3"]
+        assert repo.get("r2").description == "Rule r2"
+        assert repo.get("missing") is None
+        assert [r.id for r in repo.for_policy("p1")] == ["r1", "r2"]
+        assert repo.for_policy("nope") == []
+
+    def test_unchanged_file_is_not_reparsed(self, repo, monkeypatch):
+        first = repo.all()
+        monkeypatch.setattr(json, "loads", lambda *a, **k: pytest.fail("rules file re-parsed"))
+        assert repo.all() == first and repo.get("r1") is first[0]
+
+    def test_returned_lists_are_copies(self, repo):
+        repo.all().clear()
+        repo.for_policy("p1").clear()
+        assert len(repo.all()) == 3 and len(repo.for_policy("p1")) == 2
+
+    def test_external_change_is_picked_up(self, repo, rules_file):
+        repo.all()
+        rules_file.write_text(json.dumps([_rule("r9")]))
+        _touch_later(rules_file)
+        assert [r.id for r in repo.all()] == ["r9"]
+        assert repo.get("r1") is None
+
+    def test_missing_or_invalid_file(self, repo, rules_file):
+        rules_file.write_text("not json")
+        assert repo.all() == []
+        rules_file.unlink()
+        assert repo.all() == []
+
+
+class TestWrites:
+    def test_update_replaces_rule(self, repo, rules_file):
+        before = repo.get("r2")
+        updated = repo.update("r2", {"approved": True, "severity": "low", "unknown": 1})
+        assert updated.approved and updated.severity == "low" and not hasattr(updated, "unknown")
+        assert not before.approved  # objects handed out earlier keep their values
+        assert repo.get("r2") is updated
+        assert [r.id for r in repo.all(approved_only=True)] == ["r1", "r2", "r3"]
+        stored = {r["id"]: r for r in json.loads(rules_file.read_text())}
+        assert stored["r2"]["approved"] and stored["r2"]["severity"] == "low"
+
+    def test_update_missing_rule(self, repo):
+        assert repo.update("missing", {"approved": True}) is None
+
+    def test_add_skips_existing_and_repeated_ids(self, repo):
+        from app.models.rule import PolicyRule
+        new = [PolicyRule(**_rule("r1")), PolicyRule(**_rule("r4", "p2")), PolicyRule(**_rule("r4"))]
+        added = repo.add(new)
+        assert [r.id for r in added] == ["r4"]
+        assert [r.id for r in repo.for_policy("p2")] == ["r3", "r4"]
+
+    def test_delete(self, repo, rules_file):
+        assert repo.delete("r1")
+        assert not repo.delete("r1")
+        assert [r["id"] for r in json.loads(rules_file.read_text())] == ["r2", "r3"]
+        assert repo.for_policy("p1")[0].id == "r2"
+
+    def test_own_write_does_not_force_reload(self, repo, monkeypatch):
+        repo.update("r1", {"severity": "low"})
+        monkeypatch.setattr(json, "loads", lambda *a, **k: pytest.fail("rules file re-parsed"))
+        assert repo.get("r1").severity == "low"
+
+    def test_write_is_visible_to_other_repositories(self, repo, rules_file):
+        from app.core.rule_repository import RuleRepository
+        other = RuleRepository(rules_file)
+        assert other.get("r2").approved is False
+        repo.update("r2", {"approved": True})
+        assert other.get("r2").approved is True
+
+    def test_failed_write_leaves_file_intact(self, repo, rules_file, monkeypatch):
+        original = rules_file.read_text()
+        monkeypatch.setattr(os, "replace", lambda *a: (_ for _ in ()).throw(OSError("disk full")))
+        with pytest.raises(OSError):
+            repo.update("r2", {"approved": True})
+        assert rules_file.read_text() == original
+        assert [p.name for p in rules_file.parent.iterdir()] == ["rules.json"]
+        assert repo.get("r2").approved is False
+
+
+class TestRuleEngineFunctions:
+    def test_module_functions_use_configured_file(self, rules_file, monkeypatch):
+        from app.core import rule_engine
+        monkeypatch.setattr(rule_engine, "RULES_FILE", rules_file)
+
+        assert [r.id for r in rule_engine.get_rules(approved_only=True)] == ["r1", "r3"]
+        assert rule_engine.get_rule_by_id("r3").policy_id == "p2"
+        assert [r.id for r in rule_engine.get_rules_for_policy("p1")] == ["r1", "r2"]
+        assert rule_engine.approve_rule("r2").approved
+        assert rule_engine.update_rule("r3", {"severity": "low"}).severity == "low"
+        assert rule_engine.delete_rule("r1")
+        assert [r.id for r in rule_engine.get_rules()] == ["r2", "r3"]
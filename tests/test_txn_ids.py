@@ -0,0 +1,110 @@
+"""
+Tests for the vectorized transaction ids and the (transaction, rule) dedup keys.
+Validates hash stability across chunking and parsing, and SeenKeys dedup and persistence.
+
+Run with:
+    cd backend && python -m pytest ../tests/test_txn_ids.py -v
+"""
+import sys
+from pathlib import Path
+
+# Ensure backend is importable
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+import numpy as np
+import pandas as pd
+import pytest
+
+SAMPLE_CSV = Path(__file__).resolve().parent.parent / "data" / "datasets" / "ibm_aml" / "sample_transactions.csv"
+
+
+@pytest.fixture
+def transactions():
+    return pd.read_csv(SAMPLE_CSV)
+
+
+class TestTxnHashes:
+    def test_deterministic(self, transactions):
+        from app.core.txn_ids import txn_hashes
+        first = txn_hashes(transactions)
+        assert first.dtype == np.uint64
+        assert np.array_equal(first, txn_hashes(transactions.copy()))
+
+    def test_chunks_match_whole_frame(self, transactions):
+        from app.core.txn_ids import txn_hashes
+        whole = txn_hashes(transactions)
+        chunks = np.concatenate([txn_hashes(c) for c in pd.read_csv(SAMPLE_CSV, chunksize=7)])
+        assert np.array_equal(whole, chunks)
+
+    def test_int_and_float_amounts_agree(self, transactions):
+        from app.core.txn_ids import txn_hashes
+        rows = transactions.head(3).copy()
+        rows["Amount Paid"] = [100, 250, 3]
+        as_float = rows.assign(**{"Amount Paid": rows["Amount Paid"].astype(float)})
+        assert np.array_equal(txn_hashes(rows), txn_hashes(as_float))
+
+    def test_key_columns_only(self, transactions):
+        from app.core.txn_ids import txn_hashes
+        changed = transactions.assign(**{"Payment Format": "Wire"})
+        assert np.array_equal(txn_hashes(transactions), txn_hashes(changed))
+        changed = transactions.assign(**{"Amount Paid": transactions["Amount Paid"] + 1})
+        assert not np.any(txn_hashes(transactions) == txn_hashes(changed))
+
+    def test_id_round_trip(self, transactions):
+        from app.core.txn_ids import parse_txn_id, txn_hashes, txn_id_strings
+        hashes = txn_hashes(transactions)
+        ids = txn_id_strings(hashes)
+        assert all(i.startswith("TXN-") and len(i) == 20 for i in ids)
+        assert [parse_txn_id(i) for i in ids] == hashes.tolist()
+
+    @pytest.mark.parametrize("txn_id", ["TXN-ABC123DEF456Z", "ABC", "TXN-" + "F" * 17])
+    def test_parse_rejects_other_formats(self, txn_id):
+        from app.core.txn_ids import parse_txn_id
+        assert parse_txn_id(txn_id) is None
+
+
+class TestSeenKeys:
+    def test_first_occurrence_is_fresh(self):
+        from app.core.txn_ids import SeenKeys
+        seen = SeenKeys()
+        fresh = seen.add_new("r1", np.array([5, 3, 5, 7], dtype=np.uint64))
+        assert fresh.tolist() == [True, True, False, True]
+        assert seen.add_new("r1", np.array([3, 9], dtype=np.uint64)).tolist() == [False, True]
+        # Keys are per rule
+        assert seen.add_new("r2", np.array([3], dtype=np.uint64)).tolist() == [True]
+        assert len(seen) == 5
+
+    def test_parts_are_compacted(self):
+        from app.core.txn_ids import SeenKeys
+        seen = SeenKeys()
+        for i in range(SeenKeys.MAX_PARTS * 3):
+            seen.add_new("r1", np.array([i, i + 1000], dtype=np.uint64))
+        assert len(seen._keys["r1"]) <= SeenKeys.MAX_PARTS
+        assert not seen.add_new("r1", np.arange(SeenKeys.MAX_PARTS * 3, dtype=np.uint64)).any()
+
+    def test_state_round_trip(self):
+        from app.core.txn_ids import SeenKeys
+        seen = SeenKeys()
+        seen.add("r1", [2**64 - 1, 1])
+        restored = SeenKeys.from_state(seen.to_state())
+        assert restored.to_state() == {"r1": [1, 2**64 - 1]}
+        assert not restored.add_new("r1", np.array([1, 2**64 - 1], dtype=np.uint64)).any()
+
+    def test_from_violations_skips_old_ids(self):
+        from types import SimpleNamespace
+        from app.core.txn_ids import SeenKeys
+        violations = [
+            SimpleNamespace(rule_id="r1", transaction_id="TXN-00000000000000FF"),
+            SimpleNamespace(rule_id="r1", transaction_id="TXN-ABC123DEF456"),
+        ]
+        assert SeenKeys.from_violations(violations).to_state() == {"r1": [255]}
+
+
+class TestHitRows:
+    def test_rows_hit_by_any_rule(self):
+        from app.core.rule_matrix import evaluate_rule_matrix
+        df = pd.DataFrame({"x": range(6)})
+        matrix = evaluate_rule_matrix(
+            ["a", "b"], [lambda d: d["x"] == 1, lambda d: d["x"] >= 4], df
+        )
+        assert matrix.hit_rows().tolist() == [1, 4, 5]
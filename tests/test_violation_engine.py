@@ -0,0 +1,561 @@
+"""
+Tests for the IBM AML violation engine.
+Validates rule evaluation and violation materialization against the sample dataset.
+
+Run with:
+    cd backend && python -m pytest ../tests/test_violation_engine.py -v
+"""
+import sys
+from pathlib import Path
+
+# Ensure backend is importable
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+import numpy as np
+import pandas as pd
+import pytest
+
+SAMPLE_CSV = Path(__file__).resolve().parent.parent / "data" / "datasets" / "ibm_aml" / "sample_transactions.csv"
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    """Violation engine pointed at the sample CSV, with storage redirected to tmp_path."""
+    from app.core import violation_engine
+
+    monkeypatch.setattr(violation_engine, "DATA_FILE", SAMPLE_CSV)
+    monkeypatch.setattr(violation_engine, "VIOLATIONS_FILE", tmp_path / "violations.json")
+    monkeypatch.setattr(violation_engine, "SCAN_STATE_FILE", tmp_path / "scan_state.json")
+    return violation_engine
+
+
+@pytest.fixture
+def transactions():
+    return pd.read_csv(SAMPLE_CSV)
+
+
+@pytest.fixture
+def builtin_rules():
+    from app.core.rule_engine import get_rules
+    return get_rules(approved_only=True)
+
+
+class TestColumnarMaterialization:
+    """The columnar path must build exactly what the per-row helpers build."""
+
+    def test_matches_per_row_helpers(self, engine, transactions, builtin_rules):
+        from app.core.txn_ids import SeenKeys
+
+        for rule in builtin_rules:
+            flagged, _ = engine._apply_rule(rule.id, transactions)
+            violations = engine._materialize_violations(rule, flagged, "2024-01-01T00:00:00", SeenKeys())
+
+            expected = []
+            seen = set()
+            for _, row in flagged.iterrows():
+                txn_id = engine._make_txn_id(row)
+                if txn_id in seen:
+                    continue
+                seen.add(txn_id)
+                expected.append((txn_id, engine._build_explanation(rule.id, row), engine._build_evidence(row)))
+
+            assert [(v.transaction_id, v.explanation, v.evidence) for v in violations] == expected
+
+    def test_violations_are_valid_models(self, engine, transactions, builtin_rules):
+        from app.core.txn_ids import SeenKeys
+        from app.models.violation import Violation
+
+        rule = builtin_rules[0]
+        flagged, _ = engine._apply_rule(rule.id, transactions)
+        for v in engine._materialize_violations(rule, flagged, "2024-01-01T00:00:00", SeenKeys()):
+            assert Violation(**v.model_dump()) == v
+
+    def test_dedup_across_calls(self, engine, transactions, builtin_rules):
+        from app.core.txn_ids import SeenKeys
+
+        rule = builtin_rules[0]
+        flagged, _ = engine._apply_rule(rule.id, transactions)
+        seen = SeenKeys()
+        first = engine._materialize_violations(rule, flagged, "now", seen)
+        second = engine._materialize_violations(rule, flagged, "now", seen)
+        assert first and second == []
+
+    def test_empty_frame(self, engine, builtin_rules):
+        from app.core.txn_ids import SeenKeys
+
+        assert engine._materialize_violations(builtin_rules[0], pd.DataFrame(), "now", SeenKeys()) == []
+
+
+class TestRunScan:
+    def test_run_scan_persists_violations(self, engine):
+        violations = engine.run_scan()
+        assert violations
+        stored = engine.load_violations()
+        assert [v.id for v in stored] == [v.id for v in violations]
+
+
+class TestStreamingScan:
+    """Chunked scans must find exactly what a full in-memory scan finds."""
+
+    @staticmethod
+    def _keys(violations):
+        return sorted((v.transaction_id, v.rule_id, v.explanation) for v in violations)
+
+    @pytest.mark.parametrize("chunk_size", [1, 7, 50, 10_000])
+    def test_matches_full_scan(self, engine, chunk_size):
+        full = engine.run_scan()
+        result = engine.run_streaming_scan(chunk_size)
+        assert self._keys(result["violations"]) == self._keys(full)
+        assert result["rows_scanned"] == 50
+        assert result["chunks"] == -(-50 // chunk_size)
+        assert result["peak_memory_mb"] > 0
+
+    def test_run_scan_delegates_when_chunked(self, engine):
+        assert self._keys(engine.run_scan(chunk_size=10)) == self._keys(engine.run_scan())
+
+    def test_rejects_non_positive_chunk_size(self, engine):
+        with pytest.raises(ValueError):
+            engine.run_streaming_scan(0)
+
+
+class TestIncrementalScan:
+    """Incremental scans only evaluate appended rows and keep stored review state."""
+
+    @pytest.fixture
+    def growing(self, engine, tmp_path, monkeypatch):
+        """Engine over a copy of the first 30 sample rows; returns a callable that appends the rest."""
+        lines = SAMPLE_CSV.read_bytes().splitlines(keepends=True)
+        data = tmp_path / "transactions.csv"
+        data.write_bytes(b"".join(lines[:31]))
+        monkeypatch.setattr(engine, "DATA_FILE", data)
+
+        def append(new_lines):
+            with open(data, "ab") as f:
+                f.write(b"".join(new_lines))
+        return lines[31:], append
+
+    @staticmethod
+    def _keys(violations):
+        return sorted((v.transaction_id, v.rule_id) for v in violations)
+
+    def test_first_run_scans_everything(self, engine, growing):
+        result = engine.run_incremental_scan()
+        assert result["full_rescan"] and result["rows_scanned"] == 30
+        assert self._keys(engine.load_violations()) == self._keys(result["violations"])
+
+    def test_only_new_rows_are_scanned(self, engine, growing):
+        rest, append = growing
+        engine.run_incremental_scan()
+        assert engine.run_incremental_scan()["rows_scanned"] == 0
+
+        append(rest)
+        result = engine.run_incremental_scan(chunk_size=7)
+        assert not result["full_rescan"]
+        assert result["rows_scanned"] == 20
+
+        # Stateless rules give exactly what a full scan of the final file gives
+        stored = engine.load_violations()
+        full = engine.run_scan()
+        stateless = lambda vs: [k for k in self._keys(vs) if k[1] not in ("aml-002", "aml-007")]
+        assert stateless(stored) == stateless(full)
+
+    def test_full_scan_resets_watermark(self, engine, growing):
+        engine.run_incremental_scan()
+        engine.run_scan()
+        assert not engine.SCAN_STATE_FILE.exists()
+        result = engine.run_incremental_scan()
+        assert result["full_rescan"] and result["violations"] == []
+
+    def test_review_status_is_preserved(self, engine, growing):
+        rest, append = growing
+        first = engine.run_incremental_scan()["violations"]
+        engine.update_violation_status(first[0].id, "reviewed", "checked")
+
+        append(rest)
+        engine.run_incremental_scan()
+        stored = {v.id: v for v in engine.load_violations()}
+        assert stored[first[0].id].status == "reviewed"
+        assert len(stored) == len({(v.transaction_id, v.rule_id) for v in stored.values()})
+
+    def test_partial_last_line_waits(self, engine, growing):
+        rest, append = growing
+        engine.run_incremental_scan()
+        append([rest[0], rest[1][:10]])
+        assert engine.run_incremental_scan()["rows_scanned"] == 1
+        append([rest[1][10:]])
+        assert engine.run_incremental_scan()["rows_scanned"] == 1
+
+    def test_window_state_carries_across_runs(self, engine, growing):
+        """A burst split across two runs is flagged once its later transfers arrive."""
+        _, append = growing
+        first_row = SAMPLE_CSV.read_bytes().splitlines(keepends=True)[1]
+        burst = [first_row.replace(b"2023-01-02 00:43:00", f"2023-01-09 0{h}:00:00".encode()) for h in range(6)]
+        engine.run_incremental_scan()
+
+        append(burst[:3])
+        assert not any(v.rule_id == "aml-002" for v in engine.run_incremental_scan()["violations"])
+        append(burst[3:])
+        result = engine.run_incremental_scan()
+        assert sorted(v.evidence["timestamp"] for v in result["violations"] if v.rule_id == "aml-002") == [
+            "2023-01-09 03:00:00", "2023-01-09 04:00:00", "2023-01-09 05:00:00"
+        ]
+
+    def test_rewritten_file_triggers_rescan(self, engine, growing):
+        engine.run_incremental_scan()
+        data = engine.DATA_FILE
+        data.write_bytes(b"".join(data.read_bytes().splitlines(keepends=True)[:11]))
+        result = engine.run_incremental_scan()
+        assert result["full_rescan"] and result["rows_scanned"] == 10
+        assert result["violations"] == []
+
+    def test_old_state_version_triggers_rescan(self, engine, growing):
+        import json
+
+        engine.run_incremental_scan()
+        state = json.loads(engine.SCAN_STATE_FILE.read_text())
+        state["version"] = 1
+        engine.SCAN_STATE_FILE.write_text(json.dumps(state))
+        result = engine.run_incremental_scan()
+        assert result["full_rescan"] and result["rows_scanned"] == 30
+        # Stored violations seed the dedup keys, so the rescan adds nothing
+        assert result["violations"] == []
+
+
+class TestWindowCountRule:
+    @staticmethod
+    def _frame(events):
+        """events: (sender, beneficiary, hours since 2023-01-01)."""
+        base = pd.Timestamp("2023-01-01")
+        return pd.DataFrame({
+            "Account": [a for a, _, _ in events],
+            "Account.1": [b for _, b, _ in events],
+            "Timestamp": [str(base + pd.Timedelta(hours=h)) for _, _, h in events],
+        })
+
+    @staticmethod
+    def _brute_force(df, window_hours, threshold):
+        times = pd.to_datetime(df["Timestamp"])
+        pairs = list(zip(df["Account"], df["Account.1"]))
+        window = pd.Timedelta(hours=window_hours)
+        flags = []
+        for i in range(len(df)):
+            flags.append(any(
+                pairs[s] == pairs[i] and times[s] <= times[i] < times[s] + window
+                and sum(pairs[j] == pairs[s] and times[s] <= times[j] < times[s] + window for j in range(len(df))) > threshold
+                for s in range(len(df))
+            ))
+        return flags
+
+    def test_more_than_five_in_24h(self):
+        from app.core.stateful_rules import WindowCountRule
+
+        # A->X: 6 transfers within 24h; A->Y: 6 transfers spread over 30h; B->X: 5 within 1h
+        events = [("A", "X", h * 4) for h in range(6)] + [("A", "Y", h * 6) for h in range(6)] + [("B", "X", 0)] * 5
+        assert WindowCountRule().evaluate(self._frame(events)).tolist() == [True] * 6 + [False] * 11
+
+    def test_window_is_half_open(self):
+        from app.core.stateful_rules import WindowCountRule
+
+        events = [("A", "X", 0)] * 5 + [("A", "X", 24)]
+        assert not WindowCountRule().evaluate(self._frame(events)).any()
+        events = [("A", "X", 0)] * 5 + [("A", "X", 23.99)]
+        assert WindowCountRule().evaluate(self._frame(events)).all()
+
+    def test_matches_brute_force(self):
+        import random
+        from app.core.stateful_rules import WindowCountRule
+
+        rng = random.Random(3)
+        events = [(rng.choice("AB"), rng.choice("XY"), rng.uniform(0, 96)) for _ in range(150)]
+        df = self._frame(events)
+        for window_hours, threshold in [(24, 5), (6, 2), (1, 0)]:
+            rule = WindowCountRule(window=window_hours * 3600, threshold=threshold)
+            assert rule.evaluate(df).tolist() == self._brute_force(df, window_hours, threshold)
+
+    def test_chunks_match_whole_frame(self):
+        from app.core.stateful_rules import WindowCountRule
+
+        events = [("A", "X", h) for h in range(8)] + [("C", "Z", h) for h in range(3)]
+        df = self._frame(events).sample(frac=1, random_state=0)
+        rule = WindowCountRule()
+        chunks = [df.iloc[i:i + 3] for i in range(0, len(df), 3)]
+        for chunk in chunks:
+            rule.observe(chunk)
+        chunked = np.concatenate([rule.mask(chunk) for chunk in chunks])
+        assert chunked.tolist() == WindowCountRule().evaluate(df).tolist()
+
+    def test_streamed_state_is_bounded_by_the_window(self):
+        import random
+        from app.core.stateful_rules import WindowCountRule
+
+        # 40 days of bursts and singles, time-ordered across chunks, shuffled within each
+        rng = random.Random(7)
+        events = sorted(
+            ((rng.choice("ABC"), rng.choice("XY"), rng.uniform(0, 960)) for _ in range(900)),
+            key=lambda e: e[2],
+        )
+        df = self._frame(events)
+        expected = WindowCountRule().evaluate(df)
+        assert expected.any() and not expected.all()
+
+        rule = WindowCountRule()
+        chunks = [df.iloc[i:i + 50].sample(frac=1, random_state=i) for i in range(0, len(df), 50)]
+        buffered = []
+        for chunk in chunks:
+            rule.observe(chunk)
+            buffered.append(rule._times.size)
+        chunked = pd.concat([chunk.assign(flag=rule.mask(chunk)) for chunk in chunks]).sort_index()
+        assert chunked["flag"].tolist() == expected.tolist()
+        # Two days of transfers (~45) plus a chunk, never the whole file
+        assert max(buffered) < 150
+        assert rule.state_bytes < 16 * len(df)
+
+    def test_unparseable_timestamps_are_ignored(self):
+        from app.core.stateful_rules import WindowCountRule
+
+        df = self._frame([("A", "X", 0)] * 6)
+        df.loc[5, "Timestamp"] = "not a date"
+        assert WindowCountRule().evaluate(df).tolist() == [False] * 6
+
+    @pytest.mark.parametrize("condition,expected", [
+        ("count(To Account, 24h) > 5", (86400, 5)),
+        ("COUNT(Account, 2d) >= 10", (172800, 9)),
+        ("count(To Account, 30m) > 0", (1800, 0)),
+        ("Amount Paid > 10000", None),
+        (None, None),
+    ])
+    def test_parse_window_condition(self, condition, expected):
+        from app.core.stateful_rules import parse_window_condition
+        assert parse_window_condition(condition) == expected
+
+    def test_state_round_trip_keeps_trailing_window(self):
+        import json
+        from app.core.stateful_rules import WindowCountRule
+
+        rule = WindowCountRule()
+        rule.observe(self._frame([("A", "X", 0)] + [("A", "X", 100 + h) for h in range(3)]))
+        state = json.loads(json.dumps(rule.to_state()))
+        assert len(state["times"]) == 3  # the transfer at hour 0 can no longer share a window
+
+        restored = WindowCountRule()
+        restored.load_state(state)
+        later = self._frame([("A", "X", 103 + h) for h in range(3)])
+        restored.observe(later)
+        assert restored.mask(later).all()
+
+
+class TestAggregateThresholdRule:
+    @staticmethod
+    def _reference(df, threshold=10_000, min_count=2):
+        """Plain pandas groupby: rows of (account, day) groups reaching the threshold."""
+        day = pd.to_datetime(df["Timestamp"]).dt.floor("D")
+        grouped = df.groupby([df["Account"], day])["Amount Paid"]
+        return ((grouped.transform("sum") >= threshold) & (grouped.transform("count") >= min_count)).to_numpy()
+
+    def test_matches_groupby(self, transactions):
+        from app.core.stateful_rules import AggregateThresholdRule
+        mask = AggregateThresholdRule().evaluate(transactions)
+        assert mask.any()
+        assert mask.tolist() == self._reference(transactions).tolist()
+
+    def test_days_and_accounts_are_separate(self):
+        from app.core.stateful_rules import AggregateThresholdRule
+        df = pd.DataFrame({
+            "Account": ["A", "A", "A", "B", "B"],
+            "Amount Paid": [6000, 4000, 5000, 9999.5, 0.5],
+            "Timestamp": ["2023-01-01 09:00", "2023-01-01 23:59", "2023-01-02 00:00",
+                          "2023-01-01 10:00", "2023-01-01 11:00"],
+        })
+        assert AggregateThresholdRule().evaluate(df).tolist() == [True, True, False, True, True]
+        assert not AggregateThresholdRule(operator=">").evaluate(df).any()
+        assert AggregateThresholdRule(min_count=1).evaluate(df.iloc[[2]]).tolist() == [False]
+
+    def test_chunks_match_whole_frame(self, transactions, monkeypatch):
+        from app.core.stateful_rules import AggregateThresholdRule
+
+        monkeypatch.setattr(AggregateThresholdRule, "CONSOLIDATE_ROWS", 3)
+        rule = AggregateThresholdRule()
+        chunks = [transactions.iloc[i:i + 7] for i in range(0, len(transactions), 7)]
+        for chunk in chunks:
+            rule.observe(chunk)
+        chunked = np.concatenate([rule.mask(chunk) for chunk in chunks])
+        assert chunked.tolist() == self._reference(transactions).tolist()
+        days = pd.to_datetime(transactions["Timestamp"]).dt.floor("D")
+        assert len(rule.totals()) == len(set(zip(transactions["Account"], days)))
+
+    def test_row_totals(self, transactions):
+        from app.core.stateful_rules import AggregateThresholdRule
+        rule = AggregateThresholdRule()
+        rule.observe(transactions)
+        days = pd.to_datetime(transactions["Timestamp"]).dt.floor("D")
+        expected = transactions.groupby([transactions["Account"], days])["Amount Paid"].transform("sum").to_numpy()
+        assert np.allclose(rule.row_totals(transactions), expected)
+
+    @pytest.mark.parametrize("condition,expected", [
+        ("sum(Amount Paid, Account, 1d) >= 10000", ("Amount Paid", "Account", 86400, ">=", 10000.0)),
+        ("SUM(amount, account_id, 12h) > 2500.5", ("amount", "account_id", 43200, ">", 2500.5)),
+        ("sum(Amount Paid, 1d) > 5", None),
+        ("count(To Account, 24h) > 5", None),
+    ])
+    def test_parse_aggregate_condition(self, condition, expected):
+        from app.core.stateful_rules import parse_aggregate_condition
+        assert parse_aggregate_condition(condition) == expected
+
+    def test_state_round_trip_keeps_latest_days(self):
+        import json
+        from app.core.stateful_rules import AggregateThresholdRule
+
+        rule = AggregateThresholdRule()
+        rule.observe(pd.DataFrame({
+            "Account": ["A", "A", "B"],
+            "Amount Paid": [100, 6000, 500],
+            "Timestamp": ["2023-01-01 09:00", "2023-01-05 09:00", "2023-01-05 10:00"],
+        }))
+        state = json.loads(json.dumps(rule.to_state()))
+        assert sorted(state["totals"]) == [500.0, 6000.0]
+
+        restored = AggregateThresholdRule()
+        restored.load_state(state)
+        later = pd.DataFrame({"Account": ["A"], "Amount Paid": [4000], "Timestamp": ["2023-01-05 18:00"]})
+        restored.observe(later)
+        assert restored.mask(later).tolist() == [True]
+
+
+class TestVelocityAnomalyRule:
+    PERIOD = 30 * 86400
+
+    @staticmethod
+    def _frame(events):
+        """Frame of (account, epoch seconds) events."""
+        return pd.DataFrame({
+            "Account": [a for a, _ in events],
+            "Timestamp": pd.to_datetime([t for _, t in events], unit="s").astype(str),
+        })
+
+    @classmethod
+    def _reference(cls, df, sigmas=3.0, min_periods=3, min_std=1.0):
+        """Brute force: score each account-period against every earlier period of the account."""
+        periods = pd.to_datetime(df["Timestamp"]).astype("int64") // 10**9 // cls.PERIOD
+        counts = df.groupby([df["Account"], periods]).size()
+        flagged = set()
+        for account, per_account in counts.groupby(level=0):
+            per_period = per_account.droplevel(0)
+            for period, count in per_period.items():
+                history = [per_period.get(p, 0) for p in range(per_period.index.min(), period)]
+                std = np.std(history, ddof=1) if len(history) > 1 else 0.0
+                if len(history) >= min_periods and count > np.mean(history) + sigmas * max(std, min_std):
+                    flagged.add((account, period))
+        return np.array([(a, p) in flagged for a, p in zip(df["Account"], periods)])
+
+    def _random_events(self, n=3000, seed=3):
+        rng = np.random.default_rng(seed)
+        accounts = rng.choice([f"ACC{i}" for i in range(12)], size=n)
+        times = rng.integers(0, 14 * self.PERIOD, size=n)
+        # A few accounts get short bursts late in their history
+        burst = rng.random(n) < 0.05
+        times[burst] = 12 * self.PERIOD + rng.integers(0, self.PERIOD, size=int(burst.sum()))
+        order = np.argsort(times, kind="stable")
+        return [(accounts[i], int(times[i])) for i in order]
+
+    def test_flags_burst_above_history(self):
+        from app.core.stateful_rules import VelocityAnomalyRule
+        month = self.PERIOD
+        regular = [("A", p * month + d * 86400) for p in range(6) for d in range(5)]
+        burst = [("A", 6 * month + h * 3600) for h in range(30)]
+        steady = [("B", p * month + d * 86400) for p in range(7) for d in range(5)]
+        df = self._frame(regular + burst + steady)
+        mask = VelocityAnomalyRule().evaluate(df)
+        assert mask.tolist() == [False] * len(regular) + [True] * len(burst) + [False] * len(steady)
+
+    def test_needs_min_periods_of_history(self):
+        from app.core.stateful_rules import VelocityAnomalyRule
+        events = [("A", 0), ("A", self.PERIOD)] + [("A", 2 * self.PERIOD + h) for h in range(50)]
+        assert not VelocityAnomalyRule().evaluate(self._frame(events)).any()
+        assert VelocityAnomalyRule(min_periods=2).evaluate(self._frame(events))[2:].all()
+
+    def test_matches_brute_force(self):
+        from app.core.stateful_rules import VelocityAnomalyRule
+        df = self._frame(self._random_events())
+        expected = self._reference(df)
+        assert expected.any()
+        assert VelocityAnomalyRule().evaluate(df).tolist() == expected.tolist()
+
+    def test_chunks_match_whole_frame(self):
+        from app.core.stateful_rules import VelocityAnomalyRule
+        df = self._frame(self._random_events())
+        rule = VelocityAnomalyRule()
+        chunks = [df.iloc[i:i + 250] for i in range(0, len(df), 250)]
+        for chunk in chunks:
+            rule.observe(chunk)
+        chunked = np.concatenate([rule.mask(chunk) for chunk in chunks])
+        assert chunked.tolist() == self._reference(df).tolist()
+
+    def test_incremental_state_matches_full_history(self):
+        import json
+        from app.core.stateful_rules import VelocityAnomalyRule
+        df = self._frame(self._random_events())
+        split = len(df) * 3 // 4
+        earlier, later = df.iloc[:split], df.iloc[split:]
+
+        first = VelocityAnomalyRule()
+        first.observe(earlier)
+        restored = VelocityAnomalyRule()
+        restored.load_state(json.loads(json.dumps(first.to_state())))
+        restored.observe(later)
+
+        full = VelocityAnomalyRule()
+        full.observe(df)
+        assert restored.mask(later).tolist() == full.mask(later).tolist()
+        pd.testing.assert_frame_equal(restored.stats.frame(), full.stats.frame())
+
+    @pytest.mark.parametrize("condition,expected", [
+        ("zscore(Account, 30d) > 3", ("Account", 30 * 86400, 3.0)),
+        ("ZSCORE(account_id, 7d) > 2.5", ("account_id", 7 * 86400, 2.5)),
+        ("zscore(Account) > 3", None),
+        ("sum(Amount Paid, Account, 1d) >= 10000", None),
+    ])
+    def test_parse_zscore_condition(self, condition, expected):
+        from app.core.stateful_rules import parse_zscore_condition
+        assert parse_zscore_condition(condition) == expected
+
+
+class TestEngineStatefulRules:
+    def test_extracted_rapid_rule_is_evaluated(self, engine, transactions):
+        flagged, description = engine._apply_rule("ext-aml-rapid-x", transactions, "count(To Account, 24h) > 5")
+        assert description == "count(To Account, 24h) > 5"
+        builtin, _ = engine._apply_rule("aml-002", transactions)
+        assert not flagged.empty and flagged.index.tolist() == builtin.index.tolist()
+
+    def test_new_burst_is_flagged_by_aml_002(self, engine, transactions):
+        before, _ = engine._apply_rule("aml-002", transactions)
+        burst = pd.concat([transactions.iloc[[0]]] * 6, ignore_index=True)
+        burst["Account"] = "NEWACCT01"
+        burst["Timestamp"] = [f"2023-02-01 0{h}:00:00" for h in range(6)]
+        df = pd.concat([transactions, burst], ignore_index=True)
+        flagged, _ = engine._apply_rule("aml-002", df)
+        assert flagged.index.tolist() == before.index.tolist() + list(range(len(transactions), len(df)))
+
+    def test_aggregate_rule_is_evaluated(self, engine, transactions, builtin_rules):
+        assert "aml-007" in {r.id for r in builtin_rules}
+        flagged, description = engine._apply_rule("aml-007", transactions)
+        assert description.startswith("Same-day transactions")
+        assert flagged.index.tolist() == np.flatnonzero(TestAggregateThresholdRule._reference(transactions)).tolist()
+        extracted, _ = engine._apply_rule("ext-aml-agg-x", transactions, "sum(Amount Paid, Account, 1d) >= 10000")
+        assert extracted.index.tolist() == flagged.index.tolist()
+
+    def test_extractor_emits_aggregate_rule(self):
+        from app.core.rule_extractor import extract_rules_from_text
+        rules = extract_rules_from_text(
+            "Multiple transactions totaling $10,000 or more within a single business day are one transaction.",
+            "pol-test", "test.pdf",
+        )
+        assert any(r.condition == "sum(Amount Paid, Account, 1d) >= 10000" for r in rules)
+
+
+    def test_velocity_rule_is_registered(self, engine, transactions, builtin_rules):
+        from app.core.stateful_rules import VelocityAnomalyRule
+        assert "aml-008" in {r.id for r in builtin_rules}
+        assert isinstance(engine._new_state("aml-008", "zscore(Account, 30d) > 3"), VelocityAnomalyRule)
+        # Two days of sample data hold no monthly history yet
+        flagged, description = engine._apply_rule("aml-008", transactions, "zscore(Account, 30d) > 3")
+        assert flagged.empty and description.startswith("Account transaction frequency")
@@ -0,0 +1,203 @@
+"""
+Tests for the in-process violation index.
+Validates indexed reads against plain list filtering and the lazy rebuild on store changes.
+
+Run with:
+    cd backend && python -m pytest ../tests/test_violation_index.py -v
+"""
+import random
+import sys
+from pathlib import Path
+
+# Ensure backend is importable
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+import pytest
+
+STATUSES = ["open", "reviewed", "resolved", "false_positive"]
+SEVERITIES = ["critical", "high", "medium", "low"]
+
+
+def _violations(n: int, seed: int = 7):
+    from app.models.violation import Violation
+    rng = random.Random(seed)
+    return [
+        Violation(
+            id=f"viol-{i:05d}",
+            transaction_id=f"TXN-{i:05d}",
+            rule_id=rng.choice(["aml-001", "aml-002", "aml-003"]),
+            rule_name="Test rule",
+            severity=rng.choice(SEVERITIES),
+            explanation="x",
+            evidence={},
+            status=rng.choice(STATUSES),
+            detected_at="2024-01-01T00:00:00",
+        )
+        for i in range(n)
+    ]
+
+
+@pytest.fixture(params=["json", "sqlite"])
+def store(request, tmp_path):
+    from app.core.violation_store import open_store
+    store = open_store(request.param, tmp_path / "violations.json")
+    store.replace_all(_violations(300))
+    return store
+
+
+class TestViolationIndex:
+    def test_query_matches_list_filtering(self, store):
+        from app.core.violation_index import index_for
+
+        index = index_for(store)
+        everything = store.load_all()
+        for status in [None, "open", ("open", "reviewed")]:
+            for severity in [None, "high"]:
+                for rule_id in [None, "aml-002"]:
+                    expected = [
+                        v for v in everything
+                        if (status is None or v.status in ((status,) if isinstance(status, str) else status))
+                        and (severity is None or v.severity == severity)
+                        and (rule_id is None or v.rule_id == rule_id)
+                    ]
+                    filters = {"status": status, "severity": severity, "rule_id": rule_id}
+                    assert index.query(**filters) == expected
+                    assert index.query(limit=5, offset=3, **filters) == expected[3:8]
+                    assert index.count(**filters) == len(expected)
+
+    def test_count_by(self, store):
+        from app.core.violation_index import index_for
+
+        everything = store.load_all()
+        index = index_for(store)
+        assert index.count_by("status") == {
+            s: n for s in STATUSES if (n := sum(v.status == s for v in everything))
+        }
+        assert sum(index.count_by("severity", status="open").values()) == sum(v.status == "open" for v in everything)
+
+    def test_review_queue_order(self, store):
+        from app.core.violation_index import index_for
+
+        rank = {s: i for i, s in enumerate(SEVERITIES)}
+        pending = [v for v in store.load_all() if v.status in ("open", "reviewed")]
+        expected = sorted(pending, key=lambda v: rank[v.severity])
+        index = index_for(store)
+        assert index.review_queue(("open", "reviewed"), limit=50) == expected[:50]
+        assert index.review_queue(("open", "reviewed"), severity="low") == [v for v in expected if v.severity == "low"]
+
+    def test_review_queue_pages_only_what_it_returns(self, store, monkeypatch):
+        from app.core.violation_index import index_for
+
+        index = index_for(store)
+        query, calls = index.query, []
+
+        def recording_query(limit=None, offset=0, **filters):
+            page = query(limit=limit, offset=offset, **filters)
+            calls.append((limit, len(page)))
+            return page
+
+        monkeypatch.setattr(index, "query", recording_query)
+        assert len(index.review_queue(("open", "reviewed"), limit=20)) == 20
+        # Each severity is asked only for what is still missing from the page
+        returned = 0
+        for limit, found in calls:
+            assert limit == 20 - returned
+            returned += found
+
+    def test_status_update_is_applied_in_place(self, store):
+        from app.core.violation_index import index_for
+
+        index = index_for(store)
+        target = index.query(status="open", limit=1)[0]
+        open_before = index.count(status="open")
+        by_id_before = index.by_id
+
+        assert index.update_status(target.id, "resolved", "ok", "2024-02-01T00:00:00")
+        assert index.refresh().by_id is by_id_before  # no rebuild
+        assert index.count(status="open") == open_before - 1
+        assert target.id in {v.id for v in index.query(status="resolved")}
+        assert store.get(target.id).status == "resolved"
+        assert not index.update_status("viol-missing", "resolved", None, "now")
+
+    def test_rebuilds_after_external_write(self, store, tmp_path):
+        from app.core.violation_index import ViolationIndex, index_for
+
+        index = index_for(store)
+        assert len(index) == 300
+        # A different writer (e.g. a scan in another process) appends directly to the store
+        store.insert_many(_violations(310)[300:])
+        assert len(index_for(store)) == 310
+        assert ViolationIndex(store).refresh().count(status="open") == index.count(status="open")
+
+    def test_insert_through_index(self, store):
+        from app.core.violation_index import index_for
+
+        index = index_for(store)
+        index.insert_many(_violations(305)[300:])
+        assert len(index) == 305
+        assert index.refresh().count() == store.count() == 305
+
+    def test_reinsert_replaces_in_place(self, store):
+        from app.core.violation_index import ViolationIndex, index_for
+
+        index = index_for(store)
+        order = [v.id for v in index.query()]
+        replaced = _violations(300)[10].model_copy(update={"status": "resolved", "severity": "critical"})
+        index.insert_many([replaced])
+
+        assert [v.id for v in index.query()] == order
+        assert index.by_id[replaced.id].status == "resolved"
+        rebuilt = ViolationIndex(store).refresh()
+        assert [v.id for v in rebuilt.query()] == order
+        assert rebuilt.count_by("status") == index.count_by("status")
+        assert rebuilt.count_by("severity") == index.count_by("severity")
+
+    def test_write_racing_another_writer_rebuilds(self, store, monkeypatch):
+        from app.core.violation_index import index_for
+
+        index = index_for(store)
+        store_insert = store.insert_many
+
+        def racing_insert(violations):
+            # Another process writes after the index checked but before its own write
+            store_insert(_violations(310)[305:])
+            return store_insert(violations)
+
+        monkeypatch.setattr(store, "insert_many", racing_insert)
+        index.insert_many(_violations(305)[300:])
+        assert len(index_for(store)) == store.count() == 310
+
+
+class TestReviewEndpoints:
+    @pytest.fixture
+    def client(self, tmp_path, monkeypatch):
+        from fastapi import FastAPI
+        from fastapi.testclient import TestClient
+        from app.api import reviews
+        from app.core import violation_engine
+
+        monkeypatch.setattr(violation_engine, "VIOLATIONS_FILE", tmp_path / "violations.json")
+        violation_engine._save_violations(_violations(120))
+        app = FastAPI()
+        app.include_router(reviews.router)
+        return TestClient(app)
+
+    def test_queue_and_stats(self, client):
+        everything = _violations(120)
+        pending = [v for v in everything if v.status in ("open", "reviewed")]
+
+        body = client.get("/api/reviews", params={"severity": "high", "limit": 5}).json()
+        assert body["total_pending"] == sum(v.severity == "high" for v in pending)
+        assert [v["id"] for v in body["violations"]] == [v.id for v in pending if v.severity == "high"][:5]
+
+        stats = client.get("/api/reviews/stats").json()
+        assert stats["open"] == sum(v.status == "open" for v in everything)
+        assert stats["critical_open"] == sum(v.status == "open" and v.severity == "critical" for v in everything)
+
+    def test_action_updates_stats(self, client):
+        open_id = next(v.id for v in _violations(120) if v.status == "open")
+        before = client.get("/api/reviews/stats").json()
+        response = client.post(f"/api/reviews/{open_id}/action", json={"action": "resolve", "comment": "ok"})
+        assert response.status_code == 200
+        after = client.get("/api/reviews/stats").json()
+        assert (after["open"], after["resolved"]) == (before["open"] - 1, before["resolved"] + 1)
@@ -0,0 +1,122 @@
+"""
+Tests for the violation storage backends.
+Validates that the JSON and SQLite stores behave identically and that SQLite updates are point updates.
+
+Run with:
+    cd backend && python -m pytest ../tests/test_violation_store.py -v
+"""
+import json
+import sys
+import threading
+from pathlib import Path
+
+# Ensure backend is importable
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+import pytest
+
+
+def _violation(i: int, status: str = "open"):
+    from app.models.violation import Violation
+    return Violation(
+        id=f"viol-{i:04d}",
+        transaction_id=f"TXN-{i % 7:04d}",
+        rule_id=f"aml-00{i % 3 + 1}",
+        rule_name="Test rule",
+        severity=["critical", "high", "medium", "low"][i % 4],
+        explanation=f"Violation {i}",
+        evidence={"amount_paid": float(i), "from_account": f"ACC{i}"},
+        status=status,
+        detected_at="2024-01-01T00:00:00",
+    )
+
+
+@pytest.fixture(params=["json", "sqlite"])
+def store(request, tmp_path):
+    from app.core.violation_store import open_store
+    return open_store(request.param, tmp_path / "violations.json")
+
+
+class TestViolationStore:
+    def test_round_trip_keeps_order(self, store):
+        violations = [_violation(i) for i in range(20)]
+        store.replace_all(violations)
+        assert store.load_all() == violations
+
+    def test_insert_many_appends(self, store):
+        store.replace_all([_violation(i) for i in range(5)])
+        store.insert_many([_violation(i) for i in range(5, 8)])
+        assert [v.id for v in store.load_all()] == [f"viol-{i:04d}" for i in range(8)]
+
+    def test_filtered_paginated_reads(self, store):
+        violations = [_violation(i) for i in range(40)]
+        store.replace_all(violations)
+        expected = [v for v in violations if v.severity == "high" and v.rule_id == "aml-002"]
+        assert store.count(severity="high", rule_id="aml-002") == len(expected)
+        assert store.query(severity="high", rule_id="aml-002", limit=2, offset=1) == expected[1:3]
+        assert store.query(transaction_id="TXN-0003") == [v for v in violations if v.transaction_id == "TXN-0003"]
+        assert store.count(status=None) == 40
+
+    def test_unknown_filter_raises(self, store):
+        with pytest.raises(ValueError):
+            store.query(explanation="x")
+
+    def test_point_update(self, store):
+        store.replace_all([_violation(i) for i in range(5)])
+        assert store.update_status("viol-0002", "resolved", "done", "2024-02-01T00:00:00")
+        assert not store.update_status("viol-9999", "resolved", None, "2024-02-01T00:00:00")
+
+        updated = store.get("viol-0002")
+        assert (updated.status, updated.reviewer_comment, updated.reviewed_at) == (
+            "resolved", "done", "2024-02-01T00:00:00"
+        )
+        # An empty comment keeps the previous one
+        store.update_status("viol-0002", "reviewed", None, "2024-02-02T00:00:00")
+        assert store.get("viol-0002").reviewer_comment == "done"
+        assert store.count(status="open") == 4
+
+    def test_get_missing(self, store):
+        assert store.get("viol-0000") is None
+
+
+class TestSqliteStore:
+    def test_imports_existing_json(self, tmp_path):
+        from app.core.violation_store import open_store
+
+        violations = [_violation(i) for i in range(3)]
+        json_path = tmp_path / "violations.json"
+        json_path.write_text(json.dumps([v.model_dump() for v in violations]), encoding="utf-8")
+        assert open_store("sqlite", json_path).load_all() == violations
+
+    def test_concurrent_updates_are_not_lost(self, tmp_path):
+        from app.core.violation_store import open_store
+
+        store = open_store("sqlite", tmp_path / "violations.json")
+        store.replace_all([_violation(i) for i in range(40)])
+        threads = [
+            threading.Thread(target=store.update_status, args=(f"viol-{i:04d}", "resolved", None, "now"))
+            for i in range(40)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert store.count(status="resolved") == 40
+
+    def test_indexes_exist(self, tmp_path):
+        import sqlite3
+        from app.core.violation_store import open_store
+
+        store = open_store("sqlite", tmp_path / "violations.json")
+        conn = sqlite3.connect(str(store.path))
+        names = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        conn.close()
+        assert {
+            "idx_violations_status", "idx_violations_severity",
+            "idx_violations_rule_id", "idx_violations_transaction_id",
+        } <= names
+
+    def test_unknown_backend(self, tmp_path):
+        from app.core.violation_store import open_store
+        with pytest.raises(ValueError):
+            open_store("redis", tmp_path / "violations.json")